@@ -13,7 +13,12 @@ from legal_chatbot.api.routes.contract import router as contract_router, init_st
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Startup and shutdown events"""
-    # Startup: start session eviction background task
+    # Startup: load the embedding model up front if retrieval uses it in-process
+    from legal_chatbot.services.retriever import warm_up_vector_leg
+    from legal_chatbot.utils.executor import run_blocking
+
+    await run_blocking(warm_up_vector_leg)
+    # Start session eviction background task
     task = asyncio.create_task(_evict_loop())
     yield
     # Shutdown: cancel eviction task
@@ -0,0 +1,165 @@
+"""Embedding sidecar — one model per host, shared by all API workers.
+
+Concurrent requests are coalesced into micro-batches: the first queued text
+opens a window of max_wait_ms (or until max_batch_size texts), then the
+whole batch runs in one forward pass while the next one accumulates.
+
+    POST /embed   {"texts": [...]}  →  {"embeddings": [[...], ...]}
+                  or, with Accept: application/octet-stream, raw float32
+                  bytes (n × dim, little-endian; dim in X-Embedding-Dim)
+    GET  /health  model info + batching stats
+
+Start with: legal-chatbot embedding-server [--uds /tmp/embedding.sock]
+"""
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Callable, List
+
+import numpy as np
+from fastapi import FastAPI, Request, Response
+from pydantic import BaseModel
+
+from legal_chatbot.services.embedding_client import BINARY_MEDIA_TYPE
+from legal_chatbot.utils.config import get_settings
+from legal_chatbot.utils.vectors import as_float32, to_bytes
+
+logger = logging.getLogger(__name__)
+
+
+class EmbedRequest(BaseModel):
+    texts: List[str]
+
+
+class EmbedResponse(BaseModel):
+    embeddings: List[List[float]]
+
+
+class MicroBatcher:
+    """Coalesce concurrent encode requests into batched model calls."""
+
+    def __init__(
+        self,
+        encode: Callable[[List[str]], List[List[float]]],
+        max_batch_size: int = 64,
+        max_wait_ms: float = 5.0,
+    ):
+        self._encode = encode
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._queue: asyncio.Queue | None = None
+        self._task: asyncio.Task | None = None
+        self.batches = 0
+        self.texts = 0
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def submit(self, texts: List[str]) -> List[List[float]]:
+        """Queue texts and wait for their vectors (order preserved)."""
+        loop = asyncio.get_running_loop()
+        futures = [loop.create_future() for _ in texts]
+        for text, future in zip(texts, futures):
+            self._queue.put_nowait((text, future))
+        return list(await asyncio.gather(*futures))
+
+    async def _collect(self) -> list:
+        """Block for the first item, then fill the batch until full or window closes."""
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - loop.time()
+            try:
+                if remaining <= 0:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except (asyncio.QueueEmpty, asyncio.TimeoutError):
+                break
+        return batch
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._collect()
+            texts = [text for text, _ in batch]
+            try:
+                vectors = await asyncio.to_thread(self._encode, texts)
+            except Exception as e:
+                logger.error(f"Embedding batch of {len(texts)} failed: {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            self.batches += 1
+            self.texts += len(texts)
+            for (_, future), vector in zip(batch, vectors):
+                if not future.done():
+                    future.set_result(vector)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "texts": self.texts,
+            "avg_batch_size": round(self.texts / self.batches, 2) if self.batches else 0,
+            "queued": self._queue.qsize() if self._queue else 0,
+        }
+
+
+def create_embedding_app(encode: Callable[[List[str]], List[List[float]]] = None) -> FastAPI:
+    """Create the sidecar app. encode defaults to a local EmbeddingService."""
+    settings = get_settings()
+    model_name = settings.embedding_model
+
+    if encode is None:
+        from legal_chatbot.services.embedding import EmbeddingService
+
+        # server_url="" — the sidecar itself always runs the model locally
+        service = EmbeddingService(server_url="")
+        encode = service.embed_batch
+        model_name = service._model_name
+
+    batcher = MicroBatcher(
+        encode,
+        max_batch_size=settings.embedding_server_max_batch,
+        max_wait_ms=settings.embedding_server_max_wait_ms,
+    )
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        await batcher.start()
+        # Load the model before accepting traffic
+        await asyncio.to_thread(encode, ["khởi động"])
+        yield
+        await batcher.stop()
+
+    app = FastAPI(title="Embedding sidecar", lifespan=lifespan)
+    app.state.batcher = batcher
+
+    @app.post("/embed", response_model=EmbedResponse)
+    async def embed(body: EmbedRequest, request: Request):
+        vectors = await batcher.submit(body.texts)
+        matrix = as_float32(vectors) if vectors else np.empty((0, 0), dtype=np.float32)
+        if BINARY_MEDIA_TYPE in request.headers.get("accept", ""):
+            return Response(
+                content=to_bytes(matrix),
+                media_type=BINARY_MEDIA_TYPE,
+                headers={"X-Embedding-Dim": str(matrix.shape[1])},
+            )
+        return EmbedResponse(embeddings=matrix.tolist())
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok", "model": model_name, **batcher.stats()}
+
+    return app
@@ -0,0 +1,272 @@
+"""Local stand-in for the LLM APIs used by utils/llm.py (benchmarks, offline dev).
+
+    POST /v1/messages           Anthropic Messages (JSON, or SSE with stream=true)
+    POST /chat/completions      OpenAI chat completions (JSON, or SSE chunks)
+    POST /v1/chat/completions   same
+    GET  /health                request counters
+
+Responses are paced like a real model: ttft seconds before the first token,
+then tokens_per_sec. Texts come from canned rules ({"match": regex,
+"response": text}) matched against system + last user message; the
+defaults answer the query router with a legal_question JSON, contract-type
+classification with "none", and everything else with a legal answer.
+
+Point the app at it with ANTHROPIC_BASE_URL=http://127.0.0.1:8790 (and
+DEEPSEEK_BASE_URL for the DeepSeek path). Start with:
+legal-chatbot fake-llm-server --ttft 0.4 --tps 60
+"""
+
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+from typing import List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel
+
+ROUTER_RESPONSE = json.dumps({
+    "intent": "legal_question",
+    "contract_type": None,
+    "category": "dan_su",
+    "primary": ["thừa kế", "di sản", "hàng thừa kế", "thừa kế theo pháp luật", "di chúc"],
+    "secondary": ["bộ luật dân sự"],
+}, ensure_ascii=False)
+
+ANSWER_RESPONSE = (
+    "Theo **Điều 650 Bộ luật Dân sự 2015**, thừa kế theo pháp luật được áp dụng khi "
+    "không có di chúc, di chúc không hợp pháp hoặc những người thừa kế theo di chúc "
+    "chết trước người lập di chúc. Theo **Điều 651**, những người thừa kế theo pháp "
+    "luật được hưởng phần di sản bằng nhau nếu cùng hàng thừa kế:\n\n"
+    "1. Hàng thừa kế thứ nhất: vợ, chồng, cha đẻ, mẹ đẻ, cha nuôi, mẹ nuôi, con đẻ, con nuôi;\n"
+    "2. Hàng thừa kế thứ hai: ông bà nội, ông bà ngoại, anh chị em ruột, cháu ruột;\n"
+    "3. Hàng thừa kế thứ ba: cụ nội, cụ ngoại, bác, chú, cậu, cô, dì ruột.\n\n"
+    "Những người ở hàng sau chỉ được hưởng thừa kế nếu không còn ai ở hàng trước. "
+    "Đây là thông tin tham khảo, bạn nên tham vấn luật sư cho trường hợp cụ thể."
+)
+
+DEFAULT_RULES = [
+    {"match": r"Bạn phân tích câu hỏi cho hệ thống pháp luật", "response": ROUTER_RESPONSE},
+    {"match": r"trợ lý phân loại hợp đồng", "response": "none"},
+    {"match": r"", "response": ANSWER_RESPONSE},
+]
+
+_TOKEN = re.compile(r"\S+\s*|\s+")
+
+
+class CannedRule(BaseModel):
+    match: str
+    response: str
+
+
+def _text_of(content) -> str:
+    if isinstance(content, str):
+        return content
+    return "\n".join(block.get("text", "") for block in content or [] if isinstance(block, dict))
+
+
+def _prompt_text(body: dict) -> str:
+    """System prompt + last user message, for rule matching."""
+    system = _text_of(body.get("system", ""))
+    messages = body.get("messages", [])
+    system += "\n".join(_text_of(m["content"]) for m in messages if m.get("role") == "system")
+    user = next(
+        (_text_of(m["content"]) for m in reversed(messages) if m.get("role") == "user"), ""
+    )
+    return f"{system}\n{user}"
+
+
+def _count_tokens(text: str) -> int:
+    return max(1, len(text) // 3)
+
+
+class FakeLLM:
+    """Canned, paced responses shared by both API shapes."""
+
+    def __init__(
+        self,
+        ttft: float = 0.3,
+        tokens_per_sec: float = 80.0,
+        rules: Optional[List[dict]] = None,
+        error_rate: float = 0.0,
+    ):
+        self.ttft = ttft
+        self.tokens_per_sec = tokens_per_sec
+        self.rules = [CannedRule(**r) for r in (rules or [])] + [CannedRule(**r) for r in DEFAULT_RULES]
+        self.error_rate = error_rate
+        self.requests = 0
+        self.streams = 0
+        self.errors = 0
+
+    def respond(self, body: dict) -> str:
+        prompt = _prompt_text(body)
+        for rule in self.rules:
+            if re.search(rule.match, prompt):
+                return rule.response
+        return ANSWER_RESPONSE
+
+    def tokens(self, text: str) -> List[str]:
+        return _TOKEN.findall(text)
+
+    async def pace_tokens(self, text: str):
+        """Yield text pieces after TTFT, one token per 1/tokens_per_sec."""
+        await asyncio.sleep(self.ttft)
+        delay = 1 / self.tokens_per_sec if self.tokens_per_sec > 0 else 0
+        for i, token in enumerate(self.tokens(text)):
+            if i and delay:
+                await asyncio.sleep(delay)
+            yield token
+
+    async def wait_full(self, text: str) -> None:
+        rate = self.tokens_per_sec
+        await asyncio.sleep(self.ttft + (len(self.tokens(text)) / rate if rate > 0 else 0))
+
+    def should_fail(self) -> bool:
+        if self.error_rate and random.random() < self.error_rate:
+            self.errors += 1
+            return True
+        return False
+
+    @staticmethod
+    def rate_limit_headers() -> dict:
+        return {
+            "anthropic-ratelimit-requests-remaining": "100000",
+            "anthropic-ratelimit-requests-reset": "1s",
+            "x-ratelimit-remaining-requests": "100000",
+            "x-ratelimit-reset-requests": "1s",
+        }
+
+
+def _sse(event: Optional[str], data: dict) -> str:
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def create_fake_llm_app(
+    ttft: float = 0.3,
+    tokens_per_sec: float = 80.0,
+    rules: Optional[List[dict]] = None,
+    error_rate: float = 0.0,
+) -> FastAPI:
+    """Create the fake LLM app (error_rate = share of requests answered 529)."""
+    fake = FakeLLM(ttft=ttft, tokens_per_sec=tokens_per_sec, rules=rules, error_rate=error_rate)
+    app = FastAPI(title="Fake LLM")
+    app.state.fake = fake
+
+    def overloaded(openai: bool) -> JSONResponse:
+        error = {"type": "overloaded_error", "message": "Overloaded (fake)"}
+        body = {"error": error} if openai else {"type": "error", "error": error}
+        return JSONResponse(body, status_code=529, headers={"retry-after": "0"})
+
+    @app.post("/v1/messages")
+    async def messages(request: Request):
+        body = await request.json()
+        fake.requests += 1
+        if fake.should_fail():
+            return overloaded(openai=False)
+        text = fake.respond(body)
+        model = body.get("model", "fake")
+        input_tokens = _count_tokens(_prompt_text(body))
+        output_tokens = len(fake.tokens(text))
+        message_id = f"msg_{uuid.uuid4().hex[:24]}"
+        usage = {
+            "input_tokens": input_tokens, "output_tokens": output_tokens,
+            "cache_creation_input_tokens": 0, "cache_read_input_tokens": 0,
+        }
+
+        if not body.get("stream"):
+            await fake.wait_full(text)
+            return JSONResponse({
+                "id": message_id, "type": "message", "role": "assistant", "model": model,
+                "content": [{"type": "text", "text": text}],
+                "stop_reason": "end_turn", "stop_sequence": None, "usage": usage,
+            }, headers=fake.rate_limit_headers())
+
+        fake.streams += 1
+
+        async def events():
+            yield _sse("message_start", {"type": "message_start", "message": {
+                "id": message_id, "type": "message", "role": "assistant", "model": model,
+                "content": [], "stop_reason": None, "stop_sequence": None,
+                "usage": {**usage, "output_tokens": 1},
+            }})
+            yield _sse("content_block_start", {
+                "type": "content_block_start", "index": 0, "content_block": {"type": "text", "text": ""},
+            })
+            async for token in fake.pace_tokens(text):
+                yield _sse("content_block_delta", {
+                    "type": "content_block_delta", "index": 0,
+                    "delta": {"type": "text_delta", "text": token},
+                })
+            yield _sse("content_block_stop", {"type": "content_block_stop", "index": 0})
+            yield _sse("message_delta", {
+                "type": "message_delta",
+                "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                "usage": {"output_tokens": output_tokens},
+            })
+            yield _sse("message_stop", {"type": "message_stop"})
+
+        return StreamingResponse(events(), media_type="text/event-stream", headers=fake.rate_limit_headers())
+
+    @app.post("/chat/completions")
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        fake.requests += 1
+        if fake.should_fail():
+            return overloaded(openai=True)
+        text = fake.respond(body)
+        model = body.get("model", "fake")
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:24]}"
+        created = int(time.time())
+
+        prompt_tokens = _count_tokens(_prompt_text(body))
+        completion_tokens = len(fake.tokens(text))
+        usage = {
+            "prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        }
+
+        if not body.get("stream"):
+            await fake.wait_full(text)
+            return JSONResponse({
+                "id": completion_id, "object": "chat.completion", "created": created, "model": model,
+                "choices": [{
+                    "index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop",
+                }],
+                "usage": usage,
+            }, headers=fake.rate_limit_headers())
+
+        fake.streams += 1
+
+        def chunk(delta: dict, finish_reason=None) -> str:
+            return _sse(None, {
+                "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            })
+
+        async def events():
+            yield chunk({"role": "assistant", "content": ""})
+            async for token in fake.pace_tokens(text):
+                yield chunk({"content": token})
+            yield chunk({}, finish_reason="stop")
+            if (body.get("stream_options") or {}).get("include_usage"):
+                yield _sse(None, {
+                    "id": completion_id, "object": "chat.completion.chunk", "created": created, "model": model,
+                    "choices": [], "usage": usage,
+                })
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(events(), media_type="text/event-stream", headers=fake.rate_limit_headers())
+
+    @app.get("/health")
+    async def health():
+        return {
+            "status": "ok", "ttft": fake.ttft, "tokens_per_sec": fake.tokens_per_sec,
+            "requests": fake.requests, "streams": fake.streams, "errors": fake.errors,
+        }
+
+    return app
@@ -21,6 +21,8 @@ from legal_chatbot.api.schemas import (
     SessionUpdateRequest,
 )
 from legal_chatbot.api.session_store import SessionStore
+from legal_chatbot.utils.executor import run_blocking
+from legal_chatbot.utils.llm import cache_block
 
 logger = logging.getLogger(__name__)
 
@@ -45,7 +47,7 @@ def _get_allowed_user_ids(request: Request, user_id: str) -> set[str]:
     return allowed
 
 
-def _check_anonymous_limit(request: Request):
+async def _check_anonymous_limit(request: Request):
     """Raise 429 if anonymous user exceeded free question limit.
 
     Only enforced when AUTH_DISABLED=true (anonymous/demo mode).
@@ -58,7 +60,7 @@ def _check_anonymous_limit(request: Request):
     auth_header = request.headers.get("authorization", "")
     if auth_header.startswith("Bearer ") and len(auth_header) > 20:
         return  # has JWT token — authenticated user, no limit
-    if not store.db:
+    if not store.adb:
         return
     # Always count by device_uuid (not user_id) — survives migration/logout
 
@@ -66,7 +68,7 @@ def _check_anonymous_limit(request: Request):
     if not device_id:
         return  # no device tracking, skip
     device_uuid = device_id_to_uuid(device_id)
-    count = store.db.count_user_messages(device_uuid)
+    count = await store.adb.count_user_messages(device_uuid)
     if count >= FREE_QUESTION_LIMIT:
         raise HTTPException(
             status_code=429,
@@ -239,7 +241,7 @@ def _pdf_path_to_url(pdf_path: str | None) -> str | None:
 @router.post("/api/chat", response_model=ChatAPIResponse)
 async def chat(raw_request: Request, request: ChatRequest, user_id: str = Depends(get_current_user)):
     """Main chat endpoint — natural language router to all services"""
-    _check_anonymous_limit(raw_request)
+    await _check_anonymous_limit(raw_request)
     entry = await store.get_or_create(request.session_id, user_id=user_id)
 
     try:
@@ -261,7 +263,7 @@ async def chat(raw_request: Request, request: ChatRequest, user_id: str = Depend
     # Get available contract types for dynamic suggestions
     available_types = None
     if response.action_taken == "ask_contract_type":
-        available_types = entry.service._get_available_contract_types()
+        available_types = await entry.service._aget_available_contract_types()
 
     return ChatAPIResponse(
         session_id=entry.session_id,
@@ -287,7 +289,7 @@ async def chat_stream(raw_request: Request, request: ChatRequest, user_id: str =
       data: {"type":"token","text":"..."}
       data: {"type":"done","message":"...","suggestions":[...]}
     """
-    _check_anonymous_limit(raw_request)
+    await _check_anonymous_limit(raw_request)
     entry = await store.get_or_create(request.session_id, user_id=user_id)
     service = entry.service
     session = service.get_session()
@@ -319,7 +321,7 @@ async def chat_stream(raw_request: Request, request: ChatRequest, user_id: str =
         # Get available contract types for dynamic suggestions
         available_types = None
         if response.action_taken == "ask_contract_type":
-            available_types = service._get_available_contract_types()
+            available_types = await service._aget_available_contract_types()
 
         has_draft = session.current_draft is not None and session.current_draft.state == "ready"
 
@@ -360,7 +362,7 @@ async def chat_stream(raw_request: Request, request: ChatRequest, user_id: str =
         if not llm_messages:
             # Fallback: no context found
             llm_messages = [
-                {"role": "system", "content": service.SYSTEM_PROMPT},
+                {"role": "system", "content": [cache_block(service.SYSTEM_PROMPT)]},
                 {"role": "user", "content": request.message},
             ]
 
@@ -406,7 +408,7 @@ async def list_sessions(raw_request: Request, user_id: str = Depends(get_current
     For authenticated users, also include sessions from their device_id
     (anonymous sessions created before login).
     """
-    if not store.db:
+    if not store.adb:
         return SessionListResponse(sessions=[])
 
     try:
@@ -418,7 +420,7 @@ async def list_sessions(raw_request: Request, user_id: str = Depends(get_current
             device_uuid = device_id_to_uuid(device_id)
             if device_uuid != user_id:
                 user_ids.append(device_uuid)
-        sessions = store.db.list_chat_sessions(limit=50, user_ids=user_ids)
+        sessions = await store.adb.list_chat_sessions(limit=50, user_ids=user_ids)
         items = [
             SessionListItem(
                 session_id=s["id"],
@@ -436,18 +438,18 @@ async def list_sessions(raw_request: Request, user_id: str = Depends(get_current
 @router.get("/api/sessions/{session_id}/messages", response_model=SessionMessagesResponse)
 async def get_session_messages(raw_request: Request, session_id: str, user_id: str = Depends(get_current_user)):
     """Get all messages for a chat session"""
-    if not store.db:
+    if not store.adb:
         raise HTTPException(status_code=503, detail="Database không khả dụng")
 
     # Verify session ownership (allow both real user_id and device_uuid)
-    session = store.db.get_chat_session(session_id)
+    session = await store.adb.get_chat_session(session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session không tồn tại")
     if not is_anonymous_user(user_id) and session.get("user_id") not in _get_allowed_user_ids(raw_request, user_id):
         raise HTTPException(status_code=404, detail="Session không tồn tại")
 
     try:
-        messages = store.db.get_chat_messages(session_id, limit=200)
+        messages = await store.adb.get_chat_messages(session_id, limit=200)
         items = [
             MessageItem(
                 id=m["id"],
@@ -466,11 +468,11 @@ async def get_session_messages(raw_request: Request, session_id: str, user_id: s
 @router.patch("/api/sessions/{session_id}")
 async def update_session(raw_request: Request, session_id: str, request: SessionUpdateRequest, user_id: str = Depends(get_current_user)):
     """Update session metadata (e.g. rename title)"""
-    if not store.db:
+    if not store.adb:
         raise HTTPException(status_code=503, detail="Database không khả dụng")
 
     # Verify session ownership
-    session = store.db.get_chat_session(session_id)
+    session = await store.adb.get_chat_session(session_id)
     if not session or (not is_anonymous_user(user_id) and session.get("user_id") not in _get_allowed_user_ids(raw_request, user_id)):
         raise HTTPException(status_code=404, detail="Session không tồn tại")
 
@@ -478,7 +480,7 @@ async def update_session(raw_request: Request, session_id: str, request: Session
         update_kwargs = {}
         if request.title:
             update_kwargs["title"] = request.title
-        store.db.update_chat_session(session_id, **update_kwargs)
+        await store.adb.update_chat_session(session_id, **update_kwargs)
         return {"message": "Đã cập nhật session", "session_id": session_id}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Lỗi cập nhật: {e}")
@@ -488,8 +490,8 @@ async def update_session(raw_request: Request, session_id: str, request: Session
 async def delete_session(raw_request: Request, session_id: str, user_id: str = Depends(get_current_user)):
     """Delete a chat session"""
     # Verify session ownership before deleting
-    if store.db:
-        session = store.db.get_chat_session(session_id)
+    if store.adb:
+        session = await store.adb.get_chat_session(session_id)
         if not session or (not is_anonymous_user(user_id) and session.get("user_id") not in _get_allowed_user_ids(raw_request, user_id)):
             raise HTTPException(status_code=404, detail="Session không tồn tại")
 
@@ -532,7 +534,9 @@ async def download_file(filename: str):
     if store.db:
         try:
             client = store.db._write()  # Service role key for storage access
-            file_bytes = client.storage.from_("legal-contracts").download(safe_name)
+            file_bytes = await run_blocking(
+                client.storage.from_("legal-contracts").download, safe_name
+            )
             if file_bytes:
                 suffix = Path(safe_name).suffix.lower()
                 media_types = {
@@ -566,12 +570,12 @@ async def migrate_sessions(request: Request, user_id: str = Depends(get_current_
         return {"migrated": 0, "message": "Cần đăng nhập để migrate sessions"}
 
     device_id = get_device_id(request)
-    if not device_id or not store.db:
+    if not device_id or not store.adb:
         return {"migrated": 0}
 
     try:
         old_user_id = device_id_to_uuid(device_id)
-        count = store.db.migrate_chat_sessions(old_user_id, user_id)
+        count = await store.adb.migrate_chat_sessions(old_user_id, user_id)
         return {"migrated": count, "message": f"Đã chuyển {count} cuộc hội thoại"}
     except Exception as e:
         logger.error(f"Session migration error: {e}")
@@ -590,8 +594,50 @@ async def health():
         db_mode = "unknown"
         status = "error"
 
+    try:
+        from legal_chatbot.services.embedding_cache import get_embedding_cache
+        embedding_cache = get_embedding_cache().stats()
+    except Exception:
+        embedding_cache = None
+
+    try:
+        from legal_chatbot.utils.llm_cache import get_llm_cache
+        llm_cache = get_llm_cache().stats()
+    except Exception:
+        llm_cache = None
+
+    try:
+        from legal_chatbot.utils.llm_metrics import get_llm_metrics
+        from legal_chatbot.utils.llm_scheduler import get_llm_scheduler
+        llm = {"sites": get_llm_metrics().stats(), "models": get_llm_scheduler().stats()}
+    except Exception:
+        llm = None
+
+    try:
+        from legal_chatbot.utils.singleflight import get_singleflight
+        singleflight = get_singleflight().stats()
+    except Exception:
+        singleflight = None
+
     return HealthResponse(
         status=status,
         db_mode=db_mode,
         active_sessions=store.active_count,
+        embedding_cache=embedding_cache,
+        llm_cache=llm_cache,
+        llm=llm,
+        singleflight=singleflight,
+    )
+
+
+@router.get("/metrics")
+async def metrics():
+    """Prometheus metrics: LLM calls per call site and model (latency, TTFT, tokens, cost),
+    calls deduplicated by singleflight"""
+    from legal_chatbot.utils.llm_metrics import get_llm_metrics
+    from legal_chatbot.utils.singleflight import get_singleflight
+
+    return Response(
+        content=get_llm_metrics().render_prometheus() + get_singleflight().render_prometheus(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
     )
@@ -1,9 +1,12 @@
 """Contract Form API routes — create, submit, and edit contracts via form UI."""
 
+import asyncio
+import json
 import logging
 from pathlib import Path
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 
 from legal_chatbot.api.auth import get_current_user
 
@@ -21,6 +24,7 @@ from legal_chatbot.api.schemas import (
     LegalReference,
 )
 from legal_chatbot.api.session_store import SessionStore
+from legal_chatbot.utils.executor import run_blocking
 
 logger = logging.getLogger(__name__)
 
@@ -75,12 +79,17 @@ async def list_templates():
     service = InteractiveChatService(api_mode=True)
 
     try:
-        available = service._get_available_contract_types()
+        available = await service._aget_available_contract_types()
+        # Load templates (to get field counts) concurrently on the blocking pool
+        loaded = await asyncio.gather(
+            *(run_blocking(service._load_template_from_db, t["type"]) for t in available),
+            return_exceptions=True,
+        )
         templates = []
-        for t in available:
-            # Load template to get field count
+        for t, tmpl in zip(available, loaded):
             try:
-                tmpl = service._load_template_from_db(t["type"])
+                if isinstance(tmpl, BaseException):
+                    raise tmpl
                 field_count = len([f for f in tmpl.fields if f.required])
                 description = tmpl.description
                 has_sample_data = bool(tmpl.sample_data)
@@ -134,7 +143,7 @@ async def create_contract(request: ContractCreateRequest):
     # Resolve contract type
     resolved_slug = await service._resolve_contract_type(request.contract_type)
     if not resolved_slug:
-        available = service._get_available_contract_types()
+        available = await service._aget_available_contract_types()
         if available:
             type_list = ", ".join(t["name"] for t in available)
             raise HTTPException(
@@ -145,7 +154,7 @@ async def create_contract(request: ContractCreateRequest):
 
     # Load template
     try:
-        template = service._load_template_from_db(resolved_slug)
+        template = await run_blocking(service._load_template_from_db, resolved_slug)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
 
@@ -204,7 +213,7 @@ async def generate_articles(request: GenerateArticlesRequest, user_id: str = Dep
 
     # Generate articles via LLM (sync, 30-60s)
     try:
-        articles = entry.service._generate_articles_with_llm(draft)
+        articles = await run_blocking(entry.service._generate_articles_with_llm, draft)
         draft.articles = articles
         return GenerateArticlesResponse(articles=articles)
     except Exception as e:
@@ -212,6 +221,45 @@ async def generate_articles(request: GenerateArticlesRequest, user_id: str = Dep
         raise HTTPException(status_code=500, detail=f"Lỗi tạo điều khoản: {e}")
 
 
+@router.post("/api/contract/generate-articles/stream")
+async def generate_articles_stream(request: GenerateArticlesRequest, user_id: str = Depends(get_current_user)):
+    """SSE variant of generate-articles: each ĐIỀU is pushed as soon as it is complete.
+
+    Events: {"type": "article", "index": i, "article": {...}} per article,
+    then {"type": "done", "articles": [...]} or {"type": "error", "message": ...}.
+    """
+    entry = await store.get_or_create(request.session_id, user_id=user_id)
+    session = entry.service.session
+
+    if not session or not session.current_draft:
+        raise HTTPException(status_code=404, detail="Không tìm thấy hợp đồng đang soạn.")
+
+    draft = session.current_draft
+    if draft.id != request.draft_id:
+        raise HTTPException(status_code=404, detail="Draft ID không khớp.")
+
+    if request.field_values:
+        draft.field_values = request.field_values
+
+    async def events():
+        articles = []
+        try:
+            async for article in entry.service.stream_articles(draft):
+                yield f"data: {json.dumps({'type': 'article', 'index': len(articles), 'article': article}, ensure_ascii=False)}\n\n"
+                articles.append(article)
+        except Exception as e:
+            logger.error(f"Article streaming failed: {e}", exc_info=True)
+            yield f"data: {json.dumps({'type': 'error', 'message': f'Lỗi tạo điều khoản: {e}'}, ensure_ascii=False)}\n\n"
+            return
+        if not articles:
+            yield f"data: {json.dumps({'type': 'error', 'message': 'Không tạo được điều khoản.'}, ensure_ascii=False)}\n\n"
+            return
+        draft.articles = articles
+        yield f"data: {json.dumps({'type': 'done', 'articles': articles}, ensure_ascii=False)}\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+
 @router.post("/api/contract/submit", response_model=ContractSubmitResponse)
 async def submit_contract(request: ContractSubmitRequest, user_id: str = Depends(get_current_user)):
     """Submit all field values and generate PDF."""
@@ -241,7 +289,7 @@ async def submit_contract(request: ContractSubmitRequest, user_id: str = Depends
     draft.custom_subtitle = request.subtitle
 
     # Generate PDF
-    response = entry.service._finalize_contract(draft)
+    response = await run_blocking(entry.service._finalize_contract, draft)
     pdf_url = _pdf_path_to_url(response.pdf_path)
 
     # Persist to DB
@@ -290,7 +338,7 @@ async def update_contract(request: ContractSubmitRequest, user_id: str = Depends
     draft.custom_subtitle = request.subtitle
 
     # Regenerate PDF
-    response = entry.service._finalize_contract(draft)
+    response = await run_blocking(entry.service._finalize_contract, draft)
     pdf_url = _pdf_path_to_url(response.pdf_path)
 
     # Persist update
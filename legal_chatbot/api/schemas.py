@@ -173,3 +173,7 @@ class HealthResponse(BaseModel):
     db_mode: str
     version: str = "0.1.0"
     active_sessions: int = 0
+    embedding_cache: Optional[dict] = None  # hit/miss counters, hit_rate
+    llm_cache: Optional[dict] = None  # hit/miss counters, hit_rate
+    llm: Optional[dict] = None  # per call site / model counters (same as /metrics), slot usage
+    singleflight: Optional[dict] = None  # per group: calls, deduplicated, in flight
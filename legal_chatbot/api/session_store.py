@@ -5,6 +5,7 @@ from datetime import datetime, timedelta
 from typing import Optional
 from uuid import uuid4
 
+from legal_chatbot.db.async_db import AsyncDatabase
 from legal_chatbot.services.interactive_chat import InteractiveChatService
 
 
@@ -32,6 +33,7 @@ class SessionStore:
     - Active sessions are kept in memory for performance
     - Every session is persisted to Supabase (chat_sessions + chat_messages)
     - On get_or_create, checks memory first, then Supabase
+    - DB calls go through the async facade; the lock only guards the dict
     """
 
     def __init__(self, ttl_minutes: int = 30, max_sessions: int = 1000):
@@ -40,6 +42,7 @@ class SessionStore:
         self._max = max_sessions
         self._lock = asyncio.Lock()
         self._db = None
+        self._adb = None
 
     @property
     def db(self):
@@ -55,39 +58,51 @@ class SessionStore:
                 pass
         return self._db
 
+    @property
+    def adb(self) -> Optional[AsyncDatabase]:
+        """Awaitable facade over db (None when not in supabase mode)."""
+        if self._adb is None and self.db is not None:
+            self._adb = AsyncDatabase(self.db)
+        return self._adb
+
     async def get_or_create(self, session_id: Optional[str] = None, user_id: Optional[str] = None) -> SessionEntry:
         """Get existing session or create a new one"""
+        # Check in-memory cache first
+        async with self._lock:
+            if session_id and session_id in self._sessions:
+                entry = self._sessions[session_id]
+                entry.touch()
+                return entry
+
+        # Check Supabase for existing session — outside the lock, so one slow
+        # restore doesn't hold up every other user's request
+        restored = None
+        if session_id and self.adb:
+            db_session = await self.adb.get_chat_session(session_id)
+            if db_session:
+                restored = SessionEntry(session_id, db_session.get("title", ""))
+                restored.is_new = False
+                # Load message history into the service's session
+                messages = await self.adb.get_chat_messages(session_id, limit=50)
+                for msg in messages:
+                    restored.service.session.messages.append({
+                        "role": msg["role"],
+                        "content": msg["content"],
+                        "timestamp": msg.get("created_at", datetime.now().isoformat()),
+                    })
+
         async with self._lock:
-            # Check in-memory cache first
+            # A concurrent request may have restored/created it meanwhile
             if session_id and session_id in self._sessions:
                 entry = self._sessions[session_id]
                 entry.touch()
                 return entry
 
-            # Check Supabase for existing session
-            if session_id and self.db:
-                db_session = self.db.get_chat_session(session_id)
-                if db_session:
-                    # Restore session from DB
-                    entry = SessionEntry(session_id, db_session.get("title", ""))
-                    entry.is_new = False
-                    # Load message history into the service's session
-                    messages = self.db.get_chat_messages(session_id, limit=50)
-                    for msg in messages:
-                        entry.service.session.messages.append({
-                            "role": msg["role"],
-                            "content": msg["content"],
-                            "timestamp": msg.get("created_at", datetime.now().isoformat()),
-                        })
-                    self._sessions[session_id] = entry
-                    return entry
-
-            # Create new session
             new_id = session_id or str(uuid4())
             if len(self._sessions) >= self._max:
                 self._evict_oldest()
 
-            entry = SessionEntry(new_id)
+            entry = restored or SessionEntry(new_id)
             self._sessions[new_id] = entry
             return entry
 
@@ -96,7 +111,7 @@ class SessionStore:
         pdf_url: str | None = None, user_id: str | None = None,
     ) -> None:
         """Persist user and assistant messages to Supabase after each chat round."""
-        if not self.db:
+        if not self.adb:
             return
 
         entry = self._sessions.get(session_id)
@@ -111,14 +126,14 @@ class SessionStore:
                 if len(user_message) > 50:
                     title += "..."
                 entry.title = title
-                self.db.create_chat_session(session_id, title, user_id=user_id)
+                await self.adb.create_chat_session(session_id, title, user_id=user_id)
                 entry.is_new = False
 
             # Save messages
-            self.db.save_chat_message(session_id, "user", user_message)
+            await self.adb.save_chat_message(session_id, "user", user_message)
             # Save assistant message with pdf_url metadata if present
             metadata = {"pdf_url": pdf_url} if pdf_url else None
-            self.db.save_chat_message(
+            await self.adb.save_chat_message(
                 session_id, "assistant", assistant_message, metadata=metadata
             )
         except Exception as e:
@@ -139,9 +154,9 @@ class SessionStore:
             self._sessions.pop(session_id, None)
 
         # Also delete from Supabase
-        if self.db:
+        if self.adb:
             try:
-                return self.db.delete_chat_session(session_id)
+                return await self.adb.delete_chat_session(session_id)
             except Exception:
                 pass
         return True
@@ -810,6 +810,7 @@ def audit_command(
 @app.command("sync-articles")
 def sync_articles(
     input_file: str = typer.Argument(..., help="JSON file with articles to sync"),
+    force: bool = typer.Option(False, "--force", help="Re-embed unchanged articles too"),
 ):
     """Sync new/updated legal articles into the database with embeddings.
 
@@ -877,13 +878,8 @@ def sync_articles(
     with console.status("[blue]Syncing document..."):
         db.upsert_document(doc_data)
 
-    # Prepare articles with embeddings
-    console.print(f"[blue]Generating embeddings for {len(articles_raw)} articles...[/blue]")
-    texts = [a.get("content", "") for a in articles_raw]
-    embeddings = embedding_service.embed_batch(texts)
-
     rows = []
-    for article, emb in zip(articles_raw, embeddings):
+    for article in articles_raw:
         art_id = str(uuid.uuid5(
             uuid.NAMESPACE_URL,
             f"{doc_id}_dieu_{article.get('article_number', 0)}"
@@ -897,15 +893,75 @@ def sync_articles(
             "chapter": article.get("chapter", ""),
             "document_title": doc_title,
             "document_type": doc_data["document_type"],
-            "embedding": emb,
         })
 
+    # Embed only new/changed articles (content_hash match reuses stored vectors)
+    with console.status(f"[blue]Embedding {len(rows)} articles..."):
+        embedded = embedding_service.attach_embeddings(db, rows, force=force)
+    console.print(
+        f"[dim]Embedded {embedded} new/changed, reused {len(rows) - embedded} unchanged[/dim]"
+    )
+
     with console.status("[blue]Upserting articles..."):
         count = db.upsert_articles(rows)
 
     console.print(f"[green]Synced {count} articles from '{doc_title}' into DB[/green]")
 
 
+@app.command("export-onnx")
+def export_onnx_command(
+    output_dir: str = typer.Option(None, "--output", "-o", help="Export directory (default: EMBEDDING_ONNX_PATH)"),
+    no_quantize: bool = typer.Option(False, "--no-quantize", help="Skip the int8 copy"),
+):
+    """Export the embedding model to ONNX (+ int8) for EMBEDDING_BACKEND=onnx/onnx-int8"""
+    from legal_chatbot.utils.config import get_settings
+    from legal_chatbot.services.embedding_onnx import export_onnx
+
+    settings = get_settings()
+    target = output_dir or settings.embedding_onnx_path
+    with console.status(f"[blue]Exporting {settings.embedding_model}..."):
+        export_onnx(settings.embedding_model, target, quantize=not no_quantize)
+    console.print(f"[green]ONNX model exported to {target}[/green]")
+
+
+@app.command("backfill-embeddings")
+def backfill_embeddings(
+    workers: int = typer.Option(0, "--workers", "-w", help="Encoder processes (0/1 = in-process)"),
+    threads: int = typer.Option(0, "--threads", help="Threads per worker (default: cores / workers)"),
+    page_size: int = typer.Option(512, "--page-size", help="Articles read and written per page"),
+    checkpoint: str = typer.Option("./data/backfill_checkpoint.json", "--checkpoint", help="Resume file"),
+    restart: bool = typer.Option(False, "--restart", help="Ignore the checkpoint and start from the first article"),
+    pause: float = typer.Option(0.0, "--pause", help="Seconds to sleep between pages (throttle for live traffic)"),
+):
+    """Re-embed every article (after a model change); resumable, safe alongside live traffic"""
+    from legal_chatbot.db import get_database
+    from legal_chatbot.services.backfill import BackfillService
+
+    service = BackfillService(
+        get_database(),
+        workers=workers,
+        threads_per_worker=threads,
+        page_size=page_size,
+        checkpoint_path=checkpoint,
+        pause=pause,
+    )
+    previous = None if restart else service.load_checkpoint()
+    if previous and not previous.finished:
+        console.print(f"[blue]Resuming after article {previous.cursor} ({previous.processed} done)[/blue]")
+
+    def report(stats, rate):
+        console.print(
+            f"[dim]{stats.processed} articles, {stats.updated} updated, "
+            f"{stats.skipped} skipped — {rate:.1f} articles/s[/dim]"
+        )
+
+    stats = service.run(resume=not restart, on_page=report)
+    console.print(
+        f"[green]Backfill complete: {stats.updated} updated, {stats.skipped} skipped "
+        f"(changed during run)[/green]"
+    )
+
+
 @app.command("search")
 def search_articles(
     query: str = typer.Argument(..., help="Search query in Vietnamese"),
@@ -1706,5 +1762,109 @@ def serve(
     )
 
 
+@app.command("embedding-server")
+def embedding_server(
+    host: str = typer.Option("127.0.0.1", "--host", "-h", help="Host to bind to"),
+    port: int = typer.Option(8765, "--port", "-p", help="Port to listen on"),
+    uds: str = typer.Option(None, "--uds", help="Unix socket path (overrides host/port)"),
+):
+    """Start the embedding sidecar (one model, micro-batched) for API workers"""
+    import uvicorn
+
+    from legal_chatbot.api.embedding_server import create_embedding_app
+
+    where = f"unix://{uds}" if uds else f"http://{host}:{port}"
+    console.print(f"[green]Starting embedding server at {where}[/green]")
+    console.print(f"[blue]Set EMBEDDING_SERVER_URL={where} for API workers[/blue]")
+
+    uvicorn.run(create_embedding_app(), host=host, port=port, uds=uds, workers=1)
+
+
+@app.command("fake-llm-server")
+def fake_llm_server(
+    host: str = typer.Option("127.0.0.1", "--host", "-h", help="Host to bind to"),
+    port: int = typer.Option(8790, "--port", "-p", help="Port to listen on"),
+    ttft: float = typer.Option(0.3, "--ttft", help="Seconds before the first token"),
+    tps: float = typer.Option(80.0, "--tps", help="Output tokens per second"),
+    responses: str = typer.Option(None, "--responses", help='JSON list of {"match": regex, "response": text}'),
+    error_rate: float = typer.Option(0.0, "--error-rate", help="Share of requests answered 529 overloaded"),
+):
+    """Start a local fake Anthropic/OpenAI API (canned, paced responses) for benchmarks"""
+    from pathlib import Path
+
+    import uvicorn
+
+    from legal_chatbot.api.fake_llm_server import create_fake_llm_app
+
+    rules = json.loads(Path(responses).read_text(encoding="utf-8")) if responses else None
+    where = f"http://{host}:{port}"
+    console.print(f"[green]Fake LLM at {where} (ttft={ttft}s, {tps} tok/s)[/green]")
+    console.print(f"[blue]Set ANTHROPIC_BASE_URL={where} (DEEPSEEK_BASE_URL={where} for DeepSeek)[/blue]")
+
+    uvicorn.run(
+        create_fake_llm_app(ttft=ttft, tokens_per_sec=tps, rules=rules, error_rate=error_rate),
+        host=host, port=port, log_level="warning",
+    )
+
+
+@app.command("llm-stats")
+def llm_stats(
+    trace: str = typer.Option(None, "--trace", help="JSONL trace file (default: LLM_TRACE_PATH)"),
+    since: str = typer.Option("24h", "--since", "-s", help="Only calls in the last window, e.g. 30m, 6h, 7d"),
+    interval: str = typer.Option(None, "--interval", "-i", help="Split into time windows, e.g. 1h"),
+    by: str = typer.Option("site", "--by", help="Group by: site, model or site,model"),
+):
+    """Summarise LLM latency, tokens and cost per call site from the trace"""
+    import time
+    from datetime import datetime
+    from pathlib import Path
+
+    from legal_chatbot.utils.config import get_settings
+    from legal_chatbot.utils.llm_metrics import read_trace, summarize
+    from legal_chatbot.utils.llm_scheduler import parse_duration
+
+    path = trace or get_settings().llm_trace_path
+    if not path or not Path(path).exists():
+        console.print("[red]No LLM trace found.[/red] Set LLM_TRACE_PATH (or pass --trace) and run the app.")
+        raise typer.Exit(1)
+    window = parse_duration(since)
+    step = parse_duration(interval) if interval else None
+    fields = tuple(f.strip() for f in by.split(",") if f.strip() in ("site", "model"))
+    if window is None or (interval and not step) or not fields:
+        console.print("[red]Invalid --since / --interval / --by[/red]")
+        raise typer.Exit(1)
+
+    rows = summarize(read_trace(path, since=time.time() - window), by=fields, interval=step)
+    if not rows:
+        console.print(f"[yellow]No LLM calls in the last {since}[/yellow]")
+        return
+
+    def ms(value):
+        return "-" if value is None else f"{value * 1000:.0f}"
+
+    table = Table(title=f"LLM calls, last {since}")
+    if step:
+        table.add_column("Window", style="dim")
+    for field in fields:
+        table.add_column(field.capitalize(), style="cyan")
+    for name in ("Calls", "Err", "p50 ms", "p95 ms", "TTFT p50", "Time s", "In", "Cached", "Out", "USD"):
+        table.add_column(name, justify="right")
+    for row in rows:
+        cells = [datetime.fromtimestamp(row["window"]).strftime("%m-%d %H:%M")] if step else []
+        cells += [str(row[field]) for field in fields]
+        cells += [
+            str(row["calls"]),
+            f"[red]{row['errors']}[/red]" if row["errors"] else "0",
+            ms(row["p50_s"]), ms(row["p95_s"]), ms(row["ttft_p50_s"]),
+            f"{row['time_s']:.1f}",
+            str(row["input_tokens"]), str(row["cache_read_tokens"]), str(row["output_tokens"]),
+            f"{row['cost_usd']:.4f}",
+        ]
+        table.add_row(*cells)
+    console.print(table)
+    total_cost = sum(row["cost_usd"] for row in rows)
+    console.print(f"{sum(row['calls'] for row in rows)} calls, ${total_cost:.4f} estimated")
+
+
 if __name__ == "__main__":
     app()
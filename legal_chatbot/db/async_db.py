@@ -0,0 +1,59 @@
+"""Awaitable facade over the sync DatabaseInterface implementations.
+
+    adb = get_async_database()
+    session = await adb.get_chat_session(session_id)
+
+Every method of the wrapped client runs on the bounded blocking pool
+(utils/executor.py), so PostgREST round trips never stall the event loop.
+Concurrent awaits of a @coalesced read with the same arguments share one
+round trip (utils/singleflight.py).
+"""
+
+import functools
+from typing import Optional
+
+from legal_chatbot.db.base import DatabaseInterface
+from legal_chatbot.utils.executor import run_blocking
+from legal_chatbot.utils.singleflight import call_key, get_singleflight
+
+
+class AsyncDatabase:
+    """Async view of a DatabaseInterface: same method names, awaitable."""
+
+    def __init__(self, db: DatabaseInterface):
+        self._db = db
+
+    @property
+    def sync(self) -> DatabaseInterface:
+        """The wrapped sync client (for code that already runs off-loop)."""
+        return self._db
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._db, name)
+        if not callable(attr):
+            return attr
+
+        coalesce = getattr(attr, "__singleflight__", None)
+
+        @functools.wraps(attr)
+        async def call(*args, **kwargs):
+            if coalesce is None:
+                return await run_blocking(attr, *args, **kwargs)
+            group, qualname = coalesce
+            # Merged here; the undecorated method runs so the call isn't counted twice
+            method = functools.partial(attr.__wrapped__, attr.__self__)
+            return await get_singleflight().ado(
+                group,
+                call_key(qualname, args, kwargs),
+                lambda: run_blocking(method, *args, **kwargs),
+                copy_result=True,
+            )
+
+        return call
+
+
+def get_async_database(mode: Optional[str] = None) -> AsyncDatabase:
+    """Async facade over get_database(mode)."""
+    from legal_chatbot.db.supabase import get_database
+
+    return AsyncDatabase(get_database(mode))
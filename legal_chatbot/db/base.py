@@ -37,6 +37,30 @@ class DatabaseInterface(ABC):
     ) -> List[dict]:
         """Semantic search via embeddings. Returns articles with similarity."""
 
+    @abstractmethod
+    def keyword_search_articles(
+        self,
+        primary_terms: List[str],
+        secondary_terms: List[str] = None,
+        limit: int = 100,
+    ) -> List[dict]:
+        """Ranked keyword search. Returns articles with score, best first."""
+
+    @abstractmethod
+    def get_embeddings_by_hash(self, content_hashes: List[str]) -> dict:
+        """Bulk lookup of stored embeddings by article content_hash → vector."""
+
+    @abstractmethod
+    def list_articles_page(self, after_id: Optional[str] = None, limit: int = 500) -> List[dict]:
+        """Keyset page of articles ordered by id (id, content, ...) after after_id."""
+
+    @abstractmethod
+    def update_article_embeddings(self, rows: List[dict]) -> int:
+        """Write embedding + content_hash where content is unchanged (content_md5).
+
+        Returns number of rows updated.
+        """
+
     @abstractmethod
     def get_document_by_hash(self, content_hash: str) -> Optional[dict]:
         """Find document by content hash (for change detection)."""
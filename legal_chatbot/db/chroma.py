@@ -3,19 +3,123 @@
 Note: This is a simplified implementation that uses keyword matching instead of
 semantic search. For production, consider using ChromaDB when Python 3.14 support
 is available.
+
+Search is backed by a BM25 inverted index (posting lists + per-field lengths)
+persisted as bm25_index.json next to articles.json. The index is built once,
+loaded by init_chroma() and updated incrementally by add_articles(), so query
+cost depends on the posting lists touched — not on corpus size.
 """
 
 import re
 import json
+import math
+import unicodedata
 from pathlib import Path
 from typing import Optional
 
 from legal_chatbot.utils.config import get_settings
-from legal_chatbot.utils.vietnamese import normalize_vietnamese
+
+# BM25 parameters
+BM25_K1 = 1.2
+BM25_B = 0.75
+TITLE_BOOST = 1.5  # Title matches weigh more than content matches
+# Raw BM25 score that maps to 0.5 in search results: score / (score + k),
+# a fixed curve so scores stay comparable across queries
+SCORE_SATURATION = 5.0
+
+INDEX_VERSION = 1
+_FIELDS = ("content", "title")
 
 # Global storage (in-memory + file persistence)
 _articles: dict[str, dict] = {}
 _storage_path: Optional[Path] = None
+_index: Optional["BM25Index"] = None
+
+
+class BM25Index:
+    """Field-aware BM25 inverted index over articles (content + title).
+
+    postings[field][term] = {article_id: term_frequency}
+    lengths[field][article_id] = number of tokens in that field
+    """
+
+    def __init__(self):
+        self.postings: dict[str, dict[str, dict[str, int]]] = {f: {} for f in _FIELDS}
+        self.lengths: dict[str, dict[str, int]] = {f: {} for f in _FIELDS}
+        self._total_len: dict[str, int] = {f: 0 for f in _FIELDS}
+
+    @property
+    def doc_count(self) -> int:
+        return len(self.lengths["content"])
+
+    def __contains__(self, article_id: str) -> bool:
+        return article_id in self.lengths["content"]
+
+    def add(self, article_id: str, content: str, title: str) -> None:
+        """Index a single article (call remove() first when re-indexing)."""
+        for field, text in (("content", content), ("title", title)):
+            tokens = _tokenize(text or "")
+            self.lengths[field][article_id] = len(tokens)
+            self._total_len[field] += len(tokens)
+            tf: dict[str, int] = {}
+            for token in tokens:
+                tf[token] = tf.get(token, 0) + 1
+            postings = self.postings[field]
+            for token, count in tf.items():
+                postings.setdefault(token, {})[article_id] = count
+
+    def remove(self, article_id: str, content: str, title: str) -> None:
+        """Drop an article from the posting lists of its (previously indexed) text."""
+        for field, text in (("content", content), ("title", title)):
+            length = self.lengths[field].pop(article_id, None)
+            if length is None:
+                continue
+            self._total_len[field] -= length
+            postings = self.postings[field]
+            for token in set(_tokenize(text or "")):
+                plist = postings.get(token)
+                if plist and article_id in plist:
+                    del plist[article_id]
+                    if not plist:
+                        del postings[token]
+
+    def search(self, query_tokens: list[str]) -> dict[str, float]:
+        """Score all articles matching any query token. Returns {id: score}."""
+        n = self.doc_count
+        if not n or not query_tokens:
+            return {}
+
+        scores: dict[str, float] = {}
+        for field, weight in (("content", 1.0), ("title", TITLE_BOOST)):
+            postings = self.postings[field]
+            lengths = self.lengths[field]
+            avg_len = (self._total_len[field] / n) or 1.0
+            for token in set(query_tokens):
+                plist = postings.get(token)
+                if not plist:
+                    continue
+                df = len(plist)
+                idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+                for article_id, tf in plist.items():
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * lengths[article_id] / avg_len)
+                    s = weight * idf * tf * (BM25_K1 + 1) / (tf + norm)
+                    scores[article_id] = scores.get(article_id, 0.0) + s
+        return scores
+
+    def to_dict(self) -> dict:
+        return {
+            "version": INDEX_VERSION,
+            "postings": self.postings,
+            "lengths": self.lengths,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "BM25Index":
+        index = cls()
+        index.postings = {f: data["postings"].get(f, {}) for f in _FIELDS}
+        index.lengths = {f: data["lengths"].get(f, {}) for f in _FIELDS}
+        index._total_len = {f: sum(index.lengths[f].values()) for f in _FIELDS}
+        return index
 
 
 def get_chroma_path() -> Path:
@@ -25,13 +129,21 @@ def get_chroma_path() -> Path:
 
 
 def init_chroma():
-    """Initialize storage"""
-    global _storage_path, _articles
+    """Initialize storage and load (or build) the BM25 index.
+
+    Loading is skipped when the same storage path is already in memory.
+    """
+    global _storage_path, _articles, _index
 
-    _storage_path = get_chroma_path()
+    path = get_chroma_path()
+    if _storage_path == path and _index is not None:
+        return _storage_path
+
+    _storage_path = path
     _storage_path.mkdir(parents=True, exist_ok=True)
 
     # Load existing data if any
+    _articles = {}
     data_file = _storage_path / "articles.json"
     if data_file.exists():
         try:
@@ -40,6 +152,11 @@ def init_chroma():
         except Exception:
             _articles = {}
 
+    _index = _load_index()
+    if _index is None:
+        _index = _build_index()
+        _save_index()
+
     return _storage_path
 
 
@@ -49,6 +166,41 @@ def get_collection(name: str = "legal_articles"):
     return name
 
 
+def _load_index() -> Optional[BM25Index]:
+    """Load persisted index. Returns None if missing, outdated or out of sync."""
+    index_file = _storage_path / "bm25_index.json"
+    if not index_file.exists():
+        return None
+    try:
+        with open(index_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get("version") != INDEX_VERSION:
+            return None
+        index = BM25Index.from_dict(data)
+    except Exception:
+        return None
+    # articles.json edited outside add_articles() → rebuild
+    if set(index.lengths["content"]) != set(_articles):
+        return None
+    return index
+
+
+def _build_index() -> BM25Index:
+    """Build the index from scratch over all stored articles."""
+    index = BM25Index()
+    for article_id, article in _articles.items():
+        index.add(article_id, article.get('content', ''), article.get('article_title', ''))
+    return index
+
+
+def _save_index():
+    """Save BM25 index to disk"""
+    if _storage_path and _index is not None:
+        index_file = _storage_path / "bm25_index.json"
+        with open(index_file, 'w', encoding='utf-8') as f:
+            json.dump(_index.to_dict(), f, ensure_ascii=False)
+
+
 def _save_articles():
     """Save articles to disk"""
     if _storage_path:
@@ -71,11 +223,18 @@ def add_articles(
     Returns:
         Number of articles added
     """
-    global _articles
-
     init_chroma()
 
     for article in articles:
+        # Drop stale postings for a re-added article
+        previous = _articles.get(article['id'])
+        if previous is not None and article['id'] in _index:
+            _index.remove(
+                article['id'],
+                previous.get('content', ''),
+                previous.get('article_title', ''),
+            )
+
         _articles[article['id']] = {
             'id': article['id'],
             'content': article.get('content', ''),
@@ -86,48 +245,36 @@ def add_articles(
             'document_type': article.get('document_type', ''),
             'chapter': article.get('chapter', ''),
         }
+        _index.add(
+            article['id'],
+            _articles[article['id']]['content'],
+            _articles[article['id']]['article_title'],
+        )
 
     _save_articles()
+    _save_index()
     return len(articles)
 
 
 def _tokenize(text: str) -> list[str]:
-    """Simple tokenization for Vietnamese text"""
-    text = normalize_vietnamese(text.lower())
+    """Simple tokenization for Vietnamese text.
+
+    Uses NFC so each syllable (with its diacritics) stays one token —
+    NFD would split "đất" into "đa" + "t" at the combining marks.
+    """
+    text = unicodedata.normalize('NFC', text.lower())
     # Split on whitespace and punctuation
-    tokens = re.findall(r'\b\w+\b', text)
+    tokens = re.findall(r'\w+', text)
     return tokens
 
 
-def _calculate_score(query_tokens: list[str], content: str) -> float:
-    """Calculate relevance score using keyword matching"""
-    content_lower = normalize_vietnamese(content.lower())
-    content_tokens = set(_tokenize(content_lower))
-
-    if not query_tokens or not content_tokens:
-        return 0.0
-
-    # Count matching tokens
-    matches = sum(1 for token in query_tokens if token in content_tokens)
-
-    # Bonus for exact phrase matches
-    query_text = ' '.join(query_tokens)
-    if query_text in content_lower:
-        matches += len(query_tokens)
-
-    # Normalize score
-    score = matches / (len(query_tokens) + 1)
-
-    return min(score, 1.0)
-
-
 def search_articles(
     query: str,
     top_k: int = 5,
     collection_name: str = "legal_articles"
 ) -> list[dict]:
     """
-    Search for articles using keyword matching.
+    Search for articles using the BM25 index.
 
     Args:
         query: Search query
@@ -135,7 +282,7 @@ def search_articles(
         collection_name: Name of the collection (unused)
 
     Returns:
-        List of search results with scores
+        List of search results with scores in 0-1 (score / (score + SCORE_SATURATION))
     """
     init_chroma()
 
@@ -143,44 +290,38 @@ def search_articles(
         return []
 
     query_tokens = _tokenize(query)
+    scores = _index.search(query_tokens)
+    if not scores:
+        return []
 
-    # Calculate scores for all articles
-    scored_results = []
-    for article_id, article in _articles.items():
-        content = article.get('content', '')
-        title = article.get('article_title', '')
-
-        # Score based on content and title
-        content_score = _calculate_score(query_tokens, content)
-        title_score = _calculate_score(query_tokens, title) * 1.5  # Boost title matches
-
-        total_score = max(content_score, title_score)
-
-        if total_score > 0:
-            scored_results.append({
-                'id': article_id,
-                'score': total_score,
-                'content': content,
-                'metadata': {
-                    'document_id': article.get('document_id', ''),
-                    'document_title': article.get('document_title', ''),
-                    'article_number': article.get('article_number', 0),
-                    'article_title': article.get('article_title', ''),
-                    'document_type': article.get('document_type', ''),
-                    'chapter': article.get('chapter', ''),
-                }
-            })
-
-    # Sort by score and return top_k
-    scored_results.sort(key=lambda x: x['score'], reverse=True)
-    return scored_results[:top_k]
+    ranked = sorted(scores.items(), key=lambda x: x[1], reverse=True)[:top_k]
+
+    results = []
+    for article_id, score in ranked:
+        article = _articles[article_id]
+        results.append({
+            'id': article_id,
+            'score': score / (score + SCORE_SATURATION),
+            'content': article.get('content', ''),
+            'metadata': {
+                'document_id': article.get('document_id', ''),
+                'document_title': article.get('document_title', ''),
+                'article_number': article.get('article_number', 0),
+                'article_title': article.get('article_title', ''),
+                'document_type': article.get('document_type', ''),
+                'chapter': article.get('chapter', ''),
+            }
+        })
+    return results
 
 
 def delete_collection(name: str = "legal_articles"):
     """Delete all articles"""
-    global _articles
+    global _articles, _index
     _articles = {}
+    _index = BM25Index()
     if _storage_path:
-        data_file = _storage_path / "articles.json"
-        if data_file.exists():
-            data_file.unlink()
+        for filename in ("articles.json", "bm25_index.json"):
+            data_file = _storage_path / filename
+            if data_file.exists():
+                data_file.unlink()
@@ -0,0 +1,103 @@
+-- Migration 009: Indexed keyword search for chat context building
+-- Run this in Supabase SQL Editor AFTER 008_default_articles.sql
+
+-- Replaces the PostgREST ILIKE fan-out in InteractiveChatService._keyword_search_into
+-- (10+ sequential round trips, each a sequential scan over articles.content)
+-- with a single RPC that selects candidates via a GIN index and scores server-side.
+
+-- 1. Extensions
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- 2. Indexes
+-- Full-text (syllable) index: candidate selection for keyword_search_articles.
+-- 'simple' config = lowercase only, no stemming/stop words (fits Vietnamese syllables).
+CREATE INDEX IF NOT EXISTS idx_articles_fts ON articles
+    USING GIN (to_tsvector('simple', coalesce(title, '') || ' ' || content));
+
+-- Trigram indexes: speed up remaining ILIKE '%...%' queries on title/content
+CREATE INDEX IF NOT EXISTS idx_articles_title_trgm ON articles
+    USING GIN (title gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_articles_content_trgm ON articles
+    USING GIN (content gin_trgm_ops);
+
+-- 3. Ranked keyword search in one call
+-- Scoring (same as the client-side fan-out it replaces):
+--   primary term in title:    10.0 per term
+--   primary term in content:   2.0 per term, capped at 6.0
+--   secondary term in title:   1.0 per term
+-- ("primary"/"limit" are reserved words, hence the *_terms / match_limit names)
+CREATE OR REPLACE FUNCTION keyword_search_articles(
+    primary_terms TEXT[],
+    secondary_terms TEXT[] DEFAULT '{}',
+    match_limit INT DEFAULT 100
+)
+RETURNS TABLE (
+    article_id UUID,
+    article_number INT,
+    title TEXT,
+    content TEXT,
+    document_title TEXT,
+    document_number TEXT,
+    primary_title_hits INT,
+    primary_content_hits INT,
+    secondary_title_hits INT,
+    score FLOAT
+)
+LANGUAGE plpgsql STABLE AS $$
+#variable_conflict use_column
+DECLARE
+    term TEXT;
+    query tsquery;
+BEGIN
+    primary_terms := coalesce(primary_terms, '{}');
+    secondary_terms := coalesce(secondary_terms, '{}');
+
+    -- OR of phrase queries over all terms → one GIN index probe
+    FOREACH term IN ARRAY primary_terms || secondary_terms LOOP
+        CONTINUE WHEN numnode(phraseto_tsquery('simple', term)) = 0;
+        IF query IS NULL THEN
+            query := phraseto_tsquery('simple', term);
+        ELSE
+            query := query || phraseto_tsquery('simple', term);
+        END IF;
+    END LOOP;
+
+    IF query IS NULL THEN
+        RETURN;
+    END IF;
+
+    RETURN QUERY
+    SELECT
+        s.id,
+        s.article_number,
+        s.title,
+        s.content,
+        s.document_title,
+        s.document_number,
+        s.pt,
+        s.pc,
+        s.st,
+        (s.pt * 10.0 + LEAST(s.pc * 2.0, 6.0) + s.st * 1.0)::FLOAT AS score
+    FROM (
+        SELECT
+            a.id,
+            a.article_number,
+            a.title,
+            a.content,
+            d.title AS document_title,
+            d.document_number,
+            (SELECT count(*) FROM unnest(primary_terms) t
+              WHERE strpos(lower(coalesce(a.title, '')), lower(t)) > 0)::INT AS pt,
+            (SELECT count(*) FROM unnest(primary_terms) t
+              WHERE strpos(lower(a.content), lower(t)) > 0)::INT AS pc,
+            (SELECT count(*) FROM unnest(secondary_terms) t
+              WHERE strpos(lower(coalesce(a.title, '')), lower(t)) > 0)::INT AS st
+        FROM articles a
+        JOIN legal_documents d ON a.document_id = d.id
+        WHERE to_tsvector('simple', coalesce(a.title, '') || ' ' || a.content) @@ query
+    ) s
+    WHERE s.pt + s.pc + s.st > 0
+    ORDER BY score DESC, s.article_number
+    LIMIT match_limit;
+END;
+$$;
@@ -0,0 +1,25 @@
+-- Migration 010: Bulk, content-guarded embedding updates for backfills
+-- Run this in Supabase SQL Editor AFTER 009_keyword_search.sql
+
+-- Used by `legal-chatbot backfill-embeddings`: one round trip per page.
+-- Only embedding/content_hash are written, and only where the article's
+-- content still matches what was embedded (md5 of the text read), so a
+-- backfill never clobbers rows that a live sync changed in the meantime.
+CREATE OR REPLACE FUNCTION update_article_embeddings(rows JSONB)
+RETURNS INT
+LANGUAGE plpgsql AS $$
+DECLARE
+    updated INT;
+BEGIN
+    UPDATE articles a
+    SET embedding = x.embedding::vector,
+        content_hash = x.content_hash,
+        updated_at = now()
+    FROM jsonb_to_recordset(rows)
+        AS x(id UUID, embedding TEXT, content_hash TEXT, content_md5 TEXT)
+    WHERE a.id = x.id
+      AND md5(a.content) = x.content_md5;
+    GET DIAGNOSTICS updated = ROW_COUNT;
+    RETURN updated;
+END;
+$$;
@@ -0,0 +1,171 @@
+"""Direct-Postgres bulk article loader (SUPABASE_DB_URL).
+
+PostgREST upserts go 50 rows per JSON request, each vector as a text literal,
+and a failed chunk leaves the batch half-written. Here a batch is one
+transaction:
+
+    COPY _articles_stage FROM STDIN (FORMAT BINARY)   -- vectors as float4 bytes
+    INSERT INTO articles SELECT ... FROM _articles_stage
+    ON CONFLICT (document_id, article_number, chunk_index) DO UPDATE ...
+
+Either every row lands or none does, so a failed load is safe to rerun.
+Needs psycopg 3 + pgvector (pip install -e ".[postgres]").
+"""
+
+import logging
+import threading
+import uuid
+from functools import lru_cache
+from typing import List
+
+from legal_chatbot.utils.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# (column, COPY type) — same names/types as the articles table
+STAGE_COLUMNS = [
+    ("id", "uuid"),
+    ("document_id", "uuid"),
+    ("article_number", "int4"),
+    ("chunk_index", "int4"),
+    ("title", "text"),
+    ("content", "text"),
+    ("chapter", "text"),
+    ("section", "text"),
+    ("part", "text"),
+    ("content_hash", "text"),
+    ("embedding", "vector"),
+]
+CONFLICT_KEY = ("document_id", "article_number", "chunk_index")
+# Like the REST path (None values are dropped), NULLs never overwrite existing values
+KEEP_IF_NULL = {"title", "chapter", "section", "part", "content_hash", "embedding"}
+
+_conn = None
+_conn_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+def _driver_installed() -> bool:
+    from importlib.util import find_spec
+
+    installed = find_spec("psycopg") is not None and find_spec("pgvector") is not None
+    if not installed:
+        logger.warning(
+            "SUPABASE_DB_URL is set but psycopg/pgvector are not installed "
+            "(pip install -e \".[postgres]\") — using the REST upsert path"
+        )
+    return installed
+
+
+def bulk_loader_available() -> bool:
+    """True when SUPABASE_DB_URL is set and psycopg/pgvector are importable."""
+    return bool(get_settings().supabase_db_url) and _driver_installed()
+
+
+def connect(dsn: str):
+    """Open an autocommit connection with the pgvector type registered."""
+    import psycopg
+    from pgvector.psycopg import register_vector
+
+    conn = psycopg.connect(dsn, autocommit=True)
+    register_vector(conn)
+    return conn
+
+
+def get_bulk_connection():
+    """Get or (re)create the process-wide bulk-load connection."""
+    global _conn
+    with _conn_lock:
+        if _conn is None or _conn.closed:
+            _conn = connect(get_settings().supabase_db_url)
+        return _conn
+
+
+def _stage_rows(articles: List[dict]) -> List[tuple]:
+    """Rows in STAGE_COLUMNS order, deduplicated on the conflict key (last wins).
+
+    ON CONFLICT DO UPDATE cannot touch the same row twice in one statement.
+    """
+    rows = {}
+    for article in articles:
+        key = (
+            article.get("document_id"),
+            article.get("article_number"),
+            article.get("chunk_index") or 0,
+        )
+        row = {**article, "chunk_index": key[2]}
+        # Binary COPY needs real UUID objects, not their text form
+        for name in ("id", "document_id"):
+            if row.get(name) is not None:
+                row[name] = uuid.UUID(str(row[name]))
+        rows[key] = tuple(row.get(name) for name, _ in STAGE_COLUMNS)
+    return list(rows.values())
+
+
+def copy_upsert_articles(conn, articles: List[dict], table: str = "articles") -> int:
+    """Binary COPY into a temp staging table, then one upsert. Returns row count."""
+    from psycopg import sql
+
+    rows = _stage_rows(articles)
+    if not rows:
+        return 0
+
+    names = [name for name, _ in STAGE_COLUMNS]
+    target = sql.Identifier(table)
+    stage = sql.Identifier("_articles_stage")
+    columns = sql.SQL(", ").join(map(sql.Identifier, names))
+    select = sql.SQL(", ").join(
+        sql.SQL("COALESCE(id, gen_random_uuid())") if name == "id" else sql.Identifier(name)
+        for name in names
+    )
+    updates = sql.SQL(", ").join(
+        sql.SQL("{0} = COALESCE(EXCLUDED.{0}, {1}.{0})").format(sql.Identifier(name), target)
+        if name in KEEP_IF_NULL
+        else sql.SQL("{0} = EXCLUDED.{0}").format(sql.Identifier(name))
+        for name in names
+        if name != "id" and name not in CONFLICT_KEY
+    )
+
+    with conn.transaction(), conn.cursor() as cur:
+        cur.execute(
+            sql.SQL(
+                "CREATE TEMP TABLE {stage} ON COMMIT DROP AS "
+                "SELECT {columns} FROM {target} WITH NO DATA"
+            ).format(stage=stage, columns=columns, target=target)
+        )
+        with cur.copy(
+            sql.SQL("COPY {} ({}) FROM STDIN (FORMAT BINARY)").format(stage, columns)
+        ) as copy:
+            copy.set_types([type_name for _, type_name in STAGE_COLUMNS])
+            for row in rows:
+                copy.write_row(row)
+        cur.execute(
+            sql.SQL(
+                "INSERT INTO {target} ({columns}) SELECT {select} FROM {stage} "
+                "ON CONFLICT ({key}) DO UPDATE SET {updates}, updated_at = now()"
+            ).format(
+                target=target,
+                columns=columns,
+                select=select,
+                stage=stage,
+                key=sql.SQL(", ").join(map(sql.Identifier, CONFLICT_KEY)),
+                updates=updates,
+            )
+        )
+        count = cur.rowcount
+    logger.info(f"Bulk-loaded {count} articles via COPY")
+    return count
+
+
+def bulk_upsert_articles(articles: List[dict]) -> int:
+    """copy_upsert_articles on the shared connection (reconnects once if it dropped)."""
+    import psycopg
+
+    global _conn
+    try:
+        return copy_upsert_articles(get_bulk_connection(), articles)
+    except psycopg.OperationalError:
+        logger.warning("Bulk-load connection dropped, reconnecting")
+        with _conn_lock:
+            _conn = None
+        return copy_upsert_articles(get_bulk_connection(), articles)
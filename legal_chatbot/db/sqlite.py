@@ -68,11 +68,22 @@ def init_db():
                 title TEXT,
                 content TEXT NOT NULL,
                 chapter TEXT,
+                content_hash TEXT,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                 UNIQUE(document_id, article_number)
             )
         """)
 
+        # Databases created before content_hash existed
+        columns = {row["name"] for row in cursor.execute("PRAGMA table_info(articles)")}
+        if "content_hash" not in columns:
+            cursor.execute("ALTER TABLE articles ADD COLUMN content_hash TEXT")
+
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_articles_hash
+            ON articles(content_hash)
+        """)
+
         cursor.execute("""
             CREATE INDEX IF NOT EXISTS idx_articles_document
             ON articles(document_id)
@@ -151,8 +162,8 @@ def insert_article(article: dict) -> str:
         cursor = conn.cursor()
         cursor.execute("""
             INSERT OR REPLACE INTO articles
-            (id, document_id, article_number, title, content, chapter)
-            VALUES (?, ?, ?, ?, ?, ?)
+            (id, document_id, article_number, title, content, chapter, content_hash)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
         """, (
             article['id'],
             article['document_id'],
@@ -160,6 +171,7 @@ def insert_article(article: dict) -> str:
             article.get('title'),
             article['content'],
             article.get('chapter'),
+            article.get('content_hash'),
         ))
         return article['id']
 
@@ -9,6 +9,9 @@ from legal_chatbot.utils.config import get_settings
 
 logger = logging.getLogger(__name__)
 
+# Same cutoff SupabaseClient passes to search_legal_articles
+MATCH_THRESHOLD = 0.3
+
 
 class SQLiteClient(DatabaseInterface):
     """SQLite implementation of DatabaseInterface.
@@ -43,13 +46,158 @@ class SQLiteClient(DatabaseInterface):
         top_k: int = 5,
         status: str = "active",
     ) -> List[dict]:
-        # SQLite fallback uses keyword search via chroma
-        from legal_chatbot.db.chroma import search_articles
+        """Semantic search via the local vector index.
 
-        # Convert embedding to text query is not possible,
-        # so fall back to returning all articles
-        logger.warning("SQLite mode: vector search not available, using keyword search")
-        return []
+        Mirrors SupabaseClient.search_articles / search_legal_articles RPC:
+        cosine similarity > 0.3, documents filtered by status,
+        same result keys.
+        """
+        try:
+            from legal_chatbot.db.vector_store import get_vector_store
+            store = get_vector_store()
+        except ImportError:
+            logger.warning("SQLite mode: numpy not installed, vector search unavailable")
+            return []
+
+        # Over-fetch so status filtering still leaves top_k results
+        candidates = store.search(
+            query_embedding, limit=top_k * 4, match_threshold=MATCH_THRESHOLD
+        )
+        if not candidates:
+            return []
+
+        ids = [aid for aid, _ in candidates]
+        placeholders = ",".join("?" for _ in ids)
+        with sqlite_ops.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                f"""
+                SELECT a.id, a.document_id, a.article_number, a.title, a.content,
+                       a.chapter, d.title AS document_title, d.document_type,
+                       d.document_number, d.status
+                FROM articles a
+                JOIN legal_documents d ON a.document_id = d.id
+                WHERE a.id IN ({placeholders})
+                """,
+                ids,
+            )
+            rows = {row["id"]: dict(row) for row in cursor.fetchall()}
+
+        results = []
+        for article_id, similarity in candidates:
+            row = rows.get(article_id)
+            if not row or row["status"] != status:
+                continue
+            results.append({
+                "id": article_id,
+                "document_id": row["document_id"],
+                "article_number": row["article_number"],
+                "title": row["title"] or "",
+                "content": row["content"] or "",
+                "chapter": row["chapter"] or "",
+                "document_title": row["document_title"] or "",
+                "document_type": row["document_type"] or "",
+                "document_number": row["document_number"] or "",
+                "similarity": similarity,
+            })
+            if len(results) >= top_k:
+                break
+        return results
+
+    def keyword_search_articles(
+        self,
+        primary_terms: List[str],
+        secondary_terms: List[str] = None,
+        limit: int = 100,
+    ) -> List[dict]:
+        """Keyword search via the local BM25 index (db/chroma).
+
+        Terms are searched as one bag of words; scores are BM25 squashed
+        into 0-1 on a fixed curve (comparable across queries).
+        """
+        from legal_chatbot.db import chroma
+
+        query = " ".join(list(primary_terms) + list(secondary_terms or []))
+        if not query.strip():
+            return []
+
+        results = []
+        for hit in chroma.search_articles(query, top_k=limit):
+            meta = hit.get("metadata") or {}
+            results.append({
+                "id": hit["id"],
+                "article_number": meta.get("article_number"),
+                "title": meta.get("article_title") or "",
+                "content": hit.get("content") or "",
+                "document_title": meta.get("document_title") or "",
+                "document_number": "",
+                "score": hit["score"],
+            })
+        return results
+
+    def get_embeddings_by_hash(self, content_hashes: List[str]) -> dict:
+        """Vectors of stored articles whose content_hash matches (local index)."""
+        hashes = list(dict.fromkeys(h for h in content_hashes if h))
+        if not hashes:
+            return {}
+
+        id_to_hash = {}
+        with sqlite_ops.get_connection() as conn:
+            cursor = conn.cursor()
+            for i in range(0, len(hashes), 500):
+                batch = hashes[i:i + 500]
+                placeholders = ",".join("?" for _ in batch)
+                cursor.execute(
+                    f"SELECT id, content_hash FROM articles WHERE content_hash IN ({placeholders})",
+                    batch,
+                )
+                id_to_hash.update({row["id"]: row["content_hash"] for row in cursor.fetchall()})
+        if not id_to_hash:
+            return {}
+
+        try:
+            from legal_chatbot.db.vector_store import get_vector_store
+            vectors = get_vector_store().get(list(id_to_hash))
+        except ImportError:
+            return {}
+        return {id_to_hash[aid]: vec for aid, vec in vectors.items()}
+
+    def list_articles_page(self, after_id: Optional[str] = None, limit: int = 500) -> List[dict]:
+        with sqlite_ops.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT id, document_id, article_number, 0 AS chunk_index, content "
+                "FROM articles WHERE id > ? ORDER BY id LIMIT ?",
+                (after_id or "", limit),
+            )
+            return [dict(row) for row in cursor.fetchall()]
+
+    def update_article_embeddings(self, rows: List[dict]) -> int:
+        """Content-guarded embedding update (mirrors the Supabase RPC)."""
+        import hashlib
+
+        if not rows:
+            return 0
+        ids = [r["id"] for r in rows]
+        placeholders = ",".join("?" for _ in ids)
+        with sqlite_ops.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                f"SELECT id, content FROM articles WHERE id IN ({placeholders})", ids
+            )
+            current = {
+                row["id"]: hashlib.md5(row["content"].encode("utf-8")).hexdigest()
+                for row in cursor.fetchall()
+            }
+            fresh = [r for r in rows if current.get(r["id"]) == r["content_md5"]]
+            cursor.executemany(
+                "UPDATE articles SET content_hash = ? WHERE id = ?",
+                [(r.get("content_hash"), r["id"]) for r in fresh],
+            )
+        if fresh:
+            from legal_chatbot.db.vector_store import get_vector_store
+            get_vector_store().upsert([r["id"] for r in fresh], [r["embedding"] for r in fresh])
+        return len(fresh)
 
     def get_document_by_hash(self, content_hash: str) -> Optional[dict]:
         # Not supported in existing SQLite schema
@@ -60,7 +208,18 @@ class SQLiteClient(DatabaseInterface):
         return sqlite_ops.insert_document(document)
 
     def upsert_articles(self, articles: List[dict]) -> int:
-        return self.insert_articles(articles)
+        """Upsert article rows, then their embeddings into the local vector index."""
+        count = self.insert_articles(articles)
+        embedded = [a for a in articles if a.get("embedding") is not None and a.get("id")]
+        if embedded:
+            try:
+                from legal_chatbot.db.vector_store import get_vector_store
+                get_vector_store().upsert(
+                    [a["id"] for a in embedded], [a["embedding"] for a in embedded]
+                )
+            except ImportError:
+                logger.warning("SQLite mode: numpy not installed, embeddings not indexed")
+        return count
 
     def get_status(self) -> dict:
         settings = get_settings()
@@ -76,6 +235,7 @@ class SQLiteClient(DatabaseInterface):
                 "path": settings.database_path,
                 "documents": docs,
                 "articles": articles,
+                "vectors": self._vector_count(),
                 "status": "connected",
             }
         except Exception as e:
@@ -85,6 +245,13 @@ class SQLiteClient(DatabaseInterface):
                 "status": f"error: {e}",
             }
 
+    def _vector_count(self) -> int:
+        try:
+            from legal_chatbot.db.vector_store import get_vector_store
+            return len(get_vector_store())
+        except ImportError:
+            return 0
+
     def browse_categories(self) -> List[dict]:
         # SQLite doesn't have categories table
         return []
@@ -6,6 +6,8 @@ from typing import List, Optional
 
 from legal_chatbot.db.base import DatabaseInterface
 from legal_chatbot.utils.config import get_settings
+from legal_chatbot.utils.singleflight import coalesced
+from legal_chatbot.utils.vectors import from_pgvector, to_pgvector
 
 logger = logging.getLogger(__name__)
 
@@ -109,9 +111,9 @@ class SupabaseClient(DatabaseInterface):
         clean = []
         for a in articles:
             row = {k: v for k, v in a.items() if v is not None and k in valid_cols}
-            # Convert embedding list to string format for pgvector if present
-            if "embedding" in row and isinstance(row["embedding"], list):
-                row["embedding"] = str(row["embedding"])
+            # Serialize the float32 vector to pgvector text only here, at the wire
+            if "embedding" in row and not isinstance(row["embedding"], str):
+                row["embedding"] = to_pgvector(row["embedding"])
             clean.append(row)
         # Deduplicate by id within the batch (keep last occurrence)
         deduped = {row["id"]: row for row in clean if "id" in row}
@@ -171,7 +173,7 @@ class SupabaseClient(DatabaseInterface):
         result = client.rpc(
             "search_legal_articles",
             {
-                "query_embedding": str(query_embedding),
+                "query_embedding": to_pgvector(query_embedding),
                 "match_threshold": 0.3,
                 "match_count": top_k,
                 "filter_status": status,
@@ -194,6 +196,175 @@ class SupabaseClient(DatabaseInterface):
             })
         return normalized
 
+    def keyword_search_articles(
+        self,
+        primary_terms: List[str],
+        secondary_terms: List[str] = None,
+        limit: int = 100,
+    ) -> List[dict]:
+        """Ranked keyword search via keyword_search_articles RPC (009 migration).
+
+        One round trip: candidates come from the full-text GIN index, scoring
+        (primary title/content, secondary title) is computed server-side.
+        Falls back to batched ILIKE queries if the RPC is not deployed yet.
+        Returns id, article_number, title, content, document_title,
+        document_number and score — ordered by score DESC.
+        """
+        secondary_terms = secondary_terms or []
+        client = self._read()
+        try:
+            result = client.rpc(
+                "keyword_search_articles",
+                {
+                    "primary_terms": primary_terms,
+                    "secondary_terms": secondary_terms,
+                    "match_limit": limit,
+                },
+            ).execute()
+        except Exception as e:
+            logger.warning(f"keyword_search_articles RPC failed, using ILIKE fan-out: {e}")
+            return self._keyword_search_fanout(primary_terms, secondary_terms, limit)
+
+        return [
+            {
+                "id": row.get("article_id"),
+                "article_number": row.get("article_number"),
+                "title": row.get("title") or "",
+                "content": row.get("content") or "",
+                "document_title": row.get("document_title") or "",
+                "document_number": row.get("document_number") or "",
+                "score": float(row.get("score") or 0),
+            }
+            for row in result.data or []
+        ]
+
+    def _keyword_search_fanout(
+        self,
+        primary_terms: List[str],
+        secondary_terms: List[str],
+        limit: int,
+    ) -> List[dict]:
+        """Client-side equivalent of keyword_search_articles (pre-009 databases).
+
+        Scoring:
+        - Primary title match: 10.0 per term
+        - Primary content match: 2.0 per term, capped at 6.0
+        - Secondary title match: 1.0 per term
+        """
+        client = self._read()
+        hits: dict[str, dict] = {}
+
+        def _fetch_batched(terms, field, batch_size, limit_per_batch):
+            """Fetch articles in small batches to avoid limit bias."""
+            all_data = []
+            for i in range(0, len(terms), batch_size):
+                batch = terms[i:i + batch_size]
+                filter_str = ",".join(f"{field}.ilike.%{t}%" for t in batch)
+                try:
+                    r = (client.table("articles")
+                         .select("id, article_number, title, content, "
+                                 "legal_documents(title, document_number)")
+                         .or_(filter_str).limit(limit_per_batch).execute())
+                    all_data.extend(r.data or [])
+                except Exception:
+                    pass
+            return all_data
+
+        def _collect(rows, terms, field, bucket):
+            for a in rows:
+                entry = hits.setdefault(a["id"], {
+                    "data": a, "pri_title": set(), "pri_content": set(), "sec_title": set(),
+                })
+                text = (a.get(field) or "").lower()
+                entry[bucket].update(t for t in terms if t in text)
+
+        if primary_terms:
+            _collect(_fetch_batched(primary_terms, "title", 2, 20),
+                     primary_terms, "title", "pri_title")
+            _collect(_fetch_batched(primary_terms, "content", 2, 20),
+                     primary_terms, "content", "pri_content")
+        if secondary_terms:
+            _collect(_fetch_batched(secondary_terms, "title", 3, 15),
+                     secondary_terms, "title", "sec_title")
+
+        results = []
+        for article_id, entry in hits.items():
+            score = (
+                len(entry["pri_title"]) * 10.0
+                + min(len(entry["pri_content"]) * 2.0, 6.0)
+                + len(entry["sec_title"]) * 1.0
+            )
+            if score <= 0:
+                continue
+            a = entry["data"]
+            doc = a.get("legal_documents") or {}
+            results.append({
+                "id": article_id,
+                "article_number": a.get("article_number"),
+                "title": a.get("title") or "",
+                "content": a.get("content") or "",
+                "document_title": doc.get("title") or "",
+                "document_number": doc.get("document_number") or "",
+                "score": score,
+            })
+        results.sort(key=lambda r: (-r["score"], r["article_number"] or 0))
+        return results[:limit]
+
+    def get_embeddings_by_hash(self, content_hashes: List[str]) -> dict:
+        """Bulk lookup of existing embeddings by articles.content_hash.
+
+        Batched IN queries (50 hashes per round trip — each row carries a
+        768-d vector). Returns {content_hash: float32 vector}.
+        """
+        client = self._read()
+        hashes = list(dict.fromkeys(h for h in content_hashes if h))
+        found = {}
+        for i in range(0, len(hashes), 50):
+            batch = hashes[i:i + 50]
+            result = (
+                client.table("articles")
+                .select("content_hash, embedding")
+                .in_("content_hash", batch)
+                .not_.is_("embedding", "null")
+                .execute()
+            )
+            for row in result.data or []:
+                embedding = row.get("embedding")
+                # pgvector comes back as its text form "[0.1,0.2,...]"
+                if embedding:
+                    found[row["content_hash"]] = from_pgvector(embedding)
+        return found
+
+    def list_articles_page(self, after_id: Optional[str] = None, limit: int = 500) -> List[dict]:
+        """Keyset page over articles ordered by id (no OFFSET scans)."""
+        client = self._read()
+        query = (
+            client.table("articles")
+            .select("id, document_id, article_number, chunk_index, content")
+            .order("id")
+            .limit(limit)
+        )
+        if after_id:
+            query = query.gt("id", after_id)
+        return query.execute().data or []
+
+    def update_article_embeddings(self, rows: List[dict]) -> int:
+        """Bulk embedding update via update_article_embeddings RPC (010 migration)."""
+        if not rows:
+            return 0
+        client = self._write()
+        payload = [
+            {
+                "id": r["id"],
+                "embedding": to_pgvector(r["embedding"]),
+                "content_hash": r.get("content_hash"),
+                "content_md5": r["content_md5"],
+            }
+            for r in rows
+        ]
+        result = client.rpc("update_article_embeddings", {"rows": payload}).execute()
+        return int(result.data or 0)
+
     def get_document_by_hash(self, content_hash: str) -> Optional[dict]:
         """Find document by content hash."""
         client = self._read()
@@ -241,7 +412,15 @@ class SupabaseClient(DatabaseInterface):
         return result.data[0]["id"]
 
     def upsert_articles(self, articles: List[dict]) -> int:
-        """Batch upsert articles with embeddings. Returns count."""
+        """Batch upsert articles with embeddings. Returns count.
+
+        With SUPABASE_DB_URL set, loads the whole batch in one binary COPY
+        transaction (db/pg_bulk.py); otherwise PostgREST in 50-row chunks.
+        """
+        from legal_chatbot.db.pg_bulk import bulk_loader_available, bulk_upsert_articles
+
+        if bulk_loader_available():
+            return bulk_upsert_articles(articles)
         return self.insert_articles(articles)
 
     def get_status(self) -> dict:
@@ -271,6 +450,7 @@ class SupabaseClient(DatabaseInterface):
 
     # Browse operations
 
+    @coalesced()
     def browse_categories(self) -> List[dict]:
         """List categories with document/article counts."""
         client = self._read()
@@ -407,6 +587,7 @@ class SupabaseClient(DatabaseInterface):
     # Contract Templates CRUD (T007)
     # =========================================================
 
+    @coalesced()
     def get_contract_templates(self, category_name: str) -> List[dict]:
         """Load active contract templates for a category."""
         client = self._read()
@@ -473,6 +654,7 @@ class SupabaseClient(DatabaseInterface):
             })
         return results
 
+    @coalesced()
     def get_contract_template(self, contract_type: str) -> Optional[dict]:
         """Load single contract template by type slug."""
         client = self._read()
@@ -486,6 +668,7 @@ class SupabaseClient(DatabaseInterface):
         )
         return result.data[0] if result.data else None
 
+    @coalesced()
     def list_available_contracts(self) -> List[dict]:
         """List all active categories with their contract templates."""
         client = self._read()
@@ -515,6 +698,7 @@ class SupabaseClient(DatabaseInterface):
             })
         return results
 
+    @coalesced()
     def list_all_active_templates(self) -> List[dict]:
         """List all active templates that have required_fields defined.
 
@@ -594,6 +778,7 @@ class SupabaseClient(DatabaseInterface):
     # Category Stats (T008)
     # =========================================================
 
+    @coalesced()
     def get_category_stats(self, category_name: str) -> Optional[dict]:
         """Get category with article/document counts via RPC."""
         client = self._read()
@@ -602,6 +787,7 @@ class SupabaseClient(DatabaseInterface):
         ).execute()
         return result.data[0] if result.data else None
 
+    @coalesced()
     def get_all_categories_with_stats(self) -> List[dict]:
         """List all categories with worker/count fields."""
         client = self._read()
@@ -0,0 +1,228 @@
+"""Local vector index for SQLite mode — pgvector stand-in on a single box.
+
+Layout (under settings.vector_store_path):
+    embeddings.f32   float32 matrix (rows × dim), memory-mapped, L2-normalized rows
+    ids.json         row → article_id
+    hnsw.bin         optional HNSW graph (hnswlib), rebuilt if out of sync
+
+Similarity = cosine similarity = 1 - (a <=> b), same as search_legal_articles.
+"""
+
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+
+from legal_chatbot.utils.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class LocalVectorStore:
+    """Append/update-in-place float32 matrix with brute-force or HNSW search."""
+
+    def __init__(
+        self,
+        path: str | Path = None,
+        dimension: int = None,
+        use_hnsw: bool = None,
+    ):
+        settings = get_settings()
+        self._path = Path(path or settings.vector_store_path)
+        self._dim = dimension or settings.embedding_dimension
+        self._use_hnsw = settings.vector_store_hnsw if use_hnsw is None else use_hnsw
+        self._lock = threading.Lock()
+        self._ids: List[str] = []
+        self._rows: dict[str, int] = {}
+        self._matrix: Optional[np.memmap] = None
+        self._hnsw = None
+        self._path.mkdir(parents=True, exist_ok=True)
+        self._load()
+
+    @property
+    def _matrix_file(self) -> Path:
+        return self._path / "embeddings.f32"
+
+    @property
+    def _ids_file(self) -> Path:
+        return self._path / "ids.json"
+
+    @property
+    def _hnsw_file(self) -> Path:
+        return self._path / "hnsw.bin"
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _load(self) -> None:
+        if self._ids_file.exists():
+            try:
+                self._ids = json.loads(self._ids_file.read_text(encoding="utf-8"))
+            except Exception:
+                logger.warning("Local vector ids.json unreadable, starting empty")
+                self._ids = []
+        expected = len(self._ids) * self._dim * 4
+        size = self._matrix_file.stat().st_size if self._matrix_file.exists() else 0
+        if size < expected:
+            logger.warning("Local vector matrix shorter than ids.json, starting empty")
+            self._ids = []
+        if not self._ids:
+            # Stale rows would otherwise sit before the next append's offset 0
+            self._matrix_file.unlink(missing_ok=True)
+        elif size > expected:
+            # Torn write: rows appended but ids.json not yet replaced — drop them
+            logger.warning("Local vector matrix has rows past ids.json, truncating")
+            with open(self._matrix_file, "r+b") as f:
+                f.truncate(expected)
+        self._rows = {aid: i for i, aid in enumerate(self._ids)}
+        self._remap()
+        if self._use_hnsw:
+            self._load_hnsw()
+
+    def _save_ids(self) -> None:
+        """Replace ids.json atomically (a crash leaves the old or the new list)."""
+        tmp = self._ids_file.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(self._ids), encoding="utf-8")
+        tmp.replace(self._ids_file)
+
+    def _remap(self) -> None:
+        """(Re)open the memory map after the file grew."""
+        if not self._ids:
+            self._matrix = None
+            return
+        self._matrix = np.memmap(
+            self._matrix_file, dtype=np.float32, mode="r+",
+            shape=(len(self._ids), self._dim),
+        )
+
+    def _load_hnsw(self) -> None:
+        try:
+            import hnswlib
+        except ImportError:
+            logger.warning("hnswlib not installed — local vector search uses brute force")
+            self._use_hnsw = False
+            return
+
+        index = hnswlib.Index(space="cosine", dim=self._dim)
+        if self._hnsw_file.exists():
+            try:
+                index.load_index(str(self._hnsw_file), max_elements=max(len(self._ids), 1))
+                if index.get_current_count() == len(self._ids):
+                    index.set_ef(64)
+                    self._hnsw = index
+                    return
+            except Exception as e:
+                logger.warning(f"HNSW index unreadable, rebuilding: {e}")
+            index = hnswlib.Index(space="cosine", dim=self._dim)
+
+        index.init_index(max_elements=max(len(self._ids), 1024), ef_construction=200, M=16)
+        if self._ids:
+            index.add_items(np.asarray(self._matrix), np.arange(len(self._ids)))
+        index.set_ef(64)
+        self._hnsw = index
+        self._save_hnsw()
+
+    def _save_hnsw(self) -> None:
+        if self._hnsw is not None:
+            self._hnsw.save_index(str(self._hnsw_file))
+
+    def upsert(self, article_ids: List[str], embeddings) -> int:
+        """Insert or overwrite vectors by article ID. Returns count written."""
+        if not article_ids:
+            return 0
+        vectors = np.asarray(embeddings, dtype=np.float32).reshape(len(article_ids), self._dim)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1.0, norms)
+
+        with self._lock:
+            # Deduplicate within the batch (keep last occurrence)
+            latest = {aid: i for i, aid in enumerate(article_ids)}
+            updates = [(self._rows[aid], i) for aid, i in latest.items() if aid in self._rows]
+            new = [(aid, i) for aid, i in latest.items() if aid not in self._rows]
+
+            if updates and self._matrix is not None:
+                rows, src = zip(*updates)
+                self._matrix[list(rows)] = vectors[list(src)]
+                self._matrix.flush()
+
+            if new:
+                start = len(self._ids)
+                with open(self._matrix_file, "ab") as f:
+                    f.write(vectors[[i for _, i in new]].tobytes())
+                for offset, (aid, _) in enumerate(new):
+                    self._ids.append(aid)
+                    self._rows[aid] = start + offset
+                self._remap()
+
+            self._save_ids()
+
+            if self._hnsw is not None:
+                labels = [self._rows[aid] for aid in latest]
+                needed = len(self._ids)
+                if needed > self._hnsw.get_max_elements():
+                    self._hnsw.resize_index(max(needed, self._hnsw.get_max_elements() * 2))
+                self._hnsw.add_items(vectors[list(latest.values())], labels)
+                self._save_hnsw()
+
+        return len(latest)
+
+    def get(self, article_ids: List[str]) -> dict[str, np.ndarray]:
+        """Return stored (normalized) float32 vectors for the given IDs that exist."""
+        with self._lock:
+            if self._matrix is None:
+                return {}
+            # Copies — the memmap is replaced when the matrix grows
+            return {
+                aid: np.array(self._matrix[self._rows[aid]])
+                for aid in article_ids
+                if aid in self._rows
+            }
+
+    def search(
+        self,
+        query_embedding,
+        limit: int = 10,
+        match_threshold: float = 0.0,
+    ) -> List[tuple[str, float]]:
+        """Return [(article_id, similarity)] sorted by similarity DESC."""
+        with self._lock:
+            if self._matrix is None or not self._ids or limit <= 0:
+                return []
+            query = np.asarray(query_embedding, dtype=np.float32).reshape(self._dim)
+            norm = np.linalg.norm(query)
+            if norm == 0:
+                return []
+            query = query / norm
+            k = min(limit, len(self._ids))
+
+            if self._hnsw is not None:
+                labels, distances = self._hnsw.knn_query(query, k=k)
+                pairs = [
+                    (self._ids[int(row)], float(1.0 - dist))
+                    for row, dist in zip(labels[0], distances[0])
+                ]
+            else:
+                sims = np.asarray(self._matrix) @ query
+                if k < len(sims):
+                    top = np.argpartition(-sims, k - 1)[:k]
+                else:
+                    top = np.arange(len(sims))
+                top = top[np.argsort(-sims[top])]
+                pairs = [(self._ids[int(row)], float(sims[row])) for row in top]
+
+        return [(aid, sim) for aid, sim in pairs if sim > match_threshold]
+
+
+_store: Optional[LocalVectorStore] = None
+
+
+def get_vector_store() -> LocalVectorStore:
+    """Get or create the process-wide local vector store."""
+    global _store
+    settings = get_settings()
+    if _store is None or _store._path != Path(settings.vector_store_path):
+        _store = LocalVectorStore()
+    return _store
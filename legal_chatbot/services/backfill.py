@@ -0,0 +1,186 @@
+"""Full-corpus embedding backfill — paged, multi-process, resumable.
+
+    pages:   keyset pagination over articles (ORDER BY id), next page
+             prefetched while the current one embeds
+    workers: process pool (spawn), one model per worker, torch/BLAS/ORT
+             threads pinned so workers don't oversubscribe cores
+    writes:  one bulk update per page, only embedding + content_hash,
+             guarded by md5(content) — rows edited by a live sync are skipped
+    resume:  checkpoint file records the last committed article id
+"""
+
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from pydantic import BaseModel
+
+from legal_chatbot.services.embedding import EmbeddingService
+
+logger = logging.getLogger(__name__)
+
+# Set in each worker process by _init_worker
+_worker_service: Optional[EmbeddingService] = None
+
+
+def _init_worker(threads: int, model_name: str, backend: str) -> None:
+    """Pool initializer: pin threads, then load one model per process."""
+    global _worker_service
+    for var in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS"):
+        os.environ[var] = str(threads)
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+    _worker_service = EmbeddingService(model_name=model_name, backend=backend, server_url="")
+    _worker_service.get_model()
+
+
+def _worker_embed(texts: List[str]) -> List[List[float]]:
+    return _worker_service.embed_batch(texts)
+
+
+class BackfillStats(BaseModel):
+    """Progress of a backfill run (also the checkpoint file format)."""
+    model: str
+    cursor: Optional[str] = None
+    processed: int = 0
+    updated: int = 0
+    skipped: int = 0
+    started_at: str = ""
+    finished: bool = False
+
+
+class BackfillService:
+    """Re-embed every article in the database."""
+
+    def __init__(
+        self,
+        db,
+        embedding: EmbeddingService = None,
+        workers: int = 0,
+        threads_per_worker: int = 0,
+        page_size: int = 512,
+        checkpoint_path: str | Path = None,
+        pause: float = 0.0,
+    ):
+        self.db = db
+        self.embedding = embedding or EmbeddingService(server_url="")
+        self.workers = workers
+        cpus = os.cpu_count() or 1
+        self.threads = threads_per_worker or max(1, cpus // max(workers, 1))
+        self.page_size = page_size
+        self.checkpoint_path = Path(checkpoint_path) if checkpoint_path else None
+        self.pause = pause
+
+    def load_checkpoint(self) -> Optional[BackfillStats]:
+        if not self.checkpoint_path or not self.checkpoint_path.exists():
+            return None
+        stats = BackfillStats(**json.loads(self.checkpoint_path.read_text(encoding="utf-8")))
+        if stats.model != self.embedding._model_name:
+            logger.warning(
+                f"Checkpoint is for model {stats.model}, not {self.embedding._model_name} — ignoring"
+            )
+            return None
+        return stats
+
+    def _save_checkpoint(self, stats: BackfillStats) -> None:
+        if not self.checkpoint_path:
+            return
+        self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.checkpoint_path.with_suffix(".tmp")
+        tmp.write_text(stats.model_dump_json(indent=2), encoding="utf-8")
+        tmp.replace(self.checkpoint_path)
+
+    def _shards(self, texts: List[str]) -> List[List[str]]:
+        n = max(self.workers, 1)
+        size = -(-len(texts) // n)
+        return [texts[i:i + size] for i in range(0, len(texts), size)]
+
+    def run(
+        self,
+        resume: bool = True,
+        max_pages: int = None,
+        on_page: Callable[[BackfillStats, float], None] = None,
+    ) -> BackfillStats:
+        """Backfill all articles after the checkpoint cursor.
+
+        on_page(stats, articles_per_sec) is called after each committed page.
+        """
+        stats = (self.load_checkpoint() if resume else None) or BackfillStats(
+            model=self.embedding._model_name,
+            started_at=datetime.now().isoformat(),
+        )
+        if stats.finished:
+            stats.cursor, stats.finished = None, False
+            stats.processed = stats.updated = stats.skipped = 0
+
+        pool = None
+        if self.workers > 1:
+            pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.threads, self.embedding._model_name, self.embedding._backend),
+            )
+        prefetch = ThreadPoolExecutor(max_workers=1, thread_name_prefix="backfill-prefetch")
+
+        started = time.monotonic()
+        done_this_run = 0
+        pages = 0
+        try:
+            next_page = prefetch.submit(self.db.list_articles_page, stats.cursor, self.page_size)
+            while True:
+                page = next_page.result()
+                if not page:
+                    stats.finished = True
+                    self._save_checkpoint(stats)
+                    break
+                next_page = prefetch.submit(self.db.list_articles_page, page[-1]["id"], self.page_size)
+
+                texts = [a["content"] for a in page]
+                if pool is not None:
+                    vectors = [v for part in pool.map(_worker_embed, self._shards(texts)) for v in part]
+                else:
+                    vectors = self.embedding.embed_batch(texts)
+
+                rows = [
+                    {
+                        "id": a["id"],
+                        "embedding": vector,
+                        "content_hash": EmbeddingService.content_hash(a["content"]),
+                        "content_md5": hashlib.md5(a["content"].encode("utf-8")).hexdigest(),
+                    }
+                    for a, vector in zip(page, vectors)
+                ]
+                updated = self.db.update_article_embeddings(rows)
+
+                stats.cursor = page[-1]["id"]
+                stats.processed += len(page)
+                stats.updated += updated
+                stats.skipped += len(page) - updated
+                self._save_checkpoint(stats)
+
+                done_this_run += len(page)
+                rate = done_this_run / max(time.monotonic() - started, 1e-9)
+                if on_page:
+                    on_page(stats, rate)
+
+                pages += 1
+                if max_pages and pages >= max_pages:
+                    break
+                if self.pause:
+                    time.sleep(self.pause)
+        finally:
+            prefetch.shutdown(wait=False, cancel_futures=True)
+            if pool is not None:
+                pool.shutdown()
+        return stats
@@ -6,6 +6,7 @@ from typing import Optional
 from legal_chatbot.utils.config import get_settings
 from legal_chatbot.utils.llm import call_llm
 from legal_chatbot.models.chat import ChatResponse, Citation
+from legal_chatbot.services.query_router import QueryAnalysis, analyze_query
 from legal_chatbot.utils.vietnamese import extract_all_article_references
 
 logger = logging.getLogger(__name__)
@@ -48,6 +49,7 @@ class ChatService:
         self._audit = None
         self._db = None
         self._embedding = None
+        self._retriever = None
 
     @property
     def audit(self):
@@ -77,12 +79,22 @@ class ChatService:
             self._embedding = EmbeddingService()
         return self._embedding
 
-    def _detect_category(self, query: str) -> Optional[str]:
+    @property
+    def retriever(self):
+        """Lazy-load hybrid retriever (keyword + vector)."""
+        if self._retriever is None:
+            from legal_chatbot.services.retriever import HybridRetriever
+            self._retriever = HybridRetriever(db=self.db, embedding=self.embedding)
+        return self._retriever
+
+    def _detect_category(self, query: str) -> tuple[Optional[str], Optional[QueryAnalysis]]:
         """Detect legal domain from user query.
 
         Strategy:
         1. Keyword matching (fast, no API call)
-        2. LLM classification (fallback)
+        2. Query router (fallback) — its search terms are reused for retrieval
+
+        Returns (category, router analysis or None if the router wasn't needed).
         """
         query_lower = query.lower()
 
@@ -96,32 +108,11 @@ class ChatService:
                 best_match = category
 
         if best_score > 0:
-            return best_match
-
-        # Layer 2: LLM classification fallback
-        try:
-            categories_str = ", ".join(CATEGORY_KEYWORDS.keys())
-            result = call_llm(
-                messages=[
-                    {
-                        "role": "system",
-                        "content": (
-                            f"Phân loại câu hỏi pháp lý vào một trong các lĩnh vực: {categories_str}. "
-                            "Chỉ trả về TÊN lĩnh vực, không giải thích. "
-                            "Nếu không xác định được, trả về 'unknown'."
-                        ),
-                    },
-                    {"role": "user", "content": query},
-                ],
-                temperature=0,
-                max_tokens=20,
-            ).strip().lower()
-            if result in CATEGORY_KEYWORDS:
-                return result
-        except Exception as e:
-            logger.warning(f"LLM category detection failed: {e}")
+            return best_match, None
 
-        return None
+        # Layer 2: one router call (category + search terms)
+        analysis = analyze_query(query, categories=list(CATEGORY_KEYWORDS))
+        return (analysis.category if analysis else None), analysis
 
     def _check_data_availability(self, category: Optional[str]) -> dict:
         """Check if category has indexed data.
@@ -197,15 +188,19 @@ class ChatService:
         """Generate friendly message when search returns 0 results."""
         return "Mình không tìm thấy điều luật phù hợp với câu hỏi này. Bạn thử diễn đạt cụ thể hơn?"
 
-    def _build_context_supabase(self, query: str) -> tuple[str, list[dict]]:
-        """Build context using Supabase vector search."""
-        try:
-            query_embedding = self.embedding.embed_single(query)
+    def _build_context_supabase(
+        self, query: str, analysis: Optional[QueryAnalysis] = None
+    ) -> tuple[str, list[dict]]:
+        """Build context using hybrid (keyword + vector) search.
 
-            articles = self.db.search_articles(
-                query_embedding=query_embedding,
-                top_k=self.top_k,
-            )
+        Router search terms feed the keyword leg when available, otherwise
+        n-gram terms are built from the query.
+        """
+        terms = {}
+        if analysis and (analysis.primary or analysis.secondary):
+            terms = {"primary_terms": analysis.primary, "secondary_terms": analysis.secondary}
+        try:
+            articles = self.retriever.retrieve(query, top_k=self.top_k, **terms)
 
             if not articles:
                 return "", []
@@ -225,11 +220,6 @@ class ChatService:
                 context_parts.append(f"{header}\n{content}")
 
             context = "\n\n---\n\n".join(context_parts)
-
-            for article in articles:
-                if 'similarity' in article and 'score' not in article:
-                    article['score'] = article['similarity']
-
             return context, articles
         except Exception as e:
             logger.error(f"Supabase search failed: {e}")
@@ -297,7 +287,7 @@ class ChatService:
         settings = get_settings()
 
         # Step 1: Detect category
-        category = self._detect_category(query)
+        category, analysis = self._detect_category(query)
 
         # Step 2: Check data availability (supabase mode only)
         if settings.db_mode == "supabase":
@@ -318,7 +308,7 @@ class ChatService:
                 )
 
         # Step 4: Build RAG context (DB-only)
-        context, search_results = self._build_context_supabase(query)
+        context, search_results = self._build_context_supabase(query, analysis)
 
         # Step 5: Empty results → insufficient data
         if not context:
@@ -361,6 +351,7 @@ Lưu ý: Không tìm thấy điều luật liên quan trong cơ sở dữ liệu
             messages=messages,
             temperature=self.temperature,
             max_tokens=self.max_tokens,
+            task="answer",
         )
 
         citations = self._extract_citations(answer, search_results)
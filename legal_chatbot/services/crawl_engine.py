@@ -0,0 +1,172 @@
+"""Parallel page fetcher sharing one Playwright browser for a whole run.
+
+    async with CrawlEngine() as engine:
+        async for url, html, error in engine.fetch_all(urls):
+            ...  # in completion order, while the remaining pages load
+
+One Firefox instance is launched per engine (not per URL), on the first
+fetch, together with a pool of browser contexts that are reused. A context
+keeps its cookies, so a Cloudflare clearance earned on the first page
+carries over to the next ones. Politeness is per host: at most PIPELINE_CRAWL_PER_HOST
+pages in flight, and request starts spaced PIPELINE_RATE_LIMIT seconds
+apart plus up to PIPELINE_CRAWL_JITTER of random jitter.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from typing import AsyncIterator, Optional
+from urllib.parse import urlparse
+
+from legal_chatbot.utils.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class _HostGate:
+    """Concurrency cap plus spacing of request starts for one host."""
+
+    def __init__(self, concurrency: int, delay: float, jitter: float):
+        self.slots = asyncio.Semaphore(concurrency)
+        self.delay = delay
+        self.jitter = jitter
+        self._next_start = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait_turn(self) -> None:
+        async with self._lock:
+            now = time.monotonic()
+            if self._next_start > now:
+                await asyncio.sleep(self._next_start - now)
+            self._next_start = time.monotonic() + self.delay + random.uniform(0, self.jitter)
+
+
+class CrawlEngine:
+    """Fetches pages with a shared browser, a context pool and per-host limits."""
+
+    def __init__(
+        self,
+        contexts: int = None,
+        per_host: int = None,
+        delay: float = None,
+        jitter: float = None,
+        page_wait: float = None,
+    ):
+        settings = get_settings()
+        self.contexts = contexts or settings.pipeline_crawl_contexts
+        self.per_host = per_host or settings.pipeline_crawl_per_host
+        self.delay = settings.pipeline_rate_limit if delay is None else delay
+        self.jitter = settings.pipeline_crawl_jitter if jitter is None else jitter
+        self.page_wait = settings.pipeline_page_wait if page_wait is None else page_wait
+        self._playwright = None
+        self._browser = None
+        self._pool: Optional[asyncio.Queue] = None
+        self._start_lock: Optional[asyncio.Lock] = None
+        self._start_error: Optional[Exception] = None
+        self._gates: dict[str, _HostGate] = {}
+
+    async def __aenter__(self) -> "CrawlEngine":
+        self._start_lock = asyncio.Lock()
+        return self
+
+    async def _start(self) -> None:
+        """Launch the browser and fill the context pool (once).
+
+        A failed start is final: the engine is stopped and every later
+        fetch raises the same error instead of launching again.
+        """
+        async with self._start_lock:
+            if self._start_error is not None:
+                raise self._start_error
+            if self._pool is not None:
+                return
+            try:
+                await self._launch()
+                pool = asyncio.Queue()
+                for _ in range(self.contexts):
+                    pool.put_nowait(await self._new_context())
+            except Exception as e:
+                self._start_error = e
+                logger.error(f"Browser failed to start, stopping the crawl engine: {e}")
+                try:
+                    await self._shutdown()
+                except Exception as shutdown_error:
+                    logger.debug(f"Error stopping browser: {shutdown_error}")
+                raise
+            self._pool = pool
+
+    async def __aexit__(self, *exc) -> None:
+        while self._pool is not None and not self._pool.empty():
+            context = self._pool.get_nowait()
+            try:
+                await context.close()
+            except Exception as e:
+                logger.debug(f"Error closing browser context: {e}")
+        await self._shutdown()
+
+    async def _launch(self) -> None:
+        from playwright.async_api import async_playwright
+
+        self._playwright = await async_playwright().start()
+        self._browser = await self._playwright.firefox.launch(headless=True)
+
+    async def _shutdown(self) -> None:
+        if self._browser is not None:
+            await self._browser.close()
+        if self._playwright is not None:
+            await self._playwright.stop()
+        self._browser = self._playwright = None
+
+    async def _new_context(self):
+        return await self._browser.new_context(
+            viewport={"width": 1920, "height": 1080},
+            locale="vi-VN",
+            timezone_id="Asia/Ho_Chi_Minh",
+        )
+
+    async def _load(self, context, url: str) -> str:
+        """Open url in a fresh page of context; wait out the Cloudflare challenge."""
+        page = await context.new_page()
+        try:
+            await page.goto(url, wait_until="domcontentloaded", timeout=30000)
+            await page.wait_for_timeout(int(1000 * self.page_wait * random.uniform(1, 2)))
+            return await page.content()
+        finally:
+            await page.close()
+
+    def _gate(self, url: str) -> _HostGate:
+        host = urlparse(url).netloc
+        if host not in self._gates:
+            self._gates[host] = _HostGate(self.per_host, self.delay, self.jitter)
+        return self._gates[host]
+
+    async def fetch(self, url: str) -> str:
+        """HTML of one page, within the host's limits."""
+        if self._pool is None:
+            await self._start()  # raises if the browser could not start
+        gate = self._gate(url)
+        async with gate.slots:
+            await gate.wait_turn()
+            context = await self._pool.get()
+            try:
+                return await self._load(context, url)
+            finally:
+                self._pool.put_nowait(context)
+
+    async def fetch_all(self, urls: list[str]) -> AsyncIterator[tuple[str, Optional[str], Optional[Exception]]]:
+        """(url, html, None) or (url, None, error) per URL, as pages finish."""
+
+        async def one(url: str):
+            try:
+                return url, await self.fetch(url), None
+            except Exception as e:
+                return url, None, e
+
+        tasks = [asyncio.ensure_future(one(url)) for url in urls]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
@@ -3,7 +3,6 @@
 import asyncio
 import hashlib
 import logging
-import random
 import re
 import json
 from pathlib import Path
@@ -14,7 +13,6 @@ import aiohttp
 from bs4 import BeautifulSoup
 from pydantic import BaseModel
 
-from legal_chatbot.utils.config import get_settings
 from legal_chatbot.utils.vietnamese import clean_text, normalize_vietnamese
 
 logger = logging.getLogger(__name__)
@@ -216,40 +214,18 @@ class CrawlerService:
 
 
     async def crawl_with_stealth(self, url: str) -> str:
-        """Crawl a single page using Playwright + stealth.
+        """Crawl a single page using Playwright (browser started for this call).
 
         - Firefox browser (less fingerprinted)
-        - playwright-stealth plugin
         - Realistic viewport (1920x1080), locale (vi-VN)
         - Wait for Cloudflare challenge (5-10s)
-        - Rate limiting: 3-5s + random jitter
-        """
-        from playwright.async_api import async_playwright
-
-        settings = get_settings()
-
-        async with async_playwright() as p:
-            browser = await p.firefox.launch(headless=True)
-            context = await browser.new_context(
-                viewport={"width": 1920, "height": 1080},
-                locale="vi-VN",
-                timezone_id="Asia/Ho_Chi_Minh",
-            )
-
-            try:
-                page = await context.new_page()
 
-                # Navigate and wait for content
-                await page.goto(url, wait_until="domcontentloaded", timeout=30000)
-                await page.wait_for_timeout(random.randint(5000, 10000))
-
-                html = await page.content()
-                return html
-
-            finally:
-                await browser.close()
+        For many pages use CrawlEngine, which shares one browser across them.
+        """
+        from legal_chatbot.services.crawl_engine import CrawlEngine
 
-        return ""
+        async with CrawlEngine(contexts=1) as engine:
+            return await engine.fetch(url)
 
     async def crawl_category_listing(
         self, category_url: str, limit: int = 20
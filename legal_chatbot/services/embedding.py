@@ -1,14 +1,24 @@
 """Embedding service for Vietnamese legal text using PhoBERT-based model"""
 
+import hashlib
 import logging
+import os
 import re
+import threading
 from typing import List, Optional
 
+import numpy as np
+
 from legal_chatbot.utils.config import get_settings
+from legal_chatbot.utils.vectors import as_float32
 from legal_chatbot.utils.vietnamese import normalize_for_embedding
 
 logger = logging.getLogger(__name__)
 
+# Loaded models shared by every EmbeddingService: (model_name, backend, onnx_path) -> model
+_models: dict[tuple, object] = {}
+_models_lock = threading.Lock()
+
 
 class EmbeddingService:
     """Generates and manages embeddings for Vietnamese legal text.
@@ -18,89 +28,251 @@ class EmbeddingService:
     Index: Supabase pgvector with HNSW
     """
 
-    def __init__(self, model_name: str = None):
+    def __init__(self, model_name: str = None, backend: str = None, server_url: str = None):
         settings = get_settings()
         self._model_name = model_name or settings.embedding_model
         self._dimension = settings.embedding_dimension
+        self._backend = backend or settings.embedding_backend
+        self._onnx_path = settings.embedding_onnx_path
+        # Client mode: embed via the sidecar instead of loading a model here
+        self._server_url = settings.embedding_server_url if server_url is None else server_url
+        self._max_tokens = settings.embedding_max_tokens
+        self._chunk_overlap = settings.embedding_chunk_overlap
         self._model = None
+        self._tokenizer = None
+
+    @property
+    def client(self):
+        """Sidecar client when EMBEDDING_SERVER_URL is set, else None."""
+        if not self._server_url:
+            return None
+        from legal_chatbot.services.embedding_client import get_embedding_client
+        return get_embedding_client(self._server_url)
+
+    @property
+    def _model_key(self) -> tuple:
+        return (self._model_name, self._backend, self._onnx_path)
 
     def get_model(self):
-        """Lazy-load model (~1.1 GB RAM). Singleton per process."""
+        """Lazy-load model (~1.1 GB RAM with torch). Singleton per process.
+
+        Every EmbeddingService with the same model/backend shares one
+        instance; concurrent first calls wait for a single load.
+        backend='onnx' / 'onnx-int8' runs an ONNX export via onnxruntime,
+        exporting it on first use if settings.embedding_onnx_path is empty.
+        """
         if self._model is None:
+            with _models_lock:
+                model = _models.get(self._model_key)
+                if model is None:
+                    model = self._load_model()
+                    _models[self._model_key] = model
+            self._model = model
+        return self._model
+
+    def _load_model(self):
+        logger.info(f"Loading embedding model: {self._model_name} ({self._backend})")
+        if self._backend in ("onnx", "onnx-int8"):
+            model = self._load_onnx(quantized=self._backend == "onnx-int8")
+        elif self._backend == "torch":
             from sentence_transformers import SentenceTransformer
 
-            logger.info(f"Loading embedding model: {self._model_name}")
-            self._model = SentenceTransformer(self._model_name)
-            logger.info(
-                f"Model loaded. Dimension: {self._model.get_sentence_embedding_dimension()}"
-            )
-        return self._model
+            model = SentenceTransformer(self._model_name)
+        else:
+            raise ValueError(f"Unknown embedding backend: {self._backend}")
+        logger.info(f"Model loaded. Dimension: {model.get_sentence_embedding_dimension()}")
+        return model
+
+    def _load_onnx(self, quantized: bool):
+        from legal_chatbot.services.embedding_onnx import (
+            OnnxEncoder, export_onnx, is_exported,
+        )
+
+        if not is_exported(self._onnx_path, self._model_name, quantized):
+            logger.info(f"No ONNX export in {self._onnx_path}, exporting (one-time)")
+            export_onnx(self._model_name, self._onnx_path, quantize=quantized)
+        # Backfill workers pin OMP_NUM_THREADS; ORT ignores it unless passed explicitly
+        threads = int(os.environ.get("OMP_NUM_THREADS", 0) or 0)
+        return OnnxEncoder(self._onnx_path, quantized=quantized, threads=threads)
+
+    @property
+    def is_loaded(self) -> bool:
+        """True once a model is usable without loading it (local or sidecar)."""
+        if self._model is None:
+            self._model = _models.get(self._model_key)
+        return self._model is not None or bool(self._server_url)
 
-    def embed_single(self, text: str) -> List[float]:
+    def get_tokenizer(self):
+        """The model's tokenizer (without loading the model if possible), or None.
+
+        None (transformers missing / model not downloadable) makes chunking and
+        batching fall back to character-length heuristics.
+        """
+        if self._tokenizer is None:
+            if self._model is not None and getattr(self._model, "tokenizer", None) is not None:
+                self._tokenizer = self._model.tokenizer
+            else:
+                try:
+                    from transformers import AutoTokenizer
+
+                    self._tokenizer = AutoTokenizer.from_pretrained(self._model_name)
+                except Exception as e:
+                    logger.warning(f"Tokenizer unavailable, using char heuristics: {e}")
+                    self._tokenizer = False
+        return self._tokenizer or None
+
+    def token_lengths(
+        self, texts: List[str], add_special_tokens: bool = True
+    ) -> Optional[List[int]]:
+        """Exact (untruncated) token counts per text, or None without a tokenizer."""
+        tokenizer = self.get_tokenizer()
+        if tokenizer is None:
+            return None
+        ids = tokenizer(
+            list(texts), add_special_tokens=add_special_tokens, verbose=False
+        )["input_ids"]
+        return [len(x) for x in ids]
+
+    def embed_single(self, text: str) -> np.ndarray:
         """Generate embedding for a single text.
 
         1. NFC normalize (NOT NFD)
         2. Collapse whitespace
-        3. Encode with normalize_embeddings=True
-        4. Return as list[float] (768 dimensions)
+        3. Return cached vector if seen before (memory, then disk)
+        4. Otherwise encode with normalize_embeddings=True
+        5. Return as a read-only float32 array (768,)
         """
-        text = normalize_for_embedding(text)
-        model = self.get_model()
-        embedding = model.encode(text, normalize_embeddings=True)
-        return embedding.tolist()
+        from legal_chatbot.services.embedding_cache import get_embedding_cache
 
-    def embed_batch(self, texts: List[str], batch_size: int = 64) -> List[List[float]]:
+        text = normalize_for_embedding(text)
+        cache = get_embedding_cache()
+        key = cache.make_key(self._model_name, text, self._backend, self._onnx_path)
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+        if self.client is not None:
+            embedding = self.client.embed([text])[0]
+        else:
+            model = self.get_model()
+            embedding = as_float32(model.encode(text, normalize_embeddings=True))
+        # Shared with the cache — callers must not mutate it
+        embedding.setflags(write=False)
+        cache.put(key, embedding)
+        return embedding
+
+    def embed_batch(self, texts: List[str], batch_size: int = 64) -> np.ndarray:
         """Generate embeddings for multiple texts efficiently.
 
         1. NFC normalize all texts
-        2. Sort by length (minimize padding waste)
-        3. Batch encode
-        4. Restore original order
-        5. Return as list of list[float]
+        2. Bucket by token length (chars without a tokenizer) so each batch
+           pads to a near-uniform sequence length
+        3. Encode one bucket per model call
+        4. Write rows straight into one float32 matrix in original order
+        5. Return the (len(texts), 768) matrix — rows are views, no per-float objects
         """
         if not texts:
-            return []
+            return np.empty((0, self._dimension), dtype=np.float32)
 
         # Normalize all texts
         normalized = [normalize_for_embedding(t) for t in texts]
 
-        # Sort by length with original indices for order restoration
-        indexed = list(enumerate(normalized))
-        indexed.sort(key=lambda x: len(x[1]))
+        # Client mode: the sidecar sorts/batches on its side
+        if self.client is not None:
+            return self.client.embed(normalized)
 
-        sorted_texts = [t for _, t in indexed]
-        original_indices = [i for i, _ in indexed]
+        lengths = self.token_lengths(normalized) or [len(t) for t in normalized]
+        order = sorted(range(len(normalized)), key=lambda i: lengths[i])
 
-        # Batch encode
+        # One encode() call per bucket — encode() re-sorts its input by
+        # character length, which would undo token-length bucketing
         model = self.get_model()
-        embeddings = model.encode(
-            sorted_texts,
-            batch_size=batch_size,
-            normalize_embeddings=True,
-            show_progress_bar=len(sorted_texts) > 100,
-        )
-
-        # Restore original order
-        result = [None] * len(texts)
-        for sorted_idx, orig_idx in enumerate(original_indices):
-            result[orig_idx] = embeddings[sorted_idx].tolist()
+        result = None
+        for start in range(0, len(order), batch_size):
+            bucket = order[start:start + batch_size]
+            embeddings = model.encode(
+                [normalized[i] for i in bucket],
+                batch_size=len(bucket),
+                normalize_embeddings=True,
+                show_progress_bar=False,
+            )
+            embeddings = as_float32(embeddings)
+            if result is None:
+                result = np.empty((len(texts), embeddings.shape[1]), dtype=np.float32)
+            result[bucket] = embeddings
+            if len(order) > 100:
+                logger.info(f"Embedded {min(start + batch_size, len(order))}/{len(order)}")
 
         return result
 
+    @staticmethod
+    def content_hash(text: str) -> str:
+        """SHA-256 of the embedding-normalized text (articles.content_hash)."""
+        return hashlib.sha256(normalize_for_embedding(text).encode("utf-8")).hexdigest()
+
+    def attach_embeddings(
+        self,
+        db,
+        articles: List[dict],
+        batch_size: int = 64,
+        force: bool = False,
+    ) -> int:
+        """Set content_hash + embedding on each article, reusing stored vectors.
+
+        1. Hash every article's normalized content
+        2. Bulk-lookup hashes already in the database
+        3. embed_batch() only new/changed (unique) texts
+        4. Returns number of texts actually embedded
+
+        force=True skips the lookup (e.g. after changing embedding model).
+        """
+        if not articles:
+            return 0
+
+        for article in articles:
+            article["content_hash"] = self.content_hash(article.get("content", ""))
+
+        existing = {}
+        if not force:
+            try:
+                existing = db.get_embeddings_by_hash([a["content_hash"] for a in articles])
+            except Exception as e:
+                logger.warning(f"Embedding hash lookup failed, embedding all: {e}")
+
+        # Unique texts that still need the model
+        pending = {}
+        for article in articles:
+            if article["content_hash"] not in existing:
+                pending.setdefault(article["content_hash"], article.get("content", ""))
+
+        if pending:
+            logger.info(
+                f"Generating embeddings for {len(pending)} texts "
+                f"({len(articles) - len(pending)} unchanged reused)..."
+            )
+            vectors = self.embed_batch(list(pending.values()), batch_size=batch_size)
+            existing.update(zip(pending.keys(), vectors))
+        else:
+            logger.info(f"All {len(articles)} articles unchanged, no embeddings generated")
+
+        for article in articles:
+            article["embedding"] = existing[article["content_hash"]]
+        return len(pending)
+
     def embed_and_store(
         self,
         db,
         articles: List[dict],
         batch_size: int = 64,
         upsert_chunk_size: int = 50,
+        force: bool = False,
     ) -> int:
         """Full pipeline: embed texts + upsert to database.
 
         1. Split long articles if needed
-        2. Extract content from articles
-        3. embed_batch() all contents
-        4. Upsert to articles table in chunks
-        5. Returns total articles stored
+        2. attach_embeddings() — unchanged chunks reuse stored vectors
+        3. Upsert to articles table in chunks
+        4. Returns total articles stored
         """
         if not articles:
             return 0
@@ -111,16 +283,7 @@ class EmbeddingService:
             chunks = self.split_long_article(article)
             all_articles.extend(chunks)
 
-        # Extract content for embedding
-        texts = [a["content"] for a in all_articles]
-
-        # Generate embeddings
-        logger.info(f"Generating embeddings for {len(texts)} articles...")
-        embeddings = self.embed_batch(texts, batch_size=batch_size)
-
-        # Attach embeddings to articles
-        for article, embedding in zip(all_articles, embeddings):
-            article["embedding"] = embedding
+        self.attach_embeddings(db, all_articles, batch_size=batch_size, force=force)
 
         # Upsert in chunks
         total = db.upsert_articles(all_articles)
@@ -128,14 +291,95 @@ class EmbeddingService:
         return total
 
     def split_long_article(
-        self, article: dict, max_chars: int = 380
+        self,
+        article: dict,
+        max_tokens: int = None,
+        overlap_tokens: int = None,
     ) -> List[dict]:
-        """Split articles exceeding model token limit.
+        """Split articles exceeding the model's token limit.
 
-        max_chars=380 ≈ 256 PhoBERT tokens.
-        Splits by Khoản (clause), prepends Điều header to each chunk.
-        Sets chunk_index > 0 for splits.
+        Token counts come from the model tokenizer (PhoBERT: 256 incl.
+        <s></s>), so no chunk is silently truncated. Splits by Khoản
+        (clause), falls back to word windows for oversized clauses,
+        prepends the Điều header to each later chunk and repeats the last
+        ~overlap_tokens of the previous chunk. Sets chunk_index > 0 for splits.
         """
+        max_tokens = max_tokens or self._max_tokens
+        overlap_tokens = self._chunk_overlap if overlap_tokens is None else overlap_tokens
+
+        content = article.get("content", "")
+        full_length = self.token_lengths([content])
+        if full_length is None:
+            return self._split_by_chars(article)
+        if full_length[0] <= max_tokens:
+            return [article]
+
+        # Extract Điều header
+        header_match = re.match(
+            r"(Điều\s+\d+\.?\s*[^\n]*)", content, re.IGNORECASE
+        )
+        header = header_match.group(1) if header_match else ""
+
+        # Split by Khoản (clause): numbered items like "1. ...", "2. ..."
+        clauses = [c.strip() for c in re.split(r"(?=\n\s*\d+\.\s+)", content) if c.strip()]
+
+        # Words as (text, token count, separator before it) — PhoBERT BPE
+        # never merges across spaces, so word counts add up exactly.
+        words = [w for clause in clauses for w in clause.split()]
+        counts = iter(self.token_lengths(words, add_special_tokens=False))
+        units = [
+            [(w, next(counts), "\n" if i == 0 else " ") for i, w in enumerate(clause.split())]
+            for clause in clauses
+        ]
+
+        special = full_length[0] - sum(self.token_lengths([content], add_special_tokens=False))
+        header_cost = self.token_lengths([header], add_special_tokens=False)[0] if header else 0
+        budget = max(max_tokens - special - header_cost, 1)
+
+        chunks: List[List[tuple]] = []
+        current: List[tuple] = []
+        seeded = 0  # leading units of `current` copied from the previous chunk
+
+        def _flush(room: int):
+            nonlocal current, seeded
+            if len(current) > seeded:
+                chunks.append(current)
+            # Overlap: trailing words of the chunk, within `room` tokens
+            tail, used = [], 0
+            for unit in reversed(current):
+                if used + unit[1] > min(overlap_tokens, room):
+                    break
+                tail.insert(0, unit)
+                used += unit[1]
+            current, seeded = tail, len(tail)
+
+        def _size():
+            return sum(n for _, n, _ in current)
+
+        for clause in units:
+            cost = sum(n for _, n, _ in clause)
+            if cost <= budget:
+                if current and _size() + cost > budget:
+                    _flush(room=budget - cost)
+                current.extend(clause)
+                continue
+            # Clause alone exceeds the budget: word windows
+            for unit in clause:
+                if len(current) > seeded and _size() + unit[1] > budget:
+                    _flush(room=budget - unit[1])
+                current.append(unit)
+        if len(current) > seeded:
+            chunks.append(current)
+
+        result = []
+        for index, units_ in enumerate(chunks):
+            body = units_[0][0] + "".join(sep + w for w, _, sep in units_[1:])
+            text = header + "\n" + body if header and index > 0 else body
+            result.append(self._make_chunk(article, text, index, header))
+        return result if result else [article]
+
+    def _split_by_chars(self, article: dict, max_chars: int = 380) -> List[dict]:
+        """Character heuristic (max_chars=380 ≈ 256 PhoBERT tokens), no tokenizer."""
         content = article.get("content", "")
         if len(content) <= max_chars:
             return [article]
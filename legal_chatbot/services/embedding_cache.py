@@ -0,0 +1,85 @@
+"""Two-tier cache for query embeddings (EmbeddingService.embed_single).
+
+Tier 1: in-process LRU, keyed by (model, backend, NFC-normalized text)
+Tier 2: optional SQLite file (settings.embedding_cache_path) that survives
+        restarts — float32 blobs keyed by sha256(model + backend + text)
+
+The backend (torch / onnx / onnx-int8, plus the ONNX export path) is part of
+the key: int8 vectors differ slightly from torch ones and must not be mixed.
+
+Repeated chat questions and pipeline template queries skip the model.
+"""
+
+import hashlib
+import sqlite3
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from legal_chatbot.utils.config import get_settings
+from legal_chatbot.utils.tiered_cache import TieredCache
+from legal_chatbot.utils.vectors import as_float32
+
+
+class EmbeddingCache(TieredCache):
+    """Thread-safe LRU + optional on-disk store for embedding vectors."""
+
+    label = "Embedding"
+    table = "embeddings"
+    log_every = 500
+
+    def __init__(self, max_entries: int = None, path: Optional[str] = None):
+        settings = get_settings()
+        super().__init__(settings.embedding_cache_size if max_entries is None else max_entries, path)
+
+    def _create_table(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " key TEXT PRIMARY KEY,"
+            " vector BLOB NOT NULL,"
+            " created_at TEXT DEFAULT CURRENT_TIMESTAMP)"
+        )
+
+    @staticmethod
+    def make_key(model_name: str, text: str, backend: str = "torch", onnx_path: str = "") -> str:
+        """Cache key for already-normalized text encoded by model_name on backend."""
+        if backend == "torch":
+            onnx_path = ""  # the export path only matters to the ONNX backends
+        raw = f"{model_name}\0{backend}\0{onnx_path}\0{text}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        """Return the cached (read-only float32) vector or None (counts a hit or miss)."""
+        return super().get(key)
+
+    def put(self, key: str, vector, expires_at: Optional[float] = None) -> None:
+        """Store a vector in both tiers."""
+        vector = as_float32(vector)
+        if vector.flags.writeable:
+            vector = vector.copy()
+            vector.setflags(write=False)
+        super().put(key, vector, expires_at)
+
+    def _read(self, key: str, now: float) -> Optional[tuple[np.ndarray, None]]:
+        row = self._conn.execute("SELECT vector FROM embeddings WHERE key = ?", (key,)).fetchone()
+        return (np.frombuffer(row[0], dtype=np.float32), None) if row else None
+
+    def _write(self, key: str, vector: np.ndarray, expires_at: Optional[float]) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+            (key, vector.tobytes()),
+        )
+
+
+_cache: Optional[EmbeddingCache] = None
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Get or create the process-wide embedding cache."""
+    global _cache
+    settings = get_settings()
+    path = settings.embedding_cache_path or None
+    if _cache is None or _cache.path != (Path(path) if path else None):
+        _cache = EmbeddingCache(path=path)
+    return _cache
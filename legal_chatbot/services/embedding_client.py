@@ -0,0 +1,72 @@
+"""HTTP client for the embedding sidecar (legal_chatbot.api.embedding_server).
+
+EMBEDDING_SERVER_URL accepts either form:
+    http://127.0.0.1:8765
+    unix:///tmp/embedding.sock
+
+Vectors come back as raw float32 bytes (Accept: application/octet-stream),
+not JSON float lists.
+"""
+
+import logging
+import threading
+from typing import List, Optional
+
+import numpy as np
+
+from legal_chatbot.utils.vectors import from_bytes
+
+logger = logging.getLogger(__name__)
+
+BINARY_MEDIA_TYPE = "application/octet-stream"
+
+_clients: dict[str, "EmbeddingClient"] = {}
+_clients_lock = threading.Lock()
+
+
+class EmbeddingClient:
+    """Thread-safe, connection-pooled client for POST /embed."""
+
+    def __init__(self, url: str, timeout: float = 30.0):
+        import httpx
+
+        if url.startswith("unix://"):
+            transport = httpx.HTTPTransport(uds=url[len("unix://"):])
+            base_url = "http://embedding-server"
+        else:
+            transport = None
+            base_url = url.rstrip("/")
+        self.url = url
+        self._http = httpx.Client(base_url=base_url, transport=transport, timeout=timeout)
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Embed already-normalized texts → (len(texts), dim) L2-normalized float32."""
+        if not texts:
+            return np.empty((0, 0), dtype=np.float32)
+        response = self._http.post(
+            "/embed",
+            json={"texts": texts},
+            headers={"Accept": BINARY_MEDIA_TYPE},
+        )
+        response.raise_for_status()
+        if response.headers.get("content-type", "").startswith(BINARY_MEDIA_TYPE):
+            return from_bytes(response.content, int(response.headers["x-embedding-dim"]))
+        # Older sidecar without binary support
+        return np.asarray(response.json()["embeddings"], dtype=np.float32)
+
+    def health(self) -> Optional[dict]:
+        try:
+            response = self._http.get("/health")
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            logger.warning(f"Embedding server unreachable at {self.url}: {e}")
+            return None
+
+
+def get_embedding_client(url: str) -> EmbeddingClient:
+    """One pooled client per server URL per process."""
+    with _clients_lock:
+        if url not in _clients:
+            _clients[url] = EmbeddingClient(url)
+        return _clients[url]
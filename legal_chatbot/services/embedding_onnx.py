@@ -0,0 +1,168 @@
+"""ONNX Runtime backend for the sentence-transformers bi-encoder.
+
+export_onnx() converts the PyTorch model once (needs torch +
+sentence-transformers); OnnxEncoder then runs it with onnxruntime and the
+HF tokenizer only — no torch at inference time, int8 weights optional.
+
+Layout (under settings.embedding_onnx_path):
+    model.onnx         fp32 graph (input_ids, attention_mask → last_hidden_state)
+    model.int8.onnx    dynamic int8 quantized weights
+    export.json        model name, max_seq_length, pooling mode, dimension
+    tokenizer files    saved by tokenizer.save_pretrained()
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import List, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FP32_FILE = "model.onnx"
+INT8_FILE = "model.int8.onnx"
+META_FILE = "export.json"
+
+
+def export_onnx(model_name: str, output_dir: str | Path, quantize: bool = True) -> Path:
+    """Export a SentenceTransformer to ONNX (+ int8 copy). Returns output_dir."""
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    st = SentenceTransformer(model_name, device="cpu")
+    transformer = st[0]
+    tokenizer = transformer.tokenizer
+    pooling = st[1].get_pooling_mode_str() if len(st) > 1 else "mean"
+    if pooling not in ("mean", "cls"):
+        raise ValueError(f"Unsupported pooling mode for ONNX export: {pooling}")
+
+    class _LastHiddenState(torch.nn.Module):
+        def __init__(self, model):
+            super().__init__()
+            self.model = model
+
+        def forward(self, input_ids, attention_mask):
+            return self.model(input_ids=input_ids, attention_mask=attention_mask)[0]
+
+    dummy = tokenizer(
+        ["Điều 1. Phạm vi điều chỉnh"], return_tensors="pt",
+        padding=True, truncation=True, max_length=st.max_seq_length,
+    )
+    fp32_path = output_dir / FP32_FILE
+    logger.info(f"Exporting {model_name} to {fp32_path}")
+    with torch.no_grad():
+        torch.onnx.export(
+            _LastHiddenState(transformer.auto_model.eval()),
+            (dummy["input_ids"], dummy["attention_mask"]),
+            str(fp32_path),
+            input_names=["input_ids", "attention_mask"],
+            output_names=["last_hidden_state"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "last_hidden_state": {0: "batch", 1: "sequence"},
+            },
+            opset_version=17,
+        )
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        logger.info("Applying dynamic int8 quantization")
+        quantize_dynamic(
+            str(fp32_path), str(output_dir / INT8_FILE), weight_type=QuantType.QInt8
+        )
+
+    tokenizer.save_pretrained(str(output_dir))
+    (output_dir / META_FILE).write_text(json.dumps({
+        "model_name": model_name,
+        "max_seq_length": st.max_seq_length,
+        "pooling": pooling,
+        "dimension": st.get_sentence_embedding_dimension(),
+    }, indent=2), encoding="utf-8")
+    return output_dir
+
+
+def is_exported(model_dir: str | Path, model_name: str, quantized: bool) -> bool:
+    """True if model_dir holds an export of model_name in the wanted precision."""
+    model_dir = Path(model_dir)
+    meta_file = model_dir / META_FILE
+    if not meta_file.exists():
+        return False
+    meta = json.loads(meta_file.read_text(encoding="utf-8"))
+    graph = model_dir / (INT8_FILE if quantized else FP32_FILE)
+    return meta.get("model_name") == model_name and graph.exists()
+
+
+def pool(
+    hidden: np.ndarray, attention_mask: np.ndarray, mode: str = "mean"
+) -> np.ndarray:
+    """Sentence vectors from token states — same as sentence-transformers Pooling."""
+    if mode == "cls":
+        return hidden[:, 0]
+    mask = attention_mask[..., None].astype(hidden.dtype)
+    summed = (hidden * mask).sum(axis=1)
+    counts = np.clip(mask.sum(axis=1), 1e-9, None)
+    return summed / counts
+
+
+class OnnxEncoder:
+    """Drop-in for the SentenceTransformer.encode() calls EmbeddingService makes."""
+
+    def __init__(self, model_dir: str | Path, quantized: bool = True, threads: int = 0):
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        model_dir = Path(model_dir)
+        meta = json.loads((model_dir / META_FILE).read_text(encoding="utf-8"))
+        self.max_seq_length = meta["max_seq_length"]
+        self._pooling = meta["pooling"]
+        self._dimension = meta["dimension"]
+        self.tokenizer = AutoTokenizer.from_pretrained(str(model_dir))
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        graph = model_dir / (INT8_FILE if quantized else FP32_FILE)
+        self._session = ort.InferenceSession(
+            str(graph), options, providers=["CPUExecutionProvider"]
+        )
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self._dimension
+
+    def encode(
+        self,
+        sentences: Union[str, List[str]],
+        batch_size: int = 32,
+        normalize_embeddings: bool = False,
+        show_progress_bar: bool = False,
+        **kwargs,
+    ) -> np.ndarray:
+        """Encode like SentenceTransformer.encode (numpy, float32)."""
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        out = np.zeros((len(texts), self._dimension), dtype=np.float32)
+
+        for start in range(0, len(texts), batch_size):
+            batch = texts[start:start + batch_size]
+            tokens = self.tokenizer(
+                batch, padding=True, truncation=True,
+                max_length=self.max_seq_length, return_tensors="np",
+            )
+            attention_mask = tokens["attention_mask"].astype(np.int64)
+            hidden = self._session.run(None, {
+                "input_ids": tokens["input_ids"].astype(np.int64),
+                "attention_mask": attention_mask,
+            })[0]
+            out[start:start + len(batch)] = pool(hidden, attention_mask, self._pooling)
+
+        if normalize_embeddings:
+            norms = np.linalg.norm(out, axis=1, keepdims=True)
+            out /= np.where(norms == 0, 1.0, norms)
+        return out[0] if single else out
@@ -15,12 +15,16 @@ from uuid import uuid4
 from pydantic import BaseModel
 
 from legal_chatbot.utils.config import get_settings
+from legal_chatbot.utils.executor import run_blocking
 from legal_chatbot.utils.llm import (
-    call_llm, call_llm_json, call_llm_stream_async,
-    call_llm_sonnet, call_llm_stream_sonnet_async,
+    acall_llm, acall_llm_json, acall_llm_json_stream, acall_llm_sonnet, cache_block,
+    call_llm_stream_async, call_llm_sonnet, call_llm_stream_sonnet_async,
 )
 from legal_chatbot.utils.vietnamese import remove_diacritics
+from legal_chatbot.services.chat import CATEGORY_KEYWORDS
+from legal_chatbot.services.query_router import QueryAnalysis, aanalyze_query
 from legal_chatbot.services.research import ResearchService, ResearchResult
+from legal_chatbot.services.retriever import build_search_terms
 from legal_chatbot.services.dynamic_template import DynamicTemplate, DynamicField
 from legal_chatbot.services.generator import GeneratorService
 from legal_chatbot.services.pdf_generator import UniversalPDFGenerator
@@ -203,7 +207,9 @@ Lưu ý: Đây chỉ là tham khảo, không thay thế tư vấn pháp lý chuy
     def __init__(self, api_mode: bool = False):
         self._research_service = None  # lazy-loaded (needs embedding model)
         self._db = None  # lazy-loaded
+        self._adb = None  # async facade over _db
         self._available_types_cache = None  # cached from DB
+        self._turn_analysis = None  # (user_input, router task) for the current turn
         self._categories_cache = None  # cached category stats
         self.pdf_generator = GeneratorService()
         self.session: Optional[ChatSession] = None
@@ -217,13 +223,26 @@ Lưu ý: Đây chỉ là tham khảo, không thay thế tư vấn pháp lý chuy
             self._db = get_database()
         return self._db
 
+    @property
+    def adb(self):
+        """Awaitable facade over db (bounded pool, coalesced reads)."""
+        if self._adb is None:
+            from legal_chatbot.db.async_db import AsyncDatabase
+            self._adb = AsyncDatabase(self.db)
+        return self._adb
+
     @property
     def research_service(self):
         """Lazy-load ResearchService (avoids loading embedding model on startup)"""
         if self._research_service is None:
-            self._research_service = ResearchService()
+            self._research_service = ResearchService(api_mode=self.api_mode)
         return self._research_service
 
+    @property
+    def retriever(self):
+        """Hybrid retriever shared with ResearchService (one embedding model)."""
+        return self.research_service.retriever
+
     def _get_available_categories(self) -> list[dict]:
         """Get categories that have actual data in DB (cached)."""
         if self._categories_cache is not None:
@@ -245,6 +264,34 @@ Lưu ý: Đây chỉ là tham khảo, không thay thế tư vấn pháp lý chuy
 
         return self._categories_cache
 
+    async def _aget_available_categories(self) -> list[dict]:
+        """Async _get_available_categories (reads through the async DB facade)."""
+        if self._categories_cache is not None:
+            return self._categories_cache
+
+        try:
+            all_cats = await self.adb.get_all_categories_with_stats()
+            self._categories_cache = [
+                {
+                    "name": c["name"],
+                    "display_name": c.get("display_name", c["name"]),
+                    "article_count": c.get("article_count", 0),
+                }
+                for c in all_cats
+                if c.get("article_count", 0) > 0
+            ]
+        except Exception:
+            self._categories_cache = []
+
+        return self._categories_cache
+
+    async def _aload_prompt_data(self) -> None:
+        """Fill the category and contract-type caches _build_system_prompt reads."""
+        await asyncio.gather(
+            self._aget_available_categories(),
+            self._aget_available_contract_types(),
+        )
+
     def _build_system_prompt(self) -> str:
         """Build system prompt with actual available data from DB."""
         categories = self._get_available_categories()
@@ -282,13 +329,29 @@ Lưu ý: Đây chỉ là tham khảo, không thay thế tư vấn pháp lý chuy
                 for t in templates
             ]
         except Exception as e:
-            import logging
-            logging.getLogger(__name__).warning(f"Failed to load templates from DB: {e}")
+            logger.warning(f"Failed to load templates from DB: {e}")
+            self._available_types_cache = []
+
+        return self._available_types_cache
+
+    async def _aget_available_contract_types(self) -> list[dict]:
+        """Async _get_available_contract_types (reads through the async DB facade)."""
+        if self._available_types_cache is not None:
+            return self._available_types_cache
+
+        try:
+            templates = await self.adb.list_all_active_templates()
+            self._available_types_cache = [
+                {"type": t["contract_type"], "name": t["display_name"]}
+                for t in templates
+            ]
+        except Exception as e:
+            logger.warning(f"Failed to load templates from DB: {e}")
             self._available_types_cache = []
 
         return self._available_types_cache
 
-    async def _resolve_contract_type(self, input_text: str) -> Optional[str]:
+    async def _resolve_contract_type(self, input_text: str, use_llm: bool = True) -> Optional[str]:
         """Resolve user input to a Vietnamese DB contract_type slug.
 
         Fully DB-driven — no hardcoded mappings. When new templates are added
@@ -307,7 +370,7 @@ Lưu ý: Đây chỉ là tham khảo, không thay thế tư vấn pháp lý chuy
         filler = {"toi", "muon", "tao", "lap", "soan", "viet", "can", "giup",
                   "hop", "dong", "mau", "mot", "cai", "cho", "de", "xin"}
         input_keywords = input_words - filler
-        available = self._get_available_contract_types()
+        available = await self._aget_available_contract_types()
 
         # 1. Word-overlap scoring — rank all templates by relevance
         # Score uses harmonic mean of precision (template coverage) and recall
@@ -354,7 +417,7 @@ Lưu ý: Đây chỉ là tham khảo, không thay thế tư vấn pháp lý chuy
                 return t["type"]
 
         # 3. LLM fallback — handles ambiguous or low-confidence input
-        if available:
+        if available and use_llm:
             best_val = scored[0][0] if scored else 0
             logger.info(
                 f"Contract type scoring inconclusive (best={best_val:.2f}), "
@@ -408,22 +471,36 @@ Lưu ý: Đây chỉ là tham khảo, không thay thế tư vấn pháp lý chuy
             generated_from="Supabase contract_templates",
         )
 
-    def _call_llm(self, messages: list, temperature: float = 0.7, max_tokens: int = 1000) -> str:
-        """Call LLM via shared Anthropic client."""
+    @staticmethod
+    def _llm_error_reply(e: Exception) -> str:
+        """User-facing reply for a failed LLM call (the error is logged)."""
+        logger.error(f"LLM call error: {e}", exc_info=True)
+        err_str = str(e).lower()
+        if "prompt is too long" in err_str or "too many tokens" in err_str:
+            return "Xin lỗi, nội dung quá dài để xử lý. Bạn thử hỏi ngắn gọn hơn nhé!"
+        if "rate_limit" in err_str or "429" in err_str:
+            return "Hệ thống đang bận, bạn vui lòng đợi vài giây rồi thử lại nhé!"
+        return "Xin lỗi, mình gặp trục trặc khi xử lý. Bạn thử lại nhé!"
+
+    async def _acall_llm(
+        self,
+        messages: list,
+        temperature: float = 0.7,
+        max_tokens: int = 1000,
+        cache: bool = False,
+        task: str = None,
+    ) -> str:
+        """Call LLM via shared Anthropic client (task picks the routed model)."""
         try:
-            return call_llm(
+            return await acall_llm(
                 messages=messages,
                 temperature=temperature,
                 max_tokens=max_tokens,
+                cache=cache,
+                task=task,
             )
         except Exception as e:
-            logger.error(f"LLM call error: {e}", exc_info=True)
-            err_str = str(e).lower()
-            if "prompt is too long" in err_str or "too many tokens" in err_str:
-                return "Xin lỗi, nội dung quá dài để xử lý. Bạn thử hỏi ngắn gọn hơn nhé!"
-            if "rate_limit" in err_str or "429" in err_str:
-                return "Hệ thống đang bận, bạn vui lòng đợi vài giây rồi thử lại nhé!"
-            return "Xin lỗi, mình gặp trục trặc khi xử lý. Bạn thử lại nhé!"
+            return self._llm_error_reply(e)
 
     def _random_response(self, key: str, **kwargs) -> str:
         """Get a random human-like response"""
@@ -495,6 +572,7 @@ Lưu ý: Đây chỉ là tham khảo, không thay thế tư vấn pháp lý chuy
     async def chat(self, user_input: str) -> InteractiveChatResponse:
         """Process user input and return response"""
         session = self.get_session()
+        self._turn_analysis = None
 
         # Add user message to history
         session.messages.append({
@@ -520,9 +598,9 @@ Lưu ý: Đây chỉ là tham khảo, không thay thế tư vấn pháp lý chuy
                     )
                 # Check for preview/export commands even during collection
                 elif any(kw in input_normalized for kw in ['xem truoc', 'preview', 'xem hop dong']):
-                    response = self._preview_contract(open_browser=not self.api_mode)
+                    response = await run_blocking(self._preview_contract, open_browser=not self.api_mode)
                 elif any(kw in input_normalized for kw in ['xuat pdf', 'export pdf', 'luu pdf']):
-                    response = self._export_pdf()
+                    response = await run_blocking(self._export_pdf)
                 else:
                     # Process the answer and ask next question
                     response = await self._process_field_answer(user_input)
@@ -602,12 +680,12 @@ Lưu ý: Đây chỉ là tham khảo, không thay thế tư vấn pháp lý chuy
                 # All required fields collected — auto-generate PDF
                 draft.state = 'ready'
                 session.mode = 'normal'
-                return self._finalize_contract(draft)
+                return await run_blocking(self._finalize_contract, draft)
         else:
             # Shouldn't reach here, but just in case
             draft.state = 'ready'
             session.mode = 'normal'
-            return self._finalize_contract(draft)
+            return await run_blocking(self._finalize_contract, draft)
 
     def _finalize_contract(self, draft: ContractDraft) -> InteractiveChatResponse:
         """Auto-generate PDF when all fields collected and return Supabase download URL.
@@ -711,7 +789,7 @@ Lưu ý: Đây chỉ là tham khảo, không thay thế tư vấn pháp lý chuy
 
         elif command.command == 'ask_contract_type':
             # User wants to create contract but didn't specify type — build list from DB
-            available = self._get_available_contract_types()
+            available = await self._aget_available_contract_types()
             if available:
                 shown = available[:6]
                 type_list = "\n".join(f"• {t['name']}" for t in shown)
@@ -725,13 +803,13 @@ Lưu ý: Đây chỉ là tham khảo, không thay thế tư vấn pháp lý chuy
             )
 
         elif command.command == 'preview':
-            return self._preview_contract(open_browser=not self.api_mode)
+            return await run_blocking(self._preview_contract, open_browser=not self.api_mode)
 
         elif command.command == 'export_pdf':
-            return self._export_pdf(command.args.get('filename'))
+            return await run_blocking(self._export_pdf, command.args.get('filename'))
 
         elif command.command == 'edit_field':
-            return self._edit_field(command.args['field'], command.args['value'])
+            return await run_blocking(self._edit_field, command.args['field'], command.args['value'])
 
         elif command.command == 'show_contract':
             return self._show_contract()
@@ -795,19 +873,29 @@ Lưu ý: Đây chỉ là tham khảo, không thay thế tư vấn pháp lý chuy
             if contract_type:
                 return await self._create_contract(contract_type)
 
-        # Use LLM to detect intent + contract type in one call (no keyword hacks)
-        if not session.current_draft:
-            intent = self._detect_intent_with_llm(user_input)
-            if intent and intent.get("intent") == "create_contract":
-                contract_type = intent.get("contract_type")
-                # If LLM didn't return a slug, try word-overlap + LLM resolution
+        # One router call (intent + contract type + search terms) feeds both the
+        # intent branch and context building; retrieval and the empty-DB check
+        # run concurrently with it. The context is speculative: dropped if the
+        # user wants a contract.
+        context_task = asyncio.create_task(self._build_context_for_query(user_input, session))
+        # Retrieve the exception of a discarded task so asyncio doesn't log it
+        context_task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        try:
+            analysis, no_data_msg = await asyncio.gather(
+                self._analyze_query(user_input),
+                run_blocking(self._check_data_for_query),
+            )
+
+            if analysis and analysis.wants_contract and not session.current_draft:
+                contract_type = analysis.contract_type
+                # Router found no exact slug — word-overlap only, the LLM already judged
                 if not contract_type:
-                    contract_type = await self._resolve_contract_type(user_input)
+                    contract_type = await self._resolve_contract_type(user_input, use_llm=False)
                 if contract_type:
                     return await self._create_contract(contract_type)
                 else:
                     # User wants to create but didn't specify a recognizable type
-                    available = self._get_available_contract_types()
+                    available = await self._aget_available_contract_types()
                     if available:
                         type_list = "\n".join(f"• {t['name']}" for t in available[:8])
                         return InteractiveChatResponse(
@@ -819,48 +907,24 @@ Lưu ý: Đây chỉ là tham khảo, không thay thế tư vấn pháp lý chuy
                         action_taken="no_data"
                     )
 
-        # Check if DB has data for the topic before calling LLM
-        no_data_msg = self._check_data_for_query()
-        if no_data_msg:
-            return InteractiveChatResponse(
-                message=no_data_msg,
-                action_taken="no_data"
-            )
-
-        # Build context for LLM response
-        context = await self._build_context_for_query(user_input, session)
-
-        # Generate response with LLM - using human-like prompt
-        messages = [
-            {"role": "system", "content": self._build_system_prompt()}
-        ]
-
-        # Add conversation history (last 6 messages, truncated to avoid token overflow)
-        MAX_MSG_CHARS = 3000
-        for msg in session.messages[-6:]:
-            if msg['role'] in ['user', 'assistant']:
-                content = msg['content']
-                if len(content) > MAX_MSG_CHARS:
-                    content = content[:MAX_MSG_CHARS] + "…(lược bớt)"
-                messages.append({"role": msg['role'], "content": content})
-
-        # Add context — structured format so LLM knows to cite specific articles
-        if context:
-            user_content = f"""CÁC ĐIỀU LUẬT LIÊN QUAN (từ cơ sở dữ liệu pháp luật):
+            # Check if DB has data for the topic before calling LLM
+            if no_data_msg:
+                return InteractiveChatResponse(
+                    message=no_data_msg,
+                    action_taken="no_data"
+                )
 
-{context}
+            # Context for the LLM response (usually already done by now)
+            context = await context_task
+        finally:
+            # Early returns above discard the speculative context
+            if not context_task.done():
+                context_task.cancel()
 
----
+        await self._aload_prompt_data()
+        messages = self._compose_answer_messages(user_input, context, session)
 
-CÂU HỎI CỦA NGƯỜI DÙNG:
-{user_input}
-
-Hãy trả lời CHI TIẾT dựa trên các điều luật ở trên. Trích dẫn cụ thể số Điều và tên văn bản."""
-        else:
-            user_content = user_input
-        messages.append({"role": "user", "content": user_content})
-
-        answer = call_llm_sonnet(messages, temperature=0.3, max_tokens=8192)
+        answer = await acall_llm_sonnet(messages, temperature=0.3, max_tokens=8192)
 
         result = InteractiveChatResponse(message=answer)
 
@@ -878,11 +942,29 @@ Hãy trả lời CHI TIẾT dựa trên các điều luật ở trên. Trích d
         (contract creation, greeting, etc.)
         """
         session = self.get_session()
+        self._turn_analysis = None  # new turn (the streaming route bypasses chat())
         context = await self._build_context_for_query(user_input, session)
+        await self._aload_prompt_data()
+        return self._compose_answer_messages(user_input, context, session)
 
-        messages = [{"role": "system", "content": self._build_system_prompt()}]
+    def _compose_answer_messages(
+        self, user_input: str, context: str, session: ChatSession
+    ) -> list[dict]:
+        """System prompt + retrieved law + history + question, prompt-cache friendly.
 
-        # Truncate history messages to avoid token overflow
+        The static system prompt and the retrieved articles are separate
+        cached system blocks ahead of the history, so every turn reuses the
+        system prefix and a follow-up that retrieves the same articles reuses
+        the whole (up to 120K chars) context instead of re-reading it.
+        """
+        system = [cache_block(self._build_system_prompt())]
+        if context:
+            system.append(cache_block(
+                f"CÁC ĐIỀU LUẬT LIÊN QUAN (từ cơ sở dữ liệu pháp luật):\n\n{context}"
+            ))
+        messages = [{"role": "system", "content": system}]
+
+        # Add conversation history (last 6 messages, truncated to avoid token overflow)
         MAX_MSG_CHARS = 3000
         for msg in session.messages[-6:]:
             if msg['role'] in ['user', 'assistant']:
@@ -891,17 +973,12 @@ Hãy trả lời CHI TIẾT dựa trên các điều luật ở trên. Trích d
                     content = content[:MAX_MSG_CHARS] + "…(lược bớt)"
                 messages.append({"role": msg['role'], "content": content})
 
+        # Structured format so the LLM knows to cite specific articles
         if context:
-            user_content = f"""CÁC ĐIỀU LUẬT LIÊN QUAN (từ cơ sở dữ liệu pháp luật):
-
-{context}
-
----
-
-CÂU HỎI CỦA NGƯỜI DÙNG:
+            user_content = f"""CÂU HỎI CỦA NGƯỜI DÙNG:
 {user_input}
 
-Hãy trả lời CHI TIẾT dựa trên các điều luật ở trên. Trích dẫn cụ thể số Điều và tên văn bản."""
+Hãy trả lời CHI TIẾT dựa trên các điều luật được cung cấp. Trích dẫn cụ thể số Điều và tên văn bản."""
         else:
             user_content = user_input
         messages.append({"role": "user", "content": user_content})
@@ -912,52 +989,34 @@ Hãy trả lời CHI TIẾT dựa trên các điều luật ở trên. Trích d
         async for chunk in call_llm_stream_sonnet_async(messages, temperature=0.3, max_tokens=8192):
             yield chunk
 
-    def _detect_intent_with_llm(self, user_input: str) -> Optional[dict]:
-        """Use LLM to detect user intent: create_contract, ask_question, or other.
+    async def _analyze_query(self, user_input: str) -> Optional[QueryAnalysis]:
+        """Router analysis (intent, contract type, category, search terms) for this turn.
 
-        Returns:
-            {"intent": "create_contract", "contract_type": "slug_or_none"} or
-            {"intent": "other"} or None on failure.
+        One LLM call per turn: concurrent consumers await the same task, later
+        ones read its result. None when the router call fails; a failed
+        result is not kept, so a repeat of the message asks the router again.
         """
-        available = self._get_available_contract_types()
-        type_lines = "\n".join(
-            f"- {t['type']}: {t['name']}"
-            for t in available
-        ) if available else "(không có mẫu nào)"
-        valid_slugs = [t['type'] for t in available] if available else []
-
-        system_prompt = f"""Bạn phân loại ý định người dùng. Trả về JSON.
-
-Ý định "create_contract": khi người dùng muốn TẠO / SOẠN / LẬP / VIẾT / LÀM hợp đồng.
-Các cách nói phổ biến: "tạo hợp đồng", "soạn hợp đồng", "lập hợp đồng", "tạo cho tôi", "tạo giúp tôi", "giúp tôi tạo", "làm hợp đồng", "cần hợp đồng", "muốn hợp đồng".
-
-Ý định "other": hỏi pháp luật, hỏi danh sách, chào hỏi, hoặc bất kỳ điều gì KHÔNG phải tạo hợp đồng.
-
-Nếu intent="create_contract", chọn contract_type từ danh sách (hoặc null nếu không khớp):
-{type_lines}
-
-QUY TẮC KHỚP:
-- "cho thuê xe" KHÔNG PHẢI "cho thuê nhà/đất"
-- Phải khớp CHÍNH XÁC nghĩa, không chọn loại gần giống
-
-Trả về ĐÚNG 1 dòng JSON:
-{{"intent":"create_contract","contract_type":"slug_hoặc_null"}}
-hoặc
-{{"intent":"other"}}"""
-
-        messages = [{"role": "user", "content": user_input}]
-        try:
-            result = call_llm_json(messages, temperature=0.1, max_tokens=60, system=system_prompt)
-            logger.info(f"Intent detection result: {result} for input: {user_input[:80]}")
-            if isinstance(result, dict) and "intent" in result:
-                # Validate contract_type slug
-                ct = result.get("contract_type")
-                if ct and ct not in valid_slugs:
-                    result["contract_type"] = None
-                return result
-        except Exception as e:
-            logger.warning(f"Intent detection failed: {e}")
-        return None
+        turn = self._turn_analysis
+        if turn is None or turn[0] != user_input:
+            available = await self._aget_available_contract_types()
+            turn = self._turn_analysis
+            if turn is None or turn[0] != user_input:
+                task = asyncio.ensure_future(
+                    aanalyze_query(user_input, available, list(CATEGORY_KEYWORDS))
+                )
+                self._turn_analysis = turn = (user_input, task)
+                task.add_done_callback(lambda t, turn=turn: self._forget_failed_turn(turn, t))
+        task = turn[1]
+        if task.done():
+            return task.result()
+        # Shielded: a cancelled consumer (speculative context) must not cancel the others
+        return await asyncio.shield(task)
+
+    def _forget_failed_turn(self, turn: tuple, task: asyncio.Future) -> None:
+        """Drop the cached router task once it ends without an analysis."""
+        failed = task.cancelled() or task.exception() is not None or task.result() is None
+        if failed and self._turn_analysis is turn:
+            self._turn_analysis = None
 
     async def _detect_contract_type_with_llm(self, user_input: str) -> Optional[str]:
         """Use LLM to detect contract type from user input.
@@ -965,7 +1024,7 @@ hoặc
         Returns Vietnamese DB slug (e.g. 'cho_thue_nha') or None.
         """
         # Build dynamic prompt from DB templates
-        available = self._get_available_contract_types()
+        available = await self._aget_available_contract_types()
         if not available:
             return None
 
@@ -991,7 +1050,7 @@ QUY TẮC QUAN TRỌNG:
             {"role": "user", "content": user_input}
         ]
 
-        result = self._call_llm(messages, temperature=0.1, max_tokens=30)
+        result = await self._acall_llm(messages, temperature=0.1, max_tokens=30, cache=True, task="classify")
         result = result.strip().lower()
 
         if result in valid_slugs:
@@ -1000,11 +1059,11 @@ QUY TẮC QUAN TRỌNG:
         return None
 
     async def _build_context_for_query(self, user_input: str, session: ChatSession) -> str:
-        """Build relevant context — tries vector search first, falls back to keyword.
+        """Build relevant context via hybrid retrieval (keyword + vector, RRF).
 
-        Priority:
-        1. Vector search (ResearchService) — best quality, needs embedding model
-        2. Keyword search (SQL ilike) — fallback for serverless (no embedding model)
+        The keyword leg uses LLM-prioritized terms; the vector leg embeds the
+        raw question and is skipped when no embedding model is available
+        (serverless), leaving keyword-only search.
         """
         # Skip trivially short / greeting-like inputs (no LLM call needed)
         stripped = user_input.strip()
@@ -1013,266 +1072,42 @@ QUY TẮC QUAN TRỌNG:
         ):
             return ""
 
-        # Keyword search only (no embedding model on Vercel)
-        # LLM generates prioritized search terms (primary vs secondary)
+        # Prioritized search terms (primary vs secondary) from the turn's router call
         primary_terms: list[str] = []
         secondary_terms: list[str] = []
-        llm_succeeded = False
-
-        try:
-            result = self._extract_search_terms_with_llm(user_input)
-            llm_succeeded = True  # LLM responded (even if empty = not a legal question)
-            if isinstance(result, dict):
-                primary_terms = result.get("primary", [])
-                secondary_terms = result.get("secondary", [])
-            elif isinstance(result, list):
-                primary_terms = result
-        except Exception:
-            pass  # LLM failed — will use n-gram fallback
-
-        # N-gram fallback ONLY if LLM call itself failed (exception).
-        # If LLM returned empty intentionally (not a legal question), respect that.
-        if not llm_succeeded and not primary_terms and not secondary_terms:
+        analysis = await self._analyze_query(user_input)
+        if analysis:
+            primary_terms = analysis.primary
+            secondary_terms = analysis.secondary
+
+        # N-gram fallback ONLY if the router call itself failed.
+        # If it returned empty terms intentionally (not a legal question), respect that.
+        if analysis is None:
             try:
-                primary_terms = self._build_search_terms(user_input)
+                primary_terms = build_search_terms(user_input)
             except Exception as e:
                 logger.warning(f"DB search error: {e}")
 
         if not primary_terms and not secondary_terms:
             return ""
 
-        all_articles: dict[tuple, dict] = {}
-        self._keyword_search_into(all_articles, primary_terms, secondary_terms)
-
-        if not all_articles:
+        ranked = await self.retriever.aretrieve(
+            user_input,
+            top_k=25,
+            primary_terms=primary_terms,
+            secondary_terms=secondary_terms,
+        )
+        if not ranked:
             return ""
-
-        ranked = self._diverse_rank(list(all_articles.values()), top_n=25)
         return self._format_articles(ranked)
 
-    def _diverse_rank(self, articles: list[dict], top_n: int = 25) -> list[dict]:
-        """Rank articles by score with document diversity.
-
-        Takes top 20 by score, then fills remaining 5 slots with the
-        highest-scored articles from documents NOT yet represented.
-        This ensures multi-domain questions get coverage from all relevant laws.
-        """
-        by_score = sorted(articles, key=lambda x: x["score"], reverse=True)
-
-        main_n = max(top_n - 5, top_n * 4 // 5)  # 20 of 25
-        main = by_score[:main_n]
-
-        # Which documents are already represented?
-        seen_docs = set()
-        for item in main:
-            doc_title = (item.get("doc_info") or {}).get("title", "")
-            if doc_title:
-                seen_docs.add(doc_title)
-
-        # Find top articles from underrepresented documents
-        extra = []
-        for item in by_score[main_n:]:
-            doc_title = (item.get("doc_info") or {}).get("title", "")
-            if doc_title and doc_title not in seen_docs and item["score"] > 0:
-                extra.append(item)
-                seen_docs.add(doc_title)
-                if len(extra) >= top_n - main_n:
-                    break
-
-        # Fill remaining slots from next-best overall if diversity didn't use all
-        remaining = top_n - main_n - len(extra)
-        if remaining > 0:
-            used = set(id(x) for x in main + extra)
-            for item in by_score[main_n:]:
-                if id(item) not in used:
-                    extra.append(item)
-                    remaining -= 1
-                    if remaining <= 0:
-                        break
-
-        return main + extra
-
-    def _extract_search_terms_with_llm(self, query: str) -> dict:
-        """Use LLM to extract prioritized legal search phrases from user question.
-
-        Returns {"primary": [...], "secondary": [...]}.
-        Primary = specific legal concepts directly relevant to the question.
-        Secondary = broader/generic terms for supplementary context.
-        """
-        messages = [
-            {"role": "system", "content": (
-                "Bạn là công cụ trích xuất từ khóa tìm kiếm cho cơ sở dữ liệu pháp luật Việt Nam.\n"
-                "Database dùng SQL ILIKE (tìm kiếm chuỗi con), nên cụm từ NGẮN tìm được nhiều kết quả hơn.\n\n"
-                "Trả về JSON với 2 nhóm:\n"
-                "- \"primary\": 10-15 cụm từ CHUYÊN BIỆT (2-4 từ) — thuật ngữ pháp lý trực tiếp giải quyết câu hỏi.\n"
-                "  BAO GỒM CẢ dạng ngắn (2 từ) và dạng dài (3-4 từ) của cùng khái niệm.\n"
-                "  Nếu câu hỏi LIÊN QUAN đến nhiều lĩnh vực pháp luật, primary PHẢI có từ khóa cho MỖI lĩnh vực.\n"
-                "- \"secondary\": 3-5 cụm từ RỘNG hơn (CHỈ tên luật chung, khái niệm nền không liên quan trực tiếp)\n\n"
-                "VÍ DỤ:\n"
-                "Câu hỏi: 'Ông A chết không di chúc, vợ con tranh chấp thừa kế đất, thủ tục sang tên sổ đỏ, đất nằm trong quy hoạch'\n"
-                "Phân tích: 3 lĩnh vực — thừa kế (dân sự) + sang tên/đăng ký (đất đai) + quy hoạch (đất đai)\n"
-                "{\"primary\": [\"thừa kế\", \"di sản\", \"hàng thừa kế\", \"thừa kế theo pháp luật\", "
-                "\"chia di sản\", \"người thừa kế\", \"di chúc\", "
-                "\"đăng ký biến động\", \"sang tên\", \"cấp giấy chứng nhận\", "
-                "\"quy hoạch\", \"quy hoạch sử dụng đất\", \"đất quy hoạch\"], "
-                "\"secondary\": [\"bộ luật dân sự\", \"luật đất đai\"]}\n\n"
-                "Câu hỏi: 'Công ty sa thải nhân viên mang thai'\n"
-                "{\"primary\": [\"sa thải\", \"mang thai\", \"lao động nữ\", \"đơn phương chấm dứt\", "
-                "\"thai sản\", \"chấm dứt hợp đồng\", \"sa thải trái pháp luật\"], "
-                "\"secondary\": [\"hợp đồng lao động\", \"bồi thường\", \"bộ luật lao động\"]}\n\n"
-                "QUAN TRỌNG:\n"
-                "- primary PHẢI bao gồm dạng NGẮN 2 từ (ví dụ: 'thừa kế', 'quy hoạch', 'sang tên')\n"
-                "- Nếu câu hỏi HỎI TRỰC TIẾP về thủ tục (sang tên, đăng ký, cấp giấy, quy hoạch) → đó là primary, KHÔNG phải secondary\n"
-                "- secondary CHỈ dành cho: tên luật chung (bộ luật dân sự, luật đất đai) và khái niệm KHÔNG được hỏi trực tiếp\n"
-                "- Nếu câu hỏi KHÔNG liên quan pháp luật hoặc không rõ ràng → trả về {\"primary\": [], \"secondary\": []}\n"
-                "- TUYỆT ĐỐI CHỈ trả về JSON, KHÔNG text/giải thích/hỏi lại"
-            )},
-            {"role": "user", "content": query}
-        ]
-        result = call_llm_json(messages, temperature=0.1, max_tokens=400)
-        if isinstance(result, dict):
-            primary = [str(t).lower().strip() for t in result.get("primary", []) if isinstance(t, str) and len(t) > 1]
-            secondary = [str(t).lower().strip() for t in result.get("secondary", []) if isinstance(t, str) and len(t) > 1]
-            return {"primary": primary, "secondary": secondary}
-        if isinstance(result, list):
-            return {"primary": [str(t).lower().strip() for t in result if isinstance(t, str) and len(t) > 1], "secondary": []}
-        return {"primary": [], "secondary": []}
-
-    def _build_search_terms(self, query: str) -> list[str]:
-        """Build Vietnamese n-gram search terms from query — NO LLM call.
-
-        Generates compound terms (2-4 words) that preserve Vietnamese
-        phrasing like "giấy chứng nhận", "quyền sử dụng đất", "không có giấy tờ".
-
-        Stop words are kept INSIDE n-grams (for accurate phrase matching)
-        but filtered as standalone search terms.
-        """
-        words = query.lower().split()
-        # Remove punctuation from words
-        words = [w.strip('.,?!;:()[]{}"\'-') for w in words if w.strip('.,?!;:()[]{}"\'-')]
-
-        if not words:
-            return []
-
-        # Stop words — only used to filter STANDALONE terms, not inside n-grams
-        stop_words = {
-            'là', 'gì', 'của', 'và', 'trong', 'cho', 'như', 'thế', 'nào',
-            'có', 'không', 'được', 'phải', 'cần', 'bao', 'nhiều', 'một',
-            'các', 'những', 'này', 'đó', 'khi', 'nếu', 'thì', 'sẽ', 'đã',
-            'đang', 'từ', 'đến', 'với', 'tại', 'về', 'theo', 'bằng',
-            'để', 'mà', 'hay', 'hoặc', 'vì', 'sao', 'tôi', 'bạn',
-        }
-
-        # Build n-grams per length — ensure a MIX of term lengths
-        # Long queries would otherwise fill all slots with 4-grams,
-        # missing useful shorter terms like "thông báo", "thu hồi đất"
-        seen = set()
-        by_length: dict[int, list[str]] = {4: [], 3: [], 2: []}
-        for n in [4, 3, 2]:
-            for i in range(len(words) - n + 1):
-                gram = " ".join(words[i:i + n])
-                has_meaningful = any(w not in stop_words for w in words[i:i + n])
-                if has_meaningful and gram not in seen:
-                    seen.add(gram)
-                    by_length[n].append(gram)
-
-        # 3-grams = sweet spot (specific enough, good recall)
-        # Take ALL 3-grams, supplement with 2-grams and 4-grams
-        result = by_length[3] + by_length[2][:8] + by_length[4][:4]
-        return result[:20]
-
-    def _keyword_search_into(
-        self,
-        article_scores: dict[tuple, dict],
-        primary_terms: list[str],
-        secondary_terms: list[str] | None = None,
-    ) -> None:
-        """Run keyword search with LLM-prioritized terms. No hardcoded generic lists.
-
-        Scoring:
-        - Primary title match: 10.0 per term (these ARE the answer)
-        - Primary content match: 2.0 per term, capped at 6.0
-        - Secondary title match: 1.0 per term (context only)
-        - Secondary content: not searched (too noisy)
-        """
-        settings = get_settings()
-        if settings.db_mode != "supabase":
-            return
-
-        from legal_chatbot.db.supabase import get_database
-        db = get_database()
-        client = db._read()
-
-        secondary_terms = secondary_terms or []
-
-        def _ensure_entry(a):
-            doc_info = a.get("legal_documents") or {}
-            key = (a.get("article_number"), doc_info.get("title", ""))
-            if key not in article_scores:
-                article_scores[key] = {
-                    "data": a, "doc_info": doc_info, "score": 0,
-                    "_pri_title": set(), "_pri_content": set(), "_sec_title": set(),
-                }
-            return key
-
-        def _fetch_batched(terms, field, batch_size=3, limit_per_batch=25):
-            """Fetch articles in small batches to avoid limit bias."""
-            all_data = []
-            for i in range(0, len(terms), batch_size):
-                batch = terms[i:i + batch_size]
-                filter_str = ",".join(f"{field}.ilike.%{t}%" for t in batch)
-                try:
-                    r = (client.table("articles")
-                         .select("article_number, title, content, legal_documents(title, document_number)")
-                         .or_(filter_str).limit(limit_per_batch).execute())
-                    all_data.extend(r.data or [])
-                except Exception:
-                    pass
-            return all_data
-
-        # --- Primary terms: title search ---
-        if primary_terms:
-            for a in _fetch_batched(primary_terms, "title", batch_size=2, limit_per_batch=20):
-                key = _ensure_entry(a)
-                t_lower = (a.get("title") or "").lower()
-                for t in primary_terms:
-                    if t in t_lower:
-                        article_scores[key]["_pri_title"].add(t)
-
-        # --- Primary terms: content search ---
-        if primary_terms:
-            for a in _fetch_batched(primary_terms, "content", batch_size=2, limit_per_batch=20):
-                key = _ensure_entry(a)
-                c_lower = (a.get("content") or "").lower()
-                for t in primary_terms:
-                    if t in c_lower:
-                        article_scores[key]["_pri_content"].add(t)
-
-        # --- Secondary terms: title only ---
-        if secondary_terms:
-            for a in _fetch_batched(secondary_terms, "title", batch_size=3, limit_per_batch=15):
-                key = _ensure_entry(a)
-                t_lower = (a.get("title") or "").lower()
-                for t in secondary_terms:
-                    if t in t_lower:
-                        article_scores[key]["_sec_title"].add(t)
-
-        # Compute final scores
-        for key, entry in article_scores.items():
-            pri_t = len(entry.get("_pri_title", set()))
-            pri_c = len(entry.get("_pri_content", set()))
-            sec_t = len(entry.get("_sec_title", set()))
-            entry["score"] = pri_t * 10.0 + min(pri_c * 2.0, 6.0) + sec_t * 1.0
-
     def _format_articles(self, ranked: list[dict]) -> str:
         """Format ranked articles into context string for LLM."""
         MAX_ARTICLE_CHARS = 3000
         MAX_TOTAL_CHARS = 120_000
         results = []
         total_chars = 0
-        for item in ranked:
-            a = item["data"]
-            doc_info = item.get("doc_info", {})
+        for a in ranked:
             content = a.get("content", "")
             if len(content) > MAX_ARTICLE_CHARS:
                 content = content[:MAX_ARTICLE_CHARS] + "…(lược bớt)"
@@ -1280,7 +1115,7 @@ QUY TẮC QUAN TRỌNG:
             title = a.get("title", "")
             if title:
                 header += f": {title}"
-            doc_title = doc_info.get("title", "") or a.get("document_title", "")
+            doc_title = a.get("document_title", "")
             entry = f"**{header}** ({doc_title})\n{content}"
             total_chars += len(entry)
             if total_chars > MAX_TOTAL_CHARS:
@@ -1405,13 +1240,14 @@ VĂN BẢN:
 Hãy trích xuất thông tin và trả về JSON."""
 
         try:
-            extracted = call_llm_json(
+            extracted = await acall_llm_json(
                 messages=[
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": user_prompt}
                 ],
                 temperature=0.1,
                 max_tokens=500,
+                task="extract_terms",
             )
 
             if not isinstance(extracted, dict):
@@ -1507,7 +1343,7 @@ Khi người dùng muốn xem hợp đồng, hãy hướng dẫn họ nói 'xem
 
         except ValueError as e:
             # Build dynamic error message from DB
-            available = self._get_available_contract_types()
+            available = await self._aget_available_contract_types()
             if available:
                 type_list = ", ".join(t["name"] for t in available)
                 msg = f"Hmm, chưa hỗ trợ loại hợp đồng này. Hiện tại mình có: {type_list} nhé!"
@@ -1856,6 +1692,28 @@ Khi người dùng muốn xem hợp đồng, hãy hướng dẫn họ nói 'xem
         # Fallback: generate via LLM
         return self._generate_articles_via_llm(draft)
 
+    async def stream_articles(self, draft: ContractDraft):
+        """Async generator of articles, each yielded as soon as it is complete.
+
+        Same strategy as _generate_articles_with_llm, but the LLM fallback
+        streams: the first ĐIỀU arrives in seconds instead of after all 9.
+        """
+        if draft.template and draft.template.default_articles:
+            articles = self._substitute_article_templates(
+                draft.template.default_articles, draft.field_values
+            )
+            if articles:
+                for article in articles:
+                    yield article
+                return
+
+        async for article in acall_llm_json_stream(
+            self._articles_messages(draft), temperature=0.3, max_tokens=4000,
+            task="contract_articles", use_sonnet=True,
+        ):
+            if isinstance(article, dict) and article.get("title"):
+                yield article
+
     def _substitute_article_templates(
         self, templates: list[dict], field_values: dict[str, str]
     ) -> list[dict]:
@@ -1889,6 +1747,31 @@ Khi người dùng muốn xem hợp đồng, hãy hướng dẫn họ nói 'xem
 
     def _generate_articles_via_llm(self, draft: ContractDraft) -> list[dict]:
         """Fallback: generate articles via LLM when no DB template exists."""
+        try:
+            result = call_llm_sonnet(
+                self._articles_messages(draft),
+                temperature=0.3,
+                max_tokens=4000,
+                task="contract_articles",
+            )
+
+            # Parse JSON from response
+            result = result.strip()
+            if result.startswith('```'):
+                result = result.split('```')[1]
+                if result.startswith('json'):
+                    result = result[4:]
+                result = result.strip()
+            articles = json.loads(result)
+            if isinstance(articles, list) and len(articles) > 0:
+                return articles
+        except Exception as e:
+            print(f"Error generating articles: {e}")
+
+        return []
+
+    def _articles_messages(self, draft: ContractDraft) -> list[dict]:
+        """Prompt for generating the 9 ĐIỀU of a draft (JSON array reply)."""
         contract_type_vn = draft.template.name if draft.template else 'Hợp đồng'
         legal_refs = ', '.join(draft.legal_basis) if draft.legal_basis else 'Bộ luật Dân sự 2015'
 
@@ -1943,30 +1826,10 @@ THÔNG TIN HỢP ĐỒNG:
 
 Trả về JSON array (9 articles). CHỈ JSON, không có text giải thích."""
 
-        try:
-            result = call_llm_sonnet(
-                [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=0.3,
-                max_tokens=4000
-            )
-
-            # Parse JSON from response
-            result = result.strip()
-            if result.startswith('```'):
-                result = result.split('```')[1]
-                if result.startswith('json'):
-                    result = result[4:]
-                result = result.strip()
-            articles = json.loads(result)
-            if isinstance(articles, list) and len(articles) > 0:
-                return articles
-        except Exception as e:
-            print(f"Error generating articles: {e}")
-
-        return []
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt}
+        ]
 
     def _upload_to_supabase_storage(self, filename: str, content: bytes, content_type: str) -> Optional[str]:
         """Upload file to Supabase Storage, return filename (not signed URL).
@@ -0,0 +1,466 @@
+"""Batch jobs for pipeline-time LLM work (template discovery, field generation, seeding).
+
+None of this is latency-sensitive, so instead of one blocking call after
+another, callers collect every prompt first and let a backend work through
+them:
+
+    batch = LLMBatch("suggestions")
+    for template in templates:
+        batch.add(f"{slug}-0", messages, system=system, task="generate_json")
+    for result in batch.run(validate):  # yields as results become available
+        if result.ok:
+            db.update_...(result.value)  # writes must be idempotent (upserts)
+
+validate(result) returns the accepted value (e.g. the parsed, checked
+JSON) or None to reject the reply. Rejected and failed requests are sent
+once more, on LLM_ESCALATION_MODEL when that is a different model, like
+call_llm_json's retry.
+
+Backends (LLM_BATCH_BACKEND):
+    concurrent  each request through call_llm from a thread pool; the shared
+                scheduler caps in-flight calls, so throughput is bounded by
+                the provider's rate limit, not by round trips (default)
+    anthropic   Message Batches API: submit once, poll, fetch results
+                (half price, minutes to hours); DeepSeek-routed requests
+                fall back to concurrent
+    local       in-process stand-in for the batch API (tests, offline runs)
+
+Every accepted result is journaled to LLM_BATCH_DIR/<name>.jsonl, keyed
+by custom_id and a digest of the request. Re-running a job replays finished
+results instead of calling the LLM again, and resumes polling a submitted
+batch rather than paying for it twice.
+"""
+
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional
+
+from pydantic import BaseModel
+
+from legal_chatbot.utils.config import get_settings
+from legal_chatbot.utils.llm import (
+    call_llm,
+    escalation_model,
+    get_client,
+    is_deepseek,
+    parse_llm_json,
+    prepare_kwargs,
+    route_model,
+)
+
+logger = logging.getLogger(__name__)
+
+# Anthropic's custom_id rule; enforced for every backend so jobs can switch
+_CUSTOM_ID = re.compile(r"^[a-zA-Z0-9_-]{1,64}$")
+
+
+class BatchRequest(BaseModel):
+    """One prompt in a batch job."""
+
+    custom_id: str
+    messages: list[dict]
+    system: str = ""
+    temperature: float = 0.1
+    max_tokens: int = 4000
+    task: Optional[str] = None
+    use_sonnet: bool = False  # Sonnet tier: DeepSeek when configured (see route_model)
+    escalated: bool = False
+
+    @property
+    def model(self) -> str:
+        model = route_model(self.task, sonnet_tier=self.use_sonnet)
+        if not self.escalated:
+            return model
+        return escalation_model(model, sonnet_tier=self.use_sonnet) or model
+
+    def digest(self) -> str:
+        """Changes whenever the prompt, parameters or routed model change."""
+        payload = json.dumps(
+            [self.model, self.system, self.messages, self.temperature, self.max_tokens],
+            ensure_ascii=False, sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class BatchResult(BaseModel):
+    """Outcome of one request: text (and the validated value) on success, error otherwise."""
+
+    custom_id: str
+    text: Optional[str] = None
+    error: Optional[str] = None
+    value: Any = None
+    replayed: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return self.text is not None and self.error is None
+
+    def parsed(self):
+        """The reply as JSON (code fences stripped); None if failed or not JSON."""
+        return parse_llm_json(self.text) if self.text else None
+
+
+class BatchJournal:
+    """Append-only JSONL of finished results and submitted remote batches."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._done: dict[str, tuple[str, str]] = {}  # custom_id -> (digest, text)
+        self._batches: list[dict] = []  # submitted, not yet collected
+        if path.exists():
+            self._load()
+
+    def _load(self) -> None:
+        with self.path.open(encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn last line from an interrupted run
+                kind = entry.get("kind")
+                if kind == "result":
+                    self._done[entry["custom_id"]] = (entry["digest"], entry["text"])
+                elif kind == "submitted":
+                    self._batches.append(entry)
+                elif kind == "collected":
+                    self._batches = [b for b in self._batches if b["batch_id"] != entry["batch_id"]]
+
+    def _append(self, entry: dict) -> None:
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def finished(self, request: BatchRequest) -> Optional[str]:
+        """Stored text if this exact request already succeeded."""
+        done = self._done.get(request.custom_id)
+        return done[1] if done and done[0] == request.digest() else None
+
+    def record(self, request: BatchRequest, text: str) -> None:
+        self._done[request.custom_id] = (request.digest(), text)
+        self._append({"kind": "result", "custom_id": request.custom_id, "digest": request.digest(), "text": text})
+
+    def pending_batch(self, backend: str, requests: list[BatchRequest]) -> Optional[str]:
+        """A submitted, uncollected batch covering exactly these requests."""
+        wanted = {r.custom_id: r.digest() for r in requests}
+        for batch in reversed(self._batches):
+            if batch["backend"] == backend and batch["requests"] == wanted:
+                return batch["batch_id"]
+        return None
+
+    def submitted(self, backend: str, batch_id: str, requests: list[BatchRequest]) -> None:
+        entry = {
+            "kind": "submitted", "backend": backend, "batch_id": batch_id,
+            "requests": {r.custom_id: r.digest() for r in requests},
+        }
+        self._batches.append(entry)
+        self._append(entry)
+
+    def collected(self, batch_id: str) -> None:
+        self._batches = [b for b in self._batches if b["batch_id"] != batch_id]
+        self._append({"kind": "collected", "batch_id": batch_id})
+
+
+class ConcurrentBackend:
+    """call_llm from a thread pool; results yielded as they complete."""
+
+    name = "concurrent"
+
+    def __init__(self, concurrency: int = None, caller: str = "llm_batch"):
+        self.concurrency = concurrency or get_settings().llm_batch_concurrency
+        self.caller = caller
+
+    def run(self, requests: list[BatchRequest], journal: BatchJournal) -> Iterator[BatchResult]:
+        if not requests:
+            return
+        pool = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="llm-batch")
+        try:
+            futures = {pool.submit(self._call, request): request for request in requests}
+            for future in as_completed(futures):
+                request = futures[future]
+                try:
+                    yield BatchResult(custom_id=request.custom_id, text=future.result())
+                except Exception as e:
+                    logger.warning(f"Batch request {request.custom_id} failed: {e}")
+                    yield BatchResult(custom_id=request.custom_id, error=f"{type(e).__name__}: {e}")
+        finally:
+            # A consumer that stops early must not wait for (and pay for) queued calls
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _call(self, request: BatchRequest) -> str:
+        return call_llm(
+            request.messages, temperature=request.temperature, max_tokens=request.max_tokens,
+            system=request.system, task=request.task, model=request.model, caller=self.caller,
+        )
+
+
+class PolledBackend(ABC):
+    """Submit / poll / collect, the shape of provider batch APIs."""
+
+    name = "polled"
+
+    def __init__(self, poll_interval: float = None):
+        self.poll_interval = get_settings().llm_batch_poll_interval if poll_interval is None else poll_interval
+
+    def supports(self, request: BatchRequest) -> bool:
+        return True
+
+    @abstractmethod
+    def submit(self, requests: list[BatchRequest]) -> str:
+        """Send the requests; returns the batch id."""
+
+    @abstractmethod
+    def status(self, batch_id: str) -> Optional[str]:
+        """'in_progress', 'ended', or None if the batch is unknown."""
+
+    @abstractmethod
+    def results(self, batch_id: str) -> Iterator[BatchResult]:
+        """Results of an ended batch."""
+
+    def run(self, requests: list[BatchRequest], journal: BatchJournal) -> Iterator[BatchResult]:
+        if not requests:
+            return
+        batch_id = journal.pending_batch(self.name, requests)
+        if batch_id and self.status(batch_id) is None:
+            batch_id = None
+        if batch_id:
+            logger.info(f"Resuming {self.name} batch {batch_id} ({len(requests)} requests)")
+        else:
+            batch_id = self.submit(requests)
+            journal.submitted(self.name, batch_id, requests)
+            logger.info(f"Submitted {self.name} batch {batch_id} ({len(requests)} requests)")
+
+        while self.status(batch_id) != "ended":
+            time.sleep(self.poll_interval)
+        yield from self.results(batch_id)
+        journal.collected(batch_id)
+
+
+class AnthropicBatchBackend(PolledBackend):
+    """Anthropic Message Batches API."""
+
+    name = "anthropic"
+
+    def supports(self, request: BatchRequest) -> bool:
+        return not is_deepseek(request.model)
+
+    def submit(self, requests: list[BatchRequest]) -> str:
+        batch = get_client().messages.batches.create(requests=[
+            {
+                "custom_id": r.custom_id,
+                "params": prepare_kwargs(r.messages, r.model, r.temperature, r.max_tokens, r.system),
+            }
+            for r in requests
+        ])
+        return batch.id
+
+    def status(self, batch_id: str) -> Optional[str]:
+        try:
+            status = get_client().messages.batches.retrieve(batch_id).processing_status
+        except Exception as e:
+            if getattr(e, "status_code", None) == 404:
+                return None
+            raise
+        return "ended" if status == "ended" else "in_progress"
+
+    def results(self, batch_id: str) -> Iterator[BatchResult]:
+        for entry in get_client().messages.batches.results(batch_id):
+            if entry.result.type == "succeeded":
+                text = "".join(getattr(b, "text", "") for b in entry.result.message.content)
+                yield BatchResult(custom_id=entry.custom_id, text=text)
+            else:
+                error = getattr(entry.result, "error", None)
+                yield BatchResult(custom_id=entry.custom_id, error=f"{entry.result.type}: {error}")
+
+
+# Batches of every LocalBatchBackend in the process, like a remote batch API:
+# a new backend instance (resumed job) can still collect them
+_local_batches: dict[str, dict] = {}
+_local_batches_lock = threading.Lock()
+
+# Ended batches nobody collected (consumer stopped early) are dropped after this
+LOCAL_BATCH_RETENTION = 3600.0
+
+
+class LocalBatchBackend(PolledBackend):
+    """In-process stand-in for a batch API: a worker thread answers the requests.
+
+    responder(request) -> text defaults to a real call_llm; tests pass a fake.
+    """
+
+    name = "local"
+
+    def __init__(self, responder: Callable[[BatchRequest], str] = None, poll_interval: float = 0.05):
+        super().__init__(poll_interval)
+        self.responder = responder or ConcurrentBackend()._call
+
+    def submit(self, requests: list[BatchRequest]) -> str:
+        batch_id = f"localbatch_{uuid.uuid4().hex[:12]}"
+        batch = {"status": "in_progress", "results": [], "ended_at": None}
+        with _local_batches_lock:
+            self._prune()
+            _local_batches[batch_id] = batch
+        threading.Thread(target=self._process, args=(batch, requests), daemon=True).start()
+        return batch_id
+
+    @staticmethod
+    def _prune() -> None:
+        """Drop ended batches left uncollected past LOCAL_BATCH_RETENTION (lock held)."""
+        cutoff = time.monotonic() - LOCAL_BATCH_RETENTION
+        for batch_id, batch in list(_local_batches.items()):
+            if batch["ended_at"] is not None and batch["ended_at"] < cutoff:
+                del _local_batches[batch_id]
+
+    def _process(self, batch: dict, requests: list[BatchRequest]) -> None:
+        results = []
+        for request in requests:
+            try:
+                result = BatchResult(custom_id=request.custom_id, text=self.responder(request))
+            except Exception as e:
+                result = BatchResult(custom_id=request.custom_id, error=f"{type(e).__name__}: {e}")
+            results.append(result)
+        with _local_batches_lock:
+            batch["results"] = results
+            batch["status"] = "ended"
+            batch["ended_at"] = time.monotonic()
+
+    def status(self, batch_id: str) -> Optional[str]:
+        with _local_batches_lock:
+            batch = _local_batches.get(batch_id)
+            return batch["status"] if batch else None
+
+    def results(self, batch_id: str) -> Iterator[BatchResult]:
+        with _local_batches_lock:
+            batch = _local_batches.pop(batch_id)
+        yield from batch["results"]
+
+
+_BACKENDS = {"concurrent": ConcurrentBackend, "anthropic": AnthropicBatchBackend, "local": LocalBatchBackend}
+
+
+def get_batch_backend(name: str = None):
+    """Backend instance by name (default LLM_BATCH_BACKEND)."""
+    name = name or get_settings().llm_batch_backend
+    if name not in _BACKENDS:
+        raise ValueError(f"Unknown LLM batch backend '{name}' (expected one of {', '.join(_BACKENDS)})")
+    return _BACKENDS[name]()
+
+
+class LLMBatch:
+    """Collect prompts, run them through a backend, journal the results."""
+
+    def __init__(self, name: str, backend=None, journal_dir: str = None):
+        self.name = name
+        self.backend = backend if backend is not None and not isinstance(backend, str) else get_batch_backend(backend)
+        directory = Path(journal_dir or get_settings().llm_batch_dir)
+        self.journal = BatchJournal(directory / f"{name}.jsonl")
+        self.requests: dict[str, BatchRequest] = {}
+
+    def add(
+        self,
+        custom_id: str,
+        messages: list[dict],
+        system: str = "",
+        temperature: float = 0.1,
+        max_tokens: int = 4000,
+        task: str = None,
+        use_sonnet: bool = False,
+    ) -> None:
+        """Queue one prompt; custom_id is [a-zA-Z0-9_-]{1,64} and unique in the job.
+
+        use_sonnet routes like call_llm_sonnet / call_llm_json(use_sonnet=True).
+        """
+        if not _CUSTOM_ID.match(custom_id):
+            raise ValueError(f"Invalid batch custom_id '{custom_id}' (use [a-zA-Z0-9_-], max 64 chars)")
+        if custom_id in self.requests:
+            raise ValueError(f"Duplicate batch custom_id '{custom_id}'")
+        self.requests[custom_id] = BatchRequest(
+            custom_id=custom_id, messages=messages, system=system,
+            temperature=temperature, max_tokens=max_tokens, task=task, use_sonnet=use_sonnet,
+        )
+
+    def __len__(self) -> int:
+        return len(self.requests)
+
+    # Sends per request: the first, plus one retry for rejected / failed replies
+    ATTEMPTS = 2
+
+    def run(self, validate: Callable[[BatchResult], Any] = None) -> Iterator[BatchResult]:
+        """Yield one final result per request, as soon as it is settled.
+
+        validate(result) -> accepted value (set as result.value) or None to
+        reject. Only accepted results are journaled; rejected and failed
+        requests are re-sent, on the escalation model when there is one.
+        Without validate every reply with text is accepted.
+        """
+        accept = validate or (lambda result: result.text)
+        todo = list(self.requests.values())
+        started, sent, accepted = time.monotonic(), 0, 0
+
+        for attempt in range(self.ATTEMPTS):
+            last = attempt == self.ATTEMPTS - 1
+            pending = {}
+            for request in todo:
+                # An escalated retry accepted on an earlier run counts as finished too
+                text = self.journal.finished(request)
+                if text is None and not request.escalated:
+                    text = self.journal.finished(request.model_copy(update={"escalated": True}))
+                if text is not None:
+                    result = BatchResult(custom_id=request.custom_id, text=text, replayed=True)
+                    result.value = accept(result)
+                    if result.value is not None:
+                        yield result
+                        continue
+                pending[request.custom_id] = request
+            if not pending:
+                break
+
+            retry = []
+            for request, result in self._send(list(pending.values())):
+                sent += 1
+                if result.ok:
+                    result.value = accept(result)
+                    if result.value is not None:
+                        self.journal.record(request, result.text)
+                        accepted += 1
+                        yield result
+                        continue
+                    result.error = "rejected: reply failed validation"
+                if last:
+                    yield result
+                else:
+                    logger.info(f"Batch {self.name}: re-sending {request.custom_id} ({result.error})")
+                    retry.append(request.model_copy(update={"escalated": True}))
+            todo = retry
+
+        if sent:
+            logger.info(
+                f"Batch {self.name}: {accepted} results accepted from {sent} sends "
+                f"in {time.monotonic() - started:.1f}s"
+            )
+
+    def _send(self, requests: list[BatchRequest]) -> Iterator[tuple[BatchRequest, BatchResult]]:
+        """(request, result) pairs from the backend; models it can't serve go direct."""
+        by_id = {r.custom_id: r for r in requests}
+        # Batch APIs can't serve every model (e.g. DeepSeek on Anthropic's)
+        supports = getattr(self.backend, "supports", None)
+        direct = [r for r in requests if supports and not supports(r)]
+        batched = [r for r in requests if r not in direct]
+        backends = [(self.backend, batched)]
+        if direct:
+            backends.append((ConcurrentBackend(), direct))
+
+        for backend, chunk in backends:
+            for result in backend.run(chunk, self.journal):
+                request = by_id.get(result.custom_id)
+                if request is not None:
+                    yield request, result
@@ -1,6 +1,5 @@
 """Pipeline service — orchestrates crawl, parse, index, validate"""
 
-import asyncio
 import hashlib
 import logging
 import time
@@ -19,6 +18,7 @@ from legal_chatbot.models.pipeline import (
 from legal_chatbot.services.crawler import CrawlerService
 from legal_chatbot.services.embedding import EmbeddingService
 from legal_chatbot.services.indexer import IndexerService
+from legal_chatbot.utils.executor import run_blocking
 from legal_chatbot.utils.vietnamese import (
     edit_distance,
     normalize_category_name,
@@ -133,9 +133,9 @@ class PipelineService:
         Returns a suggested category name if valid, None if not.
         """
         try:
-            from legal_chatbot.utils.llm import call_llm_sonnet
+            from legal_chatbot.utils.llm import call_llm
 
-            answer = call_llm_sonnet(
+            answer = call_llm(
                 messages=[
                     {
                         "role": "system",
@@ -151,6 +151,8 @@ class PipelineService:
                 ],
                 temperature=0,
                 max_tokens=50,
+                cache=True,
+                task="classify",
             ).strip()
 
             if answer.upper().startswith("YES|"):
@@ -347,68 +349,68 @@ class PipelineService:
 
             run.documents_found = len(crawl_urls)
 
-            # Phase 2: Crawl (incremental)
-            logger.info("Phase 2: Crawling...")
-            crawl_results = []
+            # Phase 2+3: Crawl (incremental, parallel) and index each document as it arrives
+            logger.info("Phase 2: Crawling + indexing...")
             registry_map = {e["url"]: e for e in registry_entries} if registry_entries else {}
+            total_articles = 0
 
-            for url in crawl_urls:
-                try:
-                    result = await self.crawl_document(url, config)
-                    if not result:
+            from legal_chatbot.services.crawl_engine import CrawlEngine
+
+            async with CrawlEngine() as engine:
+                async for url, html, error in engine.fetch_all(crawl_urls):
+                    if error is not None:
+                        logger.error(f"  Error crawling {url}: {error}")
                         continue
+                    try:
+                        result = await run_blocking(self._to_crawl_result, url, html)
+                        if not result:
+                            continue
 
-                    # Incremental: compare content hash
-                    registry_entry = registry_map.get(url)
-                    if not force and registry_entry:
-                        old_hash = registry_entry.get("last_content_hash", "")
-                        if old_hash and old_hash == result.content_hash:
+                        # Incremental: compare content hash
+                        registry_entry = registry_map.get(url)
+                        if not force and registry_entry:
+                            old_hash = registry_entry.get("last_content_hash", "")
+                            if old_hash and old_hash == result.content_hash:
+                                run.documents_skipped += 1
+                                logger.info(f"  Skipped (unchanged): {result.title[:50]}")
+                                # Update checked_at
+                                if registry_entry.get("id"):
+                                    await run_blocking(
+                                        self.db.update_registry_hash,
+                                        registry_entry["id"], result.content_hash,
+                                    )
+                                continue
+
+                        # Update registry with new hash
+                        if registry_entry and registry_entry.get("id"):
+                            await run_blocking(
+                                self.db.update_registry_hash,
+                                registry_entry["id"], result.content_hash,
+                            )
+
+                        # Also check DB-level hash
+                        existing = await run_blocking(self.db.get_document_by_hash, result.content_hash)
+                        if existing and not force:
+                            result.is_new = False
                             run.documents_skipped += 1
-                            logger.info(f"  Skipped (unchanged): {result.title[:50]}")
-                            # Update checked_at
-                            if registry_entry.get("id"):
-                                self.db.update_registry_hash(
-                                    registry_entry["id"], result.content_hash
-                                )
+                            logger.info(f"  Skipped (DB hash match): {result.title[:50]}")
                             continue
-
-                    # Update registry with new hash
-                    if registry_entry and registry_entry.get("id"):
-                        self.db.update_registry_hash(
-                            registry_entry["id"], result.content_hash
-                        )
-
-                    # Also check DB-level hash
-                    existing = self.db.get_document_by_hash(result.content_hash)
-                    if existing and not force:
-                        result.is_new = False
-                        run.documents_skipped += 1
-                        logger.info(f"  Skipped (DB hash match): {result.title[:50]}")
-                    else:
-                        crawl_results.append(result)
                         run.documents_new += 1
                         logger.info(f"  Crawled: {result.title[:50]}")
 
-                except Exception as e:
-                    logger.error(f"  Error crawling {url}: {e}")
-
-                # Rate limiting
-                await asyncio.sleep(
-                    config.rate_limit_seconds + __import__("random").uniform(0, 2)
-                )
+                    except Exception as e:
+                        logger.error(f"  Error crawling {url}: {e}")
+                        continue
 
-            # Phase 3: Index
-            logger.info("Phase 3: Indexing...")
-            total_articles = 0
-            for result in crawl_results:
-                try:
-                    count = self.index_document(result, config)
-                    total_articles += count
-                    logger.info(
-                        f"  Indexed: {result.title[:50]} ({count} articles)"
-                    )
-                except Exception as e:
-                    logger.error(f"  Error indexing {result.title[:50]}: {e}")
+                    # Index while the remaining pages keep loading
+                    try:
+                        count = await run_blocking(self.index_document, result, config)
+                        total_articles += count
+                        logger.info(
+                            f"  Indexed: {result.title[:50]} ({count} articles)"
+                        )
+                    except Exception as e:
+                        logger.error(f"  Error indexing {result.title[:50]}: {e}")
 
             run.articles_indexed = total_articles
             run.embeddings_generated = total_articles
@@ -527,6 +529,10 @@ class PipelineService:
     ) -> Optional[CrawlResult]:
         """Phase 2: Crawl a single document."""
         html = await self.crawler.crawl_with_stealth(url)
+        return self._to_crawl_result(url, html)
+
+    def _to_crawl_result(self, url: str, html: str) -> Optional[CrawlResult]:
+        """Parse a fetched page into a CrawlResult (None if empty or unparseable)."""
         if not html:
             return None
 
@@ -664,6 +670,7 @@ class PipelineService:
           2. LLM Step 1: Discover contract types from articles
           3. For each type, run search queries → cache articles
           4. LLM Step 2: Generate required_fields from cached articles
+             (one batch job across all types, see services/llm_batch.py)
           5. Upsert each template to Supabase
 
         Returns count of templates seeded.
@@ -692,7 +699,10 @@ class PipelineService:
 
         logger.info(f"Discovered {len(discovered)} contract types for {category}")
 
-        count = 0
+        from legal_chatbot.services.llm_batch import LLMBatch
+
+        batch = LLMBatch(f"required_fields_{category}")
+        pending = []  # (tmpl, tmpl_data)
         for tmpl in discovered:
             tmpl_data = {
                 "contract_type": tmpl["contract_type"],
@@ -714,18 +724,40 @@ class PipelineService:
                 except Exception as e:
                     logger.warning(f"Failed to cache articles for {tmpl['contract_type']}: {e}")
 
-            # LLM Step 2: Generate required_fields from cached articles
-            if cached:
-                try:
-                    required_fields = self._generate_required_fields(tmpl, cached)
-                    if required_fields:
-                        tmpl_data["required_fields"] = required_fields
-                        logger.info(
-                            f"  Generated {len(required_fields.get('fields', []))} fields for {tmpl['contract_type']}"
-                        )
-                except Exception as e:
-                    logger.warning(f"Failed to generate fields for {tmpl['contract_type']}: {e}")
+            # LLM Step 2 prompt: required_fields from cached articles
+            if cached and _batch_id(tmpl["contract_type"]) not in batch.requests:
+                batch.add(
+                    _batch_id(tmpl["contract_type"]),
+                    self._required_fields_messages(tmpl, cached),
+                    temperature=0.1,
+                    max_tokens=4000,
+                    task="generate_json",
+                    use_sonnet=True,
+                )
+            pending.append((tmpl, tmpl_data))
+
+        templates = {_batch_id(tmpl["contract_type"]): tmpl for tmpl, _ in pending}
+        generated = {}
+        for result in batch.run(
+            lambda r: self._validate_required_fields(templates[r.custom_id], r.parsed())
+        ):
+            generated[result.custom_id] = result
+        for tmpl, tmpl_data in pending:
+            result = generated.get(_batch_id(tmpl["contract_type"]))
+            if result is None:
+                continue
+            if not result.ok:
+                logger.warning(f"Failed to generate fields for {tmpl['contract_type']}: {result.error}")
+                continue
+            required_fields = result.value
+            if required_fields:
+                tmpl_data["required_fields"] = required_fields
+                logger.info(
+                    f"  Generated {len(required_fields.get('fields', []))} fields for {tmpl['contract_type']}"
+                )
 
+        count = 0
+        for tmpl, tmpl_data in pending:
             try:
                 self.db.upsert_contract_template(tmpl_data)
                 count += 1
@@ -824,18 +856,17 @@ QUY TẮC:
             logger.warning(f"LLM discovery failed for {category}: {e}")
             return None
 
-    def _generate_required_fields(self, template: dict, cached_articles: list) -> dict | None:
-        """Use LLM to generate required_fields JSONB from cached articles.
+    @staticmethod
+    def _required_fields_messages(template: dict, cached_articles: list) -> list[dict]:
+        """Prompt for the required_fields JSONB of a template.
 
-        Analyzes the legal articles and generates:
+        Asks the LLM to analyze the legal articles and generate:
         - fields: list of {name, label, required} for the contract form
         - field_groups: prefix-based grouping for HTML preview sections
         - common_groups: shared financial/timeline groups
         - legal_refs: specific article references
         - key_terms: important legal terms from articles
         """
-        from legal_chatbot.utils.llm import call_llm_json
-
         # Build article summaries for LLM context
         article_texts = []
         for a in cached_articles[:15]:  # Limit to top 15 most relevant
@@ -875,32 +906,25 @@ QUY TẮC:
 8. Label phải có dấu tiếng Việt đầy đủ
 9. Chỉ trả về JSON, không giải thích"""
 
-        try:
-            required_fields = call_llm_json(
-                messages=[
-                    {"role": "system", "content": "Bạn là API trả về JSON. Chỉ trả về JSON hợp lệ, không có text khác."},
-                    {"role": "user", "content": prompt},
-                ],
-                temperature=0.1,
-                max_tokens=4000,
-                use_sonnet=True,
-            )
-
-            if not isinstance(required_fields, dict):
-                logger.warning(f"LLM returned non-dict for {template['contract_type']}")
-                return None
-
-            # Validate structure
-            if "fields" not in required_fields or not required_fields["fields"]:
-                logger.warning(f"LLM returned empty fields for {template['contract_type']}")
-                return None
+        return [
+            {"role": "system", "content": "Bạn là API trả về JSON. Chỉ trả về JSON hợp lệ, không có text khác."},
+            {"role": "user", "content": prompt},
+        ]
 
-            return required_fields
+    @staticmethod
+    def _validate_required_fields(template: dict, required_fields) -> dict | None:
+        """The parsed reply if it is a dict with a non-empty "fields" list."""
+        if not isinstance(required_fields, dict):
+            logger.warning(f"LLM returned non-dict for {template['contract_type']}")
+            return None
 
-        except Exception as e:
-            logger.warning(f"LLM generation failed for {template['contract_type']}: {e}")
+        # Validate structure
+        if "fields" not in required_fields or not required_fields["fields"]:
+            logger.warning(f"LLM returned empty fields for {template['contract_type']}")
             return None
 
+        return required_fields
+
     def _run_template_queries(self, queries: list, top_k: int = 10) -> list:
         """Run search queries and return deduplicated results."""
         seen_keys = set()
@@ -938,3 +962,8 @@ QUY TẮC:
             .execute()
         )
         return result.data
+
+
+def _batch_id(contract_type: str) -> str:
+    """Batch custom_id for a discovered contract type (LLM slugs aren't guaranteed ASCII)."""
+    return "rf-" + hashlib.sha1(contract_type.encode("utf-8")).hexdigest()[:16]
@@ -0,0 +1,130 @@
+"""Query router — one LLM call that analyzes a user turn.
+
+    intent:        create_contract | legal_question | other
+    contract_type: template slug (validated against the DB list) or None
+    category:      legal domain (validated against the known list) or None
+    primary/secondary: keyword-leg search terms for the retriever
+
+Replaces separate intent / contract-type / category / search-term calls on
+the chat path. Responses go through the LLM response cache, so a repeated
+question costs no round trip.
+"""
+
+import logging
+from typing import Optional
+
+from pydantic import BaseModel
+
+from legal_chatbot.utils.llm import acall_llm_json, call_llm_json
+
+logger = logging.getLogger(__name__)
+
+INTENTS = ("create_contract", "legal_question", "other")
+
+
+class QueryAnalysis(BaseModel):
+    """Router result for one user turn."""
+    intent: str = "other"
+    contract_type: Optional[str] = None
+    category: Optional[str] = None
+    primary: list[str] = []
+    secondary: list[str] = []
+
+    @property
+    def wants_contract(self) -> bool:
+        return self.intent == "create_contract"
+
+
+def build_router_prompt(contract_types: list[dict], categories: list[str]) -> str:
+    """System prompt with the compact output schema and the valid slugs/categories."""
+    type_lines = "\n".join(
+        f"- {t['type']}: {t['name']}" for t in contract_types
+    ) if contract_types else "(không có mẫu nào)"
+    category_list = ", ".join(categories) if categories else "(không có)"
+
+    return f"""Bạn phân tích câu hỏi cho hệ thống pháp luật Việt Nam. Trả về ĐÚNG 1 dòng JSON:
+{{"intent":"...","contract_type":null,"category":null,"primary":[],"secondary":[]}}
+
+intent:
+- "create_contract": người dùng muốn TẠO / SOẠN / LẬP / VIẾT / LÀM hợp đồng ("tạo hợp đồng", "soạn giúp tôi", "cần hợp đồng", "muốn hợp đồng")
+- "legal_question": hỏi về pháp luật
+- "other": chào hỏi, hỏi danh sách, hoặc không liên quan pháp luật
+
+contract_type: CHỈ khi intent="create_contract", chọn slug từ danh sách, null nếu không khớp CHÍNH XÁC nghĩa ("cho thuê xe" KHÔNG PHẢI "cho thuê nhà/đất"):
+{type_lines}
+
+category: lĩnh vực pháp luật chính, một trong: {category_list} — null nếu không xác định
+
+primary / secondary: cụm từ tìm kiếm (database dùng SQL ILIKE, cụm NGẮN tìm được nhiều hơn). CHỈ khi intent="legal_question", còn lại để [].
+- primary: 10-15 cụm CHUYÊN BIỆT (2-4 từ) trực tiếp giải quyết câu hỏi, gồm cả dạng 2 từ và dạng 3-4 từ; câu hỏi nhiều lĩnh vực thì MỖI lĩnh vực phải có từ khóa. Thủ tục được hỏi trực tiếp (sang tên, đăng ký, quy hoạch) là primary.
+- secondary: 3-5 cụm RỘNG (tên luật chung, khái niệm nền không được hỏi trực tiếp)
+
+Ví dụ: "Ông A chết không di chúc, vợ con tranh chấp thừa kế đất, thủ tục sang tên sổ đỏ"
+{{"intent":"legal_question","contract_type":null,"category":"dat_dai","primary":["thừa kế","di sản","hàng thừa kế","thừa kế theo pháp luật","chia di sản","di chúc","đăng ký biến động","sang tên","cấp giấy chứng nhận"],"secondary":["bộ luật dân sự","luật đất đai"]}}
+
+TUYỆT ĐỐI CHỈ trả về JSON, KHÔNG giải thích."""
+
+
+def _clean_terms(terms) -> list[str]:
+    if not isinstance(terms, list):
+        return []
+    return [t.lower().strip() for t in terms if isinstance(t, str) and len(t.strip()) > 1]
+
+
+def parse_analysis(
+    result, contract_types: list[dict], categories: list[str]
+) -> Optional[QueryAnalysis]:
+    """Validate the router JSON; unknown slugs/categories become None."""
+    if not isinstance(result, dict) or result.get("intent") not in INTENTS:
+        return None
+    valid_slugs = {t["type"] for t in contract_types}
+    contract_type = result.get("contract_type")
+    category = result.get("category")
+    return QueryAnalysis(
+        intent=result["intent"],
+        contract_type=contract_type if contract_type in valid_slugs else None,
+        category=category if category in categories else None,
+        primary=_clean_terms(result.get("primary")),
+        secondary=_clean_terms(result.get("secondary")),
+    )
+
+
+def _router_request(query: str, contract_types: list[dict], categories: list[str]) -> dict:
+    return {
+        "messages": [{"role": "user", "content": query}],
+        "system": build_router_prompt(contract_types, categories),
+        "temperature": 0.1,
+        "max_tokens": 500,
+        "cache": True,
+        "task": "classify",
+    }
+
+
+def analyze_query(
+    query: str, contract_types: list[dict] = (), categories: list[str] = ()
+) -> Optional[QueryAnalysis]:
+    """Analyze a user turn in one LLM call. None if the call or parse fails."""
+    contract_types, categories = list(contract_types), list(categories)
+    try:
+        result = call_llm_json(**_router_request(query, contract_types, categories))
+    except Exception as e:
+        logger.warning(f"Query router failed: {e}")
+        return None
+    analysis = parse_analysis(result, contract_types, categories)
+    logger.info(f"Query router: {analysis} for input: {query[:80]}")
+    return analysis
+
+
+async def aanalyze_query(
+    query: str, contract_types: list[dict] = (), categories: list[str] = ()
+) -> Optional[QueryAnalysis]:
+    """Async analyze_query."""
+    contract_types, categories = list(contract_types), list(categories)
+    try:
+        result = await acall_llm_json(**_router_request(query, contract_types, categories))
+    except Exception as e:
+        logger.warning(f"Query router failed: {e}")
+        return None
+    analysis = parse_analysis(result, contract_types, categories)
+    logger.info(f"Query router: {analysis} for input: {query[:80]}")
+    return analysis
@@ -4,8 +4,6 @@ import logging
 from typing import Optional
 from pydantic import BaseModel
 
-from legal_chatbot.utils.config import get_settings
-
 logger = logging.getLogger(__name__)
 
 
@@ -21,11 +19,13 @@ class ResearchResult(BaseModel):
 
 
 class ResearchService:
-    """DB-only research service — deep vector search, no LLM."""
+    """DB-only research service — deep hybrid search, no LLM."""
 
-    def __init__(self):
+    def __init__(self, api_mode: bool = False):
+        self.api_mode = api_mode
         self._db = None
         self._embedding = None
+        self._retriever = None
 
     @property
     def db(self):
@@ -43,39 +43,40 @@ class ResearchService:
             self._embedding = EmbeddingService()
         return self._embedding
 
+    @property
+    def retriever(self):
+        """Lazy-load hybrid retriever (keyword + vector)."""
+        if self._retriever is None:
+            from legal_chatbot.services.retriever import HybridRetriever
+            self._retriever = HybridRetriever(
+                db=self.db, embedding=self.embedding, api_mode=self.api_mode
+            )
+        return self._retriever
+
     async def research(self, query: str, max_sources: int = 20) -> ResearchResult:
         """Research a legal topic using DB-only deep search.
 
         Flow:
-        1. Vector search with top_k (deep)
+        1. Hybrid search (keyword + vector, RRF) with top_k (deep)
         2. Structure results by document
         3. Return raw articles for caller to analyze
 
-        No web crawling, no LLM — all data from Supabase pgvector.
+        No web crawling, no LLM — all data from the database
+        (Supabase keyword RPC + pgvector, or local BM25 + vector index).
         """
         result = ResearchResult(query=query)
 
-        settings = get_settings()
-        if settings.db_mode != "supabase":
-            result.analyzed_content = "Research requires db_mode=supabase."
-            result.has_data = False
-            return result
-
         # Get available categories for no-data response
         try:
             result.available_categories = self._get_available_categories()
         except Exception:
             pass
 
-        # Step 1: Deep vector search
+        # Step 1: Deep hybrid search
         try:
-            query_embedding = self.embedding.embed_single(query)
-            articles = self.db.search_articles(
-                query_embedding=query_embedding,
-                top_k=max_sources,
-            )
+            articles = await self.retriever.aretrieve(query, top_k=max_sources)
         except Exception as e:
-            logger.error(f"Vector search failed: {e}")
+            logger.error(f"Hybrid search failed: {e}")
             result.analyzed_content = f"Lỗi tìm kiếm: {e}"
             result.has_data = False
             return result
@@ -0,0 +1,362 @@
+"""Hybrid retriever — keyword + vector search fused with reciprocal-rank fusion.
+
+Both legs run concurrently, each with its own timeout: a slow or failing
+leg is dropped (logged) and the answer is built from the other one. A leg
+whose earlier calls are still stuck past their timeout, or that finds no
+free retriever worker, is skipped instead of queued.
+
+    keyword leg: db.keyword_search_articles (RPC / ILIKE / local BM25)
+    vector leg:  embed_single(query) → db.search_articles (pgvector / local index)
+    fusion:      score(d) = Σ 1 / (k + rank_leg(d)), normalized so best = 1.0
+    ranking:     diverse_rank (top-N by score + slots for unseen documents)
+"""
+
+import asyncio
+import importlib.util
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+from legal_chatbot.utils.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# Shared by all retrievers — legs are I/O bound (HTTP / SQLite / model encode).
+# A leg only starts when a worker is free (never queued), so legs abandoned
+# after their timeout can't hold back later requests' legs.
+LEG_WORKERS = 8
+_executor = ThreadPoolExecutor(max_workers=LEG_WORKERS, thread_name_prefix="retriever")
+_leg_slots = threading.BoundedSemaphore(LEG_WORKERS)
+
+# A leg is skipped while this many of its timed-out calls are still running
+MAX_ABANDONED_PER_LEG = 2
+_abandoned: dict[str, int] = {}
+_abandoned_lock = threading.Lock()
+
+# Vietnamese stop words — only filter STANDALONE n-grams, kept inside phrases
+STOP_WORDS = {
+    'là', 'gì', 'của', 'và', 'trong', 'cho', 'như', 'thế', 'nào',
+    'có', 'không', 'được', 'phải', 'cần', 'bao', 'nhiều', 'một',
+    'các', 'những', 'này', 'đó', 'khi', 'nếu', 'thì', 'sẽ', 'đã',
+    'đang', 'từ', 'đến', 'với', 'tại', 'về', 'theo', 'bằng',
+    'để', 'mà', 'hay', 'hoặc', 'vì', 'sao', 'tôi', 'bạn',
+}
+
+
+def build_search_terms(query: str) -> list[str]:
+    """Build Vietnamese n-gram search terms from query — NO LLM call.
+
+    Generates compound terms (2-4 words) that preserve Vietnamese
+    phrasing like "giấy chứng nhận", "quyền sử dụng đất", "không có giấy tờ".
+
+    Stop words are kept INSIDE n-grams (for accurate phrase matching)
+    but filtered as standalone search terms.
+    """
+    words = query.lower().split()
+    # Remove punctuation from words
+    words = [w.strip('.,?!;:()[]{}"\'-') for w in words if w.strip('.,?!;:()[]{}"\'-')]
+
+    if not words:
+        return []
+
+    # Build n-grams per length — ensure a MIX of term lengths
+    # Long queries would otherwise fill all slots with 4-grams,
+    # missing useful shorter terms like "thông báo", "thu hồi đất"
+    seen = set()
+    by_length: dict[int, list[str]] = {4: [], 3: [], 2: []}
+    for n in [4, 3, 2]:
+        for i in range(len(words) - n + 1):
+            gram = " ".join(words[i:i + n])
+            has_meaningful = any(w not in STOP_WORDS for w in words[i:i + n])
+            if has_meaningful and gram not in seen:
+                seen.add(gram)
+                by_length[n].append(gram)
+
+    # 3-grams = sweet spot (specific enough, good recall)
+    # Take ALL 3-grams, supplement with 2-grams and 4-grams
+    result = by_length[3] + by_length[2][:8] + by_length[4][:4]
+    return result[:20]
+
+
+def _article_key(article: dict):
+    """Identity across legs: article ID, else (article_number, document_title)."""
+    if article.get("id"):
+        return article["id"]
+    return (article.get("article_number"), article.get("document_title", ""))
+
+
+def rrf_fuse(legs: List[List[dict]], k: int = 60) -> list[dict]:
+    """Fuse ranked result lists with reciprocal-rank fusion.
+
+    Each input list must be ordered best-first. Returns merged article dicts
+    sorted by fused score (normalized to 0-1, best = 1.0). Fields from all
+    legs are merged, so a hit found by both keeps its similarity and
+    keyword_score.
+    """
+    fused: dict = {}
+    for leg in legs:
+        for rank, article in enumerate(leg, start=1):
+            key = _article_key(article)
+            entry = fused.get(key)
+            if entry is None:
+                entry = fused[key] = {**article, "score": 0.0}
+            else:
+                for field, value in article.items():
+                    if field != "score" and not entry.get(field):
+                        entry[field] = value
+            entry["score"] += 1.0 / (k + rank)
+
+    ranked = sorted(fused.values(), key=lambda a: a["score"], reverse=True)
+    if ranked:
+        best = ranked[0]["score"]
+        for article in ranked:
+            article["score"] = article["score"] / best
+    return ranked
+
+
+def diverse_rank(
+    articles: list[dict],
+    top_n: int = 25,
+    doc_title: Callable[[dict], str] = lambda a: a.get("document_title", ""),
+) -> list[dict]:
+    """Rank articles by score with document diversity.
+
+    Takes top 80% by score, then fills remaining slots with the
+    highest-scored articles from documents NOT yet represented.
+    This ensures multi-domain questions get coverage from all relevant laws.
+    """
+    by_score = sorted(articles, key=lambda x: x["score"], reverse=True)
+
+    main_n = max(top_n - 5, top_n * 4 // 5)  # 20 of 25
+    main = by_score[:main_n]
+
+    # Which documents are already represented?
+    seen_docs = set()
+    for item in main:
+        title = doc_title(item)
+        if title:
+            seen_docs.add(title)
+
+    # Find top articles from underrepresented documents
+    extra = []
+    for item in by_score[main_n:]:
+        if len(extra) >= top_n - main_n:
+            break
+        title = doc_title(item)
+        if title and title not in seen_docs and item["score"] > 0:
+            extra.append(item)
+            seen_docs.add(title)
+
+    # Fill remaining slots from next-best overall if diversity didn't use all
+    remaining = top_n - main_n - len(extra)
+    if remaining > 0:
+        used = set(id(x) for x in main + extra)
+        for item in by_score[main_n:]:
+            if id(item) not in used:
+                extra.append(item)
+                remaining -= 1
+                if remaining <= 0:
+                    break
+
+    return main + extra
+
+
+def _start_leg(name: str, fn: Callable, *args) -> Optional[Future]:
+    """Run a leg on a free retriever worker; None (leg skipped) if it can't start now."""
+    with _abandoned_lock:
+        stuck = _abandoned.get(name, 0)
+    if stuck >= MAX_ABANDONED_PER_LEG:
+        logger.warning(f"Retrieval {name} leg skipped: {stuck} earlier calls still running past their timeout")
+        return None
+    if not _leg_slots.acquire(blocking=False):
+        logger.warning(f"Retrieval {name} leg skipped: all {LEG_WORKERS} retriever workers busy")
+        return None
+    future = _executor.submit(fn, *args)
+    future.add_done_callback(lambda _: _leg_slots.release())
+    return future
+
+
+def _abandon_leg(name: str, future: Future) -> None:
+    """Count a timed-out leg as stuck until its worker actually finishes."""
+    with _abandoned_lock:
+        _abandoned[name] = _abandoned.get(name, 0) + 1
+
+    def finished(_):
+        with _abandoned_lock:
+            _abandoned[name] -= 1
+
+    future.add_done_callback(finished)
+
+
+def embedding_backend_available() -> bool:
+    """True if sentence-transformers is installed (False on serverless)."""
+    return importlib.util.find_spec("sentence_transformers") is not None
+
+
+def vector_keyword_only(settings, api_mode: bool = False) -> bool:
+    """RETRIEVAL_KEYWORD_ONLY; when unset, keyword-only only for API workers without a sidecar.
+
+    CLI chat, research and the pipeline keep the vector leg by default.
+    """
+    if settings.retrieval_keyword_only is None:
+        return api_mode and not settings.embedding_server_url
+    return settings.retrieval_keyword_only
+
+
+def warm_up_vector_leg() -> bool:
+    """Load the in-process embedding model if the vector leg will need it.
+
+    Called at API startup, so no request pays for the ~1.1 GB load (which
+    would otherwise run inside a leg timeout on the retriever pool).
+    """
+    settings = get_settings()
+    if vector_keyword_only(settings, api_mode=True) or settings.embedding_server_url or not embedding_backend_available():
+        return False
+    from legal_chatbot.services.embedding import EmbeddingService
+
+    EmbeddingService().get_model()
+    return True
+
+
+class HybridRetriever:
+    """Keyword + vector retrieval with RRF fusion and document diversity."""
+
+    def __init__(self, db=None, embedding=None, api_mode: bool = False):
+        settings = get_settings()
+        self._db = db
+        self._embedding = embedding
+        self.keyword_timeout = settings.retrieval_keyword_timeout
+        self.vector_timeout = settings.retrieval_vector_timeout
+        self.rrf_k = settings.retrieval_rrf_k
+        self.keyword_only = vector_keyword_only(settings, api_mode)
+
+    @property
+    def db(self):
+        """Lazy-load database client."""
+        if self._db is None:
+            from legal_chatbot.db.supabase import get_database
+            self._db = get_database()
+        return self._db
+
+    @property
+    def embedding(self):
+        """Lazy-load embedding service."""
+        if self._embedding is None:
+            from legal_chatbot.services.embedding import EmbeddingService
+            self._embedding = EmbeddingService()
+        return self._embedding
+
+    def vector_enabled(self) -> bool:
+        """Whether the vector leg runs for this call.
+
+        keyword_only=True: only if the model is already loaded (never
+        triggers the ~1.1 GB load). Always off when the backend is missing.
+        """
+        if self.embedding.is_loaded:
+            return True
+        if self.keyword_only:
+            return False
+        return embedding_backend_available()
+
+    def _keyword_leg(
+        self, primary_terms: list[str], secondary_terms: list[str], limit: int
+    ) -> list[dict]:
+        if not primary_terms and not secondary_terms:
+            return []
+        rows = self.db.keyword_search_articles(primary_terms, secondary_terms, limit=limit)
+        return [{**r, "keyword_score": r.get("score", 0)} for r in rows]
+
+    def _vector_leg(self, query: str, top_k: int) -> list[dict]:
+        query_embedding = self.embedding.embed_single(query)
+        return self.db.search_articles(query_embedding=query_embedding, top_k=top_k)
+
+    def _start_legs(
+        self,
+        query: str,
+        top_k: int,
+        primary_terms: Optional[list[str]],
+        secondary_terms: Optional[list[str]],
+    ) -> dict[str, tuple[Future, float]]:
+        """Start both legs; returns {leg: (future, timeout)} for those that started."""
+        if primary_terms is None and secondary_terms is None:
+            primary_terms = build_search_terms(query)
+        primary_terms = primary_terms or []
+        secondary_terms = secondary_terms or []
+
+        candidates = max(top_k * 2, 20)
+        legs = {
+            "keyword": (
+                _start_leg(
+                    "keyword", self._keyword_leg, primary_terms, secondary_terms, max(candidates, 100)
+                ),
+                self.keyword_timeout,
+            ),
+        }
+        if self.vector_enabled():
+            legs["vector"] = (
+                _start_leg("vector", self._vector_leg, query, candidates),
+                self.vector_timeout,
+            )
+        return {name: leg for name, leg in legs.items() if leg[0] is not None}
+
+    def _rank(self, legs: List[List[dict]], top_k: int, diverse: bool) -> list[dict]:
+        fused = rrf_fuse(legs, k=self.rrf_k)
+        if not diverse:
+            return fused[:top_k]
+        return diverse_rank(fused, top_n=top_k)
+
+    def retrieve(
+        self,
+        query: str,
+        top_k: int = 25,
+        primary_terms: Optional[list[str]] = None,
+        secondary_terms: Optional[list[str]] = None,
+        diverse: bool = True,
+    ) -> list[dict]:
+        """Run both legs concurrently and return the fused, diversity-ranked top_k.
+
+        primary_terms/secondary_terms feed the keyword leg (e.g. LLM-extracted);
+        when both are omitted, n-gram terms are built from the query.
+        """
+        started = time.monotonic()
+        legs = []
+        for name, (future, timeout) in self._start_legs(
+            query, top_k, primary_terms, secondary_terms
+        ).items():
+            remaining = max(timeout - (time.monotonic() - started), 0)
+            try:
+                legs.append(future.result(timeout=remaining))
+            except TimeoutError:
+                _abandon_leg(name, future)
+                logger.warning(f"Retrieval {name} leg timed out after {timeout}s, skipping")
+            except Exception as e:
+                logger.warning(f"Retrieval {name} leg failed: {e}")
+        return self._rank(legs, top_k, diverse)
+
+    async def aretrieve(
+        self,
+        query: str,
+        top_k: int = 25,
+        primary_terms: Optional[list[str]] = None,
+        secondary_terms: Optional[list[str]] = None,
+        diverse: bool = True,
+    ) -> list[dict]:
+        """Async retrieve(): awaits the legs without holding a blocking-pool thread."""
+
+        async def wait(name: str, future: Future, timeout: float) -> Optional[list[dict]]:
+            try:
+                return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+            except TimeoutError:
+                _abandon_leg(name, future)
+                logger.warning(f"Retrieval {name} leg timed out after {timeout}s, skipping")
+            except Exception as e:
+                logger.warning(f"Retrieval {name} leg failed: {e}")
+            return None
+
+        started = self._start_legs(query, top_k, primary_terms, secondary_terms)
+        results = await asyncio.gather(
+            *(wait(name, future, timeout) for name, (future, timeout) in started.items())
+        )
+        return self._rank([r for r in results if r is not None], top_k, diverse)
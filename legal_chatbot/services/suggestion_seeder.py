@@ -1,14 +1,16 @@
 """Suggestion Seeder — generates sample data and article templates for contract fields using LLM.
 
 Generates once and saves to DB so contract creation doesn't need LLM calls.
+seed_all / seed_all_articles submit every template's prompts as one batch job
+(see services/llm_batch.py) and write each template as soon as its results are in.
 """
 
-import json
+import hashlib
 import logging
 from typing import Optional
 
 from legal_chatbot.db.supabase import SupabaseClient
-from legal_chatbot.utils.llm import call_llm_json, call_llm_sonnet
+from legal_chatbot.utils.llm import call_llm_json, call_llm_sonnet, parse_llm_json
 
 logger = logging.getLogger(__name__)
 
@@ -55,25 +57,70 @@ class SuggestionSeeder:
 
         Returns list of {contract_type, display_name, status, field_count}.
         """
+        from legal_chatbot.services.llm_batch import LLMBatch
+
         if force:
             templates = self.db.list_all_active_templates()
         else:
             templates = self.db.get_templates_needing_seed()
 
-        results = []
+        batch = LLMBatch("sample_data")
+        chunks = {}  # custom_id -> (contract_type, fields in that chunk)
+        pending = {}  # contract_type -> chunks not yet answered
         for t in templates:
             ct = t["contract_type"]
-            display = t["display_name"]
-            sample = self.seed_template(ct, force=force)
+            template = self._template_to_seed(ct, "sample_data", force)
+            if not template:
+                continue
+            fields = template["required_fields"]["fields"]
+            display_name = t.get("display_name", ct)
+            for i in range(0, len(fields), self.BATCH_SIZE):
+                chunk = fields[i : i + self.BATCH_SIZE]
+                custom_id = _custom_id("sd", f"{ct}:{i}")
+                system, messages = self._sample_data_prompt(display_name, chunk)
+                batch.add(custom_id, messages, system=system, temperature=0.3, max_tokens=4000, task="generate_json")
+                chunks[custom_id] = (ct, chunk)
+                pending[ct] = pending.get(ct, 0) + 1
+
+        def validate(result):
+            return self._validate_sample_data(chunks[result.custom_id][1], result.parsed())
+
+        seeded = {}
+        for result in batch.run(validate):
+            ct = chunks[result.custom_id][0]
+            if result.ok:
+                seeded.setdefault(ct, {}).update(result.value)
+            pending[ct] -= 1
+            if pending[ct] == 0 and seeded.get(ct):
+                self.db.update_template_sample_data(ct, seeded[ct])
+                logger.info(f"Seeded {len(seeded[ct])} fields for {ct}")
+
+        results = []
+        for t in templates:
+            sample = seeded.get(t["contract_type"])
             results.append({
-                "contract_type": ct,
-                "display_name": display,
+                "contract_type": t["contract_type"],
+                "display_name": t["display_name"],
                 "status": "seeded" if sample else "skipped",
                 "field_count": len(sample) if sample else 0,
             })
 
         return results
 
+    def _template_to_seed(self, contract_type: str, column: str, force: bool) -> Optional[dict]:
+        """The full template if `column` still needs seeding and it has fields, else None."""
+        template = self.db.get_contract_template(contract_type)
+        if not template:
+            logger.warning(f"Template not found: {contract_type}")
+            return None
+        if template.get(column) and not force:
+            logger.info(f"Skipping {contract_type} — already has {column.replace('_', ' ')}")
+            return None
+        if not (template.get("required_fields") or {}).get("fields"):
+            logger.warning(f"Template {contract_type} has no fields defined")
+            return None
+        return template
+
     def get_status(self) -> list[dict]:
         """Return status of all templates (has sample_data or not)."""
         all_templates = self.db.list_all_active_templates()
@@ -108,6 +155,12 @@ class SuggestionSeeder:
 
     def _generate_batch(self, display_name: str, fields: list[dict]) -> Optional[dict]:
         """Generate sample data for a batch of fields."""
+        system, messages = self._sample_data_prompt(display_name, fields)
+        result = call_llm_json(messages, temperature=0.3, max_tokens=4000, system=system, task="generate_json")
+        return self._validate_sample_data(fields, result)
+
+    def _sample_data_prompt(self, display_name: str, fields: list[dict]) -> tuple[str, list[dict]]:
+        """(system, messages) asking for sample data of the given fields."""
         field_list = "\n".join(
             f"- {f['name']} ({f.get('label', f['name'])}): loại {f.get('field_type', 'text')}"
             for f in fields
@@ -140,9 +193,11 @@ Lưu ý:
         messages = [
             {"role": "user", "content": f"Tạo dữ liệu mẫu cho các field sau:\n{field_list}"}
         ]
+        return system, messages
 
-        result = call_llm_json(messages, temperature=0.3, max_tokens=4000, system=system)
-
+    @staticmethod
+    def _validate_sample_data(fields: list[dict], result) -> Optional[dict]:
+        """Keep well-formed entries for the requested fields."""
         if not isinstance(result, dict):
             return None
 
@@ -202,19 +257,49 @@ Lưu ý:
 
         Returns list of {contract_type, display_name, status, article_count}.
         """
+        from legal_chatbot.services.llm_batch import LLMBatch
+
         if force:
             templates = self.db.list_all_active_templates()
         else:
             templates = self.db.get_templates_needing_articles()
 
-        results = []
+        batch = LLMBatch("default_articles")
+        ids = {}  # custom_id -> contract_type
         for t in templates:
             ct = t["contract_type"]
-            display = t["display_name"]
-            articles = self.seed_articles(ct, force=force)
+            template = self._template_to_seed(ct, "default_articles", force)
+            if not template:
+                continue
+            messages = self._articles_prompt(
+                t.get("display_name", ct),
+                template["required_fields"]["fields"],
+                template.get("cached_articles") or [],
+            )
+            custom_id = _custom_id("art", ct)
+            batch.add(
+                custom_id, messages, temperature=0.3, max_tokens=6000,
+                task="contract_articles", use_sonnet=True,
+            )
+            ids[custom_id] = ct
+
+        seeded = {}
+        for result in batch.run(lambda r: self._validate_articles(r.text)):
+            ct = ids[result.custom_id]
+            articles = result.value
+            if articles:
+                self.db.update_template_default_articles(ct, articles)
+                logger.info(f"Seeded {len(articles)} article templates for {ct}")
+                seeded[ct] = articles
+            else:
+                logger.warning(f"LLM failed to generate article templates for {ct}")
+
+        results = []
+        for t in templates:
+            articles = seeded.get(t["contract_type"])
             results.append({
-                "contract_type": ct,
-                "display_name": display,
+                "contract_type": t["contract_type"],
+                "display_name": t["display_name"],
                 "status": "seeded" if articles else "skipped",
                 "article_count": len(articles) if articles else 0,
             })
@@ -244,6 +329,18 @@ Lưu ý:
 
         Placeholders use {field_name} syntax matching the template's field names.
         """
+        messages = self._articles_prompt(display_name, fields, cached_articles)
+        try:
+            result = call_llm_sonnet(messages, temperature=0.3, max_tokens=6000, task="contract_articles")
+            return self._validate_articles(result)
+        except Exception as e:
+            logger.error(f"Error generating article templates: {e}")
+        return None
+
+    def _articles_prompt(
+        self, display_name: str, fields: list[dict], cached_articles: list[dict]
+    ) -> list[dict]:
+        """Messages asking for 9 article templates with field placeholders."""
         # Build field info for LLM
         field_info = "\n".join(
             f"- {{{f['name']}}}: {f.get('label', f['name'])} (loại: {f.get('field_type', 'text')})"
@@ -296,28 +393,20 @@ LƯU Ý:
 
 Trả về JSON array (9 articles với placeholders). CHỈ JSON, không có text giải thích."""
 
-        try:
-            result = call_llm_sonnet(
-                [
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_prompt},
-                ],
-                temperature=0.3,
-                max_tokens=6000,
-            )
-
-            # Parse JSON from response
-            result = result.strip()
-            if result.startswith("```"):
-                result = result.split("```")[1]
-                if result.startswith("json"):
-                    result = result[4:]
-                result = result.strip()
-
-            articles = json.loads(result)
-            if isinstance(articles, list) and len(articles) >= 5:
-                return articles
-        except Exception as e:
-            logger.error(f"Error generating article templates: {e}")
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
 
+    @staticmethod
+    def _validate_articles(text: str) -> Optional[list]:
+        """Parse the reply; at least 5 articles or None."""
+        articles = parse_llm_json(text)
+        if isinstance(articles, list) and len(articles) >= 5:
+            return articles
         return None
+
+
+def _custom_id(prefix: str, key: str) -> str:
+    """Stable batch custom_id for a template (contract types aren't always ASCII)."""
+    return f"{prefix}-{hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]}"
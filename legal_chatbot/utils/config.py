@@ -15,6 +15,9 @@ class Settings(BaseSettings):
 
     # Anthropic API key (required for LLM)
     anthropic_api_key: Optional[str] = Field(default=None, description="Anthropic API key for Claude")
+    anthropic_base_url: Optional[str] = Field(
+        default=None, description="Override the Anthropic API URL (e.g. the local fake-llm-server)"
+    )
 
     database_path: str = Field(default="./data/legal.db", description="Path to SQLite database")
     chroma_path: str = Field(default="./data/chroma", description="Path to ChromaDB storage")
@@ -24,6 +27,74 @@ class Settings(BaseSettings):
     llm_model: str = Field(default="claude-sonnet-4-20250514", description="LLM model to use")
     llm_temperature: float = Field(default=0.3, description="LLM temperature")
     llm_max_tokens: int = Field(default=4096, description="Max tokens in response")
+    llm_prompt_cache: bool = Field(
+        default=True,
+        description="Mark static system prompts / retrieved law as Anthropic prompt-cache prefixes",
+    )
+    llm_cache_size: int = Field(default=1024, description="Cached LLM responses kept in memory (0 = off)")
+    llm_cache_path: Optional[str] = Field(
+        default=None, description="SQLite file persisting cached LLM responses across restarts"
+    )
+    llm_cache_ttl: float = Field(default=86400.0, description="Seconds a cached LLM response stays valid")
+    blocking_pool_size: int = Field(
+        default=32, description="Threads for sync DB/SDK calls offloaded from async handlers"
+    )
+    singleflight_enabled: bool = Field(
+        default=True, description="Share one execution among concurrent identical LLM calls / DB reads"
+    )
+    llm_max_concurrency: int = Field(default=16, description="In-flight LLM requests per model")
+    llm_model_concurrency: dict[str, int] = Field(
+        default_factory=dict, description='Per-model overrides, e.g. {"claude-sonnet-4-20250514": 8}'
+    )
+    llm_max_retries: int = Field(default=3, description="Retries on 429/529/5xx/connection errors")
+    llm_retry_base_delay: float = Field(default=0.5, description="Backoff base (seconds, full jitter)")
+    llm_retry_max_delay: float = Field(default=20.0, description="Cap on one backoff/throttle wait (seconds)")
+    llm_hedge_after: float = Field(
+        default=3.0, description="Seconds before a short async call is hedged with a duplicate (0 = off)"
+    )
+    llm_hedge_max_tokens: int = Field(default=600, description="Only calls with max_tokens <= this are hedged")
+    llm_routes: dict[str, str] = Field(
+        default_factory=lambda: {
+            "classify": "claude-3-5-haiku-20241022",
+            "extract_terms": "claude-3-5-haiku-20241022",
+            "generate_json": "claude-sonnet-4-20250514",
+            "answer": "claude-sonnet-4-20250514",
+            "contract_articles": "claude-sonnet-4-20250514",
+        },
+        description="Model per task class (Sonnet entries use DeepSeek for *_sonnet / use_sonnet calls when DEEPSEEK_API_KEY is set)",
+    )
+    llm_route_budgets: dict[str, float] = Field(
+        default_factory=lambda: {
+            "classify": 5.0,
+            "extract_terms": 8.0,
+            "generate_json": 60.0,
+        },
+        description="Max seconds per task class for short calls (missing/0 = no limit, as for long answers)",
+    )
+    llm_escalation_model: Optional[str] = Field(
+        default="claude-sonnet-4-20250514",
+        description="Model a JSON call is retried on when the routed model's reply doesn't parse",
+    )
+    llm_trace_path: Optional[str] = Field(
+        default=None, description="Append one JSONL record per LLM call here (read by llm-stats)"
+    )
+    llm_prices: dict[str, dict[str, float]] = Field(
+        default_factory=lambda: {
+            "claude-sonnet-4-20250514": {"input": 3.0, "output": 15.0, "cache_read": 0.3, "cache_write": 3.75},
+            "claude-3-5-haiku-20241022": {"input": 0.8, "output": 4.0, "cache_read": 0.08, "cache_write": 1.0},
+            "deepseek-chat": {"input": 0.27, "output": 1.1, "cache_read": 0.07, "cache_write": 0.0},
+        },
+        description="USD per million tokens by model, for LLM cost metrics",
+    )
+    llm_batch_backend: str = Field(
+        default="concurrent",
+        description="Pipeline batch jobs: 'concurrent' (thread pool), 'anthropic' (Message Batches API) or 'local'",
+    )
+    llm_batch_concurrency: int = Field(default=8, description="Worker threads for the concurrent batch backend")
+    llm_batch_poll_interval: float = Field(default=30.0, description="Seconds between batch status polls")
+    llm_batch_dir: str = Field(
+        default="./data/llm_batches", description="Journals of finished batch results, for resuming jobs"
+    )
 
     # Search settings
     search_top_k: int = Field(default=5, description="Number of results for semantic search")
@@ -35,11 +106,23 @@ class Settings(BaseSettings):
     supabase_url: Optional[str] = Field(default=None, description="Supabase project URL")
     supabase_key: Optional[str] = Field(default=None, description="Supabase anon key")
     supabase_service_key: Optional[str] = Field(default=None, description="Supabase service role key")
+    supabase_db_url: Optional[str] = Field(
+        default=None,
+        description="Direct Postgres URI; when set, article upserts use binary COPY instead of REST",
+    )
 
     # Pipeline settings
     pipeline_crawl_interval: int = Field(default=168, description="Crawl interval in hours")
-    pipeline_rate_limit: float = Field(default=4.0, description="Seconds between crawl requests")
+    pipeline_rate_limit: float = Field(default=4.0, description="Seconds between crawl requests to one host")
     pipeline_max_pages: int = Field(default=20, description="Max pages per crawl session")
+    pipeline_crawl_contexts: int = Field(default=3, description="Browser contexts kept open for a crawl run")
+    pipeline_crawl_per_host: int = Field(default=3, description="Pages loading at once from one host")
+    pipeline_crawl_jitter: float = Field(
+        default=2.0, description="Random extra seconds (0..N) added to PIPELINE_RATE_LIMIT between page starts"
+    )
+    pipeline_page_wait: float = Field(
+        default=5.0, description="Seconds (x1-2, random) a loaded page is left to clear the Cloudflare check"
+    )
 
     # Embedding settings
     embedding_model: str = Field(
@@ -47,6 +130,41 @@ class Settings(BaseSettings):
         description="Sentence transformer model for embeddings",
     )
     embedding_dimension: int = Field(default=768, description="Embedding vector dimension")
+    embedding_max_tokens: int = Field(default=256, description="Model max sequence length incl. special tokens (chunk size)")
+    embedding_chunk_overlap: int = Field(default=32, description="Tokens repeated from the previous chunk when splitting")
+    embedding_backend: str = Field(
+        default="torch",
+        description="Embedding runtime: 'torch', 'onnx' (fp32) or 'onnx-int8' (onnxruntime)",
+    )
+    embedding_onnx_path: str = Field(default="./data/onnx", description="Directory of the exported ONNX model")
+    embedding_server_url: Optional[str] = Field(
+        default=None,
+        description="Embedding sidecar URL (http://host:port or unix:///path.sock); unset = load model in-process",
+    )
+    embedding_server_max_batch: int = Field(default=64, description="Sidecar: max texts per forward pass")
+    embedding_server_max_wait_ms: float = Field(default=5.0, description="Sidecar: batching window in ms")
+    embedding_cache_size: int = Field(default=2048, description="Query embeddings kept in memory (0 = off)")
+    embedding_cache_path: Optional[str] = Field(
+        default=None,
+        description="SQLite file for the persistent query-embedding cache (unset = memory only)",
+    )
+
+    # Local vector index (SQLite mode)
+    vector_store_path: str = Field(default="./data/vectors", description="Path to local vector index (SQLite mode)")
+    vector_store_hnsw: bool = Field(default=False, description="Use HNSW graph (hnswlib) instead of brute-force search")
+
+    # Hybrid retrieval (keyword + vector, reciprocal-rank fusion)
+    retrieval_keyword_timeout: float = Field(default=5.0, description="Seconds to wait for the keyword leg")
+    retrieval_vector_timeout: float = Field(default=5.0, description="Seconds to wait for the vector leg")
+    retrieval_rrf_k: int = Field(default=60, description="Reciprocal-rank fusion constant k")
+    retrieval_keyword_only: Optional[bool] = Field(
+        default=None,
+        description=(
+            "Skip the vector leg unless the embedding model is already loaded; "
+            "unset = keyword-only for API workers unless EMBEDDING_SERVER_URL is set, "
+            "vector leg on for CLI chat and research"
+        ),
+    )
 
     # Worker settings
     worker_enabled: bool = Field(default=False, description="Enable background worker")
@@ -58,6 +176,7 @@ class Settings(BaseSettings):
     # DeepSeek settings (optional — for chat)
     deepseek_api_key: Optional[str] = Field(default=None, description="DeepSeek API key")
     deepseek_model: str = Field(default="deepseek-chat", description="DeepSeek model name")
+    deepseek_base_url: str = Field(default="https://api.deepseek.com", description="DeepSeek API URL")
 
     # Chat mode
     chat_mode: str = Field(default="db_only", description="Chat mode: db_only")
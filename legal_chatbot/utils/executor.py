@@ -0,0 +1,40 @@
+"""Bounded thread pool for blocking calls made from async code.
+
+FastAPI handlers and InteractiveChatService share one event loop per worker.
+Sync SDK calls (supabase-py, PDF generation, long LLM generations that are
+still sync) go through run_blocking(): a slow call then holds one pool
+thread instead of the loop, and BLOCKING_POOL_SIZE caps how many run at once.
+"""
+
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+from legal_chatbot.utils.config import get_settings
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_blocking_executor() -> ThreadPoolExecutor:
+    """Get or create the process-wide blocking-call pool."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=get_settings().blocking_pool_size,
+                thread_name_prefix="blocking",
+            )
+        return _executor
+
+
+async def run_blocking(fn: Callable[..., T], /, *args, **kwargs) -> T:
+    """Run fn(*args, **kwargs) on the bounded pool (context vars preserved)."""
+    loop = asyncio.get_running_loop()
+    call = functools.partial(contextvars.copy_context().run, fn, *args, **kwargs)
+    return await loop.run_in_executor(get_blocking_executor(), call)
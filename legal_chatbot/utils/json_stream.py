@@ -0,0 +1,84 @@
+"""Incremental parser for a JSON array arriving in streamed text chunks.
+
+    parser = JsonArrayStream()
+    for chunk in call_llm_stream(...):
+        for item in parser.feed(chunk):
+            ...  # each top-level element as soon as it is complete
+
+An object or array element is emitted on its closing '}' / ']'; a scalar
+element on the ',' or ']' that ends it.
+
+Anything before the opening '[' (a ```json fence, a stray sentence) and
+after the closing ']' is ignored. Elements that don't parse are skipped
+and counted in .skipped.
+"""
+
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class JsonArrayStream:
+    """Yields complete top-level elements of a streamed JSON array."""
+
+    def __init__(self):
+        self.started = False
+        self.done = False
+        self.skipped = 0
+        self._element: list[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, text: str) -> list:
+        """Consume a chunk; returns the elements completed by it."""
+        items = []
+        for ch in text:
+            if self.done:
+                break
+            if not self.started:
+                if ch == "[":
+                    self.started = True
+                    self._depth = 1
+                continue
+            if self._in_string:
+                self._element.append(ch)
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+            if ch == '"':
+                self._in_string = True
+            elif ch in "[{":
+                self._depth += 1
+            elif ch in "]}":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._flush(items)
+                    self.done = True
+                    continue
+                if self._depth == 1:
+                    # A container element just closed: don't wait for the ','
+                    self._element.append(ch)
+                    self._flush(items)
+                    continue
+            elif ch == "," and self._depth == 1:
+                self._flush(items)
+                continue
+            self._element.append(ch)
+        return items
+
+    def _flush(self, items: list) -> None:
+        raw = "".join(self._element).strip()
+        self._element = []
+        if not raw:
+            return
+        try:
+            items.append(json.loads(raw))
+        except json.JSONDecodeError:
+            self.skipped += 1
+            logger.debug(f"Skipping unparseable streamed JSON element: {raw[:200]}")
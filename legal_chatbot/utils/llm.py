@@ -1,15 +1,38 @@
 """Shared LLM client — single source of truth for all LLM calls.
 
 Supports Anthropic (default) and DeepSeek (OpenAI-compatible) for chat.
+
+Model routing: callers name a task class (task="classify", "extract_terms",
+"generate_json", "answer", "contract_articles") and LLM_ROUTES maps it to a
+model, so short classification calls run on a small model while answers
+stay on Sonnet (or DeepSeek when configured). LLM_ROUTE_BUDGETS caps each
+task's latency, and JSON calls whose reply doesn't parse are retried once
+on LLM_ESCALATION_MODEL.
+
+Prompt caching: `system` and message `content` may be a string or a list of
+Anthropic text blocks; blocks built with cache_block() end a cacheable
+prefix (cache_control breakpoint, max 4 per request). DeepSeek caches
+prefixes automatically, so blocks are flattened to plain text there.
+
+Every request goes through the shared scheduler (utils/llm_scheduler.py):
+per-model concurrency caps, rate-limit budget, retries and hedging. Each
+call is also recorded by utils/llm_metrics.py (latency, TTFT, tokens, cost)
+under its call site: caller="..." on any entry point, otherwise the
+'module.function' that called it.
 """
 
+import asyncio
 import json
 import logging
-from typing import Optional
+from typing import Callable, Optional
 
 from anthropic import Anthropic, AsyncAnthropic
 
 from legal_chatbot.utils.config import get_settings
+from legal_chatbot.utils.executor import run_blocking
+from legal_chatbot.utils.json_stream import JsonArrayStream
+from legal_chatbot.utils.llm_metrics import get_llm_metrics
+from legal_chatbot.utils.llm_scheduler import call_site, get_llm_scheduler
 
 logger = logging.getLogger(__name__)
 
@@ -32,7 +55,12 @@ def get_client() -> Anthropic:
             raise RuntimeError(
                 "ANTHROPIC_API_KEY not set. Add it to your .env file."
             )
-        _client = Anthropic(api_key=settings.anthropic_api_key)
+        # Retries are done by the scheduler, not the SDK
+        _client = Anthropic(
+            api_key=settings.anthropic_api_key,
+            base_url=settings.anthropic_base_url,
+            max_retries=0,
+        )
     return _client
 
 
@@ -45,7 +73,11 @@ def get_async_client() -> AsyncAnthropic:
             raise RuntimeError(
                 "ANTHROPIC_API_KEY not set. Add it to your .env file."
             )
-        _async_client = AsyncAnthropic(api_key=settings.anthropic_api_key)
+        _async_client = AsyncAnthropic(
+            api_key=settings.anthropic_api_key,
+            base_url=settings.anthropic_base_url,
+            max_retries=0,
+        )
     return _async_client
 
 
@@ -63,7 +95,8 @@ def _get_deepseek_client():
         settings = get_settings()
         _deepseek_client = OpenAI(
             api_key=settings.deepseek_api_key,
-            base_url="https://api.deepseek.com",
+            base_url=settings.deepseek_base_url,
+            max_retries=0,
         )
     return _deepseek_client
 
@@ -76,12 +109,49 @@ def _get_deepseek_async_client():
         settings = get_settings()
         _deepseek_async_client = AsyncOpenAI(
             api_key=settings.deepseek_api_key,
-            base_url="https://api.deepseek.com",
+            base_url=settings.deepseek_base_url,
+            max_retries=0,
         )
     return _deepseek_async_client
 
 
-def _build_oai_messages(messages: list[dict], system: str) -> list[dict]:
+def cache_block(text: str) -> dict:
+    """Text block that ends a cacheable prompt prefix (Anthropic prompt caching).
+
+    Everything up to and including this block is cached for ~5 minutes;
+    prefixes under the model minimum (1024 tokens for Sonnet) are simply
+    not cached. LLM_PROMPT_CACHE=false sends a plain block instead.
+    """
+    block = {"type": "text", "text": text}
+    if get_settings().llm_prompt_cache:
+        block["cache_control"] = {"type": "ephemeral"}
+    return block
+
+
+def _flatten_content(content) -> str:
+    """Plain text of a string or a list of text blocks."""
+    if isinstance(content, str):
+        return content
+    return "\n\n".join(block.get("text", "") for block in content)
+
+
+def _log_usage(model: str, usage) -> None:
+    """Log prompt-cache hit/miss tokens from an Anthropic response."""
+    if usage is None:
+        return
+    cache_read = getattr(usage, "cache_read_input_tokens", 0) or 0
+    cache_write = getattr(usage, "cache_creation_input_tokens", 0) or 0
+    message = (
+        f"LLM usage {model}: input={usage.input_tokens} cache_read={cache_read} "
+        f"cache_write={cache_write} output={usage.output_tokens}"
+    )
+    if cache_read or cache_write:
+        logger.info(message)
+    else:
+        logger.debug(message)
+
+
+def _build_oai_messages(messages: list[dict], system) -> list[dict]:
     """Convert Anthropic-style messages to OpenAI format (system as first message)."""
     oai_msgs = []
     if not system:
@@ -93,26 +163,159 @@ def _build_oai_messages(messages: list[dict], system: str) -> list[dict]:
     else:
         oai_msgs = [m for m in messages if m["role"] != "system"]
 
+    oai_msgs = [
+        {**m, "content": _flatten_content(m["content"])} for m in oai_msgs
+    ]
     if system:
-        oai_msgs.insert(0, {"role": "system", "content": system})
+        oai_msgs.insert(0, {"role": "system", "content": _flatten_content(system)})
     if not oai_msgs:
         oai_msgs = [{"role": "user", "content": ""}]
     return oai_msgs
 
 
+def _estimate_tokens(kwargs: dict) -> int:
+    """Rough input-token count for the rate budget (~3 chars/token for Vietnamese)."""
+    text = json.dumps(
+        [kwargs.get("system", ""), kwargs.get("messages", [])], ensure_ascii=False, default=str
+    )
+    return len(text) // 3
+
+
+def _create_message(kwargs: dict, caller: str = None, budget: float = 0):
+    """messages.create via the scheduler; rate-limit headers refill its budget.
+
+    budget > 0 is the per-attempt request timeout (sync calls can't be
+    cancelled mid-flight).
+    """
+    scheduler = get_llm_scheduler()
+    options = {"timeout": budget} if budget else {}
+
+    def request():
+        raw = get_client().messages.with_raw_response.create(**kwargs, **options)
+        scheduler.observe(kwargs["model"], raw.headers)
+        return raw.parse()
+
+    with get_llm_metrics().track(caller, kwargs["model"]) as call:
+        response = scheduler.run(kwargs["model"], request, cost=_estimate_tokens(kwargs), site=call.site)
+        call.usage = response.usage
+    _log_usage(kwargs["model"], response.usage)
+    return response
+
+
+async def _acreate_message(kwargs: dict, caller: str = None, budget: float = 0):
+    """Async _create_message (short requests are hedged).
+
+    budget > 0 is a deadline for the whole call, queueing and retries
+    included, so it only suits short replies; generation-heavy routes
+    (answer, contract_articles) have no budget by default.
+    """
+    scheduler = get_llm_scheduler()
+
+    async def request():
+        raw = await get_async_client().messages.with_raw_response.create(**kwargs)
+        scheduler.observe(kwargs["model"], raw.headers)
+        return raw.parse()
+
+    with get_llm_metrics().track(caller, kwargs["model"]) as call:
+        async with asyncio.timeout(budget or None):
+            response = await scheduler.arun(
+                kwargs["model"], request, cost=_estimate_tokens(kwargs),
+                max_tokens=kwargs["max_tokens"], site=call.site,
+            )
+        call.usage = response.usage
+    _log_usage(kwargs["model"], response.usage)
+    return response
+
+
+def _create_completion(kwargs: dict, caller: str = None, budget: float = 0) -> str:
+    """DeepSeek chat.completions.create via the scheduler."""
+    scheduler = get_llm_scheduler()
+    options = {"timeout": budget} if budget else {}
+
+    def request():
+        raw = _get_deepseek_client().chat.completions.with_raw_response.create(**kwargs, **options)
+        scheduler.observe(kwargs["model"], raw.headers)
+        return raw.parse()
+
+    with get_llm_metrics().track(caller, kwargs["model"]) as call:
+        response = scheduler.run(kwargs["model"], request, cost=_estimate_tokens(kwargs), site=call.site)
+        call.usage = response.usage
+    return response.choices[0].message.content or ""
+
+
+async def _acreate_completion(kwargs: dict, caller: str = None, budget: float = 0) -> str:
+    """Async _create_completion."""
+    scheduler = get_llm_scheduler()
+
+    async def request():
+        raw = await _get_deepseek_async_client().chat.completions.with_raw_response.create(**kwargs)
+        scheduler.observe(kwargs["model"], raw.headers)
+        return raw.parse()
+
+    with get_llm_metrics().track(caller, kwargs["model"]) as call:
+        async with asyncio.timeout(budget or None):
+            response = await scheduler.arun(
+                kwargs["model"], request, cost=_estimate_tokens(kwargs),
+                max_tokens=kwargs["max_tokens"], site=call.site,
+            )
+        call.usage = response.usage
+    return response.choices[0].message.content or ""
+
+
 def get_model() -> str:
     """Get configured model name."""
     return get_settings().llm_model
 
 
-def _prepare_kwargs(
+def route_model(task: Optional[str], sonnet_tier: bool = False) -> str:
+    """Model for a task class (LLM_ROUTES); no task = LLM_MODEL.
+
+    sonnet_tier=True (the *_sonnet entry points and use_sonnet JSON calls):
+    a Sonnet route goes to DeepSeek when DEEPSEEK_API_KEY is set. Every
+    other call stays on Anthropic.
+    """
+    settings = get_settings()
+    model = settings.llm_routes.get(task, settings.llm_model) if task else settings.llm_model
+    return _swap_deepseek(model) if sonnet_tier else model
+
+
+def route_budget(task: Optional[str]) -> float:
+    """Latency budget in seconds for a task class (0 = none)."""
+    return get_settings().llm_route_budgets.get(task, 0.0) if task else 0.0
+
+
+def _swap_deepseek(model: str) -> str:
+    if model == SONNET_MODEL and _use_deepseek():
+        return get_settings().deepseek_model
+    return model
+
+
+def is_deepseek(model: str) -> bool:
+    return model.startswith("deepseek")
+
+
+def escalation_model(model: str, sonnet_tier: bool = False) -> Optional[str]:
+    """Stronger model to retry a failed JSON call on (None if already on it)."""
+    stronger = get_settings().llm_escalation_model
+    if not stronger:
+        return None
+    if sonnet_tier:
+        stronger = _swap_deepseek(stronger)
+    return None if stronger == model else stronger
+
+
+def prepare_kwargs(
     messages: list[dict],
     model: str,
     temperature: float,
     max_tokens: int,
-    system: str,
+    system: str | list[dict],
 ) -> dict:
-    """Build kwargs dict for Anthropic Messages API (shared by all call_llm variants)."""
+    """Build kwargs dict for Anthropic Messages API (shared by all call_llm variants).
+
+    system / message content may be block lists carrying cache_control
+    (see cache_block); they are passed through unchanged.
+    """
     if not system:
         user_messages = []
         for msg in messages:
@@ -138,114 +341,341 @@ def _prepare_kwargs(
     return kwargs
 
 
+def _prepare_deepseek_kwargs(
+    messages: list[dict],
+    model: str,
+    temperature: float,
+    max_tokens: int,
+    system: str | list[dict],
+) -> dict:
+    """Build kwargs for DeepSeek chat.completions (OpenAI format)."""
+    return {
+        "model": model,
+        "messages": _build_oai_messages(messages, system),
+        # Lower temperature for DeepSeek to reduce hallucination
+        "temperature": min(temperature, 0.1),
+        "max_tokens": max_tokens,
+    }
+
+
+def _cached(cache: bool, request: dict, call, accept: Callable[[str], bool] = bool) -> str:
+    """Serve call() from the LLM response cache when cache=True (see llm_cache).
+
+    Only replies that pass accept() are stored (default: non-empty), so a
+    malformed JSON reply is never replayed. Identical requests already in
+    flight are joined rather than re-sent (see singleflight), cached or not.
+    """
+    from legal_chatbot.utils.llm_cache import LLMCache, get_llm_cache
+    from legal_chatbot.utils.singleflight import get_singleflight
+
+    key = LLMCache.make_key(**request)
+    if not cache:
+        return get_singleflight().do("llm", key, call)
+    llm_cache = get_llm_cache()
+    hit = llm_cache.get(key)
+    if hit is not None:
+        return hit
+    text = get_singleflight().do("llm", key, call)
+    if text and accept(text):
+        llm_cache.put(key, text)
+    return text
+
+
+async def _acached(cache: bool, request: dict, call, accept: Callable[[str], bool] = bool) -> str:
+    """Async _cached: call is a coroutine function; the SQLite tier is read off the loop."""
+    from legal_chatbot.utils.llm_cache import LLMCache, get_llm_cache
+    from legal_chatbot.utils.singleflight import get_singleflight
+
+    key = LLMCache.make_key(**request)
+    if not cache:
+        return await get_singleflight().ado("llm", key, call)
+    llm_cache = get_llm_cache()
+    hit = await run_blocking(llm_cache.get, key)
+    if hit is not None:
+        return hit
+    text = await get_singleflight().ado("llm", key, call)
+    if text and accept(text):
+        await run_blocking(llm_cache.put, key, text)
+    return text
+
+
+def _complete(
+    messages: list[dict],
+    model: str,
+    temperature: float,
+    max_tokens: int,
+    system: str | list[dict],
+    cache: bool,
+    caller: Optional[str],
+    budget: float,
+    accept: Callable[[str], bool] = bool,
+) -> str:
+    """One completion on `model` (Anthropic or DeepSeek by name).
+
+    accept decides whether a reply may be stored when cache=True.
+    """
+    # Resolved here: a coalesced call may run in another caller's frame
+    caller = caller or call_site()
+    if is_deepseek(model):
+        ds_kwargs = _prepare_deepseek_kwargs(messages, model, temperature, max_tokens, system)
+
+        def call_deepseek() -> str:
+            return _create_completion(ds_kwargs, caller, budget)
+
+        return _cached(cache, {"provider": "deepseek", **ds_kwargs}, call_deepseek, accept)
+
+    kwargs = prepare_kwargs(messages, model, temperature, max_tokens, system)
+
+    def call() -> str:
+        return _create_message(kwargs, caller, budget).content[0].text
+
+    return _cached(cache, {"provider": "anthropic", **kwargs}, call, accept)
+
+
+async def _acomplete(
+    messages: list[dict],
+    model: str,
+    temperature: float,
+    max_tokens: int,
+    system: str | list[dict],
+    cache: bool,
+    caller: Optional[str],
+    budget: float,
+    accept: Callable[[str], bool] = bool,
+) -> str:
+    """Async _complete."""
+    caller = caller or call_site()
+    if is_deepseek(model):
+        ds_kwargs = _prepare_deepseek_kwargs(messages, model, temperature, max_tokens, system)
+
+        async def call_deepseek() -> str:
+            return await _acreate_completion(ds_kwargs, caller, budget)
+
+        return await _acached(cache, {"provider": "deepseek", **ds_kwargs}, call_deepseek, accept)
+
+    kwargs = prepare_kwargs(messages, model, temperature, max_tokens, system)
+
+    async def call() -> str:
+        return (await _acreate_message(kwargs, caller, budget)).content[0].text
+
+    return await _acached(cache, {"provider": "anthropic", **kwargs}, call, accept)
+
+
 def call_llm(
     messages: list[dict],
     temperature: float = 0.3,
     max_tokens: int = 1000,
-    system: str = "",
+    system: str | list[dict] = "",
+    cache: bool = False,
+    caller: str = None,
+    task: str = None,
+    model: str = None,
 ) -> str:
-    """Call Anthropic Messages API (uses default model from LLM_MODEL env var).
+    """Call the LLM for a task class (see route_model); no task = LLM_MODEL.
 
     For legal Q&A where accuracy is critical, use call_llm_sonnet() instead.
+    cache=True reuses a stored response for an identical request.
+    model overrides the task's routed model (the task still sets the budget).
     """
-    client = get_client()
-    kwargs = _prepare_kwargs(messages, get_model(), temperature, max_tokens, system)
-    response = client.messages.create(**kwargs)
-    return response.content[0].text
+    return _complete(
+        messages, model or route_model(task), temperature, max_tokens, system, cache, caller, route_budget(task)
+    )
 
 
 def call_llm_sonnet(
     messages: list[dict],
     temperature: float = 0.3,
     max_tokens: int = 4096,
-    system: str = "",
+    system: str | list[dict] = "",
+    cache: bool = False,
+    caller: str = None,
+    task: str = "answer",
 ) -> str:
     """Call LLM for legal Q&A where accuracy is critical.
 
-    Routes to DeepSeek if configured, otherwise uses Anthropic Sonnet.
+    Routes to DeepSeek if configured, otherwise uses Anthropic Sonnet
+    (the default "answer" / "contract_articles" routes).
+    cache=True reuses a stored response for an identical request.
     """
-    if _use_deepseek():
-        client = _get_deepseek_client()
-        model = get_settings().deepseek_model
-        oai_msgs = _build_oai_messages(messages, system)
-        # Lower temperature for DeepSeek to reduce hallucination
-        ds_temp = min(temperature, 0.1)
-        response = client.chat.completions.create(
-            model=model,
-            messages=oai_msgs,
-            temperature=ds_temp,
-            max_tokens=max_tokens,
-        )
-        return response.choices[0].message.content or ""
+    return call_llm(
+        messages, temperature, max_tokens, system, cache, caller, task, route_model(task, sonnet_tier=True)
+    )
 
-    client = get_client()
-    kwargs = _prepare_kwargs(messages, SONNET_MODEL, temperature, max_tokens, system)
-    response = client.messages.create(**kwargs)
-    return response.content[0].text
+
+async def acall_llm(
+    messages: list[dict],
+    temperature: float = 0.3,
+    max_tokens: int = 1000,
+    system: str | list[dict] = "",
+    cache: bool = False,
+    caller: str = None,
+    task: str = None,
+    model: str = None,
+) -> str:
+    """Async call_llm — awaits the async clients instead of blocking the event loop.
+
+    model overrides the task's routed model (the task still sets the budget).
+    """
+    return await _acomplete(
+        messages, model or route_model(task), temperature, max_tokens, system, cache, caller, route_budget(task)
+    )
+
+
+async def acall_llm_sonnet(
+    messages: list[dict],
+    temperature: float = 0.3,
+    max_tokens: int = 4096,
+    system: str | list[dict] = "",
+    cache: bool = False,
+    caller: str = None,
+    task: str = "answer",
+) -> str:
+    """Async call_llm_sonnet (DeepSeek if configured, otherwise Anthropic Sonnet)."""
+    return await acall_llm(
+        messages, temperature, max_tokens, system, cache, caller, task, route_model(task, sonnet_tier=True)
+    )
 
 
 def call_llm_stream(
     messages: list[dict],
     temperature: float = 0.3,
     max_tokens: int = 4096,
-    system: str = "",
+    system: str | list[dict] = "",
+    caller: str = None,
+    task: str = None,
+    model: str = None,
 ):
-    """Stream Anthropic Messages API — yields text chunks (synchronous).
+    """Stream the LLM for a task class — yields text chunks (synchronous).
 
-    Uses default model from LLM_MODEL env var.
+    No task = default model from LLM_MODEL env var; model overrides the route.
     """
-    client = get_client()
-    kwargs = _prepare_kwargs(messages, get_model(), temperature, max_tokens, system)
-    with client.messages.stream(**kwargs) as stream:
-        for text in stream.text_stream:
-            yield text
+    model = model or route_model(task)
+    stream = _stream_completion if is_deepseek(model) else _stream_message
+    yield from stream(messages, model, temperature, max_tokens, system, caller)
+
+
+def _stream_message(messages, model, temperature, max_tokens, system, caller):
+    """Anthropic messages.stream via the scheduler (synchronous)."""
+    kwargs = prepare_kwargs(messages, model, temperature, max_tokens, system)
+    scheduler = get_llm_scheduler()
+
+    def open_stream():
+        with get_client().messages.stream(**kwargs) as stream:
+            scheduler.observe(model, stream.response.headers)
+            for text in stream.text_stream:
+                call.first_token()
+                yield text
+            call.usage = stream.get_final_message().usage
+            _log_usage(model, call.usage)
+
+    with get_llm_metrics().track(caller, model, stream=True) as call:
+        yield from scheduler.stream(model, open_stream, cost=_estimate_tokens(kwargs), site=call.site)
+
+
+def _stream_completion(messages, model, temperature, max_tokens, system, caller):
+    """DeepSeek streaming chat completion via the scheduler (synchronous)."""
+    ds_kwargs = {
+        **_prepare_deepseek_kwargs(messages, model, temperature, max_tokens, system),
+        "stream": True,
+        "stream_options": {"include_usage": True},
+    }
+    scheduler = get_llm_scheduler()
+
+    def open_stream():
+        stream = _get_deepseek_client().chat.completions.create(**ds_kwargs)
+        scheduler.observe(model, stream.response.headers)
+        for chunk in stream:
+            if chunk.usage:
+                call.usage = chunk.usage
+            if chunk.choices and chunk.choices[0].delta.content:
+                call.first_token()
+                yield chunk.choices[0].delta.content
+
+    with get_llm_metrics().track(caller, model, stream=True) as call:
+        yield from scheduler.stream(model, open_stream, cost=_estimate_tokens(ds_kwargs), site=call.site)
 
 
 async def call_llm_stream_async(
     messages: list[dict],
     temperature: float = 0.3,
     max_tokens: int = 4096,
-    system: str = "",
+    system: str | list[dict] = "",
+    caller: str = None,
+    task: str = None,
+    model: str = None,
 ):
-    """Stream Anthropic Messages API — async generator (default model)."""
-    client = get_async_client()
-    kwargs = _prepare_kwargs(messages, get_model(), temperature, max_tokens, system)
-    async with client.messages.stream(**kwargs) as stream:
-        async for text in stream.text_stream:
-            yield text
+    """Stream the LLM for a task class — async generator (no task = LLM_MODEL).
+
+    model overrides the task's routed model.
+    """
+    model = model or route_model(task)
+    stream = _astream_completion if is_deepseek(model) else _astream_message
+    async for text in stream(messages, model, temperature, max_tokens, system, caller):
+        yield text
 
 
 async def call_llm_stream_sonnet_async(
     messages: list[dict],
     temperature: float = 0.3,
     max_tokens: int = 4096,
-    system: str = "",
+    system: str | list[dict] = "",
+    caller: str = None,
+    task: str = "answer",
 ):
     """Stream LLM response for legal Q&A.
 
     Routes to DeepSeek if configured, otherwise uses Anthropic Sonnet.
     """
-    if _use_deepseek():
-        client = _get_deepseek_async_client()
-        model = get_settings().deepseek_model
-        oai_msgs = _build_oai_messages(messages, system)
-        ds_temp = min(temperature, 0.1)
-        stream = await client.chat.completions.create(
-            model=model,
-            messages=oai_msgs,
-            temperature=ds_temp,
-            max_tokens=max_tokens,
-            stream=True,
-        )
+    model = route_model(task, sonnet_tier=True)
+    async for text in call_llm_stream_async(messages, temperature, max_tokens, system, caller, task, model):
+        yield text
+
+
+async def _astream_completion(messages, model, temperature, max_tokens, system, caller):
+    """DeepSeek streaming chat completion via the scheduler."""
+    ds_kwargs = {
+        **_prepare_deepseek_kwargs(messages, model, temperature, max_tokens, system),
+        "stream": True,
+        # Final chunk carries usage (incl. prompt_cache_hit_tokens)
+        "stream_options": {"include_usage": True},
+    }
+    scheduler = get_llm_scheduler()
+
+    async def open_stream():
+        stream = await _get_deepseek_async_client().chat.completions.create(**ds_kwargs)
+        scheduler.observe(model, stream.response.headers)
         async for chunk in stream:
+            if chunk.usage:
+                call.usage = chunk.usage
             if chunk.choices and chunk.choices[0].delta.content:
+                call.first_token()
                 yield chunk.choices[0].delta.content
-        return
 
-    client = get_async_client()
-    kwargs = _prepare_kwargs(messages, SONNET_MODEL, temperature, max_tokens, system)
-    async with client.messages.stream(**kwargs) as stream:
-        async for text in stream.text_stream:
+    with get_llm_metrics().track(caller, model, stream=True) as call:
+        async for text in scheduler.astream(
+            model, open_stream, cost=_estimate_tokens(ds_kwargs), site=call.site
+        ):
+            yield text
+
+
+async def _astream_message(messages, model, temperature, max_tokens, system, caller):
+    """Anthropic messages.stream via the scheduler (slot held for the whole stream)."""
+    kwargs = prepare_kwargs(messages, model, temperature, max_tokens, system)
+    scheduler = get_llm_scheduler()
+
+    async def open_stream():
+        async with get_async_client().messages.stream(**kwargs) as stream:
+            scheduler.observe(model, stream.response.headers)
+            async for text in stream.text_stream:
+                call.first_token()
+                yield text
+            call.usage = (await stream.get_final_message()).usage
+            _log_usage(model, call.usage)
+
+    with get_llm_metrics().track(caller, model, stream=True) as call:
+        async for text in scheduler.astream(
+            model, open_stream, cost=_estimate_tokens(kwargs), site=call.site
+        ):
             yield text
 
 
@@ -253,22 +683,114 @@ def call_llm_json(
     messages: list[dict],
     temperature: float = 0.1,
     max_tokens: int = 4000,
-    system: str = "",
+    system: str | list[dict] = "",
     use_sonnet: bool = False,
+    cache: bool = False,
+    caller: str = None,
+    task: str = None,
 ) -> dict | list | None:
     """Call LLM and parse JSON from response.
 
-    Handles markdown code blocks (```json ... ```) automatically.
+    Handles markdown code blocks (```json ... ```) automatically. If the
+    reply doesn't parse, it is retried once on LLM_ESCALATION_MODEL.
     Args:
-        use_sonnet: If True, uses SONNET_MODEL for higher accuracy.
+        use_sonnet: Sonnet tier — DeepSeek when configured; with no task,
+            uses the "generate_json" route.
+        cache: If True, reuses a stored response for an identical request.
+        task: Task class picking the model and latency budget (LLM_ROUTES).
     Returns parsed JSON or None on failure.
     """
-    llm_fn = call_llm_sonnet if use_sonnet else call_llm
-    text = llm_fn(
-        messages, temperature=temperature, max_tokens=max_tokens, system=system
-    )
+    task = task or ("generate_json" if use_sonnet else None)
+    model, budget = route_model(task, sonnet_tier=use_sonnet), route_budget(task)
+    text = _complete(messages, model, temperature, max_tokens, system, cache, caller, budget, _is_json)
+    result = parse_llm_json(text)
+    stronger = escalation_model(model, sonnet_tier=use_sonnet)
+    if result is None and stronger:
+        logger.info(f"LLM JSON parse failed on {model} ({task}), escalating to {stronger}")
+        text = _complete(messages, stronger, temperature, max_tokens, system, cache, caller, budget, _is_json)
+        result = parse_llm_json(text)
+    return result
+
+
+async def acall_llm_json(
+    messages: list[dict],
+    temperature: float = 0.1,
+    max_tokens: int = 4000,
+    system: str | list[dict] = "",
+    use_sonnet: bool = False,
+    cache: bool = False,
+    caller: str = None,
+    task: str = None,
+) -> dict | list | None:
+    """Async call_llm_json (same escalation). Returns parsed JSON or None on failure."""
+    task = task or ("generate_json" if use_sonnet else None)
+    model, budget = route_model(task, sonnet_tier=use_sonnet), route_budget(task)
+    text = await _acomplete(messages, model, temperature, max_tokens, system, cache, caller, budget, _is_json)
+    result = parse_llm_json(text)
+    stronger = escalation_model(model, sonnet_tier=use_sonnet)
+    if result is None and stronger:
+        logger.info(f"LLM JSON parse failed on {model} ({task}), escalating to {stronger}")
+        text = await _acomplete(messages, stronger, temperature, max_tokens, system, cache, caller, budget, _is_json)
+        result = parse_llm_json(text)
+    return result
+
+
+def call_llm_json_stream(
+    messages: list[dict],
+    temperature: float = 0.1,
+    max_tokens: int = 4000,
+    system: str | list[dict] = "",
+    caller: str = None,
+    task: str = None,
+    use_sonnet: bool = False,
+):
+    """Stream a JSON-array reply, yielding each element as soon as it is complete.
+
+    Unlike call_llm_json there is no escalation: elements already yielded
+    can't be taken back. Unparseable elements are skipped (and logged).
+    use_sonnet: Sonnet tier (DeepSeek when configured), as in call_llm_json.
+    """
+    parser = JsonArrayStream()
+    model = route_model(task, sonnet_tier=use_sonnet)
+    for chunk in call_llm_stream(messages, temperature, max_tokens, system, caller, task, model):
+        yield from parser.feed(chunk)
+    _log_json_stream(parser, task)
 
-    # Strip markdown code fences
+
+async def acall_llm_json_stream(
+    messages: list[dict],
+    temperature: float = 0.1,
+    max_tokens: int = 4000,
+    system: str | list[dict] = "",
+    caller: str = None,
+    task: str = None,
+    use_sonnet: bool = False,
+):
+    """Async call_llm_json_stream."""
+    parser = JsonArrayStream()
+    model = route_model(task, sonnet_tier=use_sonnet)
+    async for chunk in call_llm_stream_async(messages, temperature, max_tokens, system, caller, task, model):
+        for item in parser.feed(chunk):
+            yield item
+    _log_json_stream(parser, task)
+
+
+def _log_json_stream(parser: JsonArrayStream, task: Optional[str]) -> None:
+    if not parser.started:
+        logger.warning(f"Streamed LLM reply had no JSON array ({task})")
+    elif parser.skipped or not parser.done:
+        logger.warning(
+            f"Streamed JSON array ({task}): {parser.skipped} elements skipped, complete={parser.done}"
+        )
+
+
+def _is_json(text: str) -> bool:
+    """Cache gate for JSON calls: store only replies that parse."""
+    return parse_llm_json(text) is not None
+
+
+def parse_llm_json(text: str) -> dict | list | None:
+    """Strip markdown code fences and parse; None if not JSON."""
     if "```json" in text:
         text = text.split("```json")[1].split("```")[0].strip()
     elif "```" in text:
@@ -303,8 +825,6 @@ def search_web(
     Returns:
         Claude's synthesized response text.
     """
-    client = get_client()
-
     tool_def: dict = {
         "type": "web_search_20250305",
         "name": "web_search",
@@ -313,12 +833,12 @@ def search_web(
     if allowed_domains:
         tool_def["allowed_domains"] = allowed_domains
 
-    response = client.messages.create(
-        model=SONNET_MODEL,
-        max_tokens=max_tokens,
-        tools=[tool_def],
-        messages=[{"role": "user", "content": query}],
-    )
+    response = _create_message({
+        "model": SONNET_MODEL,
+        "max_tokens": max_tokens,
+        "tools": [tool_def],
+        "messages": [{"role": "user", "content": query}],
+    })
 
     # Extract text blocks from response (skip tool_use/tool_result blocks)
     texts = []
@@ -347,8 +867,6 @@ def search_web_urls(
     Returns:
         List of {url, title} dicts.
     """
-    client = get_client()
-
     tool_def = {
         "type": "web_search_20250305",
         "name": "web_search",
@@ -371,12 +889,12 @@ Trả về JSON array (CHỈ JSON, không text khác):
   ...
 ]"""
 
-    response = client.messages.create(
-        model=SONNET_MODEL,
-        max_tokens=4000,
-        tools=[tool_def],
-        messages=[{"role": "user", "content": prompt}],
-    )
+    response = _create_message({
+        "model": SONNET_MODEL,
+        "max_tokens": 4000,
+        "tools": [tool_def],
+        "messages": [{"role": "user", "content": prompt}],
+    })
 
     # Strategy 1: Extract URLs directly from WebSearchToolResultBlock
     # (most reliable — doesn't depend on LLM outputting valid JSON)
@@ -0,0 +1,87 @@
+"""Two-tier cache for deterministic LLM calls (classification, term extraction).
+
+Tier 1: in-process LRU
+Tier 2: optional SQLite file (settings.llm_cache_path) that survives restarts
+
+Keys are sha256 over (provider, model, system, messages, temperature,
+max_tokens), entries expire after settings.llm_cache_ttl seconds. Opt-in per
+call site via call_llm*(..., cache=True) — only for low-temperature calls
+whose answer is a function of the prompt.
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Optional
+
+from legal_chatbot.utils.config import get_settings
+from legal_chatbot.utils.tiered_cache import TieredCache
+
+
+class LLMCache(TieredCache):
+    """Thread-safe TTL LRU + optional on-disk store for LLM response texts."""
+
+    label = "LLM"
+    table = "responses"
+    log_every = 200
+
+    def __init__(
+        self,
+        max_entries: int = None,
+        path: Optional[str] = None,
+        ttl: float = None,
+    ):
+        settings = get_settings()
+        self.ttl = settings.llm_cache_ttl if ttl is None else ttl
+        super().__init__(settings.llm_cache_size if max_entries is None else max_entries, path)
+
+    def _create_table(self, conn: sqlite3.Connection) -> None:
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY,"
+            " response TEXT NOT NULL,"
+            " expires_at REAL NOT NULL)"
+        )
+        conn.execute("DELETE FROM responses WHERE expires_at < ?", (time.time(),))
+
+    @staticmethod
+    def make_key(**request) -> str:
+        """Cache key for a request (provider, model, system, messages, params)."""
+        payload = json.dumps(request, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response text or None (counts a hit or miss)."""
+        return super().get(key)
+
+    def put(self, key: str, response: str, expires_at: Optional[float] = None) -> None:
+        """Store a response in both tiers; it expires after the cache's TTL."""
+        super().put(key, response, time.time() + self.ttl if expires_at is None else expires_at)
+
+    def _read(self, key: str, now: float) -> Optional[tuple[str, float]]:
+        row = self._conn.execute(
+            "SELECT response, expires_at FROM responses WHERE key = ? AND expires_at > ?",
+            (key, now),
+        ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def _write(self, key: str, response: str, expires_at: Optional[float]) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO responses (key, response, expires_at) VALUES (?, ?, ?)",
+            (key, response, expires_at),
+        )
+
+
+_cache: Optional[LLMCache] = None
+
+
+def get_llm_cache() -> LLMCache:
+    """Get or create the process-wide LLM response cache."""
+    global _cache
+    settings = get_settings()
+    path = settings.llm_cache_path or None
+    if _cache is None or _cache.path != (Path(path) if path else None):
+        _cache = LLMCache(path=path)
+    return _cache
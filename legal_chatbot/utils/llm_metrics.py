@@ -0,0 +1,378 @@
+"""Per-call LLM instrumentation: latency, tokens and cost by call site.
+
+Every request made through utils/llm.py is recorded once, after the
+scheduler is done with it (queueing, retries and hedges included):
+
+    site          caller tag (caller=...) or 'module.function' of the caller
+    model         model actually called (Sonnet, Haiku, DeepSeek, ...)
+    tokens        input (uncached) / output / cache_read / cache_write
+    ttft_s        seconds to the first streamed chunk (streams only)
+    total_s       seconds until the response (or stream) finished
+    error         exception class, "cancelled" if the caller went away
+    cost_usd      from LLM_PRICES (USD per million tokens)
+
+The scheduler adds its retries, hedges and throttled time to the same
+(site, model) series. Aggregates are served in the Prometheus text format
+at GET /metrics and as JSON in GET /api/health. LLM_TRACE_PATH also
+appends every record to a JSONL file (from a background thread, off the
+event loop), which `legal-chatbot llm-stats` summarises by call site and
+time window.
+"""
+
+import asyncio
+import atexit
+import json
+import logging
+import queue
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Iterable, Optional
+
+from legal_chatbot.utils.config import get_settings
+from legal_chatbot.utils.llm_scheduler import call_site
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "legal_chatbot_llm"
+DURATION_BUCKETS = (0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 40.0, 80.0)
+TTFT_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0)
+TOKEN_KINDS = ("input", "output", "cache_read", "cache_write")
+
+
+def usage_tokens(usage) -> dict:
+    """Normalise Anthropic / OpenAI / DeepSeek usage to TOKEN_KINDS counts.
+
+    "input" excludes prompt-cache reads for every provider (Anthropic
+    already reports it that way; OpenAI-style prompt_tokens include them).
+    """
+    tokens = dict.fromkeys(TOKEN_KINDS, 0)
+    if usage is None:
+        return tokens
+    if hasattr(usage, "input_tokens"):
+        tokens["input"] = usage.input_tokens or 0
+        tokens["output"] = usage.output_tokens or 0
+        tokens["cache_read"] = getattr(usage, "cache_read_input_tokens", 0) or 0
+        tokens["cache_write"] = getattr(usage, "cache_creation_input_tokens", 0) or 0
+        return tokens
+    prompt = getattr(usage, "prompt_tokens", 0) or 0
+    # DeepSeek: prompt_cache_hit_tokens; OpenAI: prompt_tokens_details.cached_tokens
+    cached = getattr(usage, "prompt_cache_hit_tokens", None)
+    if cached is None:
+        cached = getattr(getattr(usage, "prompt_tokens_details", None), "cached_tokens", 0)
+    tokens["cache_read"] = cached or 0
+    tokens["input"] = max(prompt - tokens["cache_read"], 0)
+    tokens["output"] = getattr(usage, "completion_tokens", 0) or 0
+    return tokens
+
+
+def cost_usd(model: str, tokens: dict, prices: dict = None) -> float:
+    """Cost of one call; models without a price entry cost 0."""
+    price = (get_settings().llm_prices if prices is None else prices).get(model)
+    if not price:
+        return 0.0
+    return sum(tokens.get(kind, 0) * price.get(kind, 0.0) for kind in TOKEN_KINDS) / 1_000_000
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def lines(self, name: str, labels: str) -> list[str]:
+        out, cumulative = [], 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            out.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        out.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.count}')
+        out.append(f"{name}_sum{{{labels}}} {self.sum:.6f}")
+        out.append(f"{name}_count{{{labels}}} {self.count}")
+        return out
+
+
+class _Series:
+    """Aggregates for one (site, model); the scheduler bumps retries..throttled."""
+
+    __slots__ = ("calls", "tokens", "cost", "duration", "ttft", "retries", "hedged", "hedge_wins", "throttled")
+
+    def __init__(self):
+        self.calls: dict[str, int] = defaultdict(int)  # status -> count
+        self.tokens = dict.fromkeys(TOKEN_KINDS, 0)
+        self.cost = 0.0
+        self.duration = _Histogram(DURATION_BUCKETS)
+        self.ttft = _Histogram(TTFT_BUCKETS)
+        self.retries = self.hedged = self.hedge_wins = 0
+        self.throttled = 0.0
+
+    def as_dict(self) -> dict:
+        ok = self.calls.get("ok", 0)
+        return {
+            "calls": self.duration.count,
+            "ok": ok,
+            "errors": self.duration.count - ok,
+            "retries": self.retries,
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "throttled_s": round(self.throttled, 3),
+            "avg_latency_s": round(self.duration.sum / max(self.duration.count, 1), 3),
+            "tokens": dict(self.tokens),
+            "cost_usd": round(self.cost, 6),
+        }
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class CallTracker:
+    """Times one LLM call; use as a context manager around the scheduler call.
+
+    Set .usage from the response (or final stream message) and call
+    first_token() per streamed chunk; the record is written on exit.
+    """
+
+    __slots__ = ("metrics", "site", "model", "stream", "started", "ttft", "usage")
+
+    def __init__(self, metrics: "LLMMetrics", site: str, model: str, stream: bool = False):
+        self.metrics = metrics
+        self.site = site
+        self.model = model
+        self.stream = stream
+        self.started = time.monotonic()
+        self.ttft: Optional[float] = None
+        self.usage = None
+
+    def first_token(self) -> None:
+        if self.ttft is None:
+            self.ttft = time.monotonic() - self.started
+
+    def __enter__(self) -> "CallTracker":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        error = None
+        if exc_type is not None:
+            cancelled = issubclass(exc_type, (GeneratorExit, asyncio.CancelledError))
+            error = "cancelled" if cancelled else exc_type.__name__
+        tokens = usage_tokens(self.usage)
+        self.metrics.record({
+            "ts": round(time.time(), 3),
+            "site": self.site,
+            "model": self.model,
+            "stream": self.stream,
+            **{f"{kind}_tokens": count for kind, count in tokens.items()},
+            "ttft_s": None if self.ttft is None else round(self.ttft, 4),
+            "total_s": round(time.monotonic() - self.started, 4),
+            "error": error,
+            "cost_usd": round(cost_usd(self.model, tokens, self.metrics.prices), 6),
+        })
+
+
+class _TraceWriter:
+    """Appends records to the JSONL trace from a daemon thread."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def put(self, record: dict) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="llm-trace", daemon=True)
+                self._thread.start()
+                atexit.register(self.flush)
+        self._queue.put(record)
+
+    def flush(self) -> None:
+        """Block until every queued record is written."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def _run(self) -> None:
+        while True:
+            records = [self._queue.get()]
+            while not self._queue.empty():
+                records.append(self._queue.get_nowait())
+            try:
+                with self.path.open("a", encoding="utf-8") as f:
+                    f.writelines(json.dumps(r, ensure_ascii=False) + "\n" for r in records)
+            except OSError as e:
+                logger.warning(f"LLM trace write failed: {e}")
+            finally:
+                for _ in records:
+                    self._queue.task_done()
+
+
+class LLMMetrics:
+    """In-process aggregates per (site, model) plus the optional JSONL trace."""
+
+    def __init__(self, trace_path: Optional[str] = None, prices: dict = None):
+        settings = get_settings()
+        self.trace_path = Path(trace_path) if trace_path else (
+            Path(settings.llm_trace_path) if settings.llm_trace_path else None
+        )
+        self.prices = dict(settings.llm_prices if prices is None else prices)
+        self._lock = threading.Lock()
+        self._series: dict[tuple[str, str], _Series] = {}
+        self._trace: Optional[_TraceWriter] = None
+        if self.trace_path:
+            self.trace_path.parent.mkdir(parents=True, exist_ok=True)
+            self._trace = _TraceWriter(self.trace_path)
+
+    def track(self, site: Optional[str], model: str, stream: bool = False) -> CallTracker:
+        """Tracker for one call; site None = detect the calling function."""
+        return CallTracker(self, site or call_site(), model, stream)
+
+    def series(self, site: str, model: str) -> _Series:
+        """The aggregates for (site, model), created on first use."""
+        with self._lock:
+            series = self._series.get((site, model))
+            if series is None:
+                series = self._series[(site, model)] = _Series()
+            return series
+
+    def record(self, call: dict) -> None:
+        series = self.series(call["site"], call["model"])
+        with self._lock:
+            series.calls[call["error"] or "ok"] += 1
+            for kind in TOKEN_KINDS:
+                series.tokens[kind] += call[f"{kind}_tokens"]
+            series.cost += call["cost_usd"]
+            series.duration.observe(call["total_s"])
+            if call["ttft_s"] is not None:
+                series.ttft.observe(call["ttft_s"])
+        if self._trace:
+            self._trace.put(call)
+
+    def flush(self) -> None:
+        """Wait for pending trace writes."""
+        if self._trace:
+            self._trace.flush()
+
+    def stats(self) -> dict:
+        """{site: {model: counters}}, as served in /api/health."""
+        with self._lock:
+            sites: dict = {}
+            for (site, model), series in sorted(self._series.items()):
+                sites.setdefault(site, {})[model] = series.as_dict()
+            return sites
+
+    def render_prometheus(self) -> str:
+        """All series in the Prometheus text exposition format."""
+        calls = [f"# HELP {PREFIX}_calls_total LLM calls by call site, model and status (ok or error class)",
+                 f"# TYPE {PREFIX}_calls_total counter"]
+        tokens = [f"# HELP {PREFIX}_tokens_total LLM tokens by kind (input, output, cache_read, cache_write)",
+                  f"# TYPE {PREFIX}_tokens_total counter"]
+        cost = [f"# HELP {PREFIX}_cost_usd_total Estimated LLM spend in USD",
+                f"# TYPE {PREFIX}_cost_usd_total counter"]
+        duration = [f"# HELP {PREFIX}_duration_seconds LLM call time incl. queueing and retries",
+                    f"# TYPE {PREFIX}_duration_seconds histogram"]
+        ttft = [f"# HELP {PREFIX}_ttft_seconds Time to first streamed chunk",
+                f"# TYPE {PREFIX}_ttft_seconds histogram"]
+        retries = [f"# HELP {PREFIX}_retries_total Retried attempts (429, 529, 5xx, connection errors)",
+                   f"# TYPE {PREFIX}_retries_total counter"]
+        hedged = [f"# HELP {PREFIX}_hedged_total Short calls that sent a hedge request",
+                  f"# TYPE {PREFIX}_hedged_total counter"]
+        hedge_wins = [f"# HELP {PREFIX}_hedge_wins_total Hedge requests that answered first",
+                      f"# TYPE {PREFIX}_hedge_wins_total counter"]
+        throttled = [f"# HELP {PREFIX}_throttled_seconds_total Time spent waiting for the rate budget",
+                     f"# TYPE {PREFIX}_throttled_seconds_total counter"]
+        with self._lock:
+            for (site, model), series in sorted(self._series.items()):
+                labels = f'site="{_label(site)}",model="{_label(model)}"'
+                for status, count in sorted(series.calls.items()):
+                    calls.append(f'{PREFIX}_calls_total{{{labels},status="{_label(status)}"}} {count}')
+                for kind, count in series.tokens.items():
+                    tokens.append(f'{PREFIX}_tokens_total{{{labels},kind="{kind}"}} {count}')
+                cost.append(f"{PREFIX}_cost_usd_total{{{labels}}} {series.cost:.6f}")
+                duration.extend(series.duration.lines(f"{PREFIX}_duration_seconds", labels))
+                if series.ttft.count:
+                    ttft.extend(series.ttft.lines(f"{PREFIX}_ttft_seconds", labels))
+                retries.append(f"{PREFIX}_retries_total{{{labels}}} {series.retries}")
+                hedged.append(f"{PREFIX}_hedged_total{{{labels}}} {series.hedged}")
+                hedge_wins.append(f"{PREFIX}_hedge_wins_total{{{labels}}} {series.hedge_wins}")
+                throttled.append(f"{PREFIX}_throttled_seconds_total{{{labels}}} {series.throttled:.3f}")
+        sections = calls + tokens + cost + duration + ttft + retries + hedged + hedge_wins + throttled
+        return "\n".join(sections) + "\n"
+
+
+def read_trace(path: str, since: Optional[float] = None) -> list[dict]:
+    """Records from a JSONL trace, optionally only those newer than `since` (epoch s)."""
+    records = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # torn last line while the server is writing
+            if since is None or record.get("ts", 0) >= since:
+                records.append(record)
+    return records
+
+
+def _quantile(values: list[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+def summarize(
+    records: Iterable[dict], by: tuple = ("site",), interval: Optional[float] = None
+) -> list[dict]:
+    """Aggregate trace records by the `by` fields (and `interval`-second windows).
+
+    Rows are sorted by window, then by total time spent (the biggest
+    latency contributors first).
+    """
+    groups: dict[tuple, list[dict]] = defaultdict(list)
+    for record in records:
+        window = int(record["ts"] // interval * interval) if interval else None
+        groups[(window, *(record.get(field, "") for field in by))].append(record)
+
+    rows = []
+    for (window, *key), group in groups.items():
+        totals = [r["total_s"] for r in group]
+        ttfts = [r["ttft_s"] for r in group if r.get("ttft_s") is not None]
+        rows.append({
+            "window": window,
+            **dict(zip(by, key)),
+            "calls": len(group),
+            "errors": sum(1 for r in group if r.get("error")),
+            "p50_s": _quantile(totals, 0.5),
+            "p95_s": _quantile(totals, 0.95),
+            "ttft_p50_s": _quantile(ttfts, 0.5),
+            "time_s": sum(totals),
+            **{f"{kind}_tokens": sum(r.get(f"{kind}_tokens", 0) for r in group) for kind in TOKEN_KINDS},
+            "cost_usd": sum(r.get("cost_usd", 0.0) for r in group),
+        })
+    rows.sort(key=lambda row: (row["window"] or 0, -row["time_s"]))
+    return rows
+
+
+_metrics: Optional[LLMMetrics] = None
+_metrics_lock = threading.Lock()
+
+
+def get_llm_metrics() -> LLMMetrics:
+    """Get or create the process-wide LLM metrics."""
+    global _metrics
+    with _metrics_lock:
+        if _metrics is None:
+            _metrics = LLMMetrics()
+        return _metrics
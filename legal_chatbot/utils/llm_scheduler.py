@@ -0,0 +1,482 @@
+"""Shared scheduler for all LLM traffic (sync threads and async handlers).
+
+    slots:   per-model concurrency cap (LLM_MAX_CONCURRENCY, overrides in
+             LLM_MODEL_CONCURRENCY), shared by threads and event loops
+    budget:  per-model token bucket refilled from the provider's rate-limit
+             headers (anthropic-ratelimit-*, x-ratelimit-*); a 429's
+             retry-after pauses every caller of that model, not just one
+    retries: 429 / 529 / 5xx / connection errors, exponential backoff with
+             full jitter (LLM_MAX_RETRIES) — the SDK clients' own retries are off
+    hedging: short async calls (max_tokens <= LLM_HEDGE_MAX_TOKENS) send a
+             duplicate request after LLM_HEDGE_AFTER seconds; first answer wins
+    metrics: retries, hedges and throttling per (call site, model), kept
+             with the per-call metrics in utils/llm_metrics.py; stats()
+             has the per-model slot and budget state
+
+Streams are retried only if they fail before the first chunk.
+"""
+
+import asyncio
+import logging
+import random
+import re
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, Callable, Iterator, Optional, TypeVar
+
+from legal_chatbot.utils.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS = {408, 409, 429}
+_DURATION = re.compile(r"(\d+(?:\.\d+)?)(ms|s|m|h|d)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0, "d": 86400.0}
+# Event-loop / thread-pool frames: nothing above them is the real caller
+_RUNNER_MODULES = ("asyncio", "concurrent", "threading")
+
+
+def call_site() -> str:
+    """'module.function' of the first caller outside utils/llm*.
+
+    "unknown" when the LLM call is itself a task root or thread entry point.
+    """
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get("__name__", "")
+        if not module.startswith(("legal_chatbot.utils.llm", "contextlib")):
+            if module.startswith(_RUNNER_MODULES):
+                return "unknown"
+            return f"{module.rsplit('.', 1)[-1]}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return "unknown"
+
+
+def _status_code(exc: Exception) -> Optional[int]:
+    return getattr(exc, "status_code", None)
+
+
+def is_retryable(exc: Exception) -> bool:
+    """429 / 529 overloaded / 5xx / timeouts and dropped connections."""
+    status = _status_code(exc)
+    if status is not None:
+        return status in RETRYABLE_STATUS or status >= 500
+    if isinstance(exc, (ConnectionError, TimeoutError)):
+        return True
+    # anthropic/openai APIConnectionError (APITimeoutError subclasses it)
+    return any(cls.__name__ == "APIConnectionError" for cls in type(exc).__mro__)
+
+
+def retry_after(exc: Exception) -> Optional[float]:
+    """Seconds from the error response's retry-after header, if any."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        value = headers.get("retry-after")
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_reset(value: str) -> Optional[float]:
+    """Seconds until reset from an RFC 3339 timestamp or a '1m30s' / '20ms' duration."""
+    if not value:
+        return None
+    if "T" in value:
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp() - time.time()
+        except ValueError:
+            return None
+    return parse_duration(value)
+
+
+def parse_duration(value: str) -> Optional[float]:
+    """Seconds in a '1m30s' / '20ms' / '7d' duration; None if unparseable."""
+    parts = _DURATION.findall(value or "")
+    if not parts:
+        return None
+    return sum(float(n) * _DURATION_UNITS[unit] for n, unit in parts)
+
+
+class _Slots:
+    """Counting semaphore usable from threads and from any event loop.
+
+    A released slot is handed directly to the oldest waiter (FIFO).
+    """
+
+    def __init__(self, limit: int):
+        self.limit = max(1, limit)
+        self.active = 0
+        self._lock = threading.Lock()
+        self._waiters: deque = deque()
+
+    def acquire(self) -> None:
+        with self._lock:
+            if self.active < self.limit:
+                self.active += 1
+                return
+            event = threading.Event()
+            self._waiters.append(event)
+        event.wait()
+
+    async def aacquire(self) -> None:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if self.active < self.limit:
+                self.active += 1
+                return
+            future = loop.create_future()
+            self._waiters.append(future)
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                if future in self._waiters:
+                    self._waiters.remove(future)
+                    raise
+            # Slot was already handed over (future done) — give it back
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def _hand_over(self, future) -> None:
+        if future.cancelled():
+            self.release()
+        else:
+            future.set_result(None)
+
+    def release(self) -> None:
+        with self._lock:
+            while self._waiters:
+                waiter = self._waiters.popleft()
+                if isinstance(waiter, threading.Event):
+                    waiter.set()
+                    return
+                if not waiter.done():
+                    waiter.get_loop().call_soon_threadsafe(self._hand_over, waiter)
+                    return
+            self.active -= 1
+
+
+class TokenBucket:
+    """Request/token budget for one model, as last reported by the provider.
+
+    Unknown (no headers yet, or past the reset time) means unlimited.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests: Optional[int] = None
+        self.requests_reset = 0.0
+        self.tokens: Optional[int] = None
+        self.tokens_reset = 0.0
+        self.paused_until = 0.0
+
+    def observe(self, headers) -> None:
+        """Refill from rate-limit headers (Anthropic or OpenAI-compatible)."""
+        if not headers:
+            return
+
+        def read(*names):
+            for name in names:
+                value = headers.get(name)
+                if value is not None:
+                    return value
+            return None
+
+        now = time.monotonic()
+        with self._lock:
+            remaining = read("anthropic-ratelimit-requests-remaining", "x-ratelimit-remaining-requests")
+            reset = _parse_reset(read("anthropic-ratelimit-requests-reset", "x-ratelimit-reset-requests"))
+            if remaining is not None and reset is not None:
+                self.requests, self.requests_reset = int(remaining), now + max(reset, 0.0)
+            remaining = read("anthropic-ratelimit-tokens-remaining", "x-ratelimit-remaining-tokens")
+            reset = _parse_reset(read("anthropic-ratelimit-tokens-reset", "x-ratelimit-reset-tokens"))
+            if remaining is not None and reset is not None:
+                self.tokens, self.tokens_reset = int(remaining), now + max(reset, 0.0)
+
+    def pause(self, seconds: float) -> None:
+        """Hold every caller for `seconds` (e.g. a 429's retry-after)."""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def reserve(self, cost: int = 0) -> float:
+        """Take one request (+ cost tokens); returns seconds to wait first (0 = go)."""
+        now = time.monotonic()
+        with self._lock:
+            if self.paused_until > now:
+                return self.paused_until - now
+            if self.requests is not None and self.requests_reset <= now:
+                self.requests = None
+            if self.tokens is not None and self.tokens_reset <= now:
+                self.tokens = None
+
+            wait = 0.0
+            if self.requests is not None and self.requests <= 0:
+                wait = self.requests_reset - now
+            if self.tokens is not None and cost and self.tokens < cost:
+                wait = max(wait, self.tokens_reset - now)
+            if wait > 0:
+                return wait
+
+            if self.requests is not None:
+                self.requests -= 1
+            if self.tokens is not None:
+                self.tokens -= cost
+            return 0.0
+
+
+class LLMScheduler:
+    """Concurrency caps, header-fed rate budget, retries and hedging for LLM calls."""
+
+    def __init__(
+        self,
+        max_concurrency: int = None,
+        model_concurrency: dict = None,
+        max_retries: int = None,
+        base_delay: float = None,
+        max_delay: float = None,
+        hedge_after: float = None,
+        hedge_max_tokens: int = None,
+        metrics=None,
+    ):
+        settings = get_settings()
+        self.max_concurrency = settings.llm_max_concurrency if max_concurrency is None else max_concurrency
+        self.model_concurrency = dict(
+            settings.llm_model_concurrency if model_concurrency is None else model_concurrency
+        )
+        self.max_retries = settings.llm_max_retries if max_retries is None else max_retries
+        self.base_delay = settings.llm_retry_base_delay if base_delay is None else base_delay
+        self.max_delay = settings.llm_retry_max_delay if max_delay is None else max_delay
+        self.hedge_after = settings.llm_hedge_after if hedge_after is None else hedge_after
+        self.hedge_max_tokens = settings.llm_hedge_max_tokens if hedge_max_tokens is None else hedge_max_tokens
+        self._lock = threading.Lock()
+        self._slots: dict[str, _Slots] = {}
+        self._buckets: dict[str, TokenBucket] = {}
+        self.metrics = metrics  # None = the process-wide LLMMetrics
+
+    # --- per-model state -------------------------------------------------
+
+    def _slots_for(self, model: str) -> _Slots:
+        with self._lock:
+            slots = self._slots.get(model)
+            if slots is None:
+                limit = self.model_concurrency.get(model, self.max_concurrency)
+                slots = self._slots[model] = _Slots(limit)
+            return slots
+
+    def bucket(self, model: str) -> TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(model)
+            if bucket is None:
+                bucket = self._buckets[model] = TokenBucket()
+            return bucket
+
+    def observe(self, model: str, headers) -> None:
+        """Feed a response's rate-limit headers into the model's budget."""
+        self.bucket(model).observe(headers)
+
+    def _site_stats(self, site: str, model: str):
+        """The (site, model) series in the shared LLM metrics."""
+        from legal_chatbot.utils.llm_metrics import get_llm_metrics
+
+        return (self.metrics or get_llm_metrics()).series(site, model)
+
+    def _backoff(self, exc: Exception, attempt: int, model: str) -> Optional[float]:
+        """Delay before the next attempt, or None if exc should be raised."""
+        if attempt >= self.max_retries or not is_retryable(exc):
+            return None
+        hinted = retry_after(exc)
+        if hinted is not None:
+            delay = min(hinted, self.max_delay) + random.uniform(0, self.base_delay)
+            self.bucket(model).pause(delay)
+        else:
+            delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        logger.warning(
+            f"LLM {model} failed ({type(exc).__name__} {_status_code(exc) or ''}), "
+            f"retry {attempt + 1}/{self.max_retries} in {delay:.2f}s"
+        )
+        return delay
+
+    def _wait_time(self, model: str, cost: int) -> float:
+        return min(self.bucket(model).reserve(cost), self.max_delay)
+
+    # --- sync ------------------------------------------------------------
+
+    def _throttle(self, model: str, cost: int, stats) -> None:
+        while (wait := self._wait_time(model, cost)) > 0:
+            stats.throttled += wait
+            time.sleep(wait)
+
+    def run(self, model: str, fn: Callable[[], T], cost: int = 0, site: str = None) -> T:
+        """Call fn() under the model's cap and budget, retrying transient errors."""
+        stats = self._site_stats(site or call_site(), model)
+        slots = self._slots_for(model)
+        for attempt in range(self.max_retries + 1):
+            self._throttle(model, cost, stats)
+            slots.acquire()
+            try:
+                result = fn()
+            except Exception as e:
+                delay = self._backoff(e, attempt, model)
+                if delay is None:
+                    raise
+            else:
+                return result
+            finally:
+                slots.release()
+            stats.retries += 1
+            time.sleep(delay)
+
+    def stream(
+        self, model: str, open_stream: Callable[[], Iterator[T]], cost: int = 0, site: str = None
+    ) -> Iterator[T]:
+        """Iterate open_stream() holding a slot; retried only before the first chunk."""
+        stats = self._site_stats(site or call_site(), model)
+        slots = self._slots_for(model)
+        for attempt in range(self.max_retries + 1):
+            self._throttle(model, cost, stats)
+            slots.acquire()
+            streamed = False
+            try:
+                for chunk in open_stream():
+                    streamed = True
+                    yield chunk
+            except Exception as e:
+                delay = None if streamed else self._backoff(e, attempt, model)
+                if delay is None:
+                    raise
+            else:
+                return
+            finally:
+                slots.release()
+            stats.retries += 1
+            time.sleep(delay)
+
+    # --- async -----------------------------------------------------------
+
+    async def _athrottle(self, model: str, cost: int, stats) -> None:
+        while (wait := self._wait_time(model, cost)) > 0:
+            stats.throttled += wait
+            await asyncio.sleep(wait)
+
+    async def _attempt(self, slots: _Slots, fn: Callable[[], Awaitable[T]]) -> T:
+        await slots.aacquire()
+        try:
+            return await fn()
+        finally:
+            slots.release()
+
+    async def _hedged(
+        self, model: str, slots: _Slots, fn: Callable[[], Awaitable[T]], cost: int, stats
+    ) -> T:
+        """One attempt; after hedge_after seconds a duplicate races the original."""
+        primary = asyncio.ensure_future(self._attempt(slots, fn))
+        tasks = [primary]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_after)
+            # Don't add load while the provider is throttling us
+            if done or self.bucket(model).reserve(cost) > 0:
+                return await primary
+            backup = asyncio.ensure_future(self._attempt(slots, fn))
+            tasks.append(backup)
+            stats.hedged += 1
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if not task.cancelled() and task.exception() is None:
+                        if task is backup:
+                            stats.hedge_wins += 1
+                        return task.result()
+            return primary.result()  # both failed — raise the original error
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def arun(
+        self,
+        model: str,
+        fn: Callable[[], Awaitable[T]],
+        cost: int = 0,
+        max_tokens: int = None,
+        site: str = None,
+    ) -> T:
+        """Async run(); short requests (max_tokens <= hedge_max_tokens) are hedged."""
+        stats = self._site_stats(site or call_site(), model)
+        slots = self._slots_for(model)
+        hedge = self.hedge_after > 0 and max_tokens is not None and max_tokens <= self.hedge_max_tokens
+        for attempt in range(self.max_retries + 1):
+            await self._athrottle(model, cost, stats)
+            try:
+                if hedge:
+                    result = await self._hedged(model, slots, fn, cost, stats)
+                else:
+                    result = await self._attempt(slots, fn)
+            except Exception as e:
+                delay = self._backoff(e, attempt, model)
+                if delay is None:
+                    raise
+            else:
+                return result
+            stats.retries += 1
+            await asyncio.sleep(delay)
+
+    async def astream(
+        self, model: str, open_stream: Callable[[], AsyncIterator[T]], cost: int = 0, site: str = None
+    ) -> AsyncIterator[T]:
+        """Async stream(): holds a slot for the whole stream."""
+        stats = self._site_stats(site or call_site(), model)
+        slots = self._slots_for(model)
+        for attempt in range(self.max_retries + 1):
+            await self._athrottle(model, cost, stats)
+            await slots.aacquire()
+            streamed = False
+            try:
+                async for chunk in open_stream():
+                    streamed = True
+                    yield chunk
+            except Exception as e:
+                delay = None if streamed else self._backoff(e, attempt, model)
+                if delay is None:
+                    raise
+            else:
+                return
+            finally:
+                slots.release()
+            stats.retries += 1
+            await asyncio.sleep(delay)
+
+    # --- reporting -------------------------------------------------------
+
+    def stats(self) -> dict:
+        """{model: slot and budget state}; per-site counters are in llm_metrics."""
+        with self._lock:
+            return {
+                model: {
+                    "active": slots.active,
+                    "limit": slots.limit,
+                    "waiting": len(slots._waiters),
+                    "requests_remaining": self._buckets[model].requests if model in self._buckets else None,
+                    "tokens_remaining": self._buckets[model].tokens if model in self._buckets else None,
+                }
+                for model, slots in self._slots.items()
+            }
+
+
+_scheduler: Optional[LLMScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_llm_scheduler() -> LLMScheduler:
+    """Get or create the process-wide LLM scheduler."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = LLMScheduler()
+        return _scheduler
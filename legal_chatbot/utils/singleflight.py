@@ -0,0 +1,174 @@
+"""Coalescing of identical in-flight calls ("singleflight").
+
+When many sessions start together they all list categories and templates;
+when a question trends, the same intent / term-extraction prompt runs N
+times at once. Concurrent calls with the same key share one execution:
+
+    flight = get_singleflight()
+    text = flight.do("llm", key, call)          # from threads
+    text = await flight.ado("llm", key, acall)  # on the event loop
+
+Only calls that overlap in time are merged; nothing is kept once the
+leader finishes (llm_cache does that for opted-in calls). Followers get
+the leader's result or exception. Per-group counters of calls and
+deduplicated calls are in stats() and at GET /metrics.
+
+DB read methods opt in with @coalesced(); AsyncDatabase merges awaiters
+on the loop, so followers don't each hold a blocking-pool thread.
+"""
+
+import asyncio
+import copy
+import functools
+import json
+import threading
+from concurrent.futures import Future
+from typing import Awaitable, Callable, Optional, TypeVar
+
+from legal_chatbot.utils.config import get_settings
+
+T = TypeVar("T")
+
+PREFIX = "legal_chatbot_singleflight"
+
+
+class SingleFlight:
+    """Shares one execution among concurrent calls with the same (group, key)."""
+
+    def __init__(self, enabled: bool = None):
+        self.enabled = get_settings().singleflight_enabled if enabled is None else enabled
+        self._lock = threading.Lock()
+        self._inflight: dict[tuple[str, str], Future] = {}
+        self._ainflight: dict[tuple[str, str], asyncio.Task] = {}
+        self._calls: dict[str, int] = {}
+        self._deduplicated: dict[str, int] = {}
+
+    def _count(self, group: str, follower: bool) -> None:
+        self._calls[group] = self._calls.get(group, 0) + 1
+        if follower:
+            self._deduplicated[group] = self._deduplicated.get(group, 0) + 1
+
+    def do(self, group: str, key: str, fn: Callable[[], T], copy_result: bool = False) -> T:
+        """fn(), or the result of an identical call already running in another thread.
+
+        copy_result=True hands followers a deep copy (for mutable results
+        such as DB rows), so no caller sees another's edits.
+        """
+        if not self.enabled:
+            return fn()
+        slot = (group, key)
+        with self._lock:
+            future = self._inflight.get(slot)
+            leader = future is None
+            if leader:
+                future = self._inflight[slot] = Future()
+            self._count(group, not leader)
+        if not leader:
+            result = future.result()
+            return copy.deepcopy(result) if copy_result else result
+
+        try:
+            result = fn()
+        except BaseException as e:
+            self._release(slot)
+            future.set_exception(e)
+            raise
+        self._release(slot)
+        future.set_result(result)
+        return result
+
+    def _release(self, slot: tuple[str, str]) -> None:
+        with self._lock:
+            self._inflight.pop(slot, None)
+
+    async def ado(
+        self, group: str, key: str, fn: Callable[[], Awaitable[T]], copy_result: bool = False
+    ) -> T:
+        """await fn(), or join an identical call already running on this loop.
+
+        The shared call runs as its own task: a caller that is cancelled
+        stops waiting without cancelling it for the others.
+        """
+        if not self.enabled:
+            return await fn()
+        slot = (group, key)
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            task = self._ainflight.get(slot)
+            leader = task is None or task.done() or task.get_loop() is not loop
+            if leader:
+                task = self._ainflight[slot] = loop.create_task(fn())
+                task.add_done_callback(functools.partial(self._adone, slot))
+            self._count(group, not leader)
+        result = await asyncio.shield(task)
+        return copy.deepcopy(result) if copy_result and not leader else result
+
+    def _adone(self, slot: tuple[str, str], task: asyncio.Task) -> None:
+        with self._lock:
+            if self._ainflight.get(slot) is task:
+                del self._ainflight[slot]
+        if not task.cancelled():
+            task.exception()  # retrieved even if every waiter was cancelled
+
+    def stats(self) -> dict:
+        """{group: {calls, deduplicated, in_flight}}."""
+        with self._lock:
+            in_flight: dict[str, int] = {}
+            for group, _ in list(self._inflight) + list(self._ainflight):
+                in_flight[group] = in_flight.get(group, 0) + 1
+            return {
+                group: {
+                    "calls": calls,
+                    "deduplicated": self._deduplicated.get(group, 0),
+                    "in_flight": in_flight.get(group, 0),
+                }
+                for group, calls in sorted(self._calls.items())
+            }
+
+    def render_prometheus(self) -> str:
+        """Counters in the Prometheus text exposition format."""
+        calls = [f"# HELP {PREFIX}_calls_total Coalescable calls by group (llm, db)",
+                 f"# TYPE {PREFIX}_calls_total counter"]
+        deduplicated = [f"# HELP {PREFIX}_deduplicated_total Calls served by an identical in-flight call",
+                        f"# TYPE {PREFIX}_deduplicated_total counter"]
+        for group, counters in self.stats().items():
+            calls.append(f'{PREFIX}_calls_total{{group="{group}"}} {counters["calls"]}')
+            deduplicated.append(f'{PREFIX}_deduplicated_total{{group="{group}"}} {counters["deduplicated"]}')
+        return "\n".join(calls + deduplicated) + "\n"
+
+
+def call_key(name: str, args: tuple, kwargs: dict) -> str:
+    """Key for a call by name and arguments."""
+    return json.dumps([name, args, kwargs], sort_keys=True, ensure_ascii=False, default=str)
+
+
+def coalesced(group: str = "db"):
+    """Method decorator: concurrent identical calls share one execution.
+
+    The key is the method and its arguments, not the instance: every
+    client returned by get_database() reads the same database.
+    """
+
+    def decorate(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            key = call_key(method.__qualname__, args, kwargs)
+            return get_singleflight().do(group, key, lambda: method(self, *args, **kwargs), copy_result=True)
+
+        wrapper.__singleflight__ = (group, method.__qualname__)
+        return wrapper
+
+    return decorate
+
+
+_singleflight: Optional[SingleFlight] = None
+_singleflight_lock = threading.Lock()
+
+
+def get_singleflight() -> SingleFlight:
+    """Get or create the process-wide SingleFlight."""
+    global _singleflight
+    with _singleflight_lock:
+        if _singleflight is None:
+            _singleflight = SingleFlight()
+        return _singleflight
@@ -0,0 +1,138 @@
+"""Base for the two-tier caches (query embeddings, LLM responses).
+
+Tier 1: in-process LRU of up to max_entries values
+Tier 2: optional SQLite file that survives restarts
+
+Subclasses own the table: its schema and how a value is read from and
+written to a row. Entries may carry an expiry (epoch seconds); expired
+ones count as misses.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TieredCache(ABC):
+    """Thread-safe LRU + optional on-disk store with hit/miss counters."""
+
+    label = "Cache"  # in log lines
+    table = ""  # dropped by clear()
+    log_every = 500  # log the hit rate every N lookups
+
+    def __init__(self, max_entries: int, path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.path = Path(path) if path else None
+        self._lock = threading.Lock()
+        self._lru: OrderedDict[str, tuple[Any, Optional[float]]] = OrderedDict()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if self.path:
+            self._open_disk()
+
+    def _open_disk(self) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._create_table(conn)
+            conn.commit()
+            self._conn = conn
+        except sqlite3.Error as e:
+            logger.warning(f"{self.label} disk cache unavailable ({self.path}): {e}")
+            self._conn = None
+
+    @abstractmethod
+    def _create_table(self, conn: sqlite3.Connection) -> None:
+        """Create the table (and drop stale rows) on a fresh connection."""
+
+    @abstractmethod
+    def _read(self, key: str, now: float) -> Optional[tuple[Any, Optional[float]]]:
+        """(value, expires_at) of a live row, or None."""
+
+    @abstractmethod
+    def _write(self, key: str, value: Any, expires_at: Optional[float]) -> None:
+        """Insert or replace the row for key."""
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value or None (counts a hit or miss)."""
+        now = time.time()
+        with self._lock:
+            entry = self._lru.get(key)
+            if entry is not None:
+                if entry[1] is None or entry[1] > now:
+                    self._lru.move_to_end(key)
+                    self.memory_hits += 1
+                    self._maybe_log()
+                    return entry[0]
+                del self._lru[key]
+
+            if self._conn is not None:
+                entry = self._read(key, now)
+                if entry is not None:
+                    self._remember(key, *entry)
+                    self.disk_hits += 1
+                    self._maybe_log()
+                    return entry[0]
+
+            self.misses += 1
+            self._maybe_log()
+            return None
+
+    def put(self, key: str, value: Any, expires_at: Optional[float] = None) -> None:
+        """Store a value in both tiers."""
+        with self._lock:
+            self._remember(key, value, expires_at)
+            if self._conn is not None:
+                try:
+                    self._write(key, value, expires_at)
+                    self._conn.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"{self.label} disk cache write failed: {e}")
+
+    def _remember(self, key: str, value: Any, expires_at: Optional[float]) -> None:
+        if self.max_entries <= 0:
+            return
+        self._lru[key] = (value, expires_at)
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_entries:
+            self._lru.popitem(last=False)
+
+    def _maybe_log(self) -> None:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        if lookups % self.log_every == 0:
+            logger.info(f"{self.label} cache: {lookups} lookups, hit rate {self._hit_rate():.1%}")
+
+    def _hit_rate(self) -> float:
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return (self.memory_hits + self.disk_hits) / lookups if lookups else 0.0
+
+    def stats(self) -> dict:
+        """Hit/miss counters and hit rate since process start."""
+        with self._lock:
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round(self._hit_rate(), 4),
+                "memory_entries": len(self._lru),
+                "disk_enabled": self._conn is not None,
+            }
+
+    def clear(self) -> None:
+        """Drop both tiers and reset counters."""
+        with self._lock:
+            self._lru.clear()
+            if self._conn is not None:
+                self._conn.execute(f"DELETE FROM {self.table}")
+                self._conn.commit()
+            self.memory_hits = self.disk_hits = self.misses = 0
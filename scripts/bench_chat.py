@@ -0,0 +1,205 @@
+"""End-to-end latency benchmark of /api/chat and /api/chat/stream against a fake LLM.
+
+Starts the fake LLM server (legal_chatbot/api/fake_llm_server.py) and the API
+in-process unless --llm-url / --api-url point at running ones, then drives
+both endpoints and reports p50/p95/p99 per stage:
+
+    chat:    total
+    stream:  session event (routing + session lookup), first token, total
+    llm:     per call site, from the API's /api/health scheduler counters
+
+    python scripts/bench_chat.py --requests 200 --concurrency 20 --ttft 0.4 --tps 60
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+QUESTIONS = [
+    "Chia thừa kế thế nào khi cha mẹ mất không để lại di chúc?",
+    "Người lao động nghỉ việc cần báo trước bao nhiêu ngày?",
+    "Thủ tục sang tên sổ đỏ khi mua bán đất gồm những bước nào?",
+    "Tiền đặt cọc thuê nhà có được trả lại khi chấm dứt hợp đồng sớm không?",
+]
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(app, port: int):
+    """Run an ASGI app with uvicorn in a daemon thread; returns the server."""
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def percentiles(values: list[float]) -> dict:
+    if not values:
+        return {"n": 0}
+    values = sorted(values)
+    if len(values) == 1:
+        p50 = p95 = p99 = values[0]
+    else:
+        q = statistics.quantiles(values, n=100, method="inclusive")
+        p50, p95, p99 = q[49], q[94], q[98]
+    return {"n": len(values), "p50": p50, "p95": p95, "p99": p99, "max": values[-1]}
+
+
+def question(i: int, repeat: bool) -> str:
+    text = QUESTIONS[i % len(QUESTIONS)]
+    # Vary each copy so the LLM response cache never short-circuits the router
+    return text if repeat else f"{text} (#{i})"
+
+
+async def run_chat(client, i: int, repeat: bool, stages: dict) -> None:
+    start = time.perf_counter()
+    response = await client.post("/api/chat", json={"message": question(i, repeat)})
+    response.raise_for_status()
+    stages["chat.total"].append(time.perf_counter() - start)
+
+
+async def run_stream(client, i: int, repeat: bool, stages: dict) -> None:
+    start = time.perf_counter()
+    first_token = None
+    async with client.stream("POST", "/api/chat/stream", json={"message": question(i, repeat)}) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if not line.startswith("data: "):
+                continue
+            event = json.loads(line[6:])
+            now = time.perf_counter() - start
+            if event["type"] == "session":
+                stages["stream.session"].append(now)
+            elif event["type"] == "token" and first_token is None:
+                first_token = now
+                stages["stream.first_token"].append(now)
+            elif event["type"] == "done":
+                stages["stream.total"].append(now)
+
+
+async def drive(api_url: str, endpoint: str, requests: int, concurrency: int, repeat: bool) -> tuple[dict, float]:
+    import httpx
+
+    stages = {name: [] for name in ("chat.total", "stream.session", "stream.first_token", "stream.total")}
+    runner = run_chat if endpoint == "chat" else run_stream
+    semaphore = asyncio.Semaphore(concurrency)
+    errors = 0
+
+    async def one(client, i):
+        nonlocal errors
+        async with semaphore:
+            try:
+                await runner(client, i, repeat, stages)
+            except Exception as e:
+                errors += 1
+                print(f"  request {i} failed: {e}", file=sys.stderr)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=api_url, timeout=120, limits=limits) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(one(client, i) for i in range(requests)))
+        elapsed = time.perf_counter() - start
+    if errors:
+        print(f"  {errors} {endpoint} requests failed", file=sys.stderr)
+    return {k: v for k, v in stages.items() if v}, elapsed
+
+
+def llm_site_delta(before: dict, after: dict) -> dict:
+    """Per call site: calls and mean latency between two /api/health snapshots."""
+    rows = {}
+    for site, models in (after or {}).items():
+        for model, stats in models.items():
+            prev = (before or {}).get(site, {}).get(model, {})
+            calls = stats["ok"] + stats["errors"] - prev.get("ok", 0) - prev.get("errors", 0)
+            if calls <= 0:
+                continue
+            total = stats["avg_latency_s"] * (stats["ok"] + stats["errors"]) - prev.get("avg_latency_s", 0) * (
+                prev.get("ok", 0) + prev.get("errors", 0)
+            )
+            rows[f"{site} [{model}]"] = {"calls": calls, "avg_s": total / calls}
+    return rows
+
+
+def llm_sites(api_url: str) -> dict:
+    import httpx
+
+    try:
+        health = httpx.get(f"{api_url}/api/health", timeout=10).json()
+        return (health.get("llm") or {}).get("sites", {})
+    except Exception:
+        return {}
+
+
+def print_report(endpoint: str, stages: dict, elapsed: float, requests: int, sites: dict) -> None:
+    print(f"\n{endpoint}: {requests} requests in {elapsed:.2f}s → {requests / elapsed:.1f} req/s")
+    print(f"{'stage':<22}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for name, values in stages.items():
+        p = percentiles(values)
+        print(
+            f"{name:<22}{p['n']:>6}{p['p50'] * 1000:>10.0f}{p['p95'] * 1000:>10.0f}"
+            f"{p['p99'] * 1000:>10.0f}{p['max'] * 1000:>10.0f}"
+        )
+    for site, row in sites.items():
+        print(f"  llm {site:<48}{row['calls']:>6} calls  avg {row['avg_s'] * 1000:>7.0f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--endpoints", default="chat,stream", help="chat,stream")
+    parser.add_argument("--ttft", type=float, default=0.3, help="Fake LLM seconds to first token")
+    parser.add_argument("--tps", type=float, default=80.0, help="Fake LLM output tokens per second")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of fake LLM 529s")
+    parser.add_argument("--llm-url", help="Use a running fake LLM instead of starting one")
+    parser.add_argument("--api-url", help="Use a running API (must already point at the fake LLM)")
+    parser.add_argument("--repeat", action="store_true", help="Reuse identical questions (LLM cache hits)")
+    args = parser.parse_args()
+
+    if not args.llm_url:
+        from legal_chatbot.api.fake_llm_server import create_fake_llm_app
+
+        port = free_port()
+        start_server(create_fake_llm_app(args.ttft, args.tps, error_rate=args.error_rate), port)
+        args.llm_url = f"http://127.0.0.1:{port}"
+
+    if not args.api_url:
+        # Set before the API (and its settings/LLM clients) is imported
+        os.environ["ANTHROPIC_BASE_URL"] = args.llm_url
+        os.environ["DEEPSEEK_BASE_URL"] = args.llm_url
+        os.environ.setdefault("ANTHROPIC_API_KEY", "fake-key")
+        os.environ.setdefault("AUTH_DISABLED", "true")
+        from legal_chatbot.api.app import create_app
+
+        port = free_port()
+        start_server(create_app(), port)
+        args.api_url = f"http://127.0.0.1:{port}"
+
+    print(f"API {args.api_url} → fake LLM {args.llm_url} (ttft={args.ttft}s, {args.tps} tok/s)")
+    for endpoint in args.endpoints.split(","):
+        before = llm_sites(args.api_url)
+        stages, elapsed = asyncio.run(
+            drive(args.api_url, endpoint, args.requests, args.concurrency, args.repeat)
+        )
+        print_report(endpoint, stages, elapsed, args.requests, llm_site_delta(before, llm_sites(args.api_url)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Benchmark embedding backends: throughput (texts/sec) and peak RSS per process.
+
+Each backend runs in a fresh subprocess so memory numbers are not shared.
+
+    python scripts/bench_embedding.py --backends torch,onnx,onnx-int8 --texts 512
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+SAMPLE_FILE = ROOT / "data" / "chroma" / "articles.json"
+FALLBACK_TEXTS = [
+    "Điều 45. Điều kiện thực hiện quyền chuyển nhượng quyền sử dụng đất",
+    "Người lao động có quyền đơn phương chấm dứt hợp đồng lao động không xác định thời hạn",
+    "Thừa kế theo pháp luật là thừa kế theo hàng thừa kế, điều kiện và trình tự thừa kế",
+]
+
+
+def load_texts(n: int) -> list[str]:
+    texts = []
+    if SAMPLE_FILE.exists():
+        data = json.loads(SAMPLE_FILE.read_text(encoding="utf-8"))
+        texts = [a.get("content", "") for a in data.values() if a.get("content")]
+    texts = texts or FALLBACK_TEXTS
+    # Vary each copy so the query cache never short-circuits the model
+    return [f"{texts[i % len(texts)]} ({i})" for i in range(n)]
+
+
+def run_worker(backend: str, n: int, batch_size: int) -> dict:
+    from legal_chatbot.services.embedding import EmbeddingService
+
+    svc = EmbeddingService(backend=backend)
+    start = time.perf_counter()
+    svc.get_model()
+    load_s = time.perf_counter() - start
+
+    texts = load_texts(n)
+    svc.embed_batch(texts[:batch_size], batch_size=batch_size)  # warm-up
+
+    start = time.perf_counter()
+    svc.embed_batch(texts, batch_size=batch_size)
+    batch_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for text in texts[:64]:
+        svc.get_model().encode(text, normalize_embeddings=True)
+    single_ms = (time.perf_counter() - start) / min(64, len(texts)) * 1000
+
+    return {
+        "backend": backend,
+        "load_s": round(load_s, 2),
+        "batch_texts_per_s": round(n / batch_s, 1),
+        "single_ms": round(single_ms, 2),
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--backends", default="torch,onnx,onnx-int8")
+    parser.add_argument("--texts", type=int, default=512)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker, args.texts, args.batch_size)))
+        return
+
+    results = []
+    for backend in args.backends.split(","):
+        proc = subprocess.run(
+            [sys.executable, __file__, "--worker", backend,
+             "--texts", str(args.texts), "--batch-size", str(args.batch_size)],
+            capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            print(f"{backend}: failed — {(proc.stderr.strip().splitlines() or ['?'])[-1]}")
+            continue
+        results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+
+    if not results:
+        return
+    base = results[0]
+    print(f"{'backend':<12}{'load s':>8}{'texts/s':>10}{'single ms':>11}{'RSS MB':>9}{'speedup':>9}")
+    for r in results:
+        speedup = r["batch_texts_per_s"] / base["batch_texts_per_s"]
+        print(
+            f"{r['backend']:<12}{r['load_s']:>8}{r['batch_texts_per_s']:>10}"
+            f"{r['single_ms']:>11}{r['peak_rss_mb']:>9}{speedup:>8.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
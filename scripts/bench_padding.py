@@ -0,0 +1,80 @@
+"""Benchmark chunking truncation and batch padding waste: char heuristics vs tokenizer.
+
+Needs the embedding model's tokenizer (transformers); the model itself is not loaded.
+
+    python scripts/bench_padding.py --input data/chroma/articles.json --batch-size 64
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from legal_chatbot.services.embedding import EmbeddingService  # noqa: E402
+from legal_chatbot.utils.vietnamese import normalize_for_embedding  # noqa: E402
+
+
+def load_articles(path: Path) -> list[dict]:
+    data = json.loads(path.read_text(encoding="utf-8"))
+    if isinstance(data, dict) and "articles" in data:  # sync-articles format
+        items = data["articles"]
+    elif isinstance(data, dict):  # data/chroma/articles.json
+        items = list(data.values())
+    else:
+        items = data
+    return [
+        {"id": str(a.get("id", i)), "content": a.get("content", "")}
+        for i, a in enumerate(items) if a.get("content")
+    ]
+
+
+def padding_waste(lengths: list[int], order: list[int], batch_size: int) -> float:
+    """Share of padded token slots that are padding."""
+    real = padded = 0
+    for start in range(0, len(order), batch_size):
+        batch = [lengths[i] for i in order[start:start + batch_size]]
+        real += sum(batch)
+        padded += max(batch) * len(batch)
+    return 1 - real / padded if padded else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--input", default=str(ROOT / "data" / "chroma" / "articles.json"))
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args()
+
+    svc = EmbeddingService()
+    if svc.get_tokenizer() is None:
+        sys.exit("Tokenizer unavailable — install transformers and make the model reachable")
+    max_tokens = svc._max_tokens
+
+    articles = load_articles(Path(args.input))
+    print(f"{len(articles)} articles, max_tokens={max_tokens}, batch_size={args.batch_size}\n")
+
+    print(f"{'chunking':<12}{'chunks':>8}{'truncated':>11}{'tokens lost':>13}")
+    chunk_sets = {}
+    for name, split in (
+        ("chars (old)", lambda a: svc._split_by_chars(dict(a))),
+        ("tokens (new)", lambda a: svc.split_long_article(dict(a))),
+    ):
+        chunks = [c for a in articles for c in split(a)]
+        lengths = svc.token_lengths([normalize_for_embedding(c["content"]) for c in chunks])
+        over = [n - max_tokens for n in lengths if n > max_tokens]
+        chunk_sets[name] = chunks
+        print(f"{name:<12}{len(chunks):>8}{len(over):>11}{sum(over):>13}")
+
+    texts = [normalize_for_embedding(c["content"]) for c in chunk_sets["tokens (new)"]]
+    lengths = [min(n, max_tokens) for n in svc.token_lengths(texts)]
+    by_chars = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    by_tokens = sorted(range(len(texts)), key=lambda i: lengths[i])
+    print(f"\n{'batching':<12}{'padding waste':>15}")
+    print(f"{'chars (old)':<12}{padding_waste(lengths, by_chars, args.batch_size):>14.1%}")
+    print(f"{'tokens (new)':<12}{padding_waste(lengths, by_tokens, args.batch_size):>14.1%}")
+
+
+if __name__ == "__main__":
+    main()
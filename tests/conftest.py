@@ -1,5 +1,9 @@
 """Pytest configuration and fixtures"""
 
+import asyncio
+import time
+from types import SimpleNamespace
+
 import pytest
 import os
 import tempfile
@@ -10,11 +14,83 @@ def test_env(tmp_path, monkeypatch):
     """Set up test environment with temporary database"""
     db_path = tmp_path / "test.db"
     chroma_path = tmp_path / "chroma"
+    vector_path = tmp_path / "vectors"
 
     monkeypatch.setenv("DATABASE_PATH", str(db_path))
     monkeypatch.setenv("CHROMA_PATH", str(chroma_path))
+    monkeypatch.setenv("VECTOR_STORE_PATH", str(vector_path))
     monkeypatch.setenv("ANTHROPIC_API_KEY", "test_key")
 
     yield
 
     # Cleanup handled by tmp_path fixture
+
+
+class FakeAnthropic:
+    """Stand-in for the Anthropic clients behind utils/llm.py (sync and async).
+
+    reply: text for every call, or {model: text}
+    delay: seconds each call takes
+    calls: kwargs of every messages.create, in order (recorded before the delay)
+    """
+
+    def __init__(self, reply: str | dict = "ok", delay: float = 0.0, usage: tuple = (10, 5)):
+        self.reply = reply
+        self.delay = delay
+        self.usage = usage
+        self.calls: list[dict] = []
+
+    @property
+    def models(self) -> list[str]:
+        return [call["model"] for call in self.calls]
+
+    def _respond(self, kwargs: dict):
+        text = self.reply[kwargs["model"]] if isinstance(self.reply, dict) else self.reply
+        return SimpleNamespace(
+            content=[SimpleNamespace(text=text)],
+            usage=SimpleNamespace(input_tokens=self.usage[0], output_tokens=self.usage[1]),
+        )
+
+    def create(self, **kwargs):
+        self.calls.append(kwargs)
+        time.sleep(self.delay)
+        return self._respond(kwargs)
+
+    async def acreate(self, **kwargs):
+        self.calls.append(kwargs)
+        await asyncio.sleep(self.delay)
+        return self._respond(kwargs)
+
+    @property
+    def client(self):
+        """Sync client: messages.create and messages.with_raw_response.create."""
+        def raw_create(**kwargs):
+            response = self.create(**kwargs)
+            return SimpleNamespace(headers={}, parse=lambda: response)
+
+        return SimpleNamespace(messages=SimpleNamespace(
+            create=self.create, with_raw_response=SimpleNamespace(create=raw_create),
+        ))
+
+    @property
+    def async_client(self):
+        """Async client with the same surface as .client."""
+        async def raw_create(**kwargs):
+            response = await self.acreate(**kwargs)
+            return SimpleNamespace(headers={}, parse=lambda: response)
+
+        return SimpleNamespace(messages=SimpleNamespace(
+            create=self.acreate, with_raw_response=SimpleNamespace(create=raw_create),
+        ))
+
+
+@pytest.fixture
+def fake_anthropic(monkeypatch):
+    """A FakeAnthropic installed as both LLM clients, DeepSeek off; set its attributes per test."""
+    from legal_chatbot.utils import llm
+
+    fake = FakeAnthropic()
+    monkeypatch.setattr(llm, "get_client", lambda: fake.client)
+    monkeypatch.setattr(llm, "get_async_client", lambda: fake.async_client)
+    monkeypatch.setattr(llm, "_use_deepseek", lambda: False)
+    return fake
@@ -0,0 +1,49 @@
+"""Tests for the async DB facade, the blocking pool and the async LLM helpers."""
+
+import asyncio
+import threading
+import time
+
+from legal_chatbot.db.async_db import AsyncDatabase
+from legal_chatbot.utils import llm
+from legal_chatbot.utils.executor import run_blocking
+
+
+class FakeDB:
+    table_name = "chat_sessions"
+
+    def __init__(self):
+        self.threads = []
+
+    def get_chat_session(self, session_id):
+        self.threads.append(threading.current_thread().name)
+        time.sleep(0.2)
+        return {"id": session_id}
+
+
+async def test_async_database_runs_off_loop_concurrently():
+    db = FakeDB()
+    adb = AsyncDatabase(db)
+
+    start = time.perf_counter()
+    rows = await asyncio.gather(*(adb.get_chat_session(str(i)) for i in range(4)))
+    elapsed = time.perf_counter() - start
+
+    assert [r["id"] for r in rows] == ["0", "1", "2", "3"]
+    assert all(name.startswith("blocking") for name in db.threads)
+    assert elapsed < 0.5
+    assert adb.table_name == "chat_sessions"
+    assert adb.sync is db
+
+
+async def test_run_blocking_passes_kwargs():
+    assert await run_blocking(sorted, [3, 1, 2], reverse=True) == [3, 2, 1]
+
+
+async def test_acall_llm_json_uses_async_client_and_cache(fake_anthropic):
+    fake_anthropic.reply = '```json\n{"intent": "other"}\n```'
+
+    request = [{"role": "user", "content": "Xin chào, async"}]
+    assert await llm.acall_llm_json(request, cache=True) == {"intent": "other"}
+    assert await llm.acall_llm_json(request, cache=True) == {"intent": "other"}
+    assert len(fake_anthropic.calls) == 1
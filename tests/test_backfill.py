@@ -0,0 +1,87 @@
+"""Tests for the resumable embedding backfill (in-process mode)."""
+
+import json
+
+import pytest
+
+from legal_chatbot.db import vector_store
+from legal_chatbot.db.sqlite_client import SQLiteClient
+from legal_chatbot.services.backfill import BackfillService
+from legal_chatbot.services.embedding import EmbeddingService
+
+DIM = 4
+
+
+class FakeModel:
+    def __init__(self, value=1.0):
+        self.value = value
+        self.encoded = []
+
+    def encode(self, texts, **kwargs):
+        import numpy as np
+
+        self.encoded.extend(texts)
+        return np.array([[self.value, 0.0, 0.0, 0.0] for _ in texts], dtype=np.float32)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setenv("EMBEDDING_DIMENSION", str(DIM))
+    monkeypatch.setattr(vector_store, "_store", None)
+    client = SQLiteClient()
+    client.init_db()
+    client.insert_document({
+        "id": "blds", "document_type": "luat", "document_number": "91/2015/QH13",
+        "title": "Bộ luật Dân sự 2015",
+    })
+    client.upsert_articles([
+        {"id": f"a{i:02d}", "document_id": "blds", "article_number": i,
+         "content": f"Điều {i}. Nội dung", "embedding": [0.0, 1.0, 0.0, 0.0]}
+        for i in range(1, 8)
+    ])
+    return client
+
+
+def _service(db, tmp_path, model):
+    svc = EmbeddingService(model_name="fake")
+    svc._model = model
+    svc._tokenizer = False
+    return BackfillService(db, embedding=svc, page_size=3, checkpoint_path=tmp_path / "cp.json")
+
+
+def test_backfill_reembeds_all_articles(db, tmp_path):
+    model = FakeModel()
+    stats = _service(db, tmp_path, model).run()
+    assert stats.finished and stats.processed == 7 and stats.updated == 7
+    assert len(model.encoded) == 7
+    stored = vector_store.get_vector_store().get(["a01", "a07"])
+    assert all(v[0] == pytest.approx(1.0) for v in stored.values())
+
+
+def test_backfill_resumes_from_checkpoint(db, tmp_path):
+    first = FakeModel()
+    stats = _service(db, tmp_path, first).run(max_pages=1)
+    assert not stats.finished and stats.cursor == "a03"
+    assert json.loads((tmp_path / "cp.json").read_text())["cursor"] == "a03"
+
+    second = FakeModel()
+    stats = _service(db, tmp_path, second).run()
+    assert stats.finished and stats.processed == 7
+    assert len(second.encoded) == 4
+
+
+def test_rows_changed_during_backfill_are_skipped(db, tmp_path):
+    class EditingModel(FakeModel):
+        def encode(self, texts, **kwargs):
+            # A live sync rewrites a01 while its old content is being embedded
+            if "a01-edited" not in self.encoded:
+                db.upsert_articles([{"id": "a01", "document_id": "blds", "article_number": 1,
+                                     "content": "Điều 1. Đã sửa đổi",
+                                     "embedding": [0.0, 0.0, 1.0, 0.0]}])
+                self.encoded.append("a01-edited")
+            return super().encode(texts, **kwargs)
+
+    stats = _service(db, tmp_path, EditingModel()).run(max_pages=1)
+    assert stats.updated == 2 and stats.skipped == 1
+    stored = vector_store.get_vector_store().get(["a01"])
+    assert stored["a01"][2] == pytest.approx(1.0)
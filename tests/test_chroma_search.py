@@ -0,0 +1,97 @@
+"""Tests for the BM25 inverted index behind db/chroma.search_articles (SQLite mode)."""
+
+import json
+
+import pytest
+
+from legal_chatbot.db import chroma
+
+
+@pytest.fixture(autouse=True)
+def fresh_store(monkeypatch):
+    """Force init_chroma() to reload from the per-test CHROMA_PATH."""
+    monkeypatch.setattr(chroma, "_storage_path", None)
+    monkeypatch.setattr(chroma, "_index", None)
+    monkeypatch.setattr(chroma, "_articles", {})
+
+
+ARTICLES = [
+    {
+        "id": "dat_dai_dieu_45",
+        "content": "Điều 45. Điều kiện thực hiện quyền chuyển nhượng quyền sử dụng đất",
+        "title": "Điều kiện chuyển nhượng quyền sử dụng đất",
+        "document_title": "Luật Đất đai 2024",
+        "article_number": 45,
+    },
+    {
+        "id": "nha_o_dieu_121",
+        "content": "Điều 121. Nhà ở tham gia giao dịch phải có giấy chứng nhận quyền sử dụng đất",
+        "title": "Điều kiện của nhà ở tham gia giao dịch",
+        "document_title": "Luật Nhà ở 2014",
+        "article_number": 121,
+    },
+    {
+        "id": "lao_dong_dieu_36",
+        "content": "Điều 36. Quyền đơn phương chấm dứt hợp đồng lao động của người sử dụng lao động",
+        "title": "Đơn phương chấm dứt hợp đồng lao động",
+        "document_title": "Bộ luật Lao động 2019",
+        "article_number": 36,
+    },
+]
+
+
+def test_tokenize_keeps_vietnamese_syllables_whole():
+    assert chroma._tokenize("Quyền sử dụng ĐẤT") == ["quyền", "sử", "dụng", "đất"]
+
+
+def test_title_match_ranks_first():
+    chroma.add_articles(ARTICLES)
+    results = chroma.search_articles("chuyển nhượng quyền sử dụng đất", top_k=3)
+    assert results[0]["id"] == "dat_dai_dieu_45"
+    assert all(0 < r["score"] < 1.0 for r in results)
+    assert [r["score"] for r in results] == sorted((r["score"] for r in results), reverse=True)
+    assert results[-1]["id"] == "lao_dong_dieu_36"
+
+
+def test_weak_match_is_not_promoted_to_full_score():
+    chroma.add_articles(ARTICLES)
+    strong = chroma.search_articles("chuyển nhượng quyền sử dụng đất", top_k=1)[0]["score"]
+    weak = chroma.search_articles("người sử dụng", top_k=1)[0]["score"]
+    assert weak < strong
+
+
+def test_no_match_returns_empty():
+    chroma.add_articles(ARTICLES)
+    assert chroma.search_articles("thừa kế di chúc") == []
+
+
+def test_readd_replaces_postings():
+    chroma.add_articles(ARTICLES)
+    chroma.add_articles([{**ARTICLES[0], "content": "Điều 45. Thừa kế", "title": "Thừa kế"}])
+    assert chroma.search_articles("thừa kế")[0]["id"] == "dat_dai_dieu_45"
+    ids = [r["id"] for r in chroma.search_articles("chuyển nhượng")]
+    assert "dat_dai_dieu_45" not in ids
+
+
+def test_index_persisted_and_reloaded(tmp_path, monkeypatch):
+    chroma.add_articles(ARTICLES)
+    index_file = tmp_path / "chroma" / "bm25_index.json"
+    assert index_file.exists()
+
+    monkeypatch.setattr(chroma, "_storage_path", None)
+    monkeypatch.setattr(chroma, "_index", None)
+    monkeypatch.setattr(chroma, "_build_index", lambda: pytest.fail("index rebuilt"))
+    assert chroma.search_articles("lao động")[0]["id"] == "lao_dong_dieu_36"
+
+
+def test_stale_index_is_rebuilt(tmp_path, monkeypatch):
+    chroma.add_articles(ARTICLES[:1])
+    # Simulate articles.json edited outside add_articles()
+    data_file = tmp_path / "chroma" / "articles.json"
+    stored = json.loads(data_file.read_text(encoding="utf-8"))
+    stored["extra"] = {"id": "extra", "content": "Điều 1. Thừa kế", "article_title": ""}
+    data_file.write_text(json.dumps(stored, ensure_ascii=False), encoding="utf-8")
+
+    monkeypatch.setattr(chroma, "_storage_path", None)
+    monkeypatch.setattr(chroma, "_index", None)
+    assert chroma.search_articles("thừa kế")[0]["id"] == "extra"
@@ -0,0 +1,143 @@
+"""Tests for the per-turn router call feeding intent routing + speculative context."""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from legal_chatbot.services import interactive_chat
+from legal_chatbot.services.interactive_chat import InteractiveChatService
+from legal_chatbot.services.query_router import QueryAnalysis
+
+DELAY = 0.2
+
+
+class FakeRetriever:
+    def __init__(self, svc):
+        self.svc = svc
+        self.calls = []
+
+    async def aretrieve(self, query, top_k=25, primary_terms=None, secondary_terms=None):
+        await asyncio.sleep(self.svc.context_delay)
+        self.calls.append((query, primary_terms, secondary_terms))
+        return [{"document_title": "Bộ luật Dân sự", "article_number": 650,
+                 "title": "Những trường hợp thừa kế theo pháp luật", "content": "..."}]
+
+
+@pytest.fixture
+def service(monkeypatch):
+    svc = InteractiveChatService(api_mode=True)
+    svc.router_calls = []
+    svc.retriever_fake = FakeRetriever(svc)
+    svc._research_service = SimpleNamespace(retriever=svc.retriever_fake)
+
+    async def slow_router(user_input, contract_types, categories):
+        svc.router_calls.append(user_input)
+        await asyncio.sleep(DELAY)
+        return svc.analysis
+
+    async def answer(messages, **kw):
+        return "trả lời"
+
+    svc.analysis = QueryAnalysis(
+        intent="legal_question", category="dan_su",
+        primary=["thừa kế", "di chúc"], secondary=["bộ luật dân sự"],
+    )
+    svc.context_delay = DELAY
+    monkeypatch.setattr(interactive_chat, "aanalyze_query", slow_router)
+    monkeypatch.setattr(interactive_chat, "acall_llm_sonnet", answer)
+    svc._available_types_cache = []  # no templates, no DB read
+    svc._categories_cache = []
+    monkeypatch.setattr(svc, "_check_data_for_query", lambda: None)
+    monkeypatch.setattr(svc, "_build_system_prompt", lambda: "hệ thống")
+    return svc
+
+
+async def test_one_router_call_feeds_intent_and_context(service):
+    start = time.perf_counter()
+    response = await service._handle_natural_input("Chia thừa kế khi không có di chúc?")
+    elapsed = time.perf_counter() - start
+
+    assert response.message == "trả lời"
+    assert service.router_calls == ["Chia thừa kế khi không có di chúc?"]
+    assert service.retriever_fake.calls == [
+        ("Chia thừa kế khi không có di chúc?", ["thừa kế", "di chúc"], ["bộ luật dân sự"])
+    ]
+    # router + retrieval, not router + router + retrieval
+    assert elapsed < DELAY * 2.8
+
+
+async def test_router_result_is_reused_within_the_turn(service):
+    await service._handle_natural_input("Chia thừa kế khi không có di chúc?")
+    await service._build_context_for_query("Chia thừa kế khi không có di chúc?", service.get_session())
+    assert len(service.router_calls) == 1
+
+    await service._handle_natural_input("Thời hiệu khởi kiện thừa kế?")
+    assert len(service.router_calls) == 2
+
+
+async def test_contract_intent_discards_speculative_context(service, monkeypatch):
+    service.analysis = QueryAnalysis(intent="create_contract", contract_type="cho_thue_nha")
+    service.context_delay = DELAY * 2
+
+    async def create_contract(contract_type):
+        return interactive_chat.InteractiveChatResponse(message=contract_type)
+
+    monkeypatch.setattr(service, "_create_contract", create_contract)
+    response = await service._handle_natural_input("Tạo hợp đồng thuê nhà")
+    assert response.message == "cho_thue_nha"
+    await asyncio.sleep(DELAY * 2)
+    assert service.retriever_fake.calls == []
+    assert len(service.router_calls) == 1
+
+
+async def test_router_failure_falls_back_to_ngram_terms(service):
+    service.analysis = None
+    await service._handle_natural_input("Chia thừa kế khi không có di chúc?")
+    (_, primary, secondary), = service.retriever_fake.calls
+    assert primary and not secondary
+
+
+class FakePromptDB:
+    def list_all_active_templates(self):
+        return [{"contract_type": "cho_thue_nha", "display_name": "Hợp đồng thuê nhà ở"}]
+
+    def get_all_categories_with_stats(self):
+        return [{"name": "dan_su", "display_name": "Dân sự", "article_count": 12},
+                {"name": "dat_dai", "article_count": 0}]
+
+
+def test_sync_contract_types_load_on_cold_cache():
+    svc = InteractiveChatService(api_mode=True)
+    svc._db = FakePromptDB()
+    assert svc._get_available_contract_types() == [
+        {"type": "cho_thue_nha", "name": "Hợp đồng thuê nhà ở"}
+    ]
+
+
+async def test_prompt_data_is_prefetched_off_loop():
+    svc = InteractiveChatService(api_mode=True)
+    svc._db = FakePromptDB()
+    await svc._aload_prompt_data()
+    svc._db = None  # the prompt must not touch the DB any more
+    prompt = svc._build_system_prompt()
+    assert "Dân sự (12 điều)" in prompt
+    assert "Hợp đồng thuê nhà ở" in prompt
+
+
+async def test_failed_router_result_is_not_reused(service):
+    service.analysis = None
+    await service._handle_natural_input("Chia thừa kế khi không có di chúc?")
+    assert service._turn_analysis is None
+
+    service.analysis = QueryAnalysis(intent="legal_question", primary=["thừa kế"])
+    await service._build_llm_messages("Chia thừa kế khi không có di chúc?")
+    assert len(service.router_calls) == 2
+    assert service.retriever_fake.calls[-1][1] == ["thừa kế"]
+
+
+async def test_streaming_path_starts_a_new_turn(service):
+    await service._handle_natural_input("Chia thừa kế khi không có di chúc?")
+    await service._build_llm_messages("Chia thừa kế khi không có di chúc?")
+    assert len(service.router_calls) == 2
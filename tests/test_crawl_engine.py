@@ -0,0 +1,108 @@
+"""Tests for the parallel crawler (shared browser, context pool, per-host politeness)."""
+
+import asyncio
+import time
+
+import pytest
+
+from legal_chatbot.services.crawl_engine import CrawlEngine
+
+
+class FakeEngine(CrawlEngine):
+    """Browser replaced by sleeps; records launches, contexts and page starts."""
+
+    def __init__(self, page_time, **kwargs):
+        super().__init__(jitter=0, page_wait=0, **kwargs)
+        self.page_time = page_time
+        self.launches = 0
+        self.created = []
+        self.starts = {}
+        self.in_flight = {}
+        self.max_in_flight = {}
+
+    async def _launch(self):
+        self.launches += 1
+
+    async def _shutdown(self):
+        pass
+
+    async def _new_context(self):
+        context = FakeContext()
+        self.created.append(context)
+        return context
+
+    async def _load(self, context, url):
+        host = url.split("/")[2]
+        self.starts.setdefault(host, []).append(time.monotonic())
+        self.in_flight[host] = self.in_flight.get(host, 0) + 1
+        self.max_in_flight[host] = max(self.max_in_flight.get(host, 0), self.in_flight[host])
+        try:
+            await asyncio.sleep(self.page_time(url))
+            if "missing" in url:
+                raise TimeoutError("Timeout 30000ms exceeded")
+            context.pages += 1
+            return f"<html>{url}</html>"
+        finally:
+            self.in_flight[host] -= 1
+
+
+class FakeContext:
+    def __init__(self):
+        self.pages = 0
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+async def test_pages_load_in_parallel_within_host_limits():
+    urls = [f"https://thuvienphapluat.vn/van-ban/{i}.aspx" for i in range(8)]
+    urls += ["https://vbpl.vn/1.aspx", "https://thuvienphapluat.vn/missing.aspx"]
+    engine = FakeEngine(lambda url: 0.02 if "vbpl" in url else 0.2, contexts=4, per_host=2, delay=0.05)
+
+    started = time.monotonic()
+    async with engine:
+        results = [r async for r in engine.fetch_all(urls)]
+    elapsed = time.monotonic() - started
+
+    # One browser, contexts reused and closed at the end
+    assert engine.launches == 1 and len(engine.created) == 4
+    assert sum(c.pages for c in engine.created) == 9 and all(c.closed for c in engine.created)
+
+    # Per host: never more than 2 pages at once, starts at least `delay` apart
+    assert engine.max_in_flight["thuvienphapluat.vn"] == 2
+    starts = engine.starts["thuvienphapluat.vn"]
+    assert all(b - a >= 0.045 for a, b in zip(starts, starts[1:]))
+
+    # Streamed in completion order: the other host's fast page comes first
+    assert results[0] == ("https://vbpl.vn/1.aspx", "<html>https://vbpl.vn/1.aspx</html>", None)
+    errors = [(url, type(error)) for url, html, error in results if error]
+    assert errors == [("https://thuvienphapluat.vn/missing.aspx", TimeoutError)]
+    assert elapsed < 0.6 * 9 * 0.2  # well under one page at a time
+
+
+async def test_no_browser_without_urls():
+    engine = FakeEngine(lambda url: 0, contexts=2)
+    async with engine:
+        assert [r async for r in engine.fetch_all([])] == []
+    assert engine.launches == 0
+
+
+class BrokenEngine(FakeEngine):
+    """Firefox missing: every launch fails."""
+
+    async def _launch(self):
+        self.launches += 1
+        raise RuntimeError("Executable doesn't exist at ~/.cache/ms-playwright/firefox")
+
+
+async def test_failed_start_is_not_retried_per_fetch():
+    engine = BrokenEngine(lambda url: 0, contexts=2)
+    urls = [f"https://vbpl.vn/{i}.aspx" for i in range(5)]
+    async with engine:
+        results = [r async for r in engine.fetch_all(urls)]
+        with pytest.raises(RuntimeError):
+            await engine.fetch(urls[0])
+
+    assert engine.launches == 1 and engine.created == []
+    assert all(html is None and isinstance(error, RuntimeError) for _, html, error in results)
@@ -0,0 +1,74 @@
+"""Tests for the two-tier query embedding cache behind embed_single."""
+
+import pytest
+
+from legal_chatbot.services import embedding_cache
+from legal_chatbot.services.embedding import EmbeddingService
+from legal_chatbot.services.embedding_cache import EmbeddingCache
+
+
+class FakeVector(list):
+    def tolist(self):
+        return list(self)
+
+
+class FakeModel:
+    def __init__(self):
+        self.calls = 0
+
+    def encode(self, text, normalize_embeddings=True):
+        self.calls += 1
+        return FakeVector([0.25, 0.5, float(len(text))])
+
+
+@pytest.fixture
+def service(monkeypatch, tmp_path):
+    monkeypatch.setenv("EMBEDDING_CACHE_PATH", str(tmp_path / "emb_cache.db"))
+    monkeypatch.setattr(embedding_cache, "_cache", None)
+    svc = EmbeddingService(model_name="fake-model")
+    svc._model = FakeModel()
+    return svc
+
+
+def test_repeated_query_skips_model(service):
+    first = service.embed_single("Thừa kế  theo pháp luật")
+    # Same text after NFC + whitespace normalization
+    second = service.embed_single("Thừa kế theo pháp luật ")
+    assert first.tolist() == second.tolist()
+    assert service._model.calls == 1
+    stats = embedding_cache.get_embedding_cache().stats()
+    assert stats["memory_hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+def test_disk_tier_survives_restart(service, monkeypatch):
+    vector = service.embed_single("quyền sử dụng đất")
+
+    # New process: empty LRU, same disk file
+    monkeypatch.setattr(embedding_cache, "_cache", None)
+    fresh = EmbeddingService(model_name="fake-model")
+    fresh._model = FakeModel()
+    assert fresh.embed_single("quyền sử dụng đất").tolist() == vector.tolist()
+    assert fresh._model.calls == 0
+    assert embedding_cache.get_embedding_cache().stats()["disk_hits"] == 1
+
+
+def test_lru_evicts_oldest():
+    cache = EmbeddingCache(max_entries=2)
+    for key in ("a", "b", "c"):
+        cache.put(key, [1.0])
+    assert cache.get("a") is None
+    assert cache.get("c") == [1.0]
+
+
+def test_key_depends_on_model():
+    assert EmbeddingCache.make_key("m1", "x") != EmbeddingCache.make_key("m2", "x")
+
+
+def test_key_depends_on_backend():
+    torch = EmbeddingCache.make_key("m", "x", "torch", "data/onnx")
+    assert torch == EmbeddingCache.make_key("m", "x", "torch", "other/onnx")
+    int8 = EmbeddingCache.make_key("m", "x", "onnx-int8", "data/onnx")
+    assert len({torch, int8, EmbeddingCache.make_key("m", "x", "onnx", "data/onnx")}) == 3
+    assert int8 != EmbeddingCache.make_key("m", "x", "onnx-int8", "other/onnx")
@@ -0,0 +1,79 @@
+"""Tests for tokenizer-driven chunking and token-length bucketing in EmbeddingService."""
+
+import numpy as np
+
+from legal_chatbot.services.embedding import EmbeddingService
+
+
+class FakeTokenizer:
+    """Whitespace BPE stand-in: 1 token per 4 chars of each word, + <s> </s>."""
+
+    def __call__(self, texts, add_special_tokens=True, verbose=False):
+        ids = []
+        for text in texts:
+            n = sum(1 + len(w) // 4 for w in text.split())
+            ids.append([0] * (n + (2 if add_special_tokens else 0)))
+        return {"input_ids": ids}
+
+
+class RecordingModel:
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts, batch_size=32, normalize_embeddings=True, show_progress_bar=False):
+        self.calls.append(list(texts))
+        return np.array([[float(len(t)), 1.0] for t in texts], dtype=np.float32)
+
+
+def _service():
+    svc = EmbeddingService(model_name="fake")
+    svc._tokenizer = FakeTokenizer()
+    return svc
+
+
+ARTICLE = {
+    "id": "a1",
+    "content": "Điều 5. Quyền của người lao động\n"
+    + "\n".join(f"{i}. " + " ".join(f"từ{j}" for j in range(40)) for i in range(1, 6)),
+}
+
+
+def test_chunks_fit_token_limit_and_keep_header():
+    svc = _service()
+    chunks = svc.split_long_article(ARTICLE, max_tokens=64, overlap_tokens=0)
+    assert len(chunks) > 1
+    lengths = svc.token_lengths([c["content"] for c in chunks])
+    assert max(lengths) <= 64
+    assert [c["chunk_index"] for c in chunks] == list(range(len(chunks)))
+    assert all(c["content"].startswith("Điều 5.") for c in chunks)
+    assert chunks[0]["id"] == "a1" and chunks[1]["id"] != "a1"
+
+
+def test_overlap_repeats_previous_tail():
+    svc = _service()
+    chunks = svc.split_long_article(ARTICLE, max_tokens=64, overlap_tokens=6)
+    assert max(svc.token_lengths([c["content"] for c in chunks])) <= 64
+    overlaps = 0
+    for prev, nxt in zip(chunks, chunks[1:]):
+        prev_words = prev["content"].split()
+        body_words = nxt["content"].split("\n", 1)[1].split()
+        k = next((k for k in range(6, 0, -1) if prev_words[-k:] == body_words[:k]), 0)
+        overlaps += k > 0
+    assert overlaps == len(chunks) - 1
+
+
+def test_short_article_untouched():
+    svc = _service()
+    article = {"id": "a2", "content": "Điều 1. Phạm vi điều chỉnh"}
+    assert svc.split_long_article(article) == [article]
+
+
+def test_embed_batch_buckets_by_token_length():
+    svc = _service()
+    svc._model = RecordingModel()
+    # Char length and token length disagree: long words are cheap in chars
+    texts = ["a b c d e f g h", "abcdefghijklmnop", "x y", "abcdefgh"]
+    result = svc.embed_batch(texts, batch_size=2)
+    assert [r[0] for r in result] == [float(len(t)) for t in texts]
+    token_sorted = sorted(texts, key=lambda t: svc.token_lengths([t])[0])
+    assert svc._model.calls == [token_sorted[:2], token_sorted[2:]]
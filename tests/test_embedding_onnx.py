@@ -0,0 +1,41 @@
+"""Tests for the ONNX Runtime embedding backend."""
+
+import numpy as np
+import pytest
+
+from legal_chatbot.services.embedding_onnx import pool
+
+SENTENCES = [
+    "Điều 45. Điều kiện thực hiện quyền chuyển nhượng quyền sử dụng đất",
+    "Người lao động có quyền đơn phương chấm dứt hợp đồng lao động",
+    "Thừa kế theo pháp luật được áp dụng khi không có di chúc",
+    "Bên cho thuê nhà có nghĩa vụ bảo đảm cho bên thuê sử dụng ổn định nhà",
+    "Hợp đồng vay tài sản là sự thỏa thuận giữa các bên",
+]
+
+
+def test_mean_pool_ignores_padding():
+    hidden = np.array([[[1.0, 2.0], [3.0, 4.0], [100.0, 100.0]]], dtype=np.float32)
+    mask = np.array([[1, 1, 0]])
+    assert pool(hidden, mask).tolist() == [[2.0, 3.0]]
+    assert pool(hidden, mask, "cls").tolist() == [[1.0, 2.0]]
+
+
+@pytest.mark.parametrize("backend", ["onnx", "onnx-int8"])
+def test_onnx_parity_with_torch(backend, tmp_path, monkeypatch):
+    """Cosine >= 0.99 vs the fp32 PyTorch model (downloads the model)."""
+    pytest.importorskip("sentence_transformers")
+    pytest.importorskip("onnxruntime")
+    pytest.importorskip("onnx")
+    from legal_chatbot.services.embedding import EmbeddingService
+
+    monkeypatch.setenv("EMBEDDING_ONNX_PATH", str(tmp_path / "onnx"))
+    try:
+        reference = EmbeddingService(backend="torch").embed_batch(SENTENCES)
+    except OSError as e:  # model not cached and no network
+        pytest.skip(f"embedding model unavailable: {e}")
+    candidate = EmbeddingService(backend=backend).embed_batch(SENTENCES)
+
+    for ref, got in zip(reference, candidate):
+        cosine = float(np.dot(ref, got) / (np.linalg.norm(ref) * np.linalg.norm(got)))
+        assert cosine >= 0.99
@@ -0,0 +1,74 @@
+"""Tests for content-hash embedding reuse in EmbeddingService.embed_and_store."""
+
+import pytest
+
+from legal_chatbot.db import vector_store
+from legal_chatbot.db.sqlite_client import SQLiteClient
+from legal_chatbot.services.embedding import EmbeddingService
+
+DIM = 4
+
+
+class FakeModel:
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts, **kwargs):
+        import numpy as np
+
+        self.encoded.extend(texts)
+        return np.array([[1.0, float(len(t)), 0.0, 0.0] for t in texts], dtype=np.float32)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    monkeypatch.setenv("EMBEDDING_DIMENSION", str(DIM))
+    monkeypatch.setattr(vector_store, "_store", None)
+    client = SQLiteClient()
+    client.init_db()
+    client.insert_document({
+        "id": "blds", "document_type": "luat", "document_number": "91/2015/QH13",
+        "title": "Bộ luật Dân sự 2015",
+    })
+    return client
+
+
+def _articles(*contents):
+    return [
+        {"id": f"a{i}", "document_id": "blds", "article_number": i, "content": c}
+        for i, c in enumerate(contents, start=1)
+    ]
+
+
+def test_unchanged_articles_are_not_reembedded(db):
+    svc = EmbeddingService(model_name="fake")
+    svc._model = FakeModel()
+    svc._tokenizer = False
+    svc.embed_and_store(db, _articles("Điều 1. Phạm vi", "Điều 2. Đối tượng"))
+    assert len(svc._model.encoded) == 2
+
+    svc._model = FakeModel()
+    # Whitespace-only change normalizes to the same hash
+    stored = svc.embed_and_store(db, _articles("Điều 1.  Phạm vi", "Điều 2. Sửa đổi"))
+    assert stored == 2
+    assert svc._model.encoded == ["Điều 2. Sửa đổi"]
+
+
+def test_force_reembeds_everything(db):
+    svc = EmbeddingService(model_name="fake")
+    svc._model = FakeModel()
+    svc._tokenizer = False
+    svc.embed_and_store(db, _articles("Điều 1. Phạm vi"))
+    svc._model = FakeModel()
+    svc.embed_and_store(db, _articles("Điều 1. Phạm vi"), force=True)
+    assert svc._model.encoded == ["Điều 1. Phạm vi"]
+
+
+def test_duplicate_texts_embedded_once(db):
+    svc = EmbeddingService(model_name="fake")
+    svc._model = FakeModel()
+    svc._tokenizer = False
+    articles = _articles("Điều 1. Giống nhau", "Điều 1. Giống nhau")
+    assert svc.attach_embeddings(db, articles) == 1
+    assert articles[0]["embedding"].tolist() == articles[1]["embedding"].tolist()
+    assert articles[0]["content_hash"] == EmbeddingService.content_hash("Điều 1. Giống nhau")
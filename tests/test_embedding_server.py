@@ -0,0 +1,79 @@
+"""Tests for the micro-batching embedding sidecar and EmbeddingService client mode."""
+
+import asyncio
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from legal_chatbot.api.embedding_server import MicroBatcher, create_embedding_app
+from legal_chatbot.services import embedding_cache, embedding_client
+from legal_chatbot.services.embedding import EmbeddingService
+from legal_chatbot.services.embedding_client import EmbeddingClient
+
+
+class FakeEncoder:
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, texts):
+        self.batches.append(list(texts))
+        return [[float(len(t)), 1.0] for t in texts]
+
+
+async def test_concurrent_requests_are_coalesced():
+    encode = FakeEncoder()
+    batcher = MicroBatcher(encode, max_batch_size=64, max_wait_ms=20)
+    await batcher.start()
+    try:
+        texts = [f"câu hỏi {'x' * i}" for i in range(10)]
+        results = await asyncio.gather(*(batcher.submit([t]) for t in texts))
+    finally:
+        await batcher.stop()
+    assert [r[0][0] for r in results] == [float(len(t)) for t in texts]
+    assert len(encode.batches) == 1
+    assert batcher.stats()["avg_batch_size"] == 10
+
+
+async def test_batch_size_cap():
+    encode = FakeEncoder()
+    batcher = MicroBatcher(encode, max_batch_size=4, max_wait_ms=20)
+    await batcher.start()
+    try:
+        await batcher.submit([str(i) for i in range(10)])
+    finally:
+        await batcher.stop()
+    assert [len(b) for b in encode.batches] == [4, 4, 2]
+
+
+async def test_encode_error_propagates():
+    def broken(texts):
+        raise RuntimeError("model crashed")
+
+    batcher = MicroBatcher(broken, max_wait_ms=1)
+    await batcher.start()
+    try:
+        with pytest.raises(RuntimeError):
+            await batcher.submit(["a"])
+    finally:
+        await batcher.stop()
+
+
+def test_service_client_mode(monkeypatch):
+    monkeypatch.setattr(embedding_cache, "_cache", None)
+    encode = FakeEncoder()
+    with TestClient(create_embedding_app(encode)) as http:
+        client = EmbeddingClient("http://testserver")
+        client._http = http
+        monkeypatch.setitem(embedding_client._clients, "http://testserver", client)
+
+        svc = EmbeddingService(server_url="http://testserver")
+        assert svc.is_loaded
+        assert svc.embed_single("Thừa kế  theo pháp luật").tolist() == [22.0, 1.0]
+        batch = svc.embed_batch(["a", "bb"])
+        assert batch.dtype == np.float32
+        assert batch.tolist() == [[1.0, 1.0], [2.0, 1.0]]
+        assert svc._model is None
+        assert http.get("/health").json()["texts"] == 3
+        # Clients that don't ask for bytes still get JSON
+        assert http.post("/embed", json={"texts": ["abc"]}).json() == {"embeddings": [[3.0, 1.0]]}
@@ -0,0 +1,70 @@
+"""Tests for the fake LLM server used by the offline benchmark."""
+
+import json
+import time
+
+import httpx
+import pytest
+
+from legal_chatbot.api.fake_llm_server import create_fake_llm_app
+from legal_chatbot.services.query_router import build_router_prompt, parse_analysis
+
+
+def client(**options):
+    app = create_fake_llm_app(**{"ttft": 0, "tokens_per_sec": 0, **options})
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://fake")
+
+
+async def test_anthropic_json_answers_router_prompt():
+    types = [{"type": "cho_thue_nha", "name": "Hợp đồng thuê nhà"}]
+    prompt = build_router_prompt(types, ["dan_su", "lao_dong"])
+    async with client() as http:
+        response = await http.post("/v1/messages", json={
+            "model": "claude-sonnet-4-20250514", "max_tokens": 500, "system": prompt,
+            "messages": [{"role": "user", "content": "Chia thừa kế khi không có di chúc?"}],
+        })
+    body = response.json()
+    assert body["type"] == "message" and body["usage"]["output_tokens"] > 0
+    assert "anthropic-ratelimit-requests-remaining" in response.headers
+
+    analysis = parse_analysis(json.loads(body["content"][0]["text"]), types, ["dan_su", "lao_dong"])
+    assert analysis.intent == "legal_question" and analysis.category == "dan_su"
+
+
+async def test_anthropic_stream_is_paced_event_sequence():
+    async with client(ttft=0.1) as http:
+        start = time.perf_counter()
+        response = await http.post("/v1/messages", json={
+            "model": "m", "max_tokens": 100, "stream": True,
+            "messages": [{"role": "user", "content": "Hỏi luật"}],
+        })
+    events = [line[7:] for line in response.text.splitlines() if line.startswith("event: ")]
+    assert time.perf_counter() - start >= 0.1
+    assert events[0] == "message_start" and events[-1] == "message_stop"
+    deltas = [
+        json.loads(line[6:])["delta"]["text"] for line in response.text.splitlines()
+        if line.startswith("data: ") and "text_delta" in line
+    ]
+    assert "".join(deltas).startswith("Theo **Điều 650")
+
+
+async def test_openai_sdk_stream_and_custom_rule():
+    openai = pytest.importorskip("openai")
+    app = create_fake_llm_app(ttft=0, tokens_per_sec=0, rules=[{"match": "ping", "response": "pong pong"}])
+    sdk = openai.AsyncOpenAI(
+        api_key="fake", base_url="http://fake",
+        http_client=httpx.AsyncClient(transport=httpx.ASGITransport(app=app)),
+    )
+    stream = await sdk.chat.completions.create(
+        model="deepseek-chat", messages=[{"role": "user", "content": "ping"}], stream=True,
+    )
+    chunks = [c.choices[0].delta.content async for c in stream if c.choices and c.choices[0].delta.content]
+    assert "".join(chunks) == "pong pong"
+
+
+async def test_error_rate_returns_retryable_overload():
+    async with client(error_rate=1.0) as http:
+        response = await http.post("/chat/completions", json={"model": "m", "messages": []})
+        health = (await http.get("/health")).json()
+    assert response.status_code == 529 and response.headers["retry-after"] == "0"
+    assert health["errors"] == 1
@@ -0,0 +1,160 @@
+"""Tests for the hybrid (keyword + vector) retriever."""
+
+import time
+
+import pytest
+
+from legal_chatbot.services import retriever as retriever_mod
+from legal_chatbot.services.retriever import HybridRetriever, diverse_rank, rrf_fuse
+
+
+def _article(aid, doc="Luật A", **extra):
+    return {"id": aid, "article_number": 1, "title": "", "content": aid,
+            "document_title": doc, **extra}
+
+
+class FakeDB:
+    def __init__(self, keyword=(), vector=(), keyword_delay=0.0, vector_delay=0.0):
+        self.keyword = list(keyword)
+        self.vector = list(vector)
+        self.keyword_delay = keyword_delay
+        self.vector_delay = vector_delay
+        self.keyword_calls = []
+
+    def keyword_search_articles(self, primary_terms, secondary_terms=None, limit=100):
+        self.keyword_calls.append((primary_terms, secondary_terms))
+        time.sleep(self.keyword_delay)
+        return self.keyword
+
+    def search_articles(self, query_embedding, top_k=5, status="active"):
+        time.sleep(self.vector_delay)
+        return self.vector
+
+
+class FakeEmbedding:
+    is_loaded = True
+
+    def embed_single(self, text):
+        return [1.0, 0.0]
+
+
+def test_rrf_rewards_hits_found_by_both_legs():
+    keyword = [_article("k1", score=10.0), _article("both", score=8.0)]
+    vector = [_article("v1", similarity=0.9), _article("both", similarity=0.8)]
+    fused = rrf_fuse([keyword, vector], k=60)
+    assert fused[0]["id"] == "both"
+    assert fused[0]["score"] == 1.0
+    assert fused[0]["similarity"] == 0.8
+    assert {a["id"] for a in fused} == {"k1", "both", "v1"}
+
+
+def test_diverse_rank_reserves_slots_for_unseen_documents():
+    articles = [_article(f"a{i}", doc="Luật A", score=1.0 - i / 100) for i in range(10)]
+    articles.append(_article("b", doc="Luật B", score=0.01))
+    ranked = diverse_rank(articles, top_n=5)
+    assert [a["id"] for a in ranked] == ["a0", "a1", "a2", "a3", "b"]
+
+
+def test_hybrid_retrieve_fuses_both_legs():
+    db = FakeDB(keyword=[_article("k1"), _article("both")],
+                vector=[_article("both"), _article("v1")])
+    r = HybridRetriever(db=db, embedding=FakeEmbedding())
+    ids = [a["id"] for a in r.retrieve("chuyển nhượng đất", top_k=3)]
+    assert ids[0] == "both"
+    assert set(ids) == {"k1", "both", "v1"}
+    # n-gram terms are built when the caller passes none
+    assert db.keyword_calls[0][0]
+
+
+def test_slow_leg_is_dropped(monkeypatch):
+    monkeypatch.setenv("RETRIEVAL_VECTOR_TIMEOUT", "0.1")
+    db = FakeDB(keyword=[_article("k1")], vector=[_article("v1")], vector_delay=1.0)
+    r = HybridRetriever(db=db, embedding=FakeEmbedding())
+    started = time.monotonic()
+    results = r.retrieve("thừa kế", top_k=5, primary_terms=["thừa kế"])
+    assert time.monotonic() - started < 0.8
+    assert [a["id"] for a in results] == ["k1"]
+
+
+def test_stuck_leg_is_skipped_not_queued(monkeypatch):
+    monkeypatch.setenv("RETRIEVAL_VECTOR_TIMEOUT", "0.05")
+    monkeypatch.setattr(retriever_mod, "_abandoned", {})
+    db = FakeDB(keyword=[_article("k1")], vector=[_article("v1")], vector_delay=0.5)
+    r = HybridRetriever(db=db, embedding=FakeEmbedding())
+    for _ in range(retriever_mod.MAX_ABANDONED_PER_LEG):
+        r.retrieve("thừa kế", top_k=5, primary_terms=["thừa kế"])
+
+    # Earlier vector calls still hold their workers: skip the leg, don't wait on it
+    started = time.monotonic()
+    assert [a["id"] for a in r.retrieve("thừa kế", top_k=5, primary_terms=["thừa kế"])] == ["k1"]
+    assert time.monotonic() - started < 0.04
+
+
+async def test_async_retrieve_drops_slow_leg(monkeypatch):
+    monkeypatch.setenv("RETRIEVAL_VECTOR_TIMEOUT", "0.1")
+    monkeypatch.setattr(retriever_mod, "_abandoned", {})
+    db = FakeDB(keyword=[_article("k1")], vector=[_article("v1")], vector_delay=0.5)
+    r = HybridRetriever(db=db, embedding=FakeEmbedding())
+    results = await r.aretrieve("thừa kế", top_k=5, primary_terms=["thừa kế"])
+    assert [a["id"] for a in results] == ["k1"]
+
+
+def test_keyword_only_skips_unloaded_model(monkeypatch):
+    monkeypatch.setenv("RETRIEVAL_KEYWORD_ONLY", "true")
+
+    class Unloaded(FakeEmbedding):
+        is_loaded = False
+
+        def embed_single(self, text):
+            pytest.fail("vector leg should not run")
+
+    db = FakeDB(keyword=[_article("k1")], vector=[_article("v1")])
+    r = HybridRetriever(db=db, embedding=Unloaded())
+    assert [a["id"] for a in r.retrieve("thừa kế", primary_terms=["thừa kế"])] == ["k1"]
+
+
+def test_vector_leg_off_without_backend(monkeypatch):
+    monkeypatch.setattr(retriever_mod, "embedding_backend_available", lambda: False)
+    r = HybridRetriever(db=FakeDB(), embedding=None)
+    assert r.vector_enabled() is False
+
+
+def test_api_keyword_only_by_default_without_embedding_server(monkeypatch):
+    monkeypatch.setattr(retriever_mod, "embedding_backend_available", lambda: True)
+    monkeypatch.delenv("EMBEDDING_SERVER_URL", raising=False)
+    monkeypatch.delenv("RETRIEVAL_KEYWORD_ONLY", raising=False)
+    assert HybridRetriever(db=FakeDB(), api_mode=True).vector_enabled() is False
+    assert retriever_mod.warm_up_vector_leg() is False
+
+    monkeypatch.setenv("EMBEDDING_SERVER_URL", "http://127.0.0.1:8500")
+    assert HybridRetriever(db=FakeDB(), api_mode=True).vector_enabled() is True
+
+
+def test_cli_and_research_keep_vector_leg_by_default(monkeypatch):
+    monkeypatch.setattr(retriever_mod, "embedding_backend_available", lambda: True)
+    monkeypatch.delenv("EMBEDDING_SERVER_URL", raising=False)
+    monkeypatch.delenv("RETRIEVAL_KEYWORD_ONLY", raising=False)
+    assert HybridRetriever(db=FakeDB()).vector_enabled() is True
+
+
+def test_embedding_model_is_loaded_once_per_process(monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from legal_chatbot.services import embedding as embedding_mod
+    from legal_chatbot.services.embedding import EmbeddingService
+
+    loads = []
+
+    def slow_load(self):
+        loads.append(self)
+        time.sleep(0.1)
+        return FakeEmbedding()
+
+    monkeypatch.setattr(embedding_mod, "_models", {})
+    monkeypatch.setattr(EmbeddingService, "_load_model", slow_load)
+    services = [EmbeddingService(model_name="fake", backend="torch") for _ in range(4)]
+    with ThreadPoolExecutor(4) as pool:
+        models = list(pool.map(lambda s: s.get_model(), services))
+
+    assert len(loads) == 1 and all(m is models[0] for m in models)
+    assert EmbeddingService(model_name="fake", backend="torch", server_url="").is_loaded
@@ -0,0 +1,59 @@
+"""Tests for incremental JSON array parsing of streamed LLM output."""
+
+import json
+from types import SimpleNamespace
+
+from legal_chatbot.services.interactive_chat import InteractiveChatService
+from legal_chatbot.utils import llm
+from legal_chatbot.utils.json_stream import JsonArrayStream
+
+ARTICLES = [
+    {"title": "ĐIỀU 1: ĐỐI TƯỢNG CỦA HỢP ĐỒNG", "content": ["1.1. Bên A cho thuê nhà tại \"số 5\", {phường} [1]"]},
+    {"title": "ĐIỀU 2: GIÁ VÀ PHƯƠNG THỨC THANH TOÁN", "content": ["2.1. Giá thuê: 5.000.000 VNĐ\\tháng"]},
+    {"title": "ĐIỀU 3: THỜI HẠN", "content": []},
+]
+REPLY = "```json\n" + json.dumps(ARTICLES, ensure_ascii=False, indent=2) + "\n```"
+
+
+def test_elements_are_emitted_as_soon_as_complete():
+    parser = JsonArrayStream()
+    emitted_at = []
+    for i, ch in enumerate(REPLY):  # worst case: one character per chunk
+        for item in parser.feed(ch):
+            emitted_at.append((i, item))
+
+    assert [item for _, item in emitted_at] == ARTICLES
+    # The first article is out long before the reply ends
+    assert emitted_at[0][0] < len(REPLY) // 2
+    assert parser.done and parser.skipped == 0
+
+
+def test_object_is_emitted_on_its_closing_brace():
+    parser = JsonArrayStream()
+    assert parser.feed('[{"title": "ĐIỀU 1"}') == [{"title": "ĐIỀU 1"}]
+    assert parser.feed(', [1, 2]') == [[1, 2]]
+    assert parser.feed(', 7') == []
+    assert parser.feed("]") == [7]
+    assert parser.done and parser.skipped == 0
+
+
+def test_broken_element_is_skipped():
+    parser = JsonArrayStream()
+    items = parser.feed('Đây là kết quả: [{"title": "ĐIỀU 1"}, {"title": oops}, 3, "x"] trailing [9]')
+    assert items == [{"title": "ĐIỀU 1"}, 3, "x"]
+    assert parser.skipped == 1 and parser.done
+
+
+async def test_stream_articles_uses_llm_stream(monkeypatch):
+    async def fake_stream(messages, temperature, max_tokens, system, caller, task, model=None):
+        assert task == "contract_articles"
+        for start in range(0, len(REPLY), 7):
+            yield REPLY[start:start + 7]
+
+    monkeypatch.setattr(llm, "call_llm_stream_async", fake_stream)
+    service = InteractiveChatService.__new__(InteractiveChatService)
+    service._articles_messages = lambda draft: [{"role": "user", "content": "Tạo 9 ĐIỀU"}]
+    draft = SimpleNamespace(template=SimpleNamespace(default_articles=[]), field_values={})
+
+    articles = [a async for a in service.stream_articles(draft)]
+    assert articles == ARTICLES
@@ -0,0 +1,173 @@
+"""Tests for pipeline-time LLM batch jobs (backends, journal, resume, seeding)."""
+
+import json
+import threading
+import time
+
+import pytest
+
+from legal_chatbot.services import llm_batch
+from legal_chatbot.services.llm_batch import LLMBatch, LocalBatchBackend
+from legal_chatbot.services.suggestion_seeder import SuggestionSeeder
+
+
+class Responder:
+    """Fake LLM: echoes the prompt as JSON; records every call."""
+
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def __call__(self, request):
+        with self.lock:
+            self.calls.append(request.custom_id)
+        if "lỗi" in request.messages[-1]["content"]:
+            raise RuntimeError("overloaded")
+        return json.dumps({"echo": request.messages[-1]["content"]}, ensure_ascii=False)
+
+
+def make_batch(tmp_path, responder, prompts):
+    batch = LLMBatch("job", backend=LocalBatchBackend(responder, poll_interval=0.01), journal_dir=str(tmp_path))
+    for custom_id, text in prompts.items():
+        batch.add(custom_id, [{"role": "user", "content": text}], task="generate_json")
+    return batch
+
+
+def test_results_are_journaled_and_replayed(tmp_path):
+    responder = Responder()
+    prompts = {"a": "thuê nhà", "b": "mua bán đất", "c": "lỗi"}
+    results = {r.custom_id: r for r in make_batch(tmp_path, responder, prompts).run()}
+
+    assert results["a"].parsed() == {"echo": "thuê nhà"}
+    assert not results["c"].ok and "overloaded" in results["c"].error
+    assert sorted(responder.calls) == ["a", "b", "c", "c"]  # failures are re-sent once
+
+    # Re-run: finished results replay, only the failure and the edited prompt are sent again
+    responder.calls.clear()
+    prompts["b"] = "mua bán nhà"
+    rerun = {r.custom_id: r for r in make_batch(tmp_path, responder, prompts).run()}
+    assert sorted(responder.calls) == ["b", "c", "c"]
+    assert rerun["a"].replayed and rerun["a"].parsed() == {"echo": "thuê nhà"}
+    assert rerun["b"].parsed() == {"echo": "mua bán nhà"} and not rerun["b"].replayed
+
+
+def test_rejected_replies_are_resent_not_journaled(tmp_path):
+    responder = Responder()
+    prompts = {"a": "thuê nhà", "b": "không hợp lệ"}
+
+    def validate(result):
+        reply = result.parsed()
+        return reply if "hợp lệ" not in reply["echo"] else None
+
+    results = {r.custom_id: r for r in make_batch(tmp_path, responder, prompts).run(validate)}
+    assert results["a"].value == {"echo": "thuê nhà"}
+    assert not results["b"].ok and results["b"].value is None and "rejected" in results["b"].error
+    assert sorted(responder.calls) == ["a", "b", "b"]
+
+    # The rejected reply was never journaled, so a re-run asks again
+    responder.calls.clear()
+    rerun = {r.custom_id: r for r in make_batch(tmp_path, responder, prompts).run(validate)}
+    assert rerun["a"].replayed and rerun["a"].value == {"echo": "thuê nhà"}
+    assert responder.calls == ["b", "b"]
+
+
+def test_interrupted_job_resumes_submitted_batch(tmp_path):
+    responder = Responder()
+    batch = make_batch(tmp_path, responder, {"a": "thuê nhà", "b": "mua bán đất"})
+
+    # Crash right after submitting: the journal knows the batch id, no results yet
+    batch_id = batch.backend.submit(list(batch.requests.values()))
+    batch.journal.submitted(batch.backend.name, batch_id, list(batch.requests.values()))
+
+    resumed = make_batch(tmp_path, responder, {"a": "thuê nhà", "b": "mua bán đất"})
+    assert {r.custom_id for r in resumed.run()} == {"a", "b"}
+    assert sorted(responder.calls) == ["a", "b"]  # not submitted twice
+
+
+def test_uncollected_local_batches_are_pruned(tmp_path, monkeypatch):
+    batch = make_batch(tmp_path, Responder(), {"a": "thuê nhà"})
+    backend = batch.backend
+    abandoned = backend.submit(list(batch.requests.values()))
+    while backend.status(abandoned) != "ended":
+        time.sleep(0.01)
+
+    monkeypatch.setattr(llm_batch, "LOCAL_BATCH_RETENTION", 0.0)
+    backend.submit(list(batch.requests.values()))
+    assert backend.status(abandoned) is None
+
+
+def test_concurrent_backend_stops_queued_calls_when_consumer_stops(tmp_path, monkeypatch):
+    calls = []
+
+    def slow_call_llm(messages, **kwargs):
+        calls.append(messages[-1]["content"])
+        time.sleep(0.1)
+        return "{}"
+
+    monkeypatch.setattr(llm_batch, "call_llm", slow_call_llm)
+    batch = LLMBatch("job", backend=llm_batch.ConcurrentBackend(concurrency=1), journal_dir=str(tmp_path))
+    for i in range(10):
+        batch.add(f"r{i}", [{"role": "user", "content": str(i)}])
+
+    started = time.monotonic()
+    results = batch.run()
+    next(results)
+    results.close()
+    assert time.monotonic() - started < 0.5
+    time.sleep(0.15)
+    assert len(calls) < 10
+
+
+def test_invalid_custom_id_rejected(tmp_path):
+    batch = make_batch(tmp_path, Responder(), {"a": "x"})
+    with pytest.raises(ValueError):
+        batch.add("hợp đồng", [{"role": "user", "content": "x"}])
+    with pytest.raises(ValueError):
+        batch.add("a", [{"role": "user", "content": "x"}])
+
+
+class FakeDB:
+    def __init__(self, templates):
+        self.templates = templates
+        self.writes = []
+
+    def get_templates_needing_seed(self):
+        return [t for t in self.templates.values() if not t.get("sample_data")]
+
+    def get_contract_template(self, contract_type):
+        return self.templates.get(contract_type)
+
+    def update_template_sample_data(self, contract_type, sample_data):
+        self.writes.append(contract_type)
+        self.templates[contract_type]["sample_data"] = sample_data
+
+
+def test_seed_all_runs_one_batch_across_templates(tmp_path, monkeypatch):
+    monkeypatch.setenv("LLM_BATCH_BACKEND", "concurrent")
+    monkeypatch.setenv("LLM_BATCH_DIR", str(tmp_path))
+    calls = []
+
+    def fake_call_llm(messages, system, task, caller, **kwargs):
+        calls.append(task)
+        names = [line.split(" ")[1] for line in messages[-1]["content"].splitlines()[1:]]
+        return json.dumps({n: {"examples": [f"{n} 1", f"{n} 2"], "format_hint": "text"} for n in names})
+
+    monkeypatch.setattr(llm_batch, "call_llm", fake_call_llm)
+    fields = [{"name": f"f{i}", "label": f"Trường {i}"} for i in range(20)]
+    db = FakeDB({
+        "cho_thue_nha": {"contract_type": "cho_thue_nha", "display_name": "Hợp đồng thuê nhà",
+                         "required_fields": {"fields": fields}},
+        "mua_ban_dat": {"contract_type": "mua_ban_dat", "display_name": "Hợp đồng mua bán đất",
+                        "required_fields": {"fields": fields[:3]}},
+    })
+
+    results = SuggestionSeeder(db).seed_all()
+    assert [r["field_count"] for r in results] == [20, 3]
+    assert len(calls) == 3  # 20 fields in chunks of 15, plus one
+    assert sorted(db.writes) == ["cho_thue_nha", "mua_ban_dat"]
+
+    # Nothing left to seed; a forced re-run replays the journal instead of calling the LLM
+    assert SuggestionSeeder(db).seed_all() == []
+    db.list_all_active_templates = lambda: list(db.templates.values())
+    assert [r["status"] for r in SuggestionSeeder(db).seed_all(force=True)] == ["seeded", "seeded"]
+    assert len(calls) == 3
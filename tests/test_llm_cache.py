@@ -0,0 +1,62 @@
+"""Tests for the opt-in LLM response cache (utils.llm_cache)."""
+
+import pytest
+
+from legal_chatbot.utils import llm, llm_cache
+from legal_chatbot.utils.llm_cache import LLMCache
+
+
+@pytest.fixture
+def fake_client(fake_anthropic, monkeypatch, tmp_path):
+    monkeypatch.setenv("LLM_CACHE_PATH", str(tmp_path / "llm_cache.db"))
+    monkeypatch.setattr(llm_cache, "_cache", None)
+    fake_anthropic.reply = '{"intent": "other"}'
+    return fake_anthropic
+
+
+def test_cached_call_skips_second_round_trip(fake_client):
+    messages = [{"role": "user", "content": "Tôi muốn hỏi về thừa kế"}]
+    first = llm.call_llm_json(messages, max_tokens=60, system="phân loại", cache=True)
+    second = llm.call_llm_json(messages, max_tokens=60, system="phân loại", cache=True)
+    assert first == second == {"intent": "other"}
+    assert len(fake_client.calls) == 1
+
+    # Different params are a different key
+    llm.call_llm_json(messages, max_tokens=61, system="phân loại", cache=True)
+    assert len(fake_client.calls) == 2
+
+
+def test_unparseable_json_reply_is_not_cached(fake_client, monkeypatch):
+    monkeypatch.setattr(llm, "escalation_model", lambda model, sonnet_tier=False: None)
+    fake_client.reply = "Xin lỗi, tôi không hiểu"
+    messages = [{"role": "user", "content": "phân loại câu hỏi"}]
+    assert llm.call_llm_json(messages, cache=True) is None
+    fake_client.reply = '{"intent": "other"}'
+    assert llm.call_llm_json(messages, cache=True) == {"intent": "other"}
+    assert len(fake_client.calls) == 2
+
+
+def test_uncached_calls_always_hit_the_api(fake_client):
+    messages = [{"role": "user", "content": "xin chào"}]
+    llm.call_llm(messages)
+    llm.call_llm(messages)
+    assert len(fake_client.calls) == 2
+
+
+def test_disk_tier_survives_restart(fake_client, monkeypatch):
+    messages = [{"role": "user", "content": "Lĩnh vực: vay tiền"}]
+    llm.call_llm_sonnet(messages, temperature=0, max_tokens=50, cache=True)
+    monkeypatch.setattr(llm_cache, "_cache", None)
+    llm.call_llm_sonnet(messages, temperature=0, max_tokens=50, cache=True)
+    assert len(fake_client.calls) == 1
+    assert llm_cache.get_llm_cache().stats()["disk_hits"] == 1
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    cache = LLMCache(max_entries=10, ttl=60)
+    now = [1000.0]
+    monkeypatch.setattr(llm_cache.time, "time", lambda: now[0])
+    cache.put("k", "v")
+    assert cache.get("k") == "v"
+    now[0] += 61
+    assert cache.get("k") is None
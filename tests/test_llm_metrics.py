@@ -0,0 +1,87 @@
+"""Tests for per-call LLM instrumentation (tokens, cost, Prometheus, trace)."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from legal_chatbot.utils import llm, llm_metrics
+from legal_chatbot.utils.llm_metrics import LLMMetrics, cost_usd, read_trace, summarize, usage_tokens
+
+PRICES = {"sonnet": {"input": 3.0, "output": 15.0, "cache_read": 0.3, "cache_write": 3.75}}
+
+
+def test_usage_is_normalised_across_providers():
+    anthropic = SimpleNamespace(
+        input_tokens=100, output_tokens=50, cache_read_input_tokens=900, cache_creation_input_tokens=0,
+    )
+    deepseek = SimpleNamespace(prompt_tokens=1000, completion_tokens=50, prompt_cache_hit_tokens=900)
+    openai = SimpleNamespace(
+        prompt_tokens=1000, completion_tokens=50, prompt_tokens_details=SimpleNamespace(cached_tokens=900),
+    )
+    expected = {"input": 100, "output": 50, "cache_read": 900, "cache_write": 0}
+    assert usage_tokens(anthropic) == usage_tokens(deepseek) == usage_tokens(openai) == expected
+    assert cost_usd("sonnet", expected, PRICES) == pytest.approx((300 + 750 + 270) / 1_000_000)
+    assert cost_usd("unpriced", expected, PRICES) == 0.0
+
+
+def test_tracker_records_errors_and_renders_prometheus(tmp_path):
+    metrics = LLMMetrics(trace_path=str(tmp_path / "trace.jsonl"), prices=PRICES)
+
+    with metrics.track("router", "sonnet", stream=True) as call:
+        call.first_token()
+        call.usage = SimpleNamespace(input_tokens=10, output_tokens=5)
+    with pytest.raises(TimeoutError):
+        with metrics.track("router", "sonnet"):
+            raise TimeoutError
+
+    text = metrics.render_prometheus()
+    assert 'legal_chatbot_llm_calls_total{site="router",model="sonnet",status="ok"} 1' in text
+    assert 'legal_chatbot_llm_calls_total{site="router",model="sonnet",status="TimeoutError"} 1' in text
+    assert 'legal_chatbot_llm_tokens_total{site="router",model="sonnet",kind="output"} 5' in text
+    assert 'legal_chatbot_llm_duration_seconds_count{site="router",model="sonnet"} 2' in text
+    assert 'legal_chatbot_llm_ttft_seconds_count{site="router",model="sonnet"} 1' in text
+
+    metrics.flush()  # the trace is written off the caller's thread
+    records = read_trace(str(tmp_path / "trace.jsonl"))
+    assert [r["error"] for r in records] == [None, "TimeoutError"]
+    assert records[0]["ttft_s"] is not None and records[1]["ttft_s"] is None
+
+
+def test_summarize_groups_by_site_and_window():
+    records = [
+        {"ts": 1000 + i, "site": "chat.answer", "model": "sonnet", "total_s": 2.0, "ttft_s": 0.5,
+         "output_tokens": 100, "cost_usd": 0.01, "error": None}
+        for i in range(3)
+    ] + [
+        {"ts": 4000, "site": "router", "model": "haiku", "total_s": 0.3, "ttft_s": None,
+         "output_tokens": 20, "cost_usd": 0.001, "error": "APIStatusError"},
+    ]
+
+    rows = summarize(records)
+    assert [r["site"] for r in rows] == ["chat.answer", "router"]  # most time first
+    assert rows[0]["calls"] == 3 and rows[0]["p50_s"] == 2.0 and rows[0]["output_tokens"] == 300
+    assert rows[1]["errors"] == 1 and rows[1]["ttft_p50_s"] is None
+
+    windows = summarize(records, by=("model",), interval=3600)
+    assert [(r["window"], r["model"]) for r in windows] == [(0, "sonnet"), (3600, "haiku")]
+
+
+def test_call_llm_records_call_site_and_caller_override(monkeypatch, fake_anthropic):
+    fake_anthropic.usage = (12, 3)
+    metrics = LLMMetrics(prices={})
+    monkeypatch.setattr(llm_metrics, "_metrics", metrics)
+
+    def classify():
+        return llm.call_llm([{"role": "user", "content": "Xin chào"}])
+
+    assert classify() == "ok"
+    assert llm.call_llm([{"role": "user", "content": "Xin chào"}], caller="router") == "ok"
+
+    text = metrics.render_prometheus()
+    assert 'site="test_llm_metrics.classify"' in text
+    assert 'legal_chatbot_llm_tokens_total{site="router",model="' in text
+
+    # Scheduler counters land in the same series served at /api/health
+    (router,) = metrics.stats()["router"].values()
+    assert router["calls"] == router["ok"] == 1 and router["retries"] == 0
+    assert router["tokens"]["input"] == 12
@@ -0,0 +1,82 @@
+"""Tests for task-class model routing, latency budgets and JSON escalation."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from legal_chatbot.utils import llm
+
+HAIKU = "claude-3-5-haiku-20241022"
+
+
+# The real check, kept before fake_anthropic replaces it
+REAL_USE_DEEPSEEK = llm._use_deepseek
+
+
+def test_routes_pick_small_model_for_classification(monkeypatch):
+    monkeypatch.setattr(llm, "_use_deepseek", lambda: False)
+    assert llm.route_model("classify") == HAIKU
+    assert llm.route_model("answer") == llm.SONNET_MODEL
+    assert llm.route_model(None) == llm.get_model()
+    assert llm.route_budget("classify") > 0 and llm.route_budget(None) == 0
+    assert llm.route_budget("answer") == 0  # long answers are never cut off by a deadline
+
+    # DeepSeek replaces the Sonnet tier only, and only for Sonnet-tier entry points
+    monkeypatch.setattr(llm, "_use_deepseek", lambda: True)
+    assert llm.route_model("answer", sonnet_tier=True) == "deepseek-chat"
+    assert llm.route_model("classify", sonnet_tier=True) == HAIKU
+    assert llm.route_model("answer") == llm.SONNET_MODEL
+    assert llm.route_model(None) == llm.get_model()
+
+
+async def test_unparseable_json_escalates_to_stronger_model(fake_anthropic):
+    fake_anthropic.reply = {HAIKU: "Tôi nghĩ đây là câu hỏi pháp luật", llm.SONNET_MODEL: '{"intent": "legal_question"}'}
+
+    request = [{"role": "user", "content": "Chia thừa kế thế nào?"}]
+    assert await llm.acall_llm_json(request, task="classify") == {"intent": "legal_question"}
+    assert fake_anthropic.models == [HAIKU, llm.SONNET_MODEL]
+
+    # A reply that parses is not escalated
+    fake_anthropic.reply[HAIKU] = '{"intent": "other"}'
+    fake_anthropic.calls.clear()
+    assert await llm.acall_llm_json(request, task="classify") == {"intent": "other"}
+    assert fake_anthropic.models == [HAIKU]
+
+
+async def test_budget_bounds_async_call(monkeypatch, fake_anthropic):
+    monkeypatch.setenv("LLM_ROUTE_BUDGETS", '{"classify": 0.05}')
+    fake_anthropic.reply, fake_anthropic.delay = "none", 1.0
+
+    with pytest.raises(TimeoutError):
+        await llm.acall_llm([{"role": "user", "content": "thuê nhà"}], task="classify")
+
+
+async def test_async_call_accepts_model_override(fake_anthropic):
+    request = [{"role": "user", "content": "thuê nhà"}]
+    assert await llm.acall_llm(request, task="classify", model=llm.SONNET_MODEL) == "ok"
+    assert fake_anthropic.models == [llm.SONNET_MODEL]
+
+
+def test_deepseek_key_only_moves_sonnet_entry_points(monkeypatch, fake_anthropic):
+    monkeypatch.setenv("DEEPSEEK_API_KEY", "test_key")
+    monkeypatch.setattr(llm, "_use_deepseek", REAL_USE_DEEPSEEK)
+    deepseek_models = []
+
+    def deepseek_create(**kwargs):
+        deepseek_models.append(kwargs["model"])
+        response = SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content="ok"))],
+            usage=SimpleNamespace(prompt_tokens=10, completion_tokens=5),
+        )
+        return SimpleNamespace(headers={}, parse=lambda: response)
+
+    monkeypatch.setattr(llm, "_get_deepseek_client", lambda: SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(
+            with_raw_response=SimpleNamespace(create=deepseek_create)))))
+
+    request = [{"role": "user", "content": "Chia thừa kế thế nào?"}]
+    llm.call_llm(request)
+    llm.call_llm(request, task="answer")
+    llm.call_llm_sonnet(request)
+    assert fake_anthropic.models == [llm.get_model(), llm.SONNET_MODEL]
+    assert deepseek_models == ["deepseek-chat"]
@@ -0,0 +1,154 @@
+"""Tests for the shared LLM scheduler (caps, rate budget, retries, hedging)."""
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from legal_chatbot.utils.llm_metrics import LLMMetrics
+from legal_chatbot.utils.llm_scheduler import LLMScheduler, TokenBucket, is_retryable
+
+
+class APIStatusError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+        self.response = SimpleNamespace(headers=headers or {})
+
+
+def scheduler(**overrides):
+    options = dict(
+        max_concurrency=4, model_concurrency={}, max_retries=3,
+        base_delay=0.01, max_delay=0.5, hedge_after=0, hedge_max_tokens=600, metrics=LLMMetrics(prices={}),
+    )
+    options.update(overrides)
+    return LLMScheduler(**options)
+
+
+def test_retries_429_then_succeeds_and_pauses_model():
+    sched = scheduler()
+    attempts = []
+
+    def flaky():
+        attempts.append(time.monotonic())
+        if len(attempts) < 3:
+            raise APIStatusError(429, {"retry-after": "0.05"})
+        return "ok"
+
+    assert sched.run("haiku", flaky, site="test.flaky") == "ok"
+    assert len(attempts) == 3
+    assert attempts[1] - attempts[0] >= 0.05
+    assert sched.metrics.stats()["test.flaky"]["haiku"]["retries"] == 2
+
+
+def test_client_errors_are_not_retried():
+    sched = scheduler()
+    calls = []
+
+    def bad_request():
+        calls.append(1)
+        raise APIStatusError(400)
+
+    with pytest.raises(APIStatusError):
+        sched.run("haiku", bad_request, site="test.bad")
+    assert len(calls) == 1
+    assert sched.metrics.stats()["test.bad"]["haiku"]["retries"] == 0
+    assert is_retryable(APIStatusError(529)) and is_retryable(ConnectionError())
+
+
+def test_sync_cap_is_shared_across_threads():
+    sched = scheduler(model_concurrency={"sonnet": 2})
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def call():
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        return True
+
+    threads = [threading.Thread(target=sched.run, args=("sonnet", call)) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert peak[0] == 2
+
+
+async def test_async_cap_and_site_detection():
+    sched = scheduler(max_concurrency=2)
+    active, peak = [0], [0]
+
+    async def call():
+        active[0] += 1
+        peak[0] = max(peak[0], active[0])
+        await asyncio.sleep(0.05)
+        active[0] -= 1
+        return True
+
+    async def classify():
+        return await sched.arun("haiku", call)
+
+    results = await asyncio.gather(*(classify() for _ in range(5)))
+    assert all(results) and peak[0] == 2
+    assert list(sched.metrics.stats()) == ["test_llm_scheduler.classify"]
+
+
+async def test_slow_short_call_is_hedged():
+    sched = scheduler(hedge_after=0.05)
+    calls = []
+
+    async def call():
+        calls.append(1)
+        if len(calls) == 1:
+            await asyncio.sleep(2)  # stalled upstream
+            return "slow"
+        return "fast"
+
+    start = time.monotonic()
+    result = await sched.arun("haiku", call, max_tokens=60, site="test.hedge")
+    assert result == "fast"
+    assert time.monotonic() - start < 1
+    stats = sched.metrics.stats()["test.hedge"]["haiku"]
+    assert stats["hedged"] == 1 and stats["hedge_wins"] == 1
+    await asyncio.sleep(0.01)  # loser's cancellation releases its slot
+    assert sched.stats()["haiku"]["active"] == 0
+
+    # Long generations are never duplicated
+    calls.clear()
+    await sched.arun("haiku", call, max_tokens=4096)
+    assert len(calls) == 1
+
+
+async def test_stream_retries_only_before_first_chunk():
+    sched = scheduler()
+    opened = []
+
+    async def open_stream():
+        opened.append(1)
+        if len(opened) == 1:
+            raise APIStatusError(529)
+        for text in ("Điều ", "650"):
+            yield text
+
+    chunks = [c async for c in sched.astream("sonnet", open_stream)]
+    assert chunks == ["Điều ", "650"] and len(opened) == 2
+
+
+def test_bucket_waits_for_reset_when_budget_exhausted():
+    bucket = TokenBucket()
+    bucket.observe({
+        "anthropic-ratelimit-requests-remaining": "1",
+        "anthropic-ratelimit-requests-reset": "0.3s",  # OpenAI-style duration also accepted
+        "x-ratelimit-remaining-tokens": "1000",
+        "x-ratelimit-reset-tokens": "1m",
+    })
+    assert bucket.reserve(cost=100) == 0
+    assert 0 < bucket.reserve(cost=100) <= 0.3
+    bucket.pause(0.5)
+    assert bucket.reserve() > 0.3
@@ -0,0 +1,116 @@
+"""Tests for the local vector index used by SQLiteClient.search_articles."""
+
+import numpy as np
+import pytest
+
+from legal_chatbot.db import vector_store
+from legal_chatbot.db.sqlite_client import SQLiteClient
+from legal_chatbot.db.vector_store import LocalVectorStore
+
+DIM = 8
+
+
+def _unit(*values) -> list[float]:
+    v = np.zeros(DIM, dtype=np.float32)
+    v[: len(values)] = values
+    return (v / np.linalg.norm(v)).tolist()
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setenv("EMBEDDING_DIMENSION", str(DIM))
+    monkeypatch.setattr(vector_store, "_store", None)
+    db = SQLiteClient()
+    db.init_db()
+    db.insert_document({
+        "id": "blds", "document_type": "luat", "document_number": "91/2015/QH13",
+        "title": "Bộ luật Dân sự 2015", "status": "active",
+    })
+    db.insert_document({
+        "id": "old", "document_type": "luat", "document_number": "33/2005/QH11",
+        "title": "Bộ luật Dân sự 2005", "status": "expired",
+    })
+    db.upsert_articles([
+        {"id": "a1", "document_id": "blds", "article_number": 1,
+         "content": "Điều 1", "embedding": _unit(1, 0)},
+        {"id": "a2", "document_id": "blds", "article_number": 2,
+         "content": "Điều 2", "embedding": _unit(1, 1)},
+        {"id": "a3", "document_id": "old", "article_number": 1,
+         "content": "Điều 1 cũ", "embedding": _unit(1, 0.1)},
+        {"id": "a4", "document_id": "blds", "article_number": 4,
+         "content": "Điều 4", "embedding": _unit(0, 1)},
+    ])
+    return db
+
+
+def test_search_matches_rpc_semantics(client):
+    results = client.search_articles(_unit(1, 0), top_k=5)
+    # a3 belongs to an expired document, a4 is orthogonal (similarity 0 < 0.3)
+    assert [r["id"] for r in results] == ["a1", "a2"]
+    assert results[0]["similarity"] == pytest.approx(1.0, abs=1e-5)
+    assert results[1]["similarity"] == pytest.approx(2 ** -0.5, abs=1e-5)
+    assert results[0]["document_title"] == "Bộ luật Dân sự 2015"
+    assert results[0]["document_number"] == "91/2015/QH13"
+
+
+def test_search_respects_status_filter(client):
+    results = client.search_articles(_unit(1, 0), top_k=5, status="expired")
+    assert [r["id"] for r in results] == ["a3"]
+
+
+def test_upsert_overwrites_vector_and_persists(client, tmp_path):
+    client.upsert_articles([
+        {"id": "a1", "document_id": "blds", "article_number": 1,
+         "content": "Điều 1", "embedding": _unit(0, 1)},
+    ])
+    reopened = LocalVectorStore(path=tmp_path / "vectors", dimension=DIM, use_hnsw=False)
+    assert len(reopened) == 4
+    top = reopened.search(_unit(0, 1), limit=2)
+    assert {aid for aid, _ in top} == {"a1", "a4"}
+
+
+def test_hnsw_agrees_with_brute_force(tmp_path):
+    pytest.importorskip("hnswlib")
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(200, DIM)).astype(np.float32)
+    ids = [f"id{i}" for i in range(200)]
+
+    brute = LocalVectorStore(path=tmp_path / "brute", dimension=DIM, use_hnsw=False)
+    hnsw = LocalVectorStore(path=tmp_path / "hnsw", dimension=DIM, use_hnsw=True)
+    brute.upsert(ids, vectors)
+    hnsw.upsert(ids, vectors)
+
+    query = rng.normal(size=DIM)
+    expected = brute.search(query, limit=5)
+    got = hnsw.search(query, limit=5)
+    assert [aid for aid, _ in got] == [aid for aid, _ in expected]
+    for (_, a), (_, b) in zip(got, expected):
+        assert a == pytest.approx(b, abs=1e-4)
+
+
+def test_unreadable_ids_drop_stale_rows(tmp_path):
+    path = tmp_path / "torn"
+    store = LocalVectorStore(path=path, dimension=DIM, use_hnsw=False)
+    store.upsert(["a", "b"], [_unit(1, 0), _unit(0, 1)])
+    (path / "ids.json").write_text('["a", ', encoding="utf-8")
+
+    reopened = LocalVectorStore(path=path, dimension=DIM, use_hnsw=False)
+    reopened.upsert(["c"], [_unit(0, 0, 1)])
+    np.testing.assert_allclose(reopened.get(["c"])["c"], _unit(0, 0, 1), atol=1e-6)
+    assert [aid for aid, _ in reopened.search(_unit(0, 0, 1), limit=3)] == ["c"]
+
+
+def test_rows_appended_before_ids_write_are_truncated(tmp_path):
+    path = tmp_path / "crash"
+    store = LocalVectorStore(path=path, dimension=DIM, use_hnsw=False)
+    store.upsert(["a", "b"], [_unit(1, 0), _unit(0, 1)])
+    # Crash between the matrix append and the ids.json replace
+    with open(path / "embeddings.f32", "ab") as f:
+        f.write(np.asarray(_unit(0, 0, 1), dtype=np.float32).tobytes())
+
+    reopened = LocalVectorStore(path=path, dimension=DIM, use_hnsw=False)
+    assert len(reopened) == 2
+    reopened.upsert(["c"], [_unit(0, 0, 1)])
+    assert set(reopened.get(["a", "b", "c"])) == {"a", "b", "c"}
+    assert reopened.search(_unit(1, 0), limit=1)[0][0] == "a"
+    assert reopened.search(_unit(0, 0, 1), limit=1)[0][0] == "c"
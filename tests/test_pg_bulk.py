@@ -0,0 +1,66 @@
+"""Tests for the direct-Postgres COPY bulk article loader."""
+
+import os
+import uuid
+
+import numpy as np
+import pytest
+
+from legal_chatbot.db import pg_bulk
+
+DOC_ID = "7c9e6679-7425-40de-944b-e07fc1f90ae7"
+
+
+def test_stage_rows_dedupe_on_conflict_key():
+    rows = pg_bulk._stage_rows([
+        {"document_id": DOC_ID, "article_number": 1, "content": "cũ"},
+        {"document_id": DOC_ID, "article_number": 1, "chunk_index": 0, "content": "mới"},
+        {"document_id": DOC_ID, "article_number": 1, "chunk_index": 1, "content": "phần 2"},
+    ])
+    names = [name for name, _ in pg_bulk.STAGE_COLUMNS]
+    assert len(rows) == 2
+    first = dict(zip(names, rows[0]))
+    assert first["content"] == "mới"
+    assert first["chunk_index"] == 0
+    assert first["document_id"] == uuid.UUID(DOC_ID)
+    assert first["id"] is None
+
+
+def test_bulk_loader_disabled_without_db_url(monkeypatch):
+    monkeypatch.delenv("SUPABASE_DB_URL", raising=False)
+    assert not pg_bulk.bulk_loader_available()
+
+
+@pytest.mark.skipif(
+    not os.environ.get("TEST_PGVECTOR_DSN"),
+    reason="set TEST_PGVECTOR_DSN to a Postgres with pgvector",
+)
+def test_copy_upsert_round_trip():
+    pytest.importorskip("psycopg")
+    pytest.importorskip("pgvector")
+    conn = pg_bulk.connect(os.environ["TEST_PGVECTOR_DSN"])
+    conn.execute(
+        "CREATE EXTENSION IF NOT EXISTS vector;"
+        "DROP TABLE IF EXISTS test_articles;"
+        "CREATE TABLE test_articles (id UUID PRIMARY KEY DEFAULT gen_random_uuid(),"
+        " document_id UUID NOT NULL, article_number INT NOT NULL, title TEXT,"
+        " content TEXT NOT NULL, chapter TEXT, section TEXT, part TEXT,"
+        " embedding VECTOR(3), content_hash TEXT, chunk_index INT DEFAULT 0,"
+        " updated_at TIMESTAMPTZ DEFAULT now(),"
+        " UNIQUE(document_id, article_number, chunk_index))"
+    )
+    try:
+        vector = np.array([1.0, 0.0, 0.0], dtype=np.float32)
+        article = {"document_id": DOC_ID, "article_number": 1, "title": "Điều 1",
+                   "content": "a", "embedding": vector}
+        assert pg_bulk.copy_upsert_articles(conn, [article], table="test_articles") == 1
+        # Re-load without title/embedding: content updates, NULLs keep old values
+        update = {"document_id": DOC_ID, "article_number": 1, "content": "b"}
+        assert pg_bulk.copy_upsert_articles(conn, [update], table="test_articles") == 1
+        row = conn.execute(
+            "SELECT title, content, embedding::text FROM test_articles"
+        ).fetchone()
+        assert row == ("Điều 1", "b", "[1,0,0]")
+    finally:
+        conn.execute("DROP TABLE IF EXISTS test_articles")
+        conn.close()
@@ -0,0 +1,42 @@
+"""Tests for Anthropic prompt-cache breakpoints in utils.llm."""
+
+from types import SimpleNamespace
+
+from legal_chatbot.utils import llm
+
+
+def test_cache_block_marks_breakpoint(monkeypatch):
+    assert llm.cache_block("luật")["cache_control"] == {"type": "ephemeral"}
+    monkeypatch.setenv("LLM_PROMPT_CACHE", "false")
+    assert "cache_control" not in llm.cache_block("luật")
+
+
+def test_prepare_kwargs_passes_system_blocks_through():
+    system = [llm.cache_block("hướng dẫn"), llm.cache_block("điều luật")]
+    kwargs = llm.prepare_kwargs(
+        [{"role": "system", "content": system}, {"role": "user", "content": "hỏi"}],
+        "model", 0.3, 100, "",
+    )
+    assert kwargs["system"] == system
+    assert kwargs["messages"] == [{"role": "user", "content": "hỏi"}]
+
+
+def test_openai_messages_flatten_blocks():
+    messages = llm._build_oai_messages(
+        [{"role": "user", "content": [{"type": "text", "text": "a"}, {"type": "text", "text": "b"}]}],
+        [llm.cache_block("hướng dẫn")],
+    )
+    assert messages == [
+        {"role": "system", "content": "hướng dẫn"},
+        {"role": "user", "content": "a\n\nb"},
+    ]
+
+
+def test_cache_usage_is_logged(caplog):
+    usage = SimpleNamespace(
+        input_tokens=12, output_tokens=40,
+        cache_read_input_tokens=3000, cache_creation_input_tokens=0,
+    )
+    with caplog.at_level("INFO", logger=llm.__name__):
+        llm._log_usage("claude", usage)
+    assert "cache_read=3000" in caplog.text
@@ -0,0 +1,60 @@
+"""Tests for the unified query router (parse/validation + ChatService reuse)."""
+
+from legal_chatbot.services import query_router
+from legal_chatbot.services.chat import ChatService
+from legal_chatbot.services.query_router import parse_analysis
+
+TYPES = [{"type": "cho_thue_nha", "name": "Hợp đồng thuê nhà ở"}]
+CATEGORIES = ["dat_dai", "dan_su"]
+
+
+def test_parse_analysis_validates_slugs_and_categories():
+    analysis = parse_analysis(
+        {
+            "intent": "create_contract",
+            "contract_type": "cho_thue_xe",
+            "category": "hinh_su",
+            "primary": ["Thuê Nhà ", "x", 3],
+        },
+        TYPES, CATEGORIES,
+    )
+    assert analysis.wants_contract
+    assert analysis.contract_type is None
+    assert analysis.category is None
+    assert analysis.primary == ["thuê nhà"]
+    assert analysis.secondary == []
+
+
+def test_parse_analysis_rejects_unknown_shape():
+    assert parse_analysis(None, TYPES, CATEGORIES) is None
+    assert parse_analysis({"intent": "chitchat"}, TYPES, CATEGORIES) is None
+
+
+def test_chat_service_reuses_router_terms(monkeypatch):
+    calls = []
+
+    def fake_llm_json(**request):
+        calls.append(request)
+        return {"intent": "legal_question", "category": "dan_su",
+                "primary": ["thời hiệu", "khởi kiện"], "secondary": []}
+
+    class FakeRetriever:
+        def retrieve(self, query, top_k=25, **terms):
+            self.terms = terms
+            return []
+
+    monkeypatch.setattr(query_router, "call_llm_json", fake_llm_json)
+    svc = ChatService()
+    svc._retriever = FakeRetriever()
+
+    category, analysis = svc._detect_category("Thời hiệu khởi kiện là bao lâu?")
+    svc._build_context_supabase("Thời hiệu khởi kiện là bao lâu?", analysis)
+
+    assert category == "dan_su"
+    assert len(calls) == 1 and calls[0]["cache"] is True
+    assert svc._retriever.terms == {"primary_terms": ["thời hiệu", "khởi kiện"], "secondary_terms": []}
+
+
+def test_keyword_category_skips_router(monkeypatch):
+    monkeypatch.setattr(query_router, "call_llm_json", lambda **kw: 1 / 0)
+    assert ChatService()._detect_category("Tranh chấp quyền sử dụng đất") == ("dat_dai", None)
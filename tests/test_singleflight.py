@@ -0,0 +1,101 @@
+"""Tests for coalescing identical in-flight LLM calls and DB reads."""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from legal_chatbot.db.async_db import AsyncDatabase
+from legal_chatbot.utils import llm, singleflight
+from legal_chatbot.utils.singleflight import SingleFlight, coalesced
+
+
+@pytest.fixture
+def flight(monkeypatch):
+    flight = SingleFlight(enabled=True)
+    monkeypatch.setattr(singleflight, "_singleflight", flight)
+    return flight
+
+
+async def test_identical_llm_calls_share_one_request(flight, fake_anthropic):
+    fake_anthropic.reply = '{"intent": "legal_question"}'
+    fake_anthropic.delay = 0.05
+
+    prompt = [{"role": "user", "content": "Chia thừa kế thế nào?"}]
+    replies = await asyncio.gather(*(llm.acall_llm(prompt, task="classify") for _ in range(5)))
+    assert replies == ['{"intent": "legal_question"}'] * 5
+    assert len(fake_anthropic.calls) == 1
+    assert flight.stats()["llm"] == {"calls": 5, "deduplicated": 4, "in_flight": 0}
+
+    # Calls that don't overlap are not merged
+    await llm.acall_llm(prompt, task="classify")
+    assert len(fake_anthropic.calls) == 2
+    assert 'legal_chatbot_singleflight_deduplicated_total{group="llm"} 4' in flight.render_prometheus()
+
+
+def test_threads_share_result_and_exception(flight):
+    started = threading.Event()
+    runs = []
+
+    def slow(value):
+        runs.append(value)
+        started.set()
+        time.sleep(0.1)
+        if value == "boom":
+            raise RuntimeError("PostgREST timeout")
+        return value
+
+    def call(value):
+        return flight.do("db", value, lambda: slow(value))
+
+    for value in ("ok", "boom"):
+        started.clear()
+        with ThreadPoolExecutor(4) as pool:
+            leader = pool.submit(call, value)
+            started.wait()
+            followers = [pool.submit(call, value) for _ in range(3)]
+            outcomes = []
+            for future in [leader] + followers:
+                try:
+                    outcomes.append(future.result())
+                except RuntimeError as e:
+                    outcomes.append(str(e))
+        assert outcomes == ([value] * 4 if value == "ok" else ["PostgREST timeout"] * 4)
+    assert runs == ["ok", "boom"]
+    assert flight.stats()["db"]["deduplicated"] == 6
+
+
+class FakeClient:
+    def __init__(self):
+        self.queries = []
+
+    @coalesced()
+    def list_all_active_templates(self):
+        self.queries.append("templates")
+        time.sleep(0.05)
+        return [{"contract_type": "cho_thue_nha", "display_name": "Hợp đồng thuê nhà"}]
+
+    @coalesced()
+    def get_contract_template(self, contract_type):
+        self.queries.append(contract_type)
+        time.sleep(0.05)
+        return {"contract_type": contract_type}
+
+
+async def test_async_database_coalesces_reads(flight):
+    client = FakeClient()
+    adb = AsyncDatabase(client)
+
+    templates = await asyncio.gather(*(adb.list_all_active_templates() for _ in range(10)))
+    assert client.queries == ["templates"]
+    assert flight.stats()["db"] == {"calls": 10, "deduplicated": 9, "in_flight": 0}  # counted once each
+    templates[0][0]["display_name"] = "sửa"  # callers don't share mutable rows
+    assert templates[1][0]["display_name"] == "Hợp đồng thuê nhà"
+
+    # Different arguments are different calls
+    await asyncio.gather(adb.get_contract_template("mua_ban_dat"), adb.get_contract_template("cho_thue_nha"))
+    assert sorted(client.queries[1:]) == ["cho_thue_nha", "mua_ban_dat"]
+    assert flight.stats()["db"]["deduplicated"] == 9
+    assert flight.stats()["db"]["calls"] == 12
@@ -0,0 +1,27 @@
+"""Tests for float32 vector wire formats."""
+
+import numpy as np
+
+from legal_chatbot.utils.vectors import from_bytes, from_pgvector, to_bytes, to_pgvector
+
+
+def test_pgvector_round_trip_is_compact_and_close():
+    rng = np.random.default_rng(0)
+    vector = rng.standard_normal(768).astype(np.float32)
+    vector /= np.linalg.norm(vector)
+
+    text = to_pgvector(vector)
+    assert text.startswith("[") and text.endswith("]")
+    assert len(text) < len(str(vector.tolist())) * 0.6
+    assert np.abs(from_pgvector(text) - vector).max() < 1e-6
+
+
+def test_from_pgvector_accepts_lists():
+    parsed = from_pgvector([0.5, -0.25])
+    assert parsed.dtype == np.float32
+    assert parsed.tolist() == [0.5, -0.25]
+
+
+def test_bytes_round_trip():
+    matrix = np.arange(6, dtype=np.float32).reshape(2, 3)
+    assert from_bytes(to_bytes(matrix), 3).tolist() == matrix.tolist()